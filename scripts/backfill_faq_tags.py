@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Rebuild faq_tags for every FAQ in an existing KB database.
+Run: python3 backfill_faq_tags.py [--db PATH] [--batch-size N]
+
+Databases populated by the older scripts have tags only in faqs.tags, so
+KB_FAQ_STORE.search_by_tags cannot find those FAQs. This reindexes every
+FAQ with its normalized tags and KB_TAG_VOCABULARY categories (see
+faq_tags.normalize_tags). Safe to rerun.
+"""
+
+import argparse
+
+from faq_loader import DB_PATH, DEFAULT_BATCH_SIZE, backfill_tags, connect
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild faq_tags from faqs.tags.")
+    parser.add_argument("--db", default=DB_PATH, help="database path (default: bin/kb.db)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="FAQs per batch")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    faqs, tags = backfill_tags(conn, max(args.batch_size, 1))
+    print(f"Tagged {faqs} FAQs with {tags} tags")
+
+    print("\nMost used tags:")
+    for tag, count in conn.execute(
+            "SELECT tag, COUNT(*) FROM faq_tags GROUP BY tag ORDER BY COUNT(*) DESC, tag LIMIT 15"):
+        print(f"  {tag}: {count}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark FAQ loading and faq_search rebuilds on synthetic corpora.
+Run: python3 bench_faq_load.py [--sizes 1k,10k,100k,1M] [--workers N] [--profile NAME] [--output FILE]
+
+For each size a synthetic corpus shaped like corpus/*.jsonl (Eiffel code
+blocks in answers, 5-10 tags, keyword strings) is written to a temp
+directory and loaded into a fresh temp database through the same path as
+load_faqs.py. Each size runs in its own process so peak RSS is per size.
+
+Results are printed (or written to --output) as JSON:
+
+    {"sqlite": "3.40.1", "python": "3.11.7", "workers": 4, "results": [
+        {"rows": 1000, "load_seconds": 0.41, "rows_per_sec": 2439.0,
+         "fts_rebuild_seconds": 0.05, "db_bytes": 1843200,
+         "peak_rss_bytes": 31457280, ...}, ...]}
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from faq_loader import DEFAULT_BATCH_SIZE, connect
+from kb_tuning import BULK, PROFILES
+from load_faqs import DEFAULT_CHUNK_SIZE, load_corpora
+
+DEFAULT_SIZES = "1k,10k,100k,1M"
+
+SEED = 7
+
+SUFFIXES = {"k": 1000, "m": 1000000}
+
+CLASSES = (
+    "ARRAYED_LIST", "HASH_TABLE", "STRING_32", "LINKED_LIST", "SIMPLE_JSON",
+    "SIMPLE_SQL_DATABASE", "ACTION_SEQUENCE", "PROCEDURE", "FUNCTION",
+    "DATE_TIME", "PLAIN_TEXT_FILE", "EXECUTION_ENVIRONMENT", "SIMPLE_HTTP",
+)
+
+FEATURES = (
+    "extend", "put", "item", "force", "has", "count", "start", "forth",
+    "after", "wipe_out", "to_string_32", "make_from_array", "call", "prune",
+)
+
+TOPICS = (
+    "void-safety", "scoop", "inheritance", "generics", "agents", "contracts",
+    "iteration", "once", "exceptions", "json", "sql", "http", "file",
+    "testing", "datetime", "hashing", "serialization", "cursor", "tuple",
+)
+
+TAGS = TOPICS + (
+    "dbc", "across", "loop", "attached", "detachable", "separate", "event",
+    "precondition", "postcondition", "invariant", "rename", "redefine",
+    "io", "network", "parsing", "database", "cache", "cli", "config",
+)
+
+WORDS = (
+    "feature", "class", "object", "reference", "expanded", "deferred",
+    "routine", "query", "command", "creation", "attribute", "argument",
+    "local", "result", "current", "precursor", "conformance", "type",
+    "compile", "runtime", "library", "client", "supplier", "contract",
+)
+
+CATEGORIES = ("syntax", "patterns", "errors", "libraries", "concurrency", "testing")
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000."""
+    text = text.strip().lower()
+    if text[-1:] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def synthetic_faq(rng, index):
+    """One FAQ dict with the shape of the curated corpus."""
+    topic = rng.choice(TOPICS)
+    cls = rng.choice(CLASSES)
+    feature = rng.choice(FEATURES)
+    words = rng.sample(WORDS, rng.randint(3, 6))
+    code = (
+        "```eiffel\n"
+        f"example_{index} (a_list: {cls} [STRING_32])\n"
+        "    require\n"
+        "        list_attached: a_list /= Void\n"
+        "    do\n"
+        f"        across a_list as ic loop\n"
+        f"            ic.{feature}\n"
+        "        end\n"
+        "    ensure\n"
+        f"        same_count: a_list.count = old a_list.count\n"
+        "    end\n"
+        "```"
+    )
+    answer = (
+        f"Use `{cls}.{feature}` when working with {topic}. "
+        + " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 80)))
+        + f".\n\n{code}\n\nSee also {rng.choice(CLASSES)} for the {' '.join(words[:2])} case."
+    )
+    return {
+        "question": f"How do I use {feature} on {cls} with {topic} ({' '.join(words)}) #{index}?",
+        "keywords": " ".join([topic, cls.lower(), feature] + words),
+        "answer": answer,
+        "sources": f"synthetic/{cls.lower()}.e",
+        "tags": ",".join(rng.sample(TAGS, rng.randint(5, 10))),
+        "category": rng.choice(CATEGORIES),
+        "difficulty": rng.randint(1, 5),
+        "related_classes": ",".join(rng.sample(CLASSES, 2)),
+        "source_origin": "synthetic",
+    }
+
+
+def write_corpus(path, rows, seed=SEED):
+    """Write `rows` synthetic FAQs to a JSONL file; returns its size."""
+    rng = random.Random(seed + rows)
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(1, rows + 1):
+            f.write(json.dumps(synthetic_faq(rng, index)))
+            f.write("\n")
+    return os.path.getsize(path)
+
+
+def peak_rss(who):
+    """Peak resident set size in bytes (ru_maxrss is KB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_size(rows, workers, batch_size, chunk_size, profile=BULK):
+    """Benchmark one corpus size in this process; returns a result dict (None if the load failed)."""
+    with tempfile.TemporaryDirectory(prefix="kb-bench-") as tmp:
+        corpus = os.path.join(tmp, "synthetic.jsonl")
+        db_path = os.path.join(tmp, "kb.db")
+
+        started = time.perf_counter()
+        corpus_bytes = write_corpus(corpus, rows)
+        generate_seconds = time.perf_counter() - started
+
+        conn = connect(db_path, profile)
+        started = time.perf_counter()
+        result = load_corpora(conn, [corpus], "synthetic", workers, chunk_size,
+                              None, batch_size, quiet=True)
+        load_seconds = time.perf_counter() - started
+        if result is None:
+            # load_corpora has printed why
+            conn.close()
+            return None
+
+        started = time.perf_counter()
+        conn.execute("INSERT INTO faq_search(faq_search) VALUES ('rebuild')")
+        conn.commit()
+        rebuild_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        conn.execute("INSERT INTO faq_search(faq_search) VALUES ('optimize')")
+        conn.commit()
+        optimize_seconds = time.perf_counter() - started
+
+        tag_rows = conn.execute("SELECT COUNT(*) FROM faq_tags").fetchone()[0]
+        # Fold the WAL back so db_bytes is the whole database
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+
+        return {
+            "rows": rows,
+            "workers": workers,
+            "batch_size": batch_size,
+            "profile": profile,
+            "inserted": result.inserted,
+            "failed": result.failed,
+            "tag_rows": tag_rows,
+            "generate_seconds": round(generate_seconds, 3),
+            "load_seconds": round(load_seconds, 3),
+            "rows_per_sec": round(rows / load_seconds, 1) if load_seconds > 0 else None,
+            "fts_rebuild_seconds": round(rebuild_seconds, 3),
+            "fts_optimize_seconds": round(optimize_seconds, 3),
+            "corpus_bytes": corpus_bytes,
+            "db_bytes": os.path.getsize(db_path),
+            "peak_rss_bytes": peak_rss(resource.RUSAGE_SELF),
+            "workers_peak_rss_bytes": peak_rss(resource.RUSAGE_CHILDREN),
+        }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark FAQ loading on synthetic corpora.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated row counts (default: {DEFAULT_SIZES})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="preparation processes (see load_faqs.py)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=BULK,
+                        help="database tuning profile (see kb_tuning)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.run_size:
+        # Child process: one size, result on stdout
+        result = run_size(args.run_size, args.workers, args.batch_size, args.chunk_size, args.profile)
+        if result is None:
+            print(f"Error: loading {args.run_size} rows failed", file=sys.stderr)
+            return 1
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    for rows in (parse_size(size) for size in args.sizes.split(",") if size.strip()):
+        print(f"Benchmarking {rows} rows...", file=sys.stderr)
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-size", str(rows),
+             "--workers", str(args.workers), "--batch-size", str(args.batch_size),
+             "--chunk-size", str(args.chunk_size), "--profile", args.profile],
+            stdout=subprocess.PIPE, text=True)
+        if child.returncode != 0:
+            print(f"Error: benchmark for {rows} rows failed", file=sys.stderr)
+            return 1
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    report = json.dumps({
+        "sqlite": sqlite3.sqlite_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": args.workers,
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark short prefix queries on kb_search and faq_search with and without
+FTS5 prefix indexes.
+Run: python3 bench_prefix_search.py [--db PATH] [--prefix "2 3 4"] [--rows N] [--output FILE]
+
+The text of an ingested kb.db (--db, default bin/kb.db) is copied into two
+temp databases whose kb_search and faq_search differ only in the prefix=
+option: none, and --prefix (default: [database] fts_prefix of kb.toml).
+If the database is missing or has no FAQs, --rows synthetic FAQs shaped
+like the curated corpus are used for faq_search instead (see
+bench_faq_load).
+
+Query terms are the prefixes of 2 to 5 characters that expand to the most
+distinct index terms. Each runs the way the stores run it (`term*`, bm25
+ranking, LIMIT 20) and as a bare match count, the part a prefix index
+replaces; ranking every match costs the same either way. Lengths without
+a prefix index (5 with the default) show the unchanged baseline. Results
+are printed (or written to --output) as JSON:
+
+    {"sqlite": "3.40.1", "prefix": "2 3 4",
+     "db_bytes": {"none": 58167296, "prefix": 95645696},
+     "tables": [{"table": "kb_search", "rows": 105532, "lengths": [
+         {"chars": 2, "queries": 40,
+          "ranked_ms": {"none": 15.8, "prefix": 10.7}, "ranked_speedup": 1.47,
+          "match_ms": {...}, "match_speedup": ...}, ...]}, ...]}
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from bench_faq_load import SEED, synthetic_faq
+from faq_loader import DB_PATH
+from kb_tuning import config_path_for, load_fts_prefix
+
+DEFAULT_ROWS = 100000
+DEFAULT_QUERIES = 40
+DEFAULT_REPEAT = 3
+LENGTHS = (2, 3, 4, 5)
+
+TABLES = {
+    "kb_search": ("content_type", "content_id", "title", "body", "tags"),
+    "faq_search": ("faq_id", "question", "answer", "keywords", "tags"),
+}
+
+
+def source_rows(db_path, rows):
+    """(table -> list of row tuples) from `db_path`, or synthetic FAQs."""
+    tables = {}
+    if os.path.isfile(db_path):
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        for table, columns in TABLES.items():
+            try:
+                tables[table] = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+            except sqlite3.Error:
+                pass
+        conn.close()
+    tables = {table: data for table, data in tables.items() if data}
+    if "faq_search" not in tables:
+        rng = random.Random(SEED + rows)
+        faqs = (synthetic_faq(rng, index) for index in range(1, rows + 1))
+        tables["faq_search"] = [(str(index), faq["question"], faq["answer"], faq["keywords"], faq["tags"])
+                                for index, faq in enumerate(faqs, 1)]
+    return tables
+
+
+def build(path, tables, prefix):
+    """Fill a fresh database at `path` with standalone copies of `tables`."""
+    options = (f"prefix='{prefix}', " if prefix else "") + "tokenize='porter unicode61'"
+    conn = sqlite3.connect(path)
+    for table, data in tables.items():
+        columns = TABLES[table]
+        conn.execute(f"CREATE VIRTUAL TABLE {table} USING fts5({', '.join(columns)}, {options})")
+        conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", data)
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    return os.path.getsize(path)
+
+
+def query_terms(conn, table, count):
+    """
+    `count` prefixes per length, those expanding to the most distinct terms
+    (the case prefix indexes are for: without one, each term's doclist is
+    read and merged).
+    """
+    conn.execute(f"CREATE VIRTUAL TABLE temp.vocab USING fts5vocab(main, {table}, 'row')")
+    terms = [term for (term,) in conn.execute("SELECT term FROM temp.vocab WHERE term GLOB '[a-z]*'")]
+    conn.execute("DROP TABLE temp.vocab")
+    result = {}
+    for length in LENGTHS:
+        spread = {}
+        for term in terms:
+            if len(term) >= length:
+                spread[term[:length]] = spread.get(term[:length], 0) + 1
+        result[length] = sorted(spread, key=lambda prefix: (-spread[prefix], prefix))[:count]
+    return result
+
+
+def time_queries(path, table, prefixes, repeat, ranked=True):
+    """
+    Median milliseconds of the `prefix*` query over `prefixes`: ranked as
+    the stores run it, or only collecting the matches (the part a prefix
+    index replaces).
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    if ranked:
+        sql = f"SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY bm25({table}) LIMIT 20"
+    else:
+        sql = f"SELECT COUNT(*) FROM {table} WHERE {table} MATCH ?"
+    timings = []
+    for prefix in prefixes:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, (prefix + "*",)).fetchall()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best * 1000)
+    conn.close()
+    return round(statistics.median(timings), 3) if timings else None
+
+
+def run(tables, prefix, queries, repeat):
+    """Benchmark every table; returns (per-table result dicts, database sizes)."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="kb-prefix-") as tmp:
+        plain = os.path.join(tmp, "none.db")
+        indexed = os.path.join(tmp, "prefix.db")
+        sizes = {"none": build(plain, tables, ""), "prefix": build(indexed, tables, prefix)}
+        conn = sqlite3.connect(plain)
+        for table, data in tables.items():
+            lengths = []
+            for length, prefixes in query_terms(conn, table, queries).items():
+                entry = {"chars": length, "queries": len(prefixes)}
+                for mode, ranked in (("ranked", True), ("match", False)):
+                    none = time_queries(plain, table, prefixes, repeat, ranked)
+                    with_prefix = time_queries(indexed, table, prefixes, repeat, ranked)
+                    entry[f"{mode}_ms"] = {"none": none, "prefix": with_prefix}
+                    entry[f"{mode}_speedup"] = round(none / with_prefix, 2) if none and with_prefix else None
+                lengths.append(entry)
+            results.append({"table": table, "rows": len(data), "lengths": lengths})
+        conn.close()
+    return results, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FTS5 prefix indexes on short prefix queries.")
+    parser.add_argument("--db", default=DB_PATH, help="ingested database to copy (default: bin/kb.db)")
+    parser.add_argument("--prefix", help="prefix lengths to test (default: fts_prefix in kb.toml)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS,
+                        help=f"synthetic FAQs when the database has none (default: {DEFAULT_ROWS})")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help="distinct prefixes per length")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="runs per query (the fastest counts)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    prefix = load_fts_prefix(config_path_for(args.db)) if args.prefix is None else args.prefix
+    if not prefix:
+        print("Error: no prefix lengths to test", file=sys.stderr)
+        return 1
+    tables = source_rows(args.db, args.rows)
+    results, sizes = run(tables, prefix, max(args.queries, 1), max(args.repeat, 1))
+    report = json.dumps({
+        "sqlite": sqlite3.sqlite_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source": args.db if os.path.isfile(args.db) else "synthetic",
+        "prefix": prefix,
+        "db_bytes": sizes,
+        "tables": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
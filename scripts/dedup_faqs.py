@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Find and merge near-duplicate FAQs.
+Run: python3 dedup_faqs.py [--db PATH] [--threshold 0.8] [--merge] [--max-bucket N]
+
+FAQs are compared through their faq_lsh buckets (MinHash bands, see
+faq_minhash) instead of pairwise: only FAQs sharing a bucket become
+candidates, and each candidate pair is confirmed by the exact Jaccard
+similarity of its word 3-shingles. Confirmed pairs are grouped
+transitively.
+
+Without --merge the groups are only reported. With --merge each group
+keeps one FAQ (most helpful_count, then hit_count, then lowest id); it
+takes over the others' hit and helpful counts and tags, and the others
+are deleted (faq_search and faq_lsh follow through triggers).
+
+FAQs loaded before faq_lsh existed are indexed first.
+"""
+
+import argparse
+import sys
+import time
+
+from faq_loader import DB_PATH, DEFAULT_BATCH_SIZE, MAX_LOOKUP_VARIABLES, backfill_lsh, connect
+from faq_minhash import DEFAULT_THRESHOLD, jaccard, shingle_hashes
+from faq_tags import format_tags, normalize_tags, parse_tags
+
+# Buckets with more members than this are compared as a star around their
+# first member rather than all pairs (boilerplate FAQs can share a bucket)
+DEFAULT_MAX_BUCKET = 50
+
+
+def candidate_pairs(conn, max_bucket=DEFAULT_MAX_BUCKET):
+    """Distinct (low id, high id) pairs of FAQs that share an faq_lsh bucket."""
+    pairs = set()
+    for (members,) in conn.execute(
+            "SELECT group_concat(faq_id) FROM faq_lsh GROUP BY bucket HAVING COUNT(*) > 1"):
+        ids = sorted(int(faq_id) for faq_id in members.split(","))
+        if len(ids) > max_bucket:
+            pairs.update((ids[0], other) for other in ids[1:])
+        else:
+            pairs.update((a, b) for i, a in enumerate(ids) for b in ids[i + 1:])
+    return pairs
+
+
+def load_shingles(conn, ids):
+    """Map FAQ id -> shingle-hash set for `ids`."""
+    ids = sorted(ids)
+    shingles = {}
+    for start in range(0, len(ids), MAX_LOOKUP_VARIABLES):
+        chunk = ids[start:start + MAX_LOOKUP_VARIABLES]
+        for faq_id, question, answer in conn.execute(
+                "SELECT id, question, answer FROM faqs WHERE id IN ("
+                + ",".join("?" * len(chunk)) + ")", chunk):
+            shingles[faq_id] = shingle_hashes(question, answer)
+    return shingles
+
+
+def find_groups(conn, threshold=DEFAULT_THRESHOLD, max_bucket=DEFAULT_MAX_BUCKET):
+    """
+    Near-duplicate groups as sorted id lists (largest first).
+
+    Returns (groups, candidate pair count).
+    """
+    pairs = candidate_pairs(conn, max_bucket)
+    shingles = load_shingles(conn, {faq_id for pair in pairs for faq_id in pair})
+
+    parent = {}
+
+    def root(faq_id):
+        parent.setdefault(faq_id, faq_id)
+        while parent[faq_id] != faq_id:
+            parent[faq_id] = parent[parent[faq_id]]
+            faq_id = parent[faq_id]
+        return faq_id
+
+    for a, b in pairs:
+        if a in shingles and b in shingles and jaccard(shingles[a], shingles[b]) >= threshold:
+            ra, rb = root(a), root(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    groups = {}
+    for faq_id in parent:
+        groups.setdefault(root(faq_id), []).append(faq_id)
+    result = [sorted(group) for group in groups.values() if len(group) > 1]
+    result.sort(key=lambda group: (-len(group), group[0]))
+    return result, len(pairs)
+
+
+def merge_group(conn, group):
+    """Fold `group` into its best FAQ; returns the kept id."""
+    rows = conn.execute(
+        "SELECT id, tags, COALESCE(hit_count, 0), COALESCE(helpful_count, 0) FROM faqs "
+        "WHERE id IN (" + ",".join("?" * len(group)) + ")", group).fetchall()
+    rows.sort(key=lambda row: (-row[3], -row[2], row[0]))
+    keeper, others = rows[0], rows[1:]
+    other_ids = [row[0] for row in others]
+    marks = ",".join("?" * len(other_ids))
+
+    tags = []
+    for row in rows:
+        for tag in parse_tags(row[1]):
+            if tag not in tags:
+                tags.append(tag)
+    conn.execute(
+        "UPDATE faqs SET hit_count = ?, helpful_count = ? WHERE id = ?",
+        (sum(row[2] for row in rows), sum(row[3] for row in rows), keeper[0]))
+    merged = keeper[1]
+    if tags != parse_tags(keeper[1]):
+        # Same format as the keeper's tags (the CLI writes JSON arrays);
+        # fires faqs_search_au, so the merged tags are searchable
+        merged = format_tags(tags, keeper[1])
+        conn.execute("UPDATE faqs SET tags = ? WHERE id = ?", (merged, keeper[0]))
+    conn.executemany(
+        "INSERT OR IGNORE INTO faq_tags (faq_id, tag) VALUES (?, ?)",
+        [(keeper[0], tag) for tag in normalize_tags(merged)])
+    conn.execute(f"DELETE FROM faq_tags WHERE faq_id IN ({marks})", other_ids)
+    conn.execute(f"DELETE FROM faqs WHERE id IN ({marks})", other_ids)
+    return keeper[0]
+
+
+def merge_groups(conn, groups):
+    """Merge every group in one transaction; returns the FAQs removed."""
+    removed = 0
+    conn.execute("BEGIN")
+    try:
+        for group in groups:
+            merge_group(conn, group)
+            removed += len(group) - 1
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and merge near-duplicate FAQs.")
+    parser.add_argument("--db", default=DB_PATH, help="database path (default: bin/kb.db)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"minimum shingle Jaccard similarity (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--merge", action="store_true",
+                        help="merge each group into one FAQ (default: report only)")
+    parser.add_argument("--max-bucket", type=int, default=DEFAULT_MAX_BUCKET,
+                        help="compare larger buckets against one member only")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="FAQs per batch when indexing older rows")
+    args = parser.parse_args()
+    if not 0.0 < args.threshold <= 1.0:
+        print("Error: --threshold must be in (0, 1]", file=sys.stderr)
+        return 1
+
+    conn = connect(args.db)
+    started = time.perf_counter()
+    indexed = backfill_lsh(conn, max(args.batch_size, 1))
+    if indexed:
+        print(f"Indexed {indexed} FAQs into faq_lsh")
+
+    groups, candidates = find_groups(conn, args.threshold, max(args.max_bucket, 2))
+    duplicates = sum(len(group) - 1 for group in groups)
+    print(f"{candidates} candidate pairs, {len(groups)} groups, "
+          f"{duplicates} duplicates ({time.perf_counter() - started:.2f}s)")
+
+    for group in groups[:20]:
+        first = conn.execute("SELECT question FROM faqs WHERE id = ?", (group[0],)).fetchone()
+        print(f"  {len(group)} x #{group[0]}: {(first[0] if first else '')[:70]}")
+    if len(groups) > 20:
+        print(f"  ... {len(groups) - 20} more")
+
+    if args.merge and groups:
+        removed = merge_groups(conn, groups)
+        print(f"Merged {len(groups)} groups, removed {removed} FAQs")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
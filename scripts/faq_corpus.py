@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for FAQ corpus files.
+
+A corpus is a file or a directory of files holding FAQ records with the
+same fields the loader accepts (question, answer, keywords, tags, ...):
+
+    *.jsonl   one JSON object per line, read one line at a time
+    *.toml    an array of [[faq]] tables, read one file at a time
+
+Field types:
+
+    question, answer, category, code_example, source_origin
+                                        string
+    keywords                            string, or list of words
+    tags                                comma-separated string, or list
+    sources, related_classes, related_errors
+                                        string (stored as given), or list
+                                        (stored as a JSON array)
+    difficulty                          integer 1-5
+
+A list holding anything but strings is rejected with the record's `_source`.
+
+Directories are walked recursively in name order. Records are yielded one
+by one, so memory stays flat however large the corpus grows. Each record
+carries a `_source` key ("path:line") for error messages.
+
+Usage:
+    from faq_corpus import iter_corpus
+
+    for faq in iter_corpus(["corpus/"]):
+        ...
+"""
+
+import json
+import os
+
+try:
+    import tomllib
+except ImportError:     # Python < 3.11
+    tomllib = None
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'corpus')
+
+CORPUS_EXTENSIONS = (".jsonl", ".toml")
+
+
+class CorpusError(Exception):
+    """A corpus record or file that cannot be read."""
+
+    def __init__(self, source, message):
+        super().__init__(f"{source}: {message}")
+        self.source = source
+        self.message = message
+
+
+def corpus_files(paths):
+    """Yield corpus file paths from files and directories, in name order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(CORPUS_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            raise CorpusError(path, "no such file or directory")
+
+
+def iter_corpus(paths, on_error=None):
+    """
+    Yield FAQ records from every corpus file under `paths`.
+
+    A malformed record is passed to `on_error(CorpusError)` and skipped;
+    without a handler the error is raised.
+    """
+    for path in corpus_files(paths):
+        if path.endswith(".toml"):
+            records = iter_toml(path)
+        else:
+            records = iter_jsonl(path)
+        for record in records:
+            if isinstance(record, CorpusError):
+                if on_error is None:
+                    raise record
+                on_error(record)
+            else:
+                yield record
+
+
+def iter_jsonl(path):
+    """Yield records (or CorpusError) from a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            source = f"{path}:{line_no}"
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield CorpusError(source, f"invalid JSON ({e.msg})")
+                continue
+            if not isinstance(record, dict):
+                yield CorpusError(source, "record is not an object")
+                continue
+            record["_source"] = source
+            yield record
+
+
+def iter_toml(path):
+    """Yield records (or CorpusError) from the [[faq]] tables of a TOML file."""
+    if tomllib is None:
+        yield CorpusError(path, "TOML corpora need Python 3.11+ (tomllib)")
+        return
+    try:
+        with open(path, "rb") as f:
+            document = tomllib.load(f)
+    except tomllib.TOMLDecodeError as e:
+        yield CorpusError(path, f"invalid TOML ({e})")
+        return
+    for number, record in enumerate(document.get("faq", []), 1):
+        record["_source"] = f"{path}:faq[{number}]"
+        yield record
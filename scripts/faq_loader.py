@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+"""
+Shared bulk-load engine for KB FAQs.
+
+Loads any iterable of FAQ dicts (the shape used by the populate_faqs*.py
+scripts) into kb.db in a single transaction:
+
+    - each FAQ is keyed by a hash of its normalized question, so reruns
+      update changed rows and skip unchanged ones instead of duplicating
+    - new rows go into `faqs` with executemany, one batch at a time
+    - `faq_tags` is written for the same batch with the normalized tags
+      and their KB_TAG_VOCABULARY categories (see faq_tags); `faq_search` follows
+      inserted and changed rows through triggers (see ensure_search_sync)
+    - `faq_lsh` gets the MinHash band buckets of the same rows, for
+      near-duplicate lookups (see faq_minhash, dedup_faqs.py)
+    - `faq_vectors` gets their term vectors, for paraphrase lookups
+      (see faq_vectors)
+    - a row that fails is recorded in the result and the batch carries on
+
+Usage:
+    from faq_loader import connect, load_faqs
+
+    conn = connect()
+    result = load_faqs(conn, faqs, default_origin="code-study")
+    result.report()
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+
+from faq_minhash import band_keys
+from faq_tags import normalize_tags, split_tags
+from faq_vectors import encode, faq_terms
+from kb_tuning import BULK, DEFAULT_FTS_PREFIX, apply_profile, config_path_for, load_fts_prefix, load_profile
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bin', 'kb.db')
+
+DEFAULT_BATCH_SIZE = 500
+
+# Column order used for every insert into `faqs`
+FAQ_COLUMNS = (
+    "question", "keywords", "answer", "sources", "tags",
+    "category", "difficulty", "code_example", "related_classes",
+    "related_errors", "source_origin"
+)
+
+# Instructional-pair columns the populate scripts write but that
+# KB_DATABASE.create_faq_tables does not create (added on older databases)
+EXTRA_FAQ_COLUMNS = (
+    ("category", "TEXT"),
+    ("difficulty", "INTEGER DEFAULT 1"),
+    ("code_example", "TEXT"),
+    ("see_also", "TEXT"),
+    ("source_origin", "TEXT"),
+    ("related_classes", "TEXT"),
+    ("related_errors", "TEXT"),
+    ("instruction", "TEXT"),
+    ("input_context", "TEXT"),
+    ("output_answer", "TEXT"),
+    ("question_hash", "TEXT"),
+    ("content_hash", "TEXT"),
+)
+
+INSERT_FAQ_SQL = (
+    "INSERT INTO faqs (" + ", ".join(FAQ_COLUMNS) + ", question_hash, content_hash) "
+    "VALUES (" + ", ".join("?" for _ in FAQ_COLUMNS) + ", ?, ?)"
+)
+
+UPDATE_FAQ_SQL = (
+    "UPDATE faqs SET " + ", ".join(c + " = ?" for c in FAQ_COLUMNS) +
+    ", content_hash = ? WHERE id = ?"
+)
+
+# Keep IN (...) lists under SQLITE_MAX_VARIABLE_NUMBER on old SQLite builds
+MAX_LOOKUP_VARIABLES = 900
+
+NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+class LoadResult:
+    """Counters and per-row errors from one load_faqs call."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.tags = 0
+        self.batches = 0
+        self.errors = []    # (location, question, message)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def summary(self):
+        return (f"{self.inserted} inserted, {self.updated} updated, "
+                f"{self.unchanged} unchanged, {self.failed} failed")
+
+    def report(self, label="FAQ pairs"):
+        print(f"Loaded {label}: {self.summary()} ({self.batches} batches, {self.tags} tags)")
+        for location, question, message in self.errors:
+            print(f"Error at {location}: {question[:50]}... - {message}")
+
+
+def connect(db_path=DB_PATH, profile=BULK):
+    """
+    Open kb.db with tuning `profile` and make sure the FAQ tables exist.
+
+    Profile overrides and the faq_search prefix indexes come from kb.toml
+    next to the database (see kb_tuning).
+    """
+    conn = sqlite3.connect(db_path)
+    config_path = config_path_for(db_path)
+    apply_profile(conn, load_profile(profile, config_path))
+    ensure_schema(conn, load_fts_prefix(config_path))
+    return conn
+
+
+def fts5_options(prefix):
+    """Closing options of a faq_search CREATE (as KB_DATABASE.fts5_options)."""
+    options = f"prefix='{prefix}', " if prefix else ""
+    return options + "tokenize='porter unicode61'"
+
+
+def ensure_schema(conn, prefix=DEFAULT_FTS_PREFIX):
+    """Create the FAQ tables if missing (same DDL as KB_DATABASE.create_faq_tables)."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS faqs (
+            id INTEGER PRIMARY KEY,
+            question TEXT NOT NULL,
+            keywords TEXT,
+            answer TEXT NOT NULL,
+            sources TEXT,
+            tags TEXT,
+            hit_count INTEGER DEFAULT 0,
+            helpful_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            kb_version INTEGER DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS faq_tags (
+            faq_id INTEGER REFERENCES faqs(id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (faq_id, tag)
+        );
+        CREATE INDEX IF NOT EXISTS idx_faq_tag ON faq_tags(tag);
+        CREATE TABLE IF NOT EXISTS faq_lsh (
+            bucket INTEGER NOT NULL,
+            faq_id INTEGER NOT NULL,
+            PRIMARY KEY (bucket, faq_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_faq_lsh_faq ON faq_lsh(faq_id);
+        CREATE TRIGGER IF NOT EXISTS faqs_lsh_ad AFTER DELETE ON faqs BEGIN
+            DELETE FROM faq_lsh WHERE faq_id = old.id;
+        END;
+        CREATE TABLE IF NOT EXISTS faq_vectors (
+            faq_id INTEGER PRIMARY KEY,
+            terms TEXT NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS faqs_vectors_ad AFTER DELETE ON faqs BEGIN
+            DELETE FROM faq_vectors WHERE faq_id = old.id;
+        END;
+    """)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS faq_search USING fts5(
+            faq_id,
+            question,
+            answer,
+            keywords,
+            tags,
+            {fts5_options(prefix)}
+        )
+    """)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(faqs)")}
+    for name, decl in EXTRA_FAQ_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE faqs ADD COLUMN {name} {decl}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_faq_question_hash ON faqs(question_hash)")
+    conn.commit()
+    ensure_search_sync(conn)
+    ensure_search_prefix(conn, prefix)
+    backfill_hashes(conn)
+    backfill_vectors(conn)
+
+
+INSERT_SEARCH_SQL = """
+    INSERT INTO faq_search (rowid, faq_id, question, answer, keywords, tags)
+    VALUES (new.id, CAST(new.id AS TEXT), new.question, new.answer, new.keywords, new.tags);
+"""
+
+# Removing a row from an external-content index needs the values it indexed
+REMOVE_SEARCH_SQL = {
+    False: "DELETE FROM faq_search WHERE rowid = old.id;",
+    True: """
+    INSERT INTO faq_search (faq_search, rowid, faq_id, question, answer, keywords, tags)
+    VALUES ('delete', old.id, CAST(old.id AS TEXT), old.question, old.answer, old.keywords, old.tags);
+""",
+}
+
+
+def ensure_search_sync(conn):
+    """
+    Keep faq_search in step with faqs through triggers.
+
+    faq_search rowid equals faqs.id, so inserts, updates and deletes of FAQ
+    rows - from these scripts or from KB_FAQ_STORE - cost one rowid lookup
+    each. Same triggers as KB_DATABASE.create_faq_search_sync, for both
+    standalone and external-content faq_search (kb reindex). On a database
+    without them, the index is re-keyed once before they are created.
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+                    "AND name = 'faqs_search_ai'").fetchone():
+        return
+    external = is_external_fts(conn, "faq_search")
+    if external:
+        rekey = "INSERT INTO faq_search (faq_search) VALUES ('rebuild');"
+    else:
+        rekey = """
+            DELETE FROM faq_search;
+            INSERT INTO faq_search (rowid, faq_id, question, answer, keywords, tags)
+            SELECT id, CAST(id AS TEXT), question, answer, keywords, tags FROM faqs;
+        """
+    remove = REMOVE_SEARCH_SQL[external]
+    conn.executescript(f"""
+        BEGIN;
+        {rekey}
+        CREATE TRIGGER IF NOT EXISTS faqs_search_ai AFTER INSERT ON faqs BEGIN
+            {INSERT_SEARCH_SQL}
+        END;
+        CREATE TRIGGER IF NOT EXISTS faqs_search_ad AFTER DELETE ON faqs BEGIN
+            {remove}
+        END;
+        CREATE TRIGGER IF NOT EXISTS faqs_search_au AFTER UPDATE OF question, answer, keywords, tags ON faqs BEGIN
+            {remove}
+            {INSERT_SEARCH_SQL}
+        END;
+        COMMIT;
+    """)
+
+
+def ensure_search_prefix(conn, prefix):
+    """
+    Rebuild faq_search with `prefix` indexes if it was created with others.
+
+    Keeps standalone or external-content storage; the faqs triggers stay
+    valid. One transaction, so in WAL mode readers see the old index until
+    the commit. KB_DATABASE.migrate_search_prefix does the same for
+    kb_search and faq_search when the CLI opens the database.
+    """
+    if search_prefix(conn, "faq_search") == prefix:
+        return False
+    if is_external_fts(conn, "faq_search"):
+        storage = "content='faq_search_source', content_rowid='id',"
+        fill = "INSERT INTO faq_search (faq_search) VALUES ('rebuild');"
+    else:
+        storage = ""
+        fill = """
+            INSERT INTO faq_search (rowid, faq_id, question, answer, keywords, tags)
+            SELECT id, CAST(id AS TEXT), question, answer, keywords, tags FROM faqs;
+        """
+    conn.executescript(f"""
+        BEGIN IMMEDIATE;
+        DROP TABLE faq_search;
+        CREATE VIRTUAL TABLE faq_search USING fts5(
+            faq_id, question, answer, keywords, tags, {storage} {fts5_options(prefix)}
+        );
+        {fill}
+        COMMIT;
+    """)
+    return True
+
+
+def fts_create_sql(conn, table):
+    """CREATE statement of `table`, or "" if it does not exist."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                       (table,)).fetchone()
+    return (row[0] or "") if row else ""
+
+
+def is_external_fts(conn, table):
+    """Is FTS5 `table` external-content (KB_DATABASE.rebuild_search_indexes)?"""
+    return "content=" in fts_create_sql(conn, table)
+
+
+def search_prefix(conn, table):
+    """Prefix index lengths FTS5 `table` was created with, e.g. "2 3 4" ("" if none)."""
+    match = re.search(r"prefix='([^']*)'", fts_create_sql(conn, table))
+    return match.group(1) if match else ""
+
+
+def normalize_question(question):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(NON_WORD.sub(" ", question.lower()).split())
+
+
+def question_hash(question):
+    """Identity key of a FAQ: SHA-1 of its normalized question."""
+    return hashlib.sha1(normalize_question(question).encode("utf-8")).hexdigest()
+
+
+def content_hash(row):
+    """Change detector: SHA-1 over every loaded column value."""
+    text = "\x1f".join("" if value is None else str(value) for value in row)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def backfill_hashes(conn):
+    """Hash rows stored without hashes (older loads, KB_FAQ_STORE.store_faq)."""
+    rows = conn.execute(
+        "SELECT id, " + ", ".join(FAQ_COLUMNS) + " FROM faqs WHERE question_hash IS NULL"
+    ).fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE faqs SET question_hash = ?, content_hash = ? WHERE id = ?",
+            [(question_hash(row[1]), content_hash(row[1:]), row[0]) for row in rows])
+        conn.commit()
+    return len(rows)
+
+
+def faq_row(faq, default_origin):
+    """Convert a FAQ dict to a normalized parameter tuple in FAQ_COLUMNS order."""
+    question = str(faq.get("question") or "").strip()
+    answer = str(faq.get("answer") or "").strip()
+    if not question or not answer:
+        raise ValueError("question and answer are required")
+    return (
+        question,
+        clean_keywords(text_items(faq, "keywords", " ")),
+        answer,
+        list_field(faq, "sources"),
+        ",".join(split_tags(text_items(faq, "tags", ","))),
+        faq.get("category", ""),
+        check_difficulty(faq.get("difficulty", 1)),
+        faq.get("code_example", ""),
+        list_field(faq, "related_classes"),
+        list_field(faq, "related_errors"),
+        faq.get("source_origin", default_origin)
+    )
+
+
+def field_items(faq, name):
+    """Items of list field `name`, or None when it holds a string (or is absent)."""
+    value = faq.get(name)
+    if value is None or isinstance(value, str):
+        return None
+    if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{name} must be a string or a list of strings, got {value!r}")
+    return list(value)
+
+
+def text_items(faq, name, separator):
+    """String field `name`, a list of strings joined with `separator`."""
+    items = field_items(faq, name)
+    if items is None:
+        return faq.get(name) or ""
+    return separator.join(items)
+
+
+def list_field(faq, name):
+    """List field `name` as stored: a string verbatim, a list as a JSON array (KB_FAQ reads both)."""
+    items = field_items(faq, name)
+    if items is None:
+        return faq.get(name) or ""
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+
+
+def clean_keywords(keywords):
+    """Lowercase keywords, split on spaces/commas and drop repeats."""
+    result = []
+    for word in str(keywords or "").lower().replace(",", " ").split():
+        if word not in result:
+            result.append(word)
+    return " ".join(result)
+
+
+def check_difficulty(value):
+    """Difficulty must be an integer level 1-5 (KB_FAQ.set_difficulty)."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"difficulty must be 1-5, got {value!r}")
+    try:
+        level = int(value)
+    except ValueError:
+        raise ValueError(f"difficulty must be 1-5, got {value!r}") from None
+    if not 1 <= level <= 5:
+        raise ValueError(f"difficulty must be 1-5, got {value!r}")
+    return level
+
+
+def prepare_faq(faq, index, default_origin):
+    """
+    Validate, normalize and hash one FAQ dict.
+
+    Returns (location, question_hash, content_hash, row, tags, buckets, vector);
+    raises ValueError for records the loader must reject. This is the CPU-bound
+    part of a load and has no database access, so it can run in a worker
+    process (see prepare_chunk).
+    """
+    if not isinstance(faq, dict):
+        raise ValueError("record is not an object")
+    location = faq.get("_source") or f"#{index}"
+    try:
+        row = faq_row(faq, default_origin)
+    except (AttributeError, TypeError) as e:
+        raise ValueError(str(e)) from None
+    return (location, question_hash(row[0]), content_hash(row), row,
+            normalize_tags(row[4]), band_keys(row[0], row[2]), encode(faq_terms(row[0], row[1])))
+
+
+def prepare_chunk(chunk, default_origin):
+    """
+    Prepare a list of (index, faq) pairs.
+
+    Returns (entries, errors) where errors are (location, question, message).
+    """
+    entries, errors = [], []
+    for index, faq in chunk:
+        try:
+            entries.append(prepare_faq(faq, index, default_origin))
+        except ValueError as e:
+            if isinstance(faq, dict):
+                errors.append((faq.get("_source") or f"#{index}", str(faq.get("question", "")), str(e)))
+            else:
+                errors.append((f"#{index}", "", str(e)))
+    return entries, errors
+
+
+def load_faqs(conn, faqs, batch_size=DEFAULT_BATCH_SIZE, default_origin="code-study"):
+    """
+    Upsert `faqs` (any iterable of dicts) with their tags and FTS rows.
+
+    Rows whose normalized question is already stored are updated when their
+    content changed and skipped otherwise. See write_prepared.
+    """
+    result = LoadResult()
+
+    def prepared():
+        for index, faq in enumerate(faqs, 1):
+            entries, errors = prepare_chunk([(index, faq)], default_origin)
+            result.errors.extend(errors)
+            yield from entries
+
+    return write_prepared(conn, prepared(), batch_size, result)
+
+
+def write_prepared(conn, entries, batch_size=DEFAULT_BATCH_SIZE, result=None):
+    """
+    Upsert prepared entries (from prepare_faq) through one connection.
+
+    Everything is written in one transaction that is committed at the end.
+    Each batch runs under a savepoint: if it fails, the batch is rolled back
+    and replayed row by row so only the bad rows are lost.
+    """
+    if result is None:
+        result = LoadResult()
+    batch = {}
+    conn.execute("BEGIN")
+    try:
+        for entry in entries:
+            # A repeated question within a batch supersedes the earlier one
+            batch[entry[1]] = entry
+            if len(batch) >= batch_size:
+                _write_batch(conn, batch, result)
+                batch = {}
+        if batch:
+            _write_batch(conn, batch, result)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return result
+
+
+def _write_batch(conn, batch, result):
+    """Upsert one batch of prepared rows, falling back to per-row on error."""
+    result.batches += 1
+    conn.execute("SAVEPOINT faq_batch")
+    try:
+        counts = _upsert(conn, list(batch.values()))
+        conn.execute("RELEASE faq_batch")
+        _add_counts(result, counts)
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO faq_batch")
+        conn.execute("RELEASE faq_batch")
+        for entry in batch.values():
+            _write_row(conn, entry, result)
+
+
+def _write_row(conn, entry, result):
+    """Upsert a single prepared row under its own savepoint."""
+    conn.execute("SAVEPOINT faq_row")
+    try:
+        counts = _upsert(conn, [entry])
+        conn.execute("RELEASE faq_row")
+        _add_counts(result, counts)
+    except sqlite3.Error as e:
+        conn.execute("ROLLBACK TO faq_row")
+        conn.execute("RELEASE faq_row")
+        result.errors.append((entry[0], entry[3][0], str(e)))
+
+
+def _add_counts(result, counts):
+    inserted, updated, unchanged, tags = counts
+    result.inserted += inserted
+    result.updated += updated
+    result.unchanged += unchanged
+    result.tags += tags
+
+
+def _upsert(conn, entries):
+    """Insert new rows and update changed ones; returns the counts."""
+    existing = _lookup(conn, [entry[1] for entry in entries])
+    inserts, updates, unchanged = [], [], 0
+    for entry in entries:
+        qhash, chash = entry[1], entry[2]
+        if qhash not in existing:
+            inserts.append(entry)
+        elif existing[qhash][1] != chash:
+            updates.append((existing[qhash][0], entry))
+        else:
+            unchanged += 1
+
+    written = []
+    if inserts:
+        first_id = _max_faq_id(conn) + 1
+        conn.executemany(INSERT_FAQ_SQL, [entry[3] + (entry[1], entry[2]) for entry in inserts])
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM faqs WHERE id >= ? ORDER BY id", (first_id,))]
+        if len(ids) != len(inserts):
+            raise sqlite3.DatabaseError("faqs row ids are not contiguous")
+        written.extend((faq_id,) + entry[4:7] for faq_id, entry in zip(ids, inserts))
+    if updates:
+        conn.executemany(UPDATE_FAQ_SQL, [entry[3] + (entry[2], faq_id) for faq_id, entry in updates])
+        _delete_dependents(conn, [faq_id for faq_id, _ in updates])
+        written.extend((faq_id,) + entry[4:7] for faq_id, entry in updates)
+    tags = _write_dependents(conn, written)
+    return len(inserts), len(updates), unchanged, tags
+
+
+def _lookup(conn, hashes):
+    """Map question_hash -> (id, content_hash) for rows already stored."""
+    found = {}
+    for start in range(0, len(hashes), MAX_LOOKUP_VARIABLES):
+        chunk = hashes[start:start + MAX_LOOKUP_VARIABLES]
+        for qhash, faq_id, chash in conn.execute(
+                "SELECT question_hash, MIN(id), content_hash FROM faqs "
+                "WHERE question_hash IN (" + ",".join("?" * len(chunk)) + ") "
+                "GROUP BY question_hash", chunk):
+            found[qhash] = (faq_id, chash)
+    return found
+
+
+def _delete_dependents(conn, ids, tables=("faq_tags", "faq_lsh", "faq_vectors")):
+    """Remove the `tables` rows of FAQs about to be rewritten."""
+    for start in range(0, len(ids), MAX_LOOKUP_VARIABLES):
+        chunk = ids[start:start + MAX_LOOKUP_VARIABLES]
+        for table in tables:
+            conn.execute(f"DELETE FROM {table} WHERE faq_id IN (" + ",".join("?" * len(chunk)) + ")", chunk)
+
+
+def _write_dependents(conn, written):
+    """
+    Write faq_tags, faq_lsh and faq_vectors for (id, tags, buckets, vector)
+    tuples (vector None: left as is); returns the tag count.
+    """
+    tag_rows = [(faq_id, tag) for faq_id, tags, _, _ in written for tag in tags]
+    conn.executemany(
+        "INSERT OR IGNORE INTO faq_tags (faq_id, tag) VALUES (?, ?)", tag_rows)
+    conn.executemany(
+        "INSERT OR IGNORE INTO faq_lsh (bucket, faq_id) VALUES (?, ?)",
+        [(bucket, faq_id) for faq_id, _, buckets, _ in written for bucket in buckets])
+    conn.executemany(
+        "INSERT OR REPLACE INTO faq_vectors (faq_id, terms) VALUES (?, ?)",
+        [(faq_id, vector) for faq_id, _, _, vector in written if vector is not None])
+    return len(tag_rows)
+
+
+def backfill_tags(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Rebuild `faq_tags` from `faqs.tags` for every FAQ, in one transaction.
+
+    For databases filled before the loader wrote `faq_tags`, and after
+    changes to the tag vocabulary. Returns (faqs, tags) written.
+    """
+    faqs = tags = 0
+    last_id = 0
+    conn.execute("BEGIN")
+    try:
+        while True:
+            rows = conn.execute(
+                "SELECT id, tags FROM faqs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            _delete_dependents(conn, [faq_id for faq_id, _ in rows], ("faq_tags",))
+            tags += _write_dependents(conn, [(faq_id, normalize_tags(text), (), None) for faq_id, text in rows])
+            faqs += len(rows)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return faqs, tags
+
+
+def backfill_lsh(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Add `faq_lsh` buckets for FAQs that have none, in one transaction.
+
+    Covers rows stored before faq_lsh existed. Returns the FAQs indexed.
+    """
+    faqs = 0
+    last_id = 0
+    conn.execute("BEGIN")
+    try:
+        while True:
+            rows = conn.execute(
+                "SELECT id, question, answer FROM faqs WHERE id > ? AND NOT EXISTS "
+                "(SELECT 1 FROM faq_lsh WHERE faq_id = faqs.id) ORDER BY id LIMIT ?",
+                (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            _write_dependents(conn, [(faq_id, (), band_keys(question, answer), None)
+                                     for faq_id, question, answer in rows])
+            faqs += len(rows)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return faqs
+
+
+def backfill_vectors(conn, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Add `faq_vectors` rows for FAQs that have none, in one transaction.
+
+    Covers rows stored before faq_vectors existed (the CLI also fills them
+    on first use). Returns the FAQs indexed.
+    """
+    faqs = 0
+    last_id = 0
+    conn.execute("BEGIN")
+    try:
+        while True:
+            rows = conn.execute(
+                "SELECT id, question, keywords FROM faqs WHERE id > ? AND NOT EXISTS "
+                "(SELECT 1 FROM faq_vectors WHERE faq_id = faqs.id) ORDER BY id LIMIT ?",
+                (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            _write_dependents(conn, [(faq_id, (), (), encode(faq_terms(question, keywords)))
+                                     for faq_id, question, keywords in rows])
+            faqs += len(rows)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return faqs
+
+
+def _max_faq_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM faqs").fetchone()[0]
+
+
+def print_stats(conn, group_by="category"):
+    """Print the total FAQ count and a breakdown by `group_by`."""
+    total = conn.execute("SELECT COUNT(*) FROM faqs").fetchone()[0]
+    print(f"Total FAQs: {total}")
+    print(f"\nBy {group_by}:")
+    for row in conn.execute(
+            f"SELECT {group_by}, COUNT(*) FROM faqs GROUP BY {group_by} ORDER BY COUNT(*) DESC"):
+        print(f"  {row[0] or 'uncategorized'}: {row[1]}")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+MinHash signatures and LSH band keys for FAQ near-duplicate detection.
+
+Mirrors src/faq/kb_faq_minhash.e bit for bit, so FAQs indexed by the
+scripts and by the CLI land in the same faq_lsh buckets:
+
+    - text is lowercased and split into alphanumeric words; the question
+      and answer words together form word 3-shingles
+    - each shingle is hashed once: CRC-32 of its UTF-8 bytes, multiplied
+      by 0x9E3779B1 (mod 2^32)
+    - one-permutation MinHash: the top 7 bits pick one of 128 slots, the
+      low 25 bits are the value kept per slot; empty slots borrow from
+      the next filled slot to the right (densification)
+    - the 128 slots form 16 bands of 8; each band hashes to one faq_lsh
+      bucket, so FAQs sharing a bucket are near-duplicate candidates
+
+With 16 bands of 8, pairs share a bucket with probability ~0.95 at
+Jaccard 0.8, ~0.995 at 0.85 and ~0.001 at 0.3, so unrelated FAQs rarely
+meet. Candidates are confirmed with jaccard().
+
+Usage:
+    from faq_minhash import band_keys, jaccard, shingle_hashes
+
+    keys = band_keys(question, answer)      # 16 ints for faq_lsh
+    jaccard(shingle_hashes(q1, a1), shingle_hashes(q2, a2))
+"""
+
+import re
+import zlib
+
+SLOTS = 128
+BANDS = 16
+ROWS = SLOTS // BANDS
+SHINGLE_WORDS = 3
+
+SLOT_BITS = 25
+VALUE_MASK = (1 << SLOT_BITS) - 1
+EMPTY = 0xFFFFFFFF
+MIX = 0x9E3779B1
+MASK32 = 0xFFFFFFFF
+MASK64 = 0xFFFFFFFFFFFFFFFF
+FNV_PRIME = 0x100000001B3
+
+DEFAULT_THRESHOLD = 0.8
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def words(text):
+    """Lowercase alphanumeric words of `text`."""
+    return WORD.findall((text or "").lower())
+
+
+def shingle_hashes(question, answer):
+    """Set of mixed CRC-32 hashes of the word 3-shingles of question + answer."""
+    tokens = words(question) + words(answer)
+    if len(tokens) < SHINGLE_WORDS:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = (" ".join(tokens[i:i + SHINGLE_WORDS])
+                    for i in range(len(tokens) - SHINGLE_WORDS + 1))
+    return {(zlib.crc32(s.encode("utf-8")) * MIX) & MASK32 for s in shingles}
+
+
+def signature(hashes):
+    """Densified one-permutation MinHash signature (SLOTS values) of a hash set."""
+    slots = [EMPTY] * SLOTS
+    for h in hashes:
+        slot = h >> SLOT_BITS
+        value = h & VALUE_MASK
+        if value < slots[slot]:
+            slots[slot] = value
+    if not hashes:
+        return slots
+    result = list(slots)
+    for j in range(SLOTS):
+        if slots[j] == EMPTY:
+            distance = 1
+            while slots[(j + distance) % SLOTS] == EMPTY:
+                distance += 1
+            result[j] = slots[(j + distance) % SLOTS] + (distance << SLOT_BITS)
+    return result
+
+
+def band_keys_for(sig):
+    """One faq_lsh bucket per band (non-negative 63-bit ints)."""
+    keys = []
+    for band in range(BANDS):
+        key = band + 1
+        for value in sig[band * ROWS:(band + 1) * ROWS]:
+            key = ((key * FNV_PRIME) & MASK64) ^ value
+        keys.append(key >> 1)
+    return keys
+
+
+def band_keys(question, answer):
+    """faq_lsh buckets of a FAQ; empty when it has no words to compare."""
+    hashes = shingle_hashes(question, answer)
+    return band_keys_for(signature(hashes)) if hashes else []
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two shingle-hash sets."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tag normalization for KB FAQs.
+
+FAQ tags arrive as comma-separated strings from the corpus files and as
+JSON arrays from FAQs stored by the CLI (KB_FAQ.tags_json). Both become
+one list of lowercase, unique tags, extended with the KB_TAG_VOCABULARY
+categories they map to, so tag lookups (KB_FAQ_STORE.search_by_tags,
+which the AI router feeds from KB_TAG_VOCABULARY.tags_for_keywords) reach
+curated FAQs too.
+
+VOCABULARY and VOCABULARY_RULES mirror src/faq/kb_tag_vocabulary.e; keep
+the two in step.
+
+Usage:
+    from faq_tags import normalize_tags
+
+    normalize_tags("JSON-Parsing, dbc")   # ['json-parsing', 'dbc', 'json', 'serialization']
+"""
+
+import json
+
+# KB_TAG_VOCABULARY.all_tags
+VOCABULARY = frozenset((
+    "json", "xml", "yaml", "toml", "csv", "html",
+    "file", "io", "network", "http", "websocket", "smtp",
+    "database", "sql", "cache", "parsing", "serialization", "validation",
+    "encoding", "encryption", "hashing", "datetime", "math", "decimal",
+    "uuid", "regex", "api", "web", "cli", "testing", "logging", "config",
+    "async", "process", "scoop", "ai", "llm",
+))
+
+# KB_TAG_VOCABULARY.tags_for_keywords: first matching substring wins
+VOCABULARY_RULES = (
+    (("json",), ("json", "serialization")),
+    (("http", "web"), ("http", "network")),
+    (("file",), ("file", "io")),
+    (("sql", "database"), ("sql", "database")),
+    (("date", "time"), ("datetime",)),
+    (("test",), ("testing",)),
+    (("xml",), ("xml", "parsing")),
+    (("hash",), ("hashing",)),
+    (("mail", "smtp"), ("smtp", "network")),
+)
+
+
+def split_tags(tags):
+    """Split a comma-separated tags string into unique lowercase tags."""
+    result = []
+    for tag in (tags or "").split(","):
+        tag = tag.strip().lower()
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def parse_tags(tags):
+    """Read a faqs.tags value: a JSON array (CLI) or comma-separated text."""
+    text = (tags or "").strip()
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError:
+            items = None
+        if isinstance(items, list):
+            return split_tags(",".join(str(item) for item in items))
+    return split_tags(text)
+
+
+def format_tags(tags, like):
+    """faqs.tags value for `tags`, in the format of the value `like`."""
+    if (like or "").strip().startswith("["):
+        # As KB_FAQ.tags_as_json writes it
+        return json.dumps(tags, ensure_ascii=False, separators=(",", ":"))
+    return ",".join(tags)
+
+
+def vocabulary_tags(tag):
+    """KB_TAG_VOCABULARY categories for one lowercase tag."""
+    if tag in VOCABULARY:
+        return (tag,)
+    for needles, categories in VOCABULARY_RULES:
+        if any(needle in tag for needle in needles):
+            return categories
+    return ()
+
+
+def normalize_tags(tags):
+    """
+    Tags to index for a faqs.tags value.
+
+    The FAQ's own tags (lowercased, deduplicated) come first, followed by
+    any vocabulary categories they map to that are not already present.
+    """
+    result = parse_tags(tags)
+    for tag in list(result):
+        for category in vocabulary_tags(tag):
+            if category not in result:
+                result.append(category)
+    return result
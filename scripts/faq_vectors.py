@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Term vectors for FAQ similarity lookups.
+
+Mirrors src/faq/kb_faq_vectors.e, so vectors written by the scripts and by
+the CLI are the same `faq_vectors` rows:
+
+    - the text of a FAQ is its question followed by its keywords
+    - text is lowercased and split into alphanumeric words; stop words
+      are dropped and the rest lightly stemmed ("ing", "ed", "es", "s")
+    - a term is the CRC-32 of the UTF-8 stem; a row stores "term:count"
+      pairs in ascending term order
+
+Rows hold raw counts only: KB_FAQ_VECTORS does the scoring, so stored
+rows never need rewriting as FAQs are added.
+
+Usage:
+    from faq_vectors import encode, faq_terms
+
+    row = encode(faq_terms(question, keywords))    # faq_vectors.terms
+"""
+
+import re
+import zlib
+
+WORD = re.compile(r"[^\W_]+")
+
+STOP_WORDS = frozenset("""
+    a an and are as at be by can do does for from how i if in is it its
+    me my of on or should that the this to use using what when where which
+    why will with you your
+""".split())
+
+
+def stem(word):
+    """Strip one common inflection ("ing", "ed", "es", "s") from `word`."""
+    if len(word) > 4 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 3 and (word.endswith("ed") or word.endswith("es")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text):
+    """Map term -> count for the non-stop words of `text`."""
+    result = {}
+    for word in WORD.findall((text or "").lower()):
+        if word not in STOP_WORDS:
+            term = zlib.crc32(stem(word).encode("utf-8"))
+            result[term] = result.get(term, 0) + 1
+    return result
+
+
+def faq_terms(question, keywords):
+    """Terms of a FAQ: its question followed by its keywords."""
+    return terms(f"{question or ''} {keywords or ''}")
+
+
+def encode(counts):
+    """`faq_vectors.terms` text of a term -> count map."""
+    return " ".join(f"{term}:{count}" for term, count in sorted(counts.items()))
+
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+SQLite tuning profiles for KB database connections.
+
+Mirrors src/kb_db_tuning.e: the same "serving" and "bulk" presets, with
+overrides from the [database.<profile>] sections of kb.toml next to the
+database. The scripts connect with the bulk profile; the CLI uses the
+profile named in [database] (serving by default). Both use WAL, so a
+running load does not block kb search or kb ask.
+
+[database] fts_prefix sets the FTS5 prefix index lengths of kb_search
+and faq_search (default "2 3 4"), as KB_DB_TUNING.fts_prefix.
+
+Usage:
+    from kb_tuning import apply_profile, load_profile
+
+    settings = load_profile("bulk", "bin/kb.toml")
+    apply_profile(conn, settings)
+    prefix = load_fts_prefix("bin/kb.toml")     # "2 3 4"
+"""
+
+import os
+import re
+
+try:
+    import tomllib
+except ImportError:     # Python < 3.11: presets only
+    tomllib = None
+
+SERVING = "serving"
+BULK = "bulk"
+
+DEFAULT_FTS_PREFIX = "2 3 4"
+
+PROFILES = {
+    SERVING: {
+        "busy_timeout": 5000,
+        "page_size": 4096,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+    },
+    BULK: {
+        "busy_timeout": 30000,
+        "page_size": 4096,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 268435456,
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Accepted values for the keyword PRAGMAs (KB_DB_TUNING ignores others too)
+CHOICES = {
+    "journal_mode": ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+
+def config_path_for(db_path):
+    """kb.toml in the database's directory (as KB_DATABASE.config_path)."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "kb.toml")
+
+
+def read_config(config_path):
+    """The [database] table of kb.toml, or {} if missing or unreadable."""
+    if tomllib is None or not config_path or not os.path.isfile(config_path):
+        return {}
+    try:
+        with open(config_path, "rb") as f:
+            database = tomllib.load(f).get("database", {})
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+    return database if isinstance(database, dict) else {}
+
+
+def configured_profile(config_path):
+    """Profile named by [database] profile, or serving."""
+    return str(read_config(config_path).get("profile", SERVING))
+
+
+def load_fts_prefix(config_path=None):
+    """
+    Prefix index lengths from [database] fts_prefix as "2 3 4".
+
+    Accepts "2 3 4", "2,3,4" and [2, 3, 4]; "" disables prefix indexes.
+    Lengths outside 1..99 are dropped.
+    """
+    value = read_config(config_path).get("fts_prefix", DEFAULT_FTS_PREFIX)
+    if isinstance(value, list):
+        value = " ".join(str(item) for item in value)
+    lengths = [int(item) for item in re.findall(r"\d+", str(value)) if len(item) <= 2]
+    return " ".join(str(length) for length in lengths if length > 0)
+
+
+def load_profile(name=None, config_path=None):
+    """
+    Settings for profile `name` (default: the configured one).
+
+    Unknown names fall back to serving; invalid overrides are ignored.
+    """
+    config = read_config(config_path)
+    if name is None:
+        name = str(config.get("profile", SERVING))
+    if name not in PROFILES:
+        name = SERVING
+    settings = dict(PROFILES[name])
+    overrides = config.get(name, {})
+    if isinstance(overrides, dict):
+        for key, value in overrides.items():
+            if key in CHOICES:
+                if str(value).upper() in CHOICES[key]:
+                    settings[key] = str(value).upper()
+            elif key in settings and isinstance(value, int) and not isinstance(value, bool):
+                settings[key] = value
+    settings["name"] = name
+    return settings
+
+
+def apply_profile(conn, settings):
+    """Run the profile's PRAGMAs on `conn` (outside any transaction)."""
+    # busy_timeout first so switching journal mode waits for other connections
+    for key in ("busy_timeout", "page_size", "journal_mode", "synchronous",
+                "mmap_size", "cache_size", "temp_store"):
+        conn.execute(f"PRAGMA {key} = {settings[key]}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Load KB FAQs from corpus files and directories.
+Run: python3 load_faqs.py [options] [corpus files or directories...]
+
+With no arguments, every corpus file under corpus/ is loaded. Reruns are
+cheap: unchanged FAQs are skipped (see faq_loader.load_faqs).
+
+Records are validated, normalized and hashed in a pool of worker processes
+(faq_loader.prepare_chunk). Prepared chunks come back through a bounded
+queue, in corpus order, to the main process, which is the only one holding
+a database connection. SQLite allows a single writer, so this keeps the
+write side to one transaction while the CPU work is spread out.
+
+Options:
+    --db PATH          database to load into (default: bin/kb.db)
+    --workers N        preparation processes (default: CPU count; 0 = inline)
+    --chunk-size N     records sent to a worker at a time (default: 1000)
+    --queue-size N     prepared chunks allowed in flight (default: 2 x workers)
+    --batch-size N     rows per upsert batch (default: 500)
+    --origin NAME      source_origin for records without one (default: manual)
+    --profile NAME     database tuning profile, see kb_tuning (default: bulk)
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from faq_corpus import CORPUS_DIR, CorpusError, iter_corpus
+from faq_loader import DB_PATH, DEFAULT_BATCH_SIZE, LoadResult, connect, prepare_chunk, print_stats, write_prepared
+from kb_tuning import BULK, PROFILES
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def iter_chunks(records, chunk_size):
+    """Group records into lists of (index, record) pairs."""
+    chunk = []
+    for index, record in enumerate(records, 1):
+        chunk.append((index, record))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def prepare_inline(chunks, default_origin):
+    """Prepare chunks in this process (--workers 0)."""
+    for chunk in chunks:
+        yield prepare_chunk(chunk, default_origin)
+
+
+def prepare_parallel(chunks, default_origin, workers, queue_size):
+    """
+    Prepare chunks in a process pool, yielding results in submission order.
+
+    A reader thread submits chunks and puts their futures on a bounded
+    queue, so at most `queue_size` chunks are read ahead of the writer.
+    """
+    pending = queue.Queue(maxsize=queue_size)
+    failure = []
+    done = threading.Event()
+
+    def produce():
+        try:
+            for chunk in chunks:
+                future = pool.submit(prepare_chunk, chunk, default_origin)
+                while not done.is_set():
+                    try:
+                        pending.put(future, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if done.is_set():
+                    return
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            pending.put(None)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        reader = threading.Thread(target=produce, daemon=True)
+        reader.start()
+        try:
+            while True:
+                future = pending.get()
+                if future is None:
+                    break
+                yield future.result()
+        finally:
+            done.set()
+            while reader.is_alive():
+                try:
+                    pending.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            reader.join()
+    if failure:
+        raise failure[0]
+
+
+def load_corpora(conn, paths, default_origin="manual", workers=0,
+                 chunk_size=DEFAULT_CHUNK_SIZE, queue_size=None,
+                 batch_size=DEFAULT_BATCH_SIZE, quiet=False):
+    """Stream every record under `paths` into the loader."""
+    corpus_errors = []
+    result = LoadResult()
+    records = iter_corpus(paths, on_error=corpus_errors.append)
+    chunks = iter_chunks(records, chunk_size)
+    if workers > 1:
+        prepared = prepare_parallel(chunks, default_origin, workers, queue_size or 2 * workers)
+    else:
+        prepared = prepare_inline(chunks, default_origin)
+
+    def entries():
+        for chunk_entries, errors in prepared:
+            result.errors.extend(errors)
+            yield from chunk_entries
+
+    try:
+        write_prepared(conn, entries(), batch_size, result)
+    except CorpusError as e:
+        print(f"Error: {e}")
+        return None
+    result.errors.extend((e.source, "", e.message) for e in corpus_errors)
+    if not quiet:
+        result.report()
+    return result
+
+
+def positive(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Load KB FAQs from corpus files and directories.")
+    parser.add_argument("paths", nargs="*", default=[CORPUS_DIR],
+                        help="corpus files or directories (default: corpus/)")
+    parser.add_argument("--db", default=DB_PATH, help="database path (default: bin/kb.db)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="preparation processes; 0 or 1 prepares inline")
+    parser.add_argument("--chunk-size", type=positive, default=DEFAULT_CHUNK_SIZE,
+                        help="records per worker task")
+    parser.add_argument("--queue-size", type=positive, default=None,
+                        help="prepared chunks in flight (default: 2 x workers)")
+    parser.add_argument("--batch-size", type=positive, default=DEFAULT_BATCH_SIZE,
+                        help="rows per upsert batch")
+    parser.add_argument("--origin", default="manual",
+                        help="source_origin for records without one")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=BULK,
+                        help="database tuning profile (default: bulk)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    workers = max(args.workers, 0)
+    conn = connect(args.db, args.profile)
+    started = time.perf_counter()
+    result = load_corpora(conn, args.paths, args.origin, workers,
+                          args.chunk_size, args.queue_size, args.batch_size)
+    elapsed = time.perf_counter() - started
+    if result is not None:
+        records = result.inserted + result.updated + result.unchanged + len(result.errors)
+        rate = records / elapsed if elapsed > 0 else 0.0
+        mode = f"{workers} workers" if workers > 1 else "inline"
+        print(f"Throughput: {records} records in {elapsed:.2f}s ({rate:,.0f} records/s, {mode})")
+        print_stats(conn, "source_origin")
+    conn.close()
+    return 0 if result is not None and not result.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
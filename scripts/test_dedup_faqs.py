@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for dedup_faqs merging.
+Run: python3 -m unittest test_dedup_faqs (from scripts/)
+"""
+
+import json
+import sqlite3
+import unittest
+
+from dedup_faqs import merge_group
+from faq_loader import ensure_schema
+from faq_tags import normalize_tags
+
+
+class MergeGroupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        ensure_schema(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def add_faq(self, question, tags, helpful=0):
+        cursor = self.conn.execute(
+            "INSERT INTO faqs (question, answer, tags, helpful_count) VALUES (?, ?, ?, ?)",
+            (question, "Use SIMPLE_JSON.", tags, helpful))
+        return cursor.lastrowid
+
+    def tags_of(self, faq_id):
+        return self.conn.execute("SELECT tags FROM faqs WHERE id = ?", (faq_id,)).fetchone()[0]
+
+    def indexed_tags(self, faq_id):
+        return {tag for (tag,) in self.conn.execute("SELECT tag FROM faq_tags WHERE faq_id = ?", (faq_id,))}
+
+    def test_json_array_tags(self):
+        keeper = self.add_faq("How do I parse JSON?", '["json","parsing"]', helpful=2)
+        other = self.add_faq("How to parse JSON?", '["JSON","simple_json"]')
+        self.assertEqual(merge_group(self.conn, [keeper, other]), keeper)
+        self.assertEqual(json.loads(self.tags_of(keeper)), ["json", "parsing", "simple_json"])
+        self.assertEqual(self.tags_of(keeper), '["json","parsing","simple_json"]')
+        self.assertEqual(self.indexed_tags(keeper), set(normalize_tags("json,parsing,simple_json")))
+        self.assertIsNone(self.conn.execute("SELECT id FROM faqs WHERE id = ?", (other,)).fetchone())
+
+    def test_comma_separated_tags(self):
+        keeper = self.add_faq("How do I parse JSON?", "json,parsing", helpful=2)
+        other = self.add_faq("How to parse JSON?", '["simple_json"]')
+        merge_group(self.conn, [keeper, other])
+        self.assertEqual(self.tags_of(keeper), "json,parsing,simple_json")
+
+    def test_unchanged_tags_kept_verbatim(self):
+        keeper = self.add_faq("How do I parse JSON?", '["json", "parsing"]', helpful=2)
+        other = self.add_faq("How to parse JSON?", "json")
+        merge_group(self.conn, [keeper, other])
+        self.assertEqual(self.tags_of(keeper), '["json", "parsing"]')
+        self.assertEqual(self.indexed_tags(keeper), set(normalize_tags("json,parsing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for faq_loader upserts, tags and corpus field types.
+Run: python3 -m unittest test_faq_loader (from scripts/)
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from faq_corpus import iter_corpus
+from faq_loader import ensure_schema, load_faqs
+from faq_tags import normalize_tags
+
+
+TOML_CORPUS = '''
+[[faq]]
+question = "How do I parse JSON?"
+answer = "Use SIMPLE_JSON."
+keywords = ["JSON", "parse"]
+tags = ["scoop", "JSON"]
+sources = ["simple_json/src/simple_json.e"]
+related_classes = ["SIMPLE_JSON", "JSON_VALUE"]
+related_errors = []
+
+[[faq]]
+question = "How do I send mail?"
+answer = "Use SIMPLE_SMTP."
+tags = ["smtp", 42]
+'''
+
+
+class LoaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        ensure_schema(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def faq(self, question="How do I parse JSON?", answer="Use SIMPLE_JSON.", **fields):
+        return dict(question=question, answer=answer, **fields)
+
+    def matches(self, term):
+        return [faq_id for (faq_id,) in self.conn.execute(
+            "SELECT rowid FROM faq_search WHERE faq_search MATCH ?", (term,))]
+
+    def test_rerun_unchanged(self):
+        faqs = [self.faq(tags="json"), self.faq("How do I send mail?", "Use SIMPLE_SMTP.")]
+        self.assertEqual(load_faqs(self.conn, faqs).inserted, 2)
+        result = load_faqs(self.conn, faqs)
+        self.assertEqual((result.inserted, result.updated, result.unchanged, result.failed), (0, 0, 2, 0))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM faqs").fetchone()[0], 2)
+
+    def test_changed_answer_updates_search(self):
+        load_faqs(self.conn, [self.faq(answer="Use SIMPLE_JSON.")])
+        (faq_id,) = self.conn.execute("SELECT id FROM faqs").fetchone()
+        result = load_faqs(self.conn, [self.faq(answer="Call JSON_PARSER.")])
+        self.assertEqual((result.inserted, result.updated), (0, 1))
+        self.assertEqual(self.conn.execute("SELECT id, answer FROM faqs").fetchall(),
+                         [(faq_id, "Call JSON_PARSER.")])
+        self.assertEqual(self.matches("answer:simple_json"), [])
+        self.assertEqual(self.matches("answer:json_parser"), [faq_id])
+
+    def test_bad_row_keeps_batch(self):
+        faqs = [self.faq(), self.faq("How do I send mail?", "Use SIMPLE_SMTP.", difficulty=9),
+                self.faq("How do I hash?", "Use SIMPLE_HASH.")]
+        result = load_faqs(self.conn, faqs, batch_size=10)
+        self.assertEqual((result.inserted, result.failed), (2, 1))
+        location, question, message = result.errors[0]
+        self.assertEqual((location, question), ("#2", "How do I send mail?"))
+        self.assertIn("difficulty", message)
+        self.assertEqual([q for (q,) in self.conn.execute("SELECT question FROM faqs ORDER BY id")],
+                         ["How do I parse JSON?", "How do I hash?"])
+
+    def test_failed_write_keeps_batch(self):
+        self.conn.execute(
+            "CREATE TRIGGER reject_mail BEFORE INSERT ON faqs WHEN new.question LIKE '%mail%' "
+            "BEGIN SELECT RAISE(ABORT, 'mail rejected'); END")
+        faqs = [self.faq(tags="json"), self.faq("How do I send mail?", "Use SIMPLE_SMTP."),
+                self.faq("How do I hash?", "Use SIMPLE_HASH.", tags="hash")]
+        result = load_faqs(self.conn, faqs, batch_size=10)
+        self.assertEqual((result.inserted, result.failed, result.batches), (2, 1, 1))
+        self.assertEqual(result.errors[0], ("#2", "How do I send mail?", "mail rejected"))
+        self.assertEqual([q for (q,) in self.conn.execute("SELECT question FROM faqs ORDER BY id")],
+                         ["How do I parse JSON?", "How do I hash?"])
+        self.assertEqual(self.matches("hash"), [self.conn.execute(
+            "SELECT id FROM faqs WHERE question = 'How do I hash?'").fetchone()[0]])
+
+    def test_tags_indexed(self):
+        load_faqs(self.conn, [self.faq(tags="JSON, parsing,json")])
+        (faq_id, tags) = self.conn.execute("SELECT id, tags FROM faqs").fetchone()
+        self.assertEqual(tags, "json,parsing")
+        indexed = {tag for (tag,) in self.conn.execute("SELECT tag FROM faq_tags WHERE faq_id = ?", (faq_id,))}
+        self.assertEqual(indexed, set(normalize_tags("json,parsing")))
+
+    def test_toml_arrays(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "faqs.toml")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(TOML_CORPUS)
+            result = load_faqs(self.conn, iter_corpus([path]))
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual(result.failed, 1)
+        location, question, message = result.errors[0]
+        self.assertEqual(location, f"{path}:faq[2]")
+        self.assertIn("tags must be a string or a list of strings", message)
+        row = self.conn.execute(
+            "SELECT id, keywords, tags, sources, related_classes, related_errors FROM faqs").fetchone()
+        self.assertEqual(row[1:], ("json parse", "scoop,json", '["simple_json/src/simple_json.e"]',
+                                   '["SIMPLE_JSON","JSON_VALUE"]', "[]"))
+        tags = {tag for (tag,) in self.conn.execute("SELECT tag FROM faq_tags WHERE faq_id = ?", (row[0],))}
+        self.assertTrue({"scoop", "json"} <= tags)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,342 @@
+note
+	description: "[
+		KB_AI_CACHE - On-Disk Cache of AI Provider Responses
+
+		Answers a provider round trip from an earlier identical one: same
+		provider, model, system prompt and user content. The prompt and the
+		content are stored as 64-bit FNV-1a hashes of their UTF-8 bytes
+		(content length kept too, as a collision guard), so the key stays
+		small however much FAQ or KB context a prompt carries.
+
+		Lives in its own SQLite file next to kb.db (kb_ai_cache.db), so
+		'kb clear' and reindexing never touch it and it can be deleted at
+		any time. Entries older than `ttl_seconds' are never returned;
+		after each `put' expired entries go, then the least recently used
+		ones until the responses fit in `max_chars'. Hits and misses are
+		counted for this session and in total (ai_cache_counters).
+
+		Usage:
+			cache: KB_AI_CACHE
+			create cache.make_beside ("kb.db")
+			if attached cache.item ("claude", model, system, user) as al_text then
+				...
+			else
+				... ask the provider ...
+				cache.put ("claude", model, system, user, response_text)
+			end
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_AI_CACHE
+
+create
+	make,
+	make_beside,
+	make_in_memory
+
+feature {NONE} -- Initialization
+
+	make (a_path: READABLE_STRING_GENERAL)
+			-- Cache stored in the SQLite file at `a_path'
+		require
+			path_not_empty: not a_path.is_empty
+		do
+			create db.make (a_path.to_string_32)
+			initialize
+		end
+
+	make_beside (a_db_path: READABLE_STRING_GENERAL)
+			-- Cache in `File_name' next to the database at `a_db_path'
+			-- (in memory when that database is)
+		require
+			path_not_empty: not a_db_path.is_empty
+		local
+			l_path: PATH
+		do
+			if a_db_path.same_string (":memory:") then
+				make_in_memory
+			else
+				create l_path.make_from_string (a_db_path)
+				if attached l_path.parent as al_dir then
+					make (al_dir.extended (File_name).name)
+				else
+					make (File_name)
+				end
+			end
+		end
+
+	make_in_memory
+			-- Cache for this process only (for testing)
+		do
+			create db.make_memory
+			initialize
+		end
+
+	initialize
+			-- Apply defaults and create the tables
+		local
+			l_tuning: KB_DB_TUNING
+		do
+			ttl_seconds := Default_ttl_seconds
+			max_chars := Default_max_chars
+			if db.is_open then
+				create l_tuning.make_serving
+				l_tuning.apply (db)
+				ensure_schema
+			end
+		end
+
+feature -- Constants
+
+	File_name: STRING = "kb_ai_cache.db"
+			-- Cache file created next to kb.db
+
+	Default_ttl_seconds: INTEGER = 604_800
+			-- Age at which a response is no longer returned (7 days)
+
+	Default_max_chars: INTEGER = 33_554_432
+			-- Response text kept before eviction (32M characters)
+
+feature -- Access
+
+	db: SIMPLE_SQL_DATABASE
+			-- Cache connection
+
+	ttl_seconds: INTEGER
+			-- Age in seconds after which an entry is stale
+
+	max_chars: INTEGER
+			-- Bound on the total length of cached responses
+
+	hits: INTEGER
+			-- Lookups answered from the cache by this object
+
+	misses: INTEGER
+			-- Lookups not answered by this object
+
+	item (a_provider, a_model, a_system, a_user: READABLE_STRING_GENERAL): detachable STRING_32
+			-- Cached response of `a_provider'/`a_model' to `a_user' under
+			-- system prompt `a_system', unless missing or stale
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_system_hash, l_user_hash: INTEGER_64
+		do
+			if db.is_open then
+				l_system_hash := text_hash (a_system)
+				l_user_hash := text_hash (a_user)
+				l_result := db.query_with_args ("[
+					SELECT response FROM ai_responses
+					WHERE provider = ? AND model = ? AND system_hash = ? AND user_hash = ? AND user_length = ?
+					AND created_at > CAST(strftime('%s', 'now') AS INTEGER) - ?
+				]", <<a_provider.to_string_32, a_model.to_string_32, l_system_hash, l_user_hash, a_user.count, ttl_seconds>>)
+				if not l_result.is_empty and then attached l_result.rows.first.string_value ("response") as al_text then
+					Result := al_text.to_string_32
+					db.execute_with_args ("[
+						UPDATE ai_responses SET used_at = CAST(strftime('%s', 'now') AS INTEGER)
+						WHERE provider = ? AND model = ? AND system_hash = ? AND user_hash = ?
+					]", <<a_provider.to_string_32, a_model.to_string_32, l_system_hash, l_user_hash>>)
+					hits := hits + 1
+					count_lookup ("hits")
+				else
+					misses := misses + 1
+					count_lookup ("misses")
+				end
+			end
+		end
+
+feature -- Measurement
+
+	count: INTEGER
+			-- Responses stored (stale ones included until evicted)
+		do
+			Result := counted ("SELECT COUNT(*) FROM ai_responses")
+		end
+
+	total_chars: INTEGER
+			-- Length of the stored responses
+		do
+			Result := counted ("SELECT COALESCE(SUM(chars), 0) FROM ai_responses")
+		end
+
+	total_hits: INTEGER
+			-- Lookups answered from the cache, all sessions
+		do
+			Result := counted ("SELECT COALESCE(SUM(value), 0) FROM ai_cache_counters WHERE name = 'hits'")
+		end
+
+	total_misses: INTEGER
+			-- Lookups not answered, all sessions
+		do
+			Result := counted ("SELECT COALESCE(SUM(value), 0) FROM ai_cache_counters WHERE name = 'misses'")
+		end
+
+feature -- Settings
+
+	set_ttl_seconds (a_seconds: INTEGER)
+			-- Return entries younger than `a_seconds' only
+		require
+			positive: a_seconds > 0
+		do
+			ttl_seconds := a_seconds
+		ensure
+			set: ttl_seconds = a_seconds
+		end
+
+	set_max_chars (a_chars: INTEGER)
+			-- Keep at most `a_chars' characters of responses
+		require
+			positive: a_chars > 0
+		do
+			max_chars := a_chars
+		ensure
+			set: max_chars = a_chars
+		end
+
+feature -- Element change
+
+	put (a_provider, a_model, a_system, a_user, a_response: READABLE_STRING_GENERAL)
+			-- Cache `a_response' of `a_provider'/`a_model' to `a_user' under
+			-- `a_system', then evict stale and least recently used entries
+		local
+			l_text: STRING_32
+		do
+			if db.is_open then
+				l_text := a_response.to_string_32
+				db.execute_with_args ("[
+					INSERT OR REPLACE INTO ai_responses
+					(provider, model, system_hash, user_hash, user_length, response, chars, created_at, used_at)
+					VALUES (?, ?, ?, ?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))
+				]", <<a_provider.to_string_32, a_model.to_string_32, text_hash (a_system), text_hash (a_user), a_user.count,
+					l_text, l_text.count>>)
+				evict
+			end
+		end
+
+	wipe_out
+			-- Remove every response and reset the counters
+		do
+			if db.is_open then
+				db.execute ("DELETE FROM ai_responses")
+				db.execute ("DELETE FROM ai_cache_counters")
+			end
+			hits := 0
+			misses := 0
+		ensure
+			no_hits: hits = 0
+			no_misses: misses = 0
+		end
+
+	close
+			-- Close the cache file
+		local
+			l_rescued: BOOLEAN
+		do
+			if not l_rescued and then db.is_open then
+				db.close
+			end
+		rescue
+			l_rescued := True
+			retry
+		end
+
+feature -- Display
+
+	description: STRING
+			-- One-line summary, e.g. for kb stats
+		do
+			Result := count.out + " responses (" + (total_chars // 1024).out + "K chars), " +
+				total_hits.out + " hits, " + total_misses.out + " misses"
+		end
+
+feature {NONE} -- Implementation
+
+	ensure_schema
+			-- Create the cache tables if missing
+		do
+			db.execute ("[
+				CREATE TABLE IF NOT EXISTS ai_responses (
+					provider TEXT NOT NULL,
+					model TEXT NOT NULL,
+					system_hash INTEGER NOT NULL,
+					user_hash INTEGER NOT NULL,
+					user_length INTEGER NOT NULL,
+					response TEXT NOT NULL,
+					chars INTEGER NOT NULL,
+					created_at INTEGER NOT NULL,
+					used_at INTEGER NOT NULL,
+					PRIMARY KEY (provider, model, system_hash, user_hash)
+				)
+			]")
+			db.execute ("CREATE INDEX IF NOT EXISTS idx_ai_responses_used ON ai_responses (used_at)")
+			db.execute ("[
+				CREATE TABLE IF NOT EXISTS ai_cache_counters (
+					name TEXT PRIMARY KEY,
+					value INTEGER NOT NULL
+				)
+			]")
+		end
+
+	evict
+			-- Drop stale entries, then the least recently used beyond `max_chars'
+		do
+			db.execute_with_args ("DELETE FROM ai_responses WHERE created_at <= CAST(strftime('%%s', 'now') AS INTEGER) - ?",
+				<<ttl_seconds>>)
+			db.execute_with_args ("[
+				DELETE FROM ai_responses WHERE rowid IN (
+					SELECT rowid FROM (
+						SELECT rowid, SUM(chars) OVER (ORDER BY used_at DESC, rowid DESC) AS kept
+						FROM ai_responses
+					) WHERE kept > ?
+				)
+			]", <<max_chars>>)
+		end
+
+	count_lookup (a_counter: STRING)
+			-- Add one to the total of `a_counter'
+		do
+			db.execute_with_args ("INSERT OR IGNORE INTO ai_cache_counters (name, value) VALUES (?, 0)", <<a_counter>>)
+			db.execute_with_args ("UPDATE ai_cache_counters SET value = value + 1 WHERE name = ?", <<a_counter>>)
+		end
+
+	counted (a_sql: STRING): INTEGER
+			-- Single integer returned by `a_sql' (0 if closed)
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			if db.is_open then
+				l_result := db.query (a_sql)
+				if not l_result.is_empty and then attached l_result.rows.first.item (1) as al_val then
+					Result := al_val.out.to_integer
+				end
+			end
+		end
+
+	text_hash (a_text: READABLE_STRING_GENERAL): INTEGER_64
+			-- FNV-1a of the UTF-8 bytes of `a_text', top bit dropped to fit an SQLite INTEGER
+		local
+			l_bytes: STRING_8
+			l_hash: NATURAL_64
+			i: INTEGER
+		do
+			l_bytes := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (a_text.to_string_32)
+			l_hash := Fnv_offset
+			from i := 1 until i > l_bytes.count loop
+				l_hash := l_hash.bit_xor (l_bytes.code (i).to_natural_64) * Fnv_prime
+				i := i + 1
+			end
+			Result := (l_hash |>> 1).to_integer_64
+		end
+
+	Fnv_offset: NATURAL_64 = 0xCBF29CE484222325
+			-- FNV-1a 64-bit offset basis
+
+	Fnv_prime: NATURAL_64 = 0x100000001B3
+			-- FNV-1a 64-bit prime
+
+invariant
+	db_not_void: db /= Void
+	ttl_positive: ttl_seconds > 0
+	max_chars_positive: max_chars > 0
+
+end
@@ -14,6 +14,34 @@ note
 		- grok: xAI API (XAI_API_KEY)
 
 		Configuration persists to kb.toml in same directory as executable.
+		Provider responses are cached (KB_AI_CACHE) for `cache_ttl_hours'
+		(0 turns the cache off), up to about `cache_max_mb' of text:
+
+			[ai]
+			cache_ttl_hours = 168
+			cache_max_mb = 32
+
+		Phase 1 keywords come from KB_KEYWORD_EXTRACTOR, without an LLM
+		call, when its confidence reaches `keyword_confidence' (above 1.0
+		always asks the LLM):
+
+			[ai]
+			keyword_confidence = 0.75
+
+		A question already answered (same words in the same order, give or
+		take case, punctuation, articles and pronouns) gets the stored FAQ without any
+		provider call; `answer_similarity' > 0 also accepts FAQs at least
+		that similar (KB_FAQ_VECTORS cosine, e.g. 0.9):
+
+			[ai]
+			answer_similarity = 0
+
+		`concurrent_cascade' runs the FAQ and KB searches on the words of
+		the question while the Phase 1 LLM call is in flight, reusing them
+		when the keywords agree (see KB_AI_ROUTER):
+
+			[ai]
+			concurrent_cascade = true
 
 		Usage:
 			config: KB_AI_CONFIG
@@ -45,6 +73,10 @@ feature {NONE} -- Initialization
 			create available_providers.make (5)
 			create provider_keys.make (5)
 			ai_enabled := True
+			cache_ttl_hours := Default_cache_ttl_hours
+			cache_max_mb := Default_cache_max_mb
+			keyword_confidence := {KB_KEYWORD_EXTRACTOR}.Default_threshold
+			answer_similarity := 0.0
 			detect_providers
 			load_config
 			-- Only auto-select if no provider loaded from config
@@ -60,6 +92,10 @@ feature {NONE} -- Initialization
 			create available_providers.make (5)
 			create provider_keys.make (5)
 			ai_enabled := True
+			cache_ttl_hours := Default_cache_ttl_hours
+			cache_max_mb := Default_cache_max_mb
+			keyword_confidence := {KB_KEYWORD_EXTRACTOR}.Default_threshold
+			answer_similarity := 0.0
 			detect_providers
 			load_config
 			if active_provider = Void then
@@ -67,6 +103,14 @@ feature {NONE} -- Initialization
 			end
 		end
 
+feature -- Constants
+
+	Default_cache_ttl_hours: INTEGER = 168
+			-- Hours a cached provider response is reused (one week)
+
+	Default_cache_max_mb: INTEGER = 32
+			-- Millions of characters of cached responses kept
+
 feature -- Access
 
 	available_providers: ARRAYED_LIST [STRING_32]
@@ -81,6 +125,21 @@ feature -- Access
 	config_path: STRING_32
 			-- Path to configuration file
 
+	cache_ttl_hours: INTEGER
+			-- Hours a cached provider response is reused (0: no cache)
+
+	cache_max_mb: INTEGER
+			-- Millions of characters of responses the cache keeps
+
+	keyword_confidence: REAL_64
+			-- Local keyword confidence at which the LLM keyword call is skipped
+
+	answer_similarity: REAL_64
+			-- Similarity at which a stored FAQ answers a reworded question (0: off)
+
+	concurrent_cascade: BOOLEAN
+			-- Search speculatively while the keyword LLM call is in flight?
+
 feature -- Status
 
 	has_ai_configured: BOOLEAN
@@ -249,6 +308,16 @@ feature -- Configuration Persistence
 								if has_provider (l_value) then
 									active_provider := l_value.to_string_32
 								end
+							elseif l_key.same_string ("cache_ttl_hours") and then l_value.is_integer then
+								cache_ttl_hours := l_value.to_integer.max (0)
+							elseif l_key.same_string ("cache_max_mb") and then l_value.is_integer and then l_value.to_integer > 0 then
+								cache_max_mb := l_value.to_integer
+							elseif l_key.same_string ("keyword_confidence") and then l_value.is_double then
+								keyword_confidence := l_value.to_double.max (0.0)
+							elseif l_key.same_string ("answer_similarity") and then l_value.is_double then
+								answer_similarity := l_value.to_double.max (0.0).min (1.0)
+							elseif l_key.same_string ("concurrent_cascade") then
+								concurrent_cascade := l_value.same_string ("true")
 							end
 						end
 					end
@@ -261,10 +330,12 @@ feature -- Configuration Persistence
 		end
 
 	save_config
-			-- Save settings to config file
+			-- Save settings to config file, keeping its other sections (e.g. [database])
 		local
 			l_file: PLAIN_TEXT_FILE
+			l_other: ARRAYED_LIST [STRING]
 		do
+			l_other := other_sections
 			create l_file.make_with_name (config_path)
 			l_file.open_write
 			l_file.put_string ("# KB AI Configuration%N")
@@ -278,11 +349,62 @@ feature -- Configuration Persistence
 			if attached active_provider as al_ap then
 				l_file.put_string ("provider = %"" + al_ap.out + "%"%N")
 			end
+			if cache_ttl_hours /= Default_cache_ttl_hours then
+				l_file.put_string ("cache_ttl_hours = " + cache_ttl_hours.out + "%N")
+			end
+			if cache_max_mb /= Default_cache_max_mb then
+				l_file.put_string ("cache_max_mb = " + cache_max_mb.out + "%N")
+			end
+			if keyword_confidence /= {KB_KEYWORD_EXTRACTOR}.Default_threshold then
+				l_file.put_string ("keyword_confidence = " + keyword_confidence.out + "%N")
+			end
+			if answer_similarity > 0.0 then
+				l_file.put_string ("answer_similarity = " + answer_similarity.out + "%N")
+			end
+			if concurrent_cascade then
+				l_file.put_string ("concurrent_cascade = true%N")
+			end
+			across l_other as ln loop
+				l_file.put_string (ln + "%N")
+			end
 			l_file.close
 		rescue
 			-- Ignore write errors (e.g., read-only filesystem)
 		end
 
+	other_sections: ARRAYED_LIST [STRING]
+			-- Lines of the config file from its first non-[ai] section on, minus the [ai] section
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_line, l_trimmed: STRING
+			l_keep: BOOLEAN
+		do
+			create Result.make (10)
+			create l_file.make_with_name (config_path)
+			if l_file.exists and then l_file.is_readable then
+				l_file.open_read
+				from l_file.read_line until l_file.exhausted loop
+					l_line := l_file.last_string.twin
+					l_trimmed := l_line.twin
+					l_trimmed.left_adjust
+					l_trimmed.right_adjust
+					if not l_trimmed.is_empty and then l_trimmed [1] = '[' then
+						l_keep := not l_trimmed.same_string ("[ai]")
+						if l_keep then
+							Result.extend ("")
+						end
+					end
+					if l_keep and then not l_trimmed.is_empty then
+						Result.extend (l_line)
+					end
+					l_file.read_line
+				end
+				l_file.close
+			end
+		rescue
+			-- Ignore file errors, nothing to keep
+		end
+
 	default_config_path: STRING_32
 			-- Default path for config file (same directory as executable)
 		local
@@ -404,6 +526,9 @@ invariant
 	providers_not_void: available_providers /= Void
 	keys_not_void: provider_keys /= Void
 	config_path_not_void: config_path /= Void
+	cache_ttl_not_negative: cache_ttl_hours >= 0
+	cache_size_positive: cache_max_mb > 0
+	valid_answer_similarity: answer_similarity >= 0.0 and answer_similarity <= 1.0
 	active_provider_valid: attached active_provider as p implies has_provider (p)
 
 end
\ No newline at end of file
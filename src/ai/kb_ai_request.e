@@ -0,0 +1,118 @@
+note
+	description: "[
+		KB_AI_REQUEST - One Provider Round Trip on Its Own SCOOP Processor
+
+		Lets KB_AI_ROUTER wait for an LLM answer and query the KB at the
+		same time. The request builds its own AI_CLIENT for `provider'
+		(the router's client lives on the router's processor) and `run'
+		asks it `user' under `system'; the router reads `text' or
+		`error_message' once `is_done' (a wait condition).
+
+		Only the round trip runs here: caching and timing stay with the
+		router (see {KB_AI_ROUTER}.ask_llm_while).
+
+		Usage:
+			request: separate KB_AI_REQUEST
+			create request.make ("claude", api_key, system, user)
+			start (request)        -- request.run, asynchronously
+			... other work ...
+			answer := answer_of (request)  -- require request.is_done
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_AI_REQUEST
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_provider: separate READABLE_STRING_32; a_api_key: detachable separate READABLE_STRING_32;
+			a_system, a_user: separate READABLE_STRING_32)
+			-- Request asking `a_provider' (with `a_api_key') `a_user' under `a_system'
+		do
+			create provider.make_from_separate (a_provider)
+			if attached a_api_key as al_key then
+				create api_key.make_from_separate (al_key)
+			end
+			create system.make_from_separate (a_system)
+			create user.make_from_separate (a_user)
+		end
+
+feature -- Access
+
+	provider: STRING_32
+			-- Provider asked ("claude", "ollama", "grok")
+
+	system: STRING_32
+			-- System prompt
+
+	user: STRING_32
+			-- User content
+
+	text: detachable STRING_32
+			-- Answer, once `is_done' (Void if the provider failed)
+
+	error_message: detachable STRING_32
+			-- Why `text' is Void, once `is_done'
+
+feature -- Status
+
+	is_done: BOOLEAN
+			-- Has `run' finished?
+
+feature -- Basic operations
+
+	run
+			-- Ask the provider and keep its answer
+		local
+			l_response: AI_RESPONSE
+			l_failed: BOOLEAN
+		do
+			if l_failed then
+				error_message := {STRING_32} "Request to " + provider + " failed"
+			elseif attached client as al_client then
+				l_response := al_client.ask_with_system (system, user)
+				if l_response.is_success then
+					text := l_response.text.twin
+				elseif attached l_response.error_message as al_e then
+					error_message := al_e.to_string_32
+				else
+					error_message := {STRING_32} "No response from " + provider
+				end
+			else
+				error_message := {STRING_32} "Could not initialize AI client for " + provider
+			end
+			is_done := True
+		ensure
+			done: is_done
+			answered: text /= Void or error_message /= Void
+		rescue
+			-- Never leave the waiting router without an answer
+			l_failed := True
+			retry
+		end
+
+feature {NONE} -- Implementation
+
+	api_key: detachable STRING_32
+			-- Key for `provider', if it needs one
+
+	client: detachable AI_CLIENT
+			-- Client for `provider' (as {KB_AI_ROUTER}.create_ai_client)
+		do
+			if provider.same_string ("claude") then
+				if attached api_key as al_k then
+					create {CLAUDE_CLIENT} Result.make_with_api_key (al_k)
+				end
+			elseif provider.same_string ("ollama") then
+				create {OLLAMA_CLIENT} Result.make
+			elseif provider.same_string ("grok") then
+				if attached api_key as al_k then
+					create {GROK_CLIENT} Result.make_with_api_key (al_k)
+				end
+			end
+		end
+
+end
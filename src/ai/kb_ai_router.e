@@ -2,18 +2,42 @@ note
 	description: "[
 		KB_AI_ROUTER - 4-Phase RAG Query Router
 
+		Phase 0: Question asked before -> stored FAQ answer, no AI call
 		Phase 1: AI extracts l_keywords + l_tags
-		Phase 2: Search FAQ cache
+		Phase 2: Search FAQ cache (paraphrases, keywords, tags)
 		Phase 3: If FAQs found -> synthesize from FAQ l_context
 		Phase 4: If no FAQs -> Raw KB RAG + store as new FAQ
+
+		Each phase is timed as an "ask.*" span of `perf' (and every
+		provider round trip as "llm"); see `kb stats --perf'.
+
+		Phase 1 asks the LLM only when `keyword_extractor' is not confident
+		enough of keywords taken from the KB's own vocabulary.
+
+		Provider responses are kept in `response_cache' (kb_ai_cache.db),
+		so a prompt already answered costs no round trip ("llm.cached").
+
+		With concurrent_cascade set in kb.toml, the Phase 1 LLM call runs
+		on its own processor (KB_AI_REQUEST) while the FAQ and KB searches
+		are run on `simple_tokenize' terms ("ask.speculate"); Phases 2 and
+		4 reuse them when the LLM keywords overlap those terms.
+
+		With an `answer_sink' set, Phase 3 and 4 answers are passed to it
+		as they are generated (token by token from Ollama, KB_OLLAMA_STREAM;
+		at once from other providers and the cache) and the result is
+		marked `is_answer_streamed'; the whole text is still stored.
 	]"
 	author: "Simple Eiffel"
 
 class
 	KB_AI_ROUTER
 
+inherit
+	KB_SHARED_PERF
+
 create
-	make
+	make,
+	make_with_faq_store
 
 feature {NONE} -- Initialization
 
@@ -21,13 +45,25 @@ feature {NONE} -- Initialization
 		require
 			db_not_void: a_db /= Void
 			config_not_void: a_config /= Void
+		do
+			make_with_faq_store (a_db, a_config, create {KB_FAQ_STORE}.make (a_db.db))
+		end
+
+	make_with_faq_store (a_db: KB_DATABASE; a_config: KB_AI_CONFIG; a_faq_store: KB_FAQ_STORE)
+			-- Router sharing `a_faq_store' (and its loaded FAQ vectors) with the caller
+		require
+			db_not_void: a_db /= Void
+			config_not_void: a_config /= Void
+			faq_store_not_void: a_faq_store /= Void
 		do
 			db := a_db
 			ai_config := a_config
 			use_ai_mode := a_config.is_ready
 			create last_mode_used.make_empty
-			create faq_store.make (a_db.db)
+			faq_store := a_faq_store
 			create tag_vocab
+		ensure
+			faq_store_shared: faq_store = a_faq_store
 		end
 
 feature -- Access
@@ -36,6 +72,13 @@ feature -- Access
 	ai_config: KB_AI_CONFIG
 	faq_store: KB_FAQ_STORE
 	tag_vocab: KB_TAG_VOCABULARY
+
+	keyword_extractor: KB_KEYWORD_EXTRACTOR
+			-- Phase 1 keywords from the KB vocabulary (created on first use)
+		attribute
+			create Result.make (db.db)
+		end
+
 	use_ai_mode: BOOLEAN
 	last_mode_used: STRING_32
 	last_keywords: detachable STRING_32
@@ -44,6 +87,9 @@ feature -- Access
 	debug_mode: BOOLEAN
 			-- Enable verbose logging
 
+	answer_sink: detachable PROCEDURE [STRING_32]
+			-- Receiver of synthesized answers while they are generated (Void: none)
+
 feature -- Status
 
 	is_ai_available: BOOLEAN
@@ -97,78 +143,179 @@ feature -- 4-Phase AI Cascade
 			l_keywords: STRING_32
 			l_tags: ARRAYED_LIST [STRING_32]
 			l_faqs: ARRAYED_LIST [KB_FAQ]
+			l_answered: detachable KB_QUERY_RESULT
+			l_started, l_phase: DATE_TIME
 		do
+			l_started := perf.now
 			create Result.make (a_query)
 			Result.set_mode ("ai-cascade")
-			l_client := create_ai_client
-
-			if l_client = Void then
-				Result := process_direct (a_query)
-				Result.set_ai_note ("Could not initialize AI client")
+			speculation := Void
+			l_phase := perf.now
+			l_answered := answered_faq (a_query)
+			perf.record ("ask.answered_faq", l_phase)
+			if attached l_answered then
+				Result := l_answered
 			else
-				if attached ai_config.active_provider as al_p then
-					Result.set_ai_provider (p)
-				end
-				l_keywords := extract_keywords (l_client, a_query)
-				-- Fallback: if AI returned garbage, use simple query tokenization
-				if l_keywords.is_empty or else is_garbage_keywords (l_keywords) then
-					l_keywords := simple_tokenize (a_query)
-					if debug_mode then
-						io.put_string ("  [DEBUG] Fallback to simple tokenization: " + l_keywords.out + "%N")
-					end
-				end
-				last_keywords := l_keywords
-				l_tags := tag_vocab.tags_for_keywords (l_keywords)
-
-				if l_keywords.is_empty then
+				l_client := create_ai_client
+				if l_client = Void then
 					Result := process_direct (a_query)
-					Result.set_ai_note ("Keyword extraction failed")
+					Result.set_ai_note ("Could not initialize AI client")
 				else
-					l_faqs := search_faq_cache (l_keywords, l_tags)
-					if not l_faqs.is_empty then
-						Result := synthesize_from_faqs (l_client, a_query, l_faqs, l_keywords, l_tags)
+					if attached ai_config.active_provider as al_p then
+						Result.set_ai_provider (p)
+					end
+					l_phase := perf.now
+					l_keywords := keyword_extractor.keywords (a_query)
+					perf.record ("ask.local_keywords", l_phase)
+					if keyword_extractor.last_confidence >= ai_config.keyword_confidence then
+						if debug_mode then
+							io.put_string ("  [DEBUG] Local keywords (confidence " + keyword_extractor.last_confidence.out + "): " + l_keywords.out + "%N")
+						end
 					else
-						Result := raw_kb_rag_and_store (l_client, a_query, l_keywords, l_tags)
+						l_phase := perf.now
+						l_keywords := extract_keywords (l_client, a_query)
+						perf.record ("ask.extract_keywords", l_phase)
+					end
+					-- Fallback: if AI returned garbage, use simple query tokenization
+					if l_keywords.is_empty or else is_garbage_keywords (l_keywords) then
+						l_keywords := simple_tokenize (a_query)
+						if debug_mode then
+							io.put_string ("  [DEBUG] Fallback to simple tokenization: " + l_keywords.out + "%N")
+						end
+					end
+					last_keywords := l_keywords
+					l_phase := perf.now
+					l_tags := tag_vocab.tags_for_keywords (l_keywords)
+					perf.record ("ask.tags_for_keywords", l_phase)
+
+					if l_keywords.is_empty then
+						Result := process_direct (a_query)
+						Result.set_ai_note ("Keyword extraction failed")
+					else
+						if attached speculation as al_s and then overlaps (l_keywords, al_s.terms) then
+							l_faqs := al_s.faqs
+							if debug_mode then
+								io.put_string ("  [DEBUG] Reusing speculative FAQ search: " + al_s.terms.out + "%N")
+							end
+						else
+							l_phase := perf.now
+							l_faqs := search_faq_cache (a_query, l_keywords, l_tags)
+							perf.record ("ask.search_faq_cache", l_phase)
+						end
+						l_phase := perf.now
+						if not l_faqs.is_empty then
+							Result := synthesize_from_faqs (l_client, a_query, l_faqs, l_keywords, l_tags)
+							perf.record ("ask.synthesize_from_faqs", l_phase)
+						else
+							Result := raw_kb_rag_and_store (l_client, a_query, l_keywords, l_tags)
+							perf.record ("ask.raw_kb_rag_and_store", l_phase)
+						end
 					end
 				end
 			end
+			perf.record ("ask.total", l_started)
+		end
+
+feature {NONE} -- Phase 0: Answered Questions
+
+	answered_faq (a_query: STRING_32): detachable KB_QUERY_RESULT
+			-- Stored answer to `a_query' if it was asked before
+			-- (see {KB_FAQ_STORE}.answered_faq), its hit recorded
+		do
+			if attached faq_store.answered_faq (a_query, ai_config.answer_similarity) as al_faq then
+				create Result.make (a_query)
+				Result.set_mode ("faq-answer")
+				Result.set_synthesized_answer (al_faq.answer)
+				Result.add_citation ("FAQ: " + al_faq.question.head (50))
+				faq_store.record_hit (al_faq)
+				Result.set_ai_note ("Answered before (FAQ #" + al_faq.id.out + ")")
+			end
 		end
 
 feature {NONE} -- Phase 1: Keywords
 
 	extract_keywords (a_client: AI_CLIENT; a_query: STRING_32): STRING_32
 		local
-			l_response: AI_RESPONSE
+			l_meanwhile: detachable PROCEDURE
 		do
-			l_response := a_client.ask_with_system (keyword_prompt, a_query)
-			if l_response.is_success then
-				last_raw_response := l_response.text.twin
+			if ai_config.concurrent_cascade then
+				l_meanwhile := agent speculate (a_query)
+			end
+			if attached ask_llm_while (a_client, keyword_prompt, a_query, l_meanwhile) as al_text then
+				last_raw_response := al_text.twin
 				if debug_mode then
-					io.put_string ("  [DEBUG] Raw AI response: " + l_response.text.out + "%N")
+					io.put_string ("  [DEBUG] Raw AI response: " + al_text.out + "%N")
 				end
-				Result := sanitize_keywords (l_response.text)
+				Result := sanitize_keywords (al_text)
 				if debug_mode then
 					io.put_string ("  [DEBUG] Sanitized keywords: " + Result.out + "%N")
 				end
 			else
 				last_raw_response := Void
-				if debug_mode and attached l_response.error_message as al_e then
+				if debug_mode and attached last_llm_error as al_e then
 					io.put_string ("  [DEBUG] AI error: " + e.out + "%N")
 				end
 				create Result.make_empty
 			end
 		end
 
+	speculation: detachable TUPLE [terms: STRING_32; faqs: ARRAYED_LIST [KB_FAQ]; results: ARRAYED_LIST [KB_RESULT]]
+			-- Searches run by `speculate' during the keyword call of this question
+
+	speculate (a_query: STRING_32)
+			-- Run the Phase 2 and Phase 4 searches on the `simple_tokenize'
+			-- terms of `a_query' into `speculation' (timed as "ask.speculate")
+		local
+			l_started: DATE_TIME
+			l_terms: STRING_32
+		do
+			l_started := perf.now
+			l_terms := sanitize_keywords (simple_tokenize (a_query))
+			if not l_terms.is_empty then
+				speculation := [l_terms, search_faq_cache (a_query, l_terms, tag_vocab.tags_for_keywords (l_terms)),
+					db.search (l_terms, 10)]
+			end
+			perf.record ("ask.speculate", l_started)
+		end
+
+	overlaps (a_keywords, a_terms: STRING_32): BOOLEAN
+			-- Are at least `Speculation_overlap' of the words of `a_keywords' among `a_terms'?
+		local
+			l_terms: LIST [STRING_32]
+			l_words, l_shared: INTEGER
+		do
+			l_terms := a_terms.split (' ')
+			l_terms.compare_objects
+			across a_keywords.split (' ') as w loop
+				if not w.is_empty then
+					l_words := l_words + 1
+					if l_terms.has (w) then
+						l_shared := l_shared + 1
+					end
+				end
+			end
+			Result := l_words > 0 and then l_shared >= l_words * Speculation_overlap
+		end
+
+	Speculation_overlap: REAL_64 = 0.5
+			-- Share of LLM keywords the speculative terms must contain to be reused
+
 feature {NONE} -- Phase 2: FAQ Search
 
-	search_faq_cache (a_keywords: STRING_32; a_tags: ARRAYED_LIST [STRING_32]): ARRAYED_LIST [KB_FAQ]
+	search_faq_cache (a_query, a_keywords: STRING_32; a_tags: ARRAYED_LIST [STRING_32]): ARRAYED_LIST [KB_FAQ]
+			-- Cached FAQs for `a_query': paraphrases of it first, then
+			-- keyword matches, then FAQs sharing a tag
 		local
-			l_by_kw, l_by_tags: ARRAYED_LIST [KB_FAQ]
+			l_similar, l_by_kw, l_by_tags: ARRAYED_LIST [KB_FAQ]
 		do
-			create Result.make (10)
+			create Result.make (15)
+			l_similar := faq_store.similar_faqs (a_query + {STRING_32} " " + a_keywords, 5)
+			across l_similar as f loop Result.extend (f) end
 			if not a_keywords.is_empty then
 				l_by_kw := faq_store.search_faqs (a_keywords, 5)
-				across l_by_kw as f loop Result.extend (f) end
+				across l_by_kw as f loop
+					if not has_faq_id (Result, f.id) then Result.extend (f) end
+				end
 			end
 			if not a_tags.is_empty then
 				l_by_tags := faq_store.search_by_tags (a_tags, 5)
@@ -191,7 +338,6 @@ feature {NONE} -- Phase 3: FAQ Synthesis
 		a_faqs: ARRAYED_LIST [KB_FAQ]; a_keywords: STRING_32;
 		a_tags: ARRAYED_LIST [STRING_32]): KB_QUERY_RESULT
 		local
-			l_response: AI_RESPONSE
 			l_context: STRING_32
 			l_new_faq: KB_FAQ
 			i: INTEGER
@@ -199,20 +345,22 @@ feature {NONE} -- Phase 3: FAQ Synthesis
 			create Result.make (a_query)
 			Result.set_mode ("faq-hit")
 			l_context := build_faq_context (a_faqs)
-			l_response := a_client.ask_with_system (faq_prompt,
-				"Question: " + a_query + "%N%NPrevious Q&A:%N" + l_context)
-
-			if l_response.is_success then
-				Result.set_synthesized_answer (l_response.text)
+			if attached stream_llm (a_client, faq_prompt,
+				"Question: " + a_query + "%N%NPrevious Q&A:%N" + l_context) as al_answer
+			then
+				Result.set_synthesized_answer (al_answer)
+				if attached answer_sink then
+					Result.set_answer_streamed
+				end
 				from i := 1 until i > a_faqs.count.min (5) loop
 					Result.add_citation ("FAQ: " + a_faqs [i].question.head (50))
 					faq_store.record_hit (a_faqs [i])
 					i := i + 1
 				end
-				create l_new_faq.make (a_query, l_response.text)
+				create l_new_faq.make (a_query, al_answer)
 				l_new_faq.set_keywords (a_keywords)
 				across a_tags as t loop l_new_faq.add_tag (t) end
-				faq_store.store_faq (l_new_faq)
+				store_faq (l_new_faq)
 				Result.set_ai_note ("From " + a_faqs.count.out + " cached FAQs")
 			else
 				Result := raw_kb_rag_and_store (a_client, a_query, a_keywords, a_tags)
@@ -236,7 +384,6 @@ feature {NONE} -- Phase 4: Raw KB RAG
 	raw_kb_rag_and_store (a_client: AI_CLIENT; a_query: STRING_32;
 		a_keywords: STRING_32; a_tags: ARRAYED_LIST [STRING_32]): KB_QUERY_RESULT
 		local
-			l_response: AI_RESPONSE
 			l_results: ARRAYED_LIST [KB_RESULT]
 			l_context: STRING_32
 			l_new_faq: KB_FAQ
@@ -244,28 +391,38 @@ feature {NONE} -- Phase 4: Raw KB RAG
 		do
 			create Result.make (a_query)
 			Result.set_mode ("raw-kb")
-			l_results := db.search (a_keywords, 10)
+			if attached speculation as al_s and then overlaps (a_keywords, al_s.terms) then
+				l_results := al_s.results
+			else
+				l_results := db.search (a_keywords, 10)
+			end
 			Result.set_raw_results (l_results)
 
 			if not l_results.is_empty then
 				l_context := build_kb_context (l_results)
-				l_response := a_client.ask_with_system (synthesis_prompt,
-					"Question: " + a_query + "%N%NContext:%N" + l_context)
-
-				if l_response.is_success then
-					Result.set_synthesized_answer (l_response.text)
+				if attached stream_llm (a_client, synthesis_prompt,
+					"Question: " + a_query + "%N%NContext:%N" + l_context) as al_answer
+				then
+					Result.set_synthesized_answer (al_answer)
+					if attached answer_sink then
+						Result.set_answer_streamed
+					end
 					from i := 1 until i > l_results.count.min (5) loop
 						Result.add_citation (l_results [i].title)
 						i := i + 1
 					end
-					create l_new_faq.make (a_query, l_response.text)
+					create l_new_faq.make (a_query, al_answer)
 					l_new_faq.set_keywords (a_keywords)
 					across a_tags as t loop l_new_faq.add_tag (t) end
 					across l_results as r loop l_new_faq.add_source (r.title) end
-					faq_store.store_faq (l_new_faq)
-					Result.set_ai_note ("New FAQ #" + l_new_faq.id.out)
+					store_faq (l_new_faq)
+					if faq_store.last_duplicate_of > 0 then
+						Result.set_ai_note ("Merged into FAQ #" + l_new_faq.id.out)
+					else
+						Result.set_ai_note ("New FAQ #" + l_new_faq.id.out)
+					end
 				else
-					if attached l_response.error_message as al_e then
+					if attached last_llm_error as al_e then
 						Result.set_ai_note ("Synthesis failed: " + al_e.out)
 					end
 				end
@@ -280,14 +437,153 @@ feature {NONE} -- Phase 4: Raw KB RAG
 		do
 			create Result.make (2000)
 			from i := 1 until i > a_results.count.min (5) loop
+				-- Search returns snippets; read whole bodies only for the results used
+				db.load_result_body (a_results [i])
 				Result.append ("--- " + a_results [i].title + " ---%N")
-				Result.append (a_results [i].snippet + "%N%N")
+				Result.append (a_results [i].body + "%N%N")
 				i := i + 1
 			end
 		end
 
 feature {NONE} -- AI Client
 
+	ask_llm (a_client: AI_CLIENT; a_system, a_user: STRING_32): detachable STRING_32
+			-- Text of the answer of `a_client' to `a_user' under `a_system',
+			-- from `response_cache' if it was asked before (timed as "llm"
+			-- or "llm.cached"); Void if the provider failed, see `last_llm_error'
+		do
+			Result := ask_llm_while (a_client, a_system, a_user, Void)
+		end
+
+	ask_llm_while (a_client: AI_CLIENT; a_system, a_user: STRING_32; a_meanwhile: detachable PROCEDURE): detachable STRING_32
+			-- `ask_llm', running `a_meanwhile' while the provider answers
+			-- (the round trip on a KB_AI_REQUEST processor); `a_meanwhile'
+			-- is not run when the answer is cached
+		local
+			l_started: DATE_TIME
+			l_response: AI_RESPONSE
+			l_request: separate KB_AI_REQUEST
+			l_provider: STRING_32
+		do
+			l_started := perf.now
+			last_llm_error := Void
+			if attached ai_config.active_provider as al_p then
+				l_provider := al_p
+			else
+				l_provider := a_client.generating_type.name_32
+			end
+			if ai_config.cache_ttl_hours > 0 then
+				Result := response_cache.item (l_provider, a_client.model, a_system, a_user)
+			end
+			if attached Result then
+				perf.record ("llm.cached", l_started)
+			else
+				if attached a_meanwhile then
+					create l_request.make (l_provider, ai_config.provider_api_key (l_provider), a_system, a_user)
+					start_request (l_request)
+					a_meanwhile.call (Void)
+					Result := request_answer (l_request)
+				else
+					l_response := a_client.ask_with_system (a_system, a_user)
+					if l_response.is_success then
+						Result := l_response.text.twin
+					elseif attached l_response.error_message as al_e then
+						last_llm_error := al_e.to_string_32
+					else
+						last_llm_error := {STRING_32} "No response from " + l_provider
+					end
+				end
+				if attached Result and ai_config.cache_ttl_hours > 0 then
+					response_cache.put (l_provider, a_client.model, a_system, a_user, Result)
+				end
+				perf.record ("llm", l_started)
+			end
+		end
+
+	stream_llm (a_client: AI_CLIENT; a_system, a_user: STRING_32): detachable STRING_32
+			-- `ask_llm', passing the answer to `answer_sink' as it arrives:
+			-- piece by piece from Ollama (time to the first one also timed,
+			-- as "llm.first_token"), whole from other providers or the cache
+		local
+			l_started: DATE_TIME
+			l_stream: KB_OLLAMA_STREAM
+		do
+			if attached answer_sink as al_sink then
+				if attached ai_config.active_provider as al_p and then al_p.same_string ("ollama") then
+					l_started := perf.now
+					last_llm_error := Void
+					if ai_config.cache_ttl_hours > 0 then
+						Result := response_cache.item (al_p, a_client.model, a_system, a_user)
+					end
+					if attached Result then
+						perf.record ("llm.cached", l_started)
+						al_sink.call ([Result])
+					else
+						create l_stream.make (a_client.model)
+						Result := l_stream.answer (a_system, a_user, al_sink)
+						if attached Result then
+							if ai_config.cache_ttl_hours > 0 then
+								response_cache.put (al_p, a_client.model, a_system, a_user, Result)
+							end
+						else
+							last_llm_error := l_stream.last_error
+						end
+						if l_stream.first_piece_micros > 0 then
+							perf.add_sample ("llm.first_token", l_stream.first_piece_micros)
+						end
+						perf.record ("llm", l_started)
+					end
+				else
+					Result := ask_llm (a_client, a_system, a_user)
+					if attached Result then
+						al_sink.call ([Result])
+					end
+				end
+			else
+				Result := ask_llm (a_client, a_system, a_user)
+			end
+		end
+
+	start_request (a_request: separate KB_AI_REQUEST)
+			-- Let `a_request' ask its provider (asynchronously)
+		do
+			a_request.run
+		end
+
+	request_answer (a_request: separate KB_AI_REQUEST): detachable STRING_32
+			-- Answer of `a_request', waiting until it is done; Void if the
+			-- provider failed, see `last_llm_error'
+		require
+			done: a_request.is_done
+		do
+			if attached a_request.text as al_text then
+				create Result.make_from_separate (al_text)
+			elseif attached a_request.error_message as al_e then
+				create last_llm_error.make_from_separate (al_e)
+			end
+		end
+
+	response_cache: KB_AI_CACHE
+			-- Provider responses by prompt (opened on first use)
+		attribute
+			create Result.make_beside (db.db_path)
+			Result.set_ttl_seconds (ai_config.cache_ttl_hours.max (1) * 3600)
+			Result.set_max_chars (ai_config.cache_max_mb.max (1) * 1_000_000)
+		end
+
+	last_llm_error: detachable STRING_32
+			-- Why the last `ask_llm' returned Void
+
+	store_faq (a_faq: KB_FAQ)
+			-- Store `a_faq' in `faq_store' (timed as "ask.store_faq")
+		local
+			l_started: DATE_TIME
+		do
+			l_started := perf.now
+			faq_store.store_faq (a_faq)
+			perf.record ("ask.store_faq", l_started)
+		end
+
 	create_ai_client: detachable AI_CLIENT
 		do
 			if attached ai_config.active_provider as al_p then
@@ -356,6 +652,16 @@ feature -- Debug
 			debug_mode := a_val
 		end
 
+feature -- Streaming
+
+	set_answer_sink (a_sink: detachable PROCEDURE [STRING_32])
+			-- Pass synthesized answers to `a_sink' piece by piece (Void: no streaming)
+		do
+			answer_sink := a_sink
+		ensure
+			set: answer_sink = a_sink
+		end
+
 feature {NONE} -- Fallback Tokenization
 
 	is_garbage_keywords (a_kw: STRING_32): BOOLEAN
@@ -0,0 +1,336 @@
+note
+	description: "[
+		KB_KEYWORD_EXTRACTOR - Search Keywords From the KB's Own Vocabulary
+
+		Local stand-in for the Phase 1 keyword call of KB_AI_ROUTER. The
+		words of a question are looked up in what the KB already knows:
+
+			- class names (classes.name) and error codes (errors.code)
+			- KB_TAG_VOCABULARY tags
+			- kb_search terms, through the kb_search_vocab fts5vocab table:
+			  a word is known when its longest indexed prefix (the porter
+			  stem, for most words) is a term, and weighs ln (N / df)
+
+		Stop words and terms found in more than half of the documents are
+		dropped. The keywords are the known words, anchors (class, error,
+		tag) first, then rarest first, at most `Max_keywords', in question
+		order. `last_confidence' is the share of remaining words the KB
+		knows, times 0.85 when none is an anchor: 1.0 for "SIMPLE_JSON
+		parse error", lower as more words are unknown to the KB.
+
+		Usage:
+			extractor: KB_KEYWORD_EXTRACTOR
+			create extractor.make (db.db)
+			keywords := extractor.keywords ("How do I parse JSON with SIMPLE_JSON?")
+			if extractor.last_confidence >= 0.75 then ... skip the LLM ...
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_KEYWORD_EXTRACTOR
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_db: SIMPLE_SQL_DATABASE)
+			-- Extractor over the knowledge base in `a_db'
+		require
+			db_not_void: a_db /= Void
+		do
+			db := a_db
+			create tag_vocab
+			create math
+		end
+
+feature -- Constants
+
+	Max_keywords: INTEGER = 4
+			-- Keywords returned at most (the LLM prompt asks for 2-4)
+
+	Default_threshold: REAL_64 = 0.75
+			-- Confidence at which the local keywords replace the LLM call
+
+	Common_ratio: REAL_64 = 0.5
+			-- Share of documents above which a term is too common to search on
+
+	Unanchored_factor: REAL_64 = 0.85
+			-- Confidence scale when no class, error code or tag was found
+
+	Max_lookup_variables: INTEGER = 900
+			-- Values bound per lookup query (under SQLite's 999 variables)
+
+	Anchor_weight: REAL_64 = 1000.0
+			-- Weight of a class, error code or tag (above any ln (N / df))
+
+feature -- Access
+
+	db: SIMPLE_SQL_DATABASE
+			-- Knowledge base connection
+
+	last_confidence: REAL_64
+			-- How well the KB knew the words of the last `keywords' question (0..1)
+
+	keywords (a_query: READABLE_STRING_GENERAL): STRING_32
+			-- Lowercase search keywords for `a_query', separated by spaces
+			-- (empty if the KB knows none of its words); sets `last_confidence'
+		local
+			l_words, l_known: ARRAYED_LIST [STRING_32]
+			l_weights: HASH_TABLE [REAL_64, STRING_32]
+			l_anchors, l_frequencies: HASH_TABLE [INTEGER, STRING_32]
+			l_documents, l_content: INTEGER
+			l_has_anchor: BOOLEAN
+		do
+			l_words := content_words (a_query)
+			l_anchors := anchors (l_words)
+			l_frequencies := term_frequencies (l_words)
+			l_documents := document_count.max (1)
+			create l_weights.make (l_words.count)
+			across l_words as w loop
+				if l_anchors.has (w) or else not tag_vocab.tags_for_keywords (w.twin).is_empty then
+					-- Anchors rank above any vocabulary weight
+					l_weights.force (Anchor_weight, w)
+					l_has_anchor := True
+					l_content := l_content + 1
+				elseif l_frequencies.has (w) then
+					if l_frequencies.item (w) <= l_documents * Common_ratio then
+						l_weights.force (math.log (l_documents / l_frequencies.item (w)), w)
+						l_content := l_content + 1
+					end
+				else
+					-- Unknown to the KB: counts against confidence
+					l_content := l_content + 1
+				end
+			end
+
+			l_known := strongest (l_words, l_weights)
+			create Result.make (40)
+			across l_words as w loop
+				if l_known.has (w) then
+					if not Result.is_empty then
+						Result.append_character (' ')
+					end
+					Result.append (w)
+				end
+			end
+			if Result.is_empty or l_content = 0 then
+				last_confidence := 0.0
+			else
+				last_confidence := l_weights.count / l_content
+				if not l_has_anchor then
+					last_confidence := last_confidence * Unanchored_factor
+				end
+			end
+		ensure
+			confidence_in_range: last_confidence >= 0.0 and last_confidence <= 1.0
+			no_keywords_no_confidence: Result.is_empty implies last_confidence = 0.0
+		end
+
+feature {NONE} -- Implementation
+
+	tag_vocab: KB_TAG_VOCABULARY
+			-- Tags recognized as anchors
+
+	math: DOUBLE_MATH
+			-- Logarithm
+
+	content_words (a_query: READABLE_STRING_GENERAL): ARRAYED_LIST [STRING_32]
+			-- Distinct lowercase words of `a_query' (letters, digits, '_'),
+			-- stop words and one- or two-letter words dropped
+		local
+			l_text, l_word: STRING_32
+			i: INTEGER
+		do
+			l_text := a_query.to_string_32.as_lower
+			l_text.append_character (' ')
+			create Result.make (8)
+			Result.compare_objects
+			create l_word.make (16)
+			from i := 1 until i > l_text.count loop
+				if l_text [i].is_alpha_numeric or l_text [i] = '_' then
+					l_word.append_character (l_text [i])
+				elseif not l_word.is_empty then
+					l_word.prune_all_leading ('_')
+					l_word.prune_all_trailing ('_')
+					if l_word.count >= 3 and then not Stopwords.has (l_word) and then not Result.has (l_word) then
+						Result.extend (l_word)
+					end
+					create l_word.make (16)
+				end
+				i := i + 1
+			end
+		end
+
+	anchors (a_words: ARRAYED_LIST [STRING_32]): HASH_TABLE [INTEGER, STRING_32]
+			-- Those of `a_words' naming a class or an error code
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_args: ARRAY [ANY]
+			l_placeholders: STRING
+			l_start, l_count, i: INTEGER
+			l_failed: BOOLEAN
+		do
+			create Result.make (a_words.count)
+			if not l_failed then
+				from l_start := 1 until l_start > a_words.count loop
+					-- Each word is bound twice (once per IN list), in as many
+					-- queries as `Max_lookup_variables' requires
+					l_count := (a_words.count - l_start + 1).min (Max_lookup_variables // 2)
+					create l_args.make_filled (0, 1, l_count * 2)
+					from i := 1 until i > l_count loop
+						l_args [i] := a_words [l_start + i - 1].as_upper
+						l_args [i + l_count] := a_words [l_start + i - 1].as_upper
+						i := i + 1
+					end
+					l_placeholders := placeholders (l_count)
+					l_result := db.query_with_args ("SELECT name AS word FROM classes WHERE name IN (" + l_placeholders +
+						") UNION SELECT code FROM errors WHERE code IN (" + l_placeholders + ")", l_args)
+					across l_result.rows as row loop
+						if attached row.string_value ("word") as al_word then
+							Result.force (1, al_word.to_string_32.as_lower)
+						end
+					end
+					l_start := l_start + l_count
+				end
+			end
+		rescue
+			-- Lookup failed: the words count as unknown rather than anchors
+			l_failed := True
+			retry
+		end
+
+	term_frequencies (a_words: ARRAYED_LIST [STRING_32]): HASH_TABLE [INTEGER, STRING_32]
+			-- Documents containing each of `a_words' known to kb_search: those
+			-- of its longest indexed prefix of at least 3 letters and 2/3 of
+			-- the word (porter stems are prefixes of most words)
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_prefixes: ARRAYED_LIST [STRING_32]
+			l_terms: HASH_TABLE [INTEGER, STRING_32]
+			l_args: ARRAY [ANY]
+			l_length, l_start, l_count, i: INTEGER
+			l_failed: BOOLEAN
+		do
+			create Result.make (a_words.count)
+			if not l_failed and not a_words.is_empty then
+				create l_prefixes.make (a_words.count * 4)
+				l_prefixes.compare_objects
+				across a_words as w loop
+					from l_length := w.count until l_length < (w.count * 2 // 3).max (3) loop
+						if not l_prefixes.has (w.head (l_length)) then
+							l_prefixes.extend (w.head (l_length))
+						end
+						l_length := l_length - 1
+					end
+				end
+				create l_terms.make (l_prefixes.count)
+				from l_start := 1 until l_start > l_prefixes.count loop
+					l_count := (l_prefixes.count - l_start + 1).min (Max_lookup_variables)
+					create l_args.make_filled (0, 1, l_count)
+					from i := 1 until i > l_count loop
+						l_args [i] := l_prefixes [l_start + i - 1]
+						i := i + 1
+					end
+					l_result := db.query_with_args ("SELECT term, doc FROM kb_search_vocab WHERE term IN (" + placeholders (l_count) + ")", l_args)
+					across l_result.rows as row loop
+						if attached row.string_value ("term") as al_term then
+							l_terms.force (row.integer_value ("doc"), al_term.to_string_32)
+						end
+					end
+					l_start := l_start + l_count
+				end
+				across a_words as w loop
+					from l_length := w.count until l_length < (w.count * 2 // 3).max (3) or Result.has (w) loop
+						if l_terms.has (w.head (l_length)) then
+							Result.force (l_terms.item (w.head (l_length)), w)
+						end
+						l_length := l_length - 1
+					end
+				end
+			end
+		rescue
+			-- No kb_search_vocab (database from an older kb): nothing is known
+			l_failed := True
+			retry
+		end
+
+	placeholders (a_count: INTEGER): STRING
+			-- "?, ?, ..." with `a_count' parameters, for an IN list
+		require
+			positive_count: a_count > 0
+		local
+			i: INTEGER
+		do
+			create Result.make (a_count * 3)
+			from i := 1 until i > a_count loop
+				if i > 1 then
+					Result.append (", ")
+				end
+				Result.append_character ('?')
+				i := i + 1
+			end
+		end
+
+	document_count: INTEGER
+			-- Documents in kb_search
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			l_result := db.query ("SELECT COUNT(*) FROM kb_search_docs")
+			if not l_result.is_empty and then attached l_result.rows.first.item (1) as al_val then
+				Result := al_val.out.to_integer
+			end
+		end
+
+	strongest (a_words: ARRAYED_LIST [STRING_32]; a_weights: HASH_TABLE [REAL_64, STRING_32]): ARRAYED_LIST [STRING_32]
+			-- The (at most `Max_keywords') `a_words' of highest weight
+		local
+			l_placed: BOOLEAN
+		do
+			create Result.make (Max_keywords + 1)
+			Result.compare_objects
+			across a_words as w loop
+				if a_weights.has (w) then
+					from
+						Result.start
+						l_placed := False
+					until
+						l_placed or Result.after
+					loop
+						if a_weights.item (w) > a_weights.item (Result.item) then
+							Result.put_left (w)
+							l_placed := True
+						else
+							Result.forth
+						end
+					end
+					if not l_placed then
+						Result.extend (w)
+					end
+					if Result.count > Max_keywords then
+						Result.finish
+						Result.remove
+					end
+				end
+			end
+		ensure
+			within_limit: Result.count <= Max_keywords
+		end
+
+	Stopwords: ARRAY [STRING_32]
+			-- Question words that never make a keyword
+		once
+			Result := <<"the", "and", "for", "how", "what", "which", "why", "when", "where", "who",
+				"does", "did", "can", "could", "should", "would", "will", "use", "using", "with",
+				"from", "that", "this", "these", "those", "into", "about", "are", "was", "were",
+				"there", "their", "have", "has", "not", "you", "your", "get", "make", "way",
+				"best", "need", "want", "eiffel">>
+			Result.compare_objects
+		end
+
+invariant
+	db_not_void: db /= Void
+	confidence_in_range: last_confidence >= 0.0 and last_confidence <= 1.0
+
+end
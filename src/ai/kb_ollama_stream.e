@@ -0,0 +1,198 @@
+note
+	description: "[
+		KB_OLLAMA_STREAM - Ollama Answer Read Token by Token
+
+		Asks the local Ollama server (127.0.0.1:11434, POST /api/generate
+		with "stream": true) and hands each piece of the answer to a sink
+		as it is generated, so `kb ask' shows the first words after the
+		first-token latency instead of the whole generation time. The
+		whole answer is still returned for KB_FAQ_STORE.
+
+		The request is HTTP/1.0, so the server sends the NDJSON lines
+		without chunked encoding and closes the connection at the end:
+
+			{"model": "llama3", "response": "Use", "done": false}
+			...
+			{"model": "llama3", "response": "", "done": true, ...}
+
+		Usage:
+			create stream.make ("llama3")
+			if attached stream.answer (system, user, agent show) as al_text then
+				...
+			elseif attached stream.last_error as al_e then
+				...
+			end
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_OLLAMA_STREAM
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_model: READABLE_STRING_GENERAL)
+			-- Stream answers of Ollama model `a_model'
+		require
+			model_not_empty: not a_model.is_empty
+		do
+			model := a_model.to_string_32
+		end
+
+feature -- Constants
+
+	Port: INTEGER = 11434
+			-- Ollama's port on the loopback interface
+
+feature -- Access
+
+	model: STRING_32
+			-- Model asked
+
+	last_error: detachable STRING_32
+			-- Why the last `answer' returned Void
+
+	first_piece_micros: INTEGER_64
+			-- Microseconds from the last `answer' call to its first piece (0 if none)
+
+	answer (a_system, a_user: READABLE_STRING_32; a_sink: PROCEDURE [STRING_32]): detachable STRING_32
+			-- Answer to `a_user' under system prompt `a_system', each piece
+			-- passed to `a_sink' as it arrives; Void if Ollama failed (see
+			-- `last_error'; pieces already passed stay passed)
+		local
+			l_socket: detachable NETWORK_STREAM_SOCKET
+			l_started: DATE_TIME
+			l_body: STRING_8
+			l_line: STRING_8
+			l_text: STRING_32
+			l_in_body, l_done, l_failed: BOOLEAN
+		do
+			last_error := Void
+			first_piece_micros := 0
+			if l_failed then
+				last_error := {STRING_32} "Lost connection to Ollama on port " + Port.out
+			else
+				create l_started.make_now_utc
+				l_body := request_body (a_system, a_user)
+				create l_socket.make_client_by_address_and_port ((create {INET_ADDRESS_FACTORY}).create_loopback, Port)
+				l_socket.connect
+				if l_socket.is_connected then
+					l_socket.put_string ("POST /api/generate HTTP/1.0%R%NHost: 127.0.0.1%R%N" +
+						"Content-Type: application/json%R%NContent-Length: " + l_body.count.out + "%R%N%R%N" + l_body)
+					create l_text.make (2048)
+					from l_socket.read_line until l_done loop
+						l_line := l_socket.last_string.twin
+						l_line.prune_all_trailing ('%R')
+						if not l_in_body then
+							if l_line.starts_with ("HTTP/") and then not l_line.has_substring (" 200") then
+								last_error := {STRING_32} "Ollama answered " + l_line.to_string_32
+							end
+							-- Headers end at the first empty line
+							l_in_body := l_line.is_empty
+						elseif l_line.is_empty then
+							-- NDJSON has no empty lines: the connection closed before the last one
+							l_done := True
+							if last_error = Void then
+								last_error := {STRING_32} "Ollama closed the connection early"
+							end
+						else
+							l_done := read_piece (l_line, l_text, a_sink, l_started)
+						end
+						if not l_done then
+							l_socket.read_line
+						end
+					end
+					l_socket.close
+					if last_error = Void then
+						Result := l_text
+					end
+				else
+					last_error := {STRING_32} "Ollama is not running on port " + Port.out
+				end
+			end
+		rescue
+			if attached l_socket as al_socket and then not al_socket.is_closed then
+				al_socket.close
+			end
+			l_failed := True
+			retry
+		end
+
+feature -- Parsing
+
+	read_piece (a_line: READABLE_STRING_8; a_text: STRING_32; a_sink: PROCEDURE [STRING_32]; a_started: DATE_TIME): BOOLEAN
+			-- Add the piece of NDJSON line `a_line' to `a_text' and pass it to
+			-- `a_sink'; True on the last line (or an error line, see `last_error')
+		local
+			l_json: SIMPLE_JSON
+			l_piece: STRING_32
+		do
+			create l_json
+			if attached l_json.parse ({UTF_CONVERTER}.utf_8_string_8_to_string_32 (a_line)) as al_value and then al_value.is_object then
+				if attached al_value.object_value.string_item ("error") as al_e then
+					last_error := al_e.to_string_32
+					Result := True
+				else
+					if attached al_value.object_value.string_item ("response") as al_piece and then not al_piece.is_empty then
+						l_piece := al_piece.to_string_32
+						if first_piece_micros = 0 then
+							first_piece_micros := ((create {DATE_TIME}.make_now_utc).relative_duration (a_started).fine_seconds_count * 1_000_000).truncated_to_integer_64.max (1)
+						end
+						a_text.append (l_piece)
+						a_sink.call ([l_piece])
+					end
+					Result := a_line.has_substring ("%"done%":true") or a_line.has_substring ("%"done%": true")
+				end
+			end
+		end
+
+feature {NONE} -- Implementation
+
+	request_body (a_system, a_user: READABLE_STRING_32): STRING_8
+			-- UTF-8 JSON body of the streaming generate request
+		local
+			l_json: STRING_32
+		do
+			create l_json.make (a_system.count + a_user.count + 100)
+			l_json.append ("{%"model%": %"")
+			append_escaped (l_json, model)
+			l_json.append ("%", %"system%": %"")
+			append_escaped (l_json, a_system)
+			l_json.append ("%", %"prompt%": %"")
+			append_escaped (l_json, a_user)
+			l_json.append ("%", %"stream%": true}")
+			Result := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (l_json)
+		end
+
+	append_escaped (a_json: STRING_32; a_value: READABLE_STRING_32)
+			-- Append `a_value' to `a_json' as the body of a JSON string
+		do
+			across a_value as c loop
+				inspect c
+				when '"' then
+					a_json.append ("\%"")
+				when '\' then
+					a_json.append ("\\")
+				when '%N' then
+					a_json.append ("\n")
+				when '%R' then
+					a_json.append ("\r")
+				when '%T' then
+					a_json.append ("\t")
+				else
+					if c.natural_32_code < 0x20 then
+						a_json.append ("\u00")
+						a_json.append (c.natural_32_code.to_hex_string.tail (2))
+					else
+						a_json.append_character (c)
+					end
+				end
+			end
+		end
+
+invariant
+	model_not_empty: not model.is_empty
+
+end
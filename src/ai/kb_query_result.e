@@ -95,6 +95,10 @@ feature -- Status
 			Result := raw_results.count
 		end
 
+	is_answer_streamed: BOOLEAN
+			-- Was the synthesized answer shown while it was generated?
+			-- (`formatted' then leaves it out)
+
 feature -- Setters
 
 	set_mode (a_mode: STRING_32)
@@ -131,6 +135,14 @@ feature -- Setters
 			answer_set: synthesized_answer.same_string (a_answer)
 		end
 
+	set_answer_streamed
+			-- Record that the synthesized answer has been shown already
+		do
+			is_answer_streamed := True
+		ensure
+			streamed: is_answer_streamed
+		end
+
 	add_citation (a_source: STRING_32)
 			-- Add a citation
 		do
@@ -175,7 +187,9 @@ feature -- Display
 
 			-- Synthesized answer (if available)
 			if has_synthesized_answer then
-				Result.append ("%N" + sanitize_for_console (synthesized_answer) + "%N")
+				if not is_answer_streamed then
+					Result.append ("%N" + sanitize_for_console (synthesized_answer) + "%N")
+				end
 				if not citations.is_empty then
 					Result.append ("%NSources:%N")
 					from i := 1 until i > citations.count loop
@@ -207,12 +221,14 @@ feature -- Display
 			end
 		end
 
-feature {NONE} -- Helpers
+feature -- Conversion
 
-	sanitize_for_console (a_s: STRING_32): STRING_32
-			-- Replace problematic Unicode characters with ASCII equivalents
+	sanitize_for_console (a_s: READABLE_STRING_32): STRING_32
+			-- Replace problematic Unicode characters with ASCII equivalents.
+			-- Each one is a single character, so pieces of a text can be
+			-- sanitized one by one (see {KB_CLI_APP}.show_streamed).
 		do
-			Result := a_s.twin
+			create Result.make_from_string_general (a_s)
 			Result.replace_substring_all ({STRING_32} "→", {STRING_32} "->")
 			Result.replace_substring_all ({STRING_32} "←", {STRING_32} "<-")
 			Result.replace_substring_all ({STRING_32} "∘", {STRING_32} "o")
@@ -220,6 +236,8 @@ feature {NONE} -- Helpers
 			Result.replace_substring_all ({STRING_32} "≤", {STRING_32} "<=")
 			Result.replace_substring_all ({STRING_32} "≠", {STRING_32} "/=")
 			Result.replace_substring_all ({STRING_32} "•", {STRING_32} "*")
+		ensure
+			class
 		end
 
 invariant
@@ -0,0 +1,125 @@
+note
+	description: "[
+		KB_BATCH - Answer Many kb Lookups With a Pool of Read Connections
+
+		For tooling that checks many names at once (every class a project
+		references, every error code in a build log): one process, one
+		KB_BATCH_WORKER per connection, each on its own SCOOP processor
+		with a query_only connection to kb.db. Under WAL the readers run
+		in parallel, so throughput grows with cores instead of paying
+		process start-up and schema checks per lookup.
+
+		Answers are NDJSON lines (see KB_BATCH_WORKER), written in input
+		order as soon as each one and all before it are ready.
+
+		Usage:
+			create batch.make ("kb.db", 4)
+			batch.add ("class SIMPLE_JSON", 1)
+			batch.add ("error VEVI", 2)
+			batch.run (agent io.put_string)
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_BATCH
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_db_path: READABLE_STRING_GENERAL; a_workers: INTEGER)
+			-- Batch on the database at `a_db_path' with up to `a_workers' connections
+		require
+			path_not_empty: not a_db_path.is_empty
+			positive_workers: a_workers > 0
+		do
+			db_path := a_db_path.to_string_32
+			worker_count := a_workers.min (Max_workers)
+			create jobs.make (100)
+		ensure
+			workers_capped: worker_count <= Max_workers
+		end
+
+feature -- Constants
+
+	Max_workers: INTEGER = 16
+			-- Most read connections opened
+
+feature -- Access
+
+	db_path: STRING_32
+			-- Database queried
+
+	worker_count: INTEGER
+			-- Read connections to open (fewer if there are fewer queries)
+
+	count: INTEGER
+			-- Queries added
+
+feature -- Element change
+
+	add (a_query: READABLE_STRING_32; a_line: INTEGER)
+			-- Queue `a_query', read from input line `a_line'
+		require
+			query_not_empty: not a_query.is_empty
+		do
+			add_job (jobs, a_query.to_string_32, a_line)
+			count := count + 1
+		ensure
+			one_more: count = old count + 1
+		end
+
+feature -- Basic operations
+
+	run (a_output: PROCEDURE [STRING])
+			-- Answer every query, passing each NDJSON line (UTF-8, with its
+			-- line break) to `a_output' in input order
+		local
+			l_worker: separate KB_BATCH_WORKER
+			l_line: STRING
+			i: INTEGER
+		do
+			from i := 1 until i > worker_count.min (count) loop
+				create l_worker.make (db_path, jobs)
+				start (l_worker)
+				i := i + 1
+			end
+			from i := 1 until i > count loop
+				l_line := answer (jobs, i)
+				l_line.append_character ('%N')
+				a_output.call ([l_line])
+				i := i + 1
+			end
+		end
+
+feature {NONE} -- Implementation
+
+	jobs: separate KB_BATCH_JOBS
+			-- Queries and answers shared with the workers
+
+	add_job (a_jobs: separate KB_BATCH_JOBS; a_query: STRING_32; a_line: INTEGER)
+			-- Add `a_query' to `a_jobs'
+		do
+			a_jobs.extend (a_query, a_line)
+		end
+
+	start (a_worker: separate KB_BATCH_WORKER)
+			-- Let `a_worker' answer queries (asynchronously)
+		do
+			a_worker.run
+		end
+
+	answer (a_jobs: separate KB_BATCH_JOBS; a_index: INTEGER): STRING
+			-- Answer to query `a_index', waiting until it is ready
+		require
+			ready: a_jobs.has_answer (a_index)
+		do
+			create Result.make_from_separate (a_jobs.answer (a_index))
+			a_jobs.prune_answer (a_index)
+		end
+
+invariant
+	positive_workers: worker_count > 0
+
+end
@@ -0,0 +1,138 @@
+note
+	description: "[
+		KB_BATCH_JOBS - Queries and Answers Shared by kb batch Workers
+
+		Lives on its own SCOOP processor. Workers take the next query
+		index with `take' and hand back the NDJSON line for it with
+		`put_answer'; KB_BATCH reads the answers in query order, waiting
+		(precondition `has_answer') for each one in turn.
+
+		Answers are kept until `prune_answer', so only the lines finished
+		ahead of the one being printed are held.
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_BATCH_JOBS
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_capacity: INTEGER)
+			-- Empty job list for about `a_capacity' queries
+		require
+			capacity_non_negative: a_capacity >= 0
+		do
+			create queries.make (a_capacity)
+			create line_numbers.make (a_capacity)
+			create answers.make (a_capacity)
+			next_index := 1
+		ensure
+			empty: count = 0
+		end
+
+feature -- Access
+
+	count: INTEGER
+			-- Number of queries
+		do
+			Result := queries.count
+		end
+
+	query (a_index: INTEGER): STRING_32
+			-- Query `a_index' (e.g. "class SIMPLE_JSON")
+		require
+			valid_index: a_index >= 1 and a_index <= count
+		do
+			Result := queries [a_index]
+		end
+
+	line_number (a_index: INTEGER): INTEGER
+			-- Input line query `a_index' was read from
+		require
+			valid_index: a_index >= 1 and a_index <= count
+		do
+			Result := line_numbers [a_index]
+		end
+
+	last_taken: INTEGER
+			-- Index handed out by the last `take' (0 when none were left)
+
+	answer (a_index: INTEGER): STRING
+			-- NDJSON line (UTF-8) answering query `a_index'
+		require
+			has_answer: has_answer (a_index)
+		do
+			if attached answers.item (a_index) as al_answer then
+				Result := al_answer
+			else
+				create Result.make_empty
+			end
+		end
+
+feature -- Status
+
+	has_answer (a_index: INTEGER): BOOLEAN
+			-- Has query `a_index' been answered?
+		do
+			Result := answers.has (a_index)
+		end
+
+feature -- Element change
+
+	extend (a_query: separate READABLE_STRING_32; a_line: INTEGER)
+			-- Add `a_query', read from input line `a_line'
+		do
+			queries.extend (create {STRING_32}.make_from_separate (a_query))
+			line_numbers.extend (a_line)
+		ensure
+			one_more: count = old count + 1
+		end
+
+	take
+			-- Hand out the next unanswered query in `last_taken'
+		do
+			if next_index <= count then
+				last_taken := next_index
+				next_index := next_index + 1
+			else
+				last_taken := 0
+			end
+		end
+
+	put_answer (a_answer: separate READABLE_STRING_8; a_index: INTEGER)
+			-- Record `a_answer' for query `a_index'
+		require
+			valid_index: a_index >= 1 and a_index <= count
+		do
+			answers.force (create {STRING}.make_from_separate (a_answer), a_index)
+		ensure
+			answered: has_answer (a_index)
+		end
+
+	prune_answer (a_index: INTEGER)
+			-- Drop the answer of `a_index' once it has been written
+		do
+			answers.remove (a_index)
+		end
+
+feature {NONE} -- Implementation
+
+	queries: ARRAYED_LIST [STRING_32]
+			-- Queries in input order
+
+	line_numbers: ARRAYED_LIST [INTEGER]
+			-- Input line of each query
+
+	answers: HASH_TABLE [STRING, INTEGER]
+			-- Answers not yet written, by query index
+
+	next_index: INTEGER
+			-- Index `take' hands out next
+
+invariant
+	same_count: queries.count = line_numbers.count
+
+end
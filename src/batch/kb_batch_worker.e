@@ -0,0 +1,292 @@
+note
+	description: "[
+		KB_BATCH_WORKER - One Read Connection Answering kb batch Queries
+
+		Runs on its own SCOOP processor with its own KB_DATABASE opened by
+		`make_reader' (query_only; under WAL, readers do not block each
+		other). `run' takes queries from the shared KB_BATCH_JOBS until
+		none are left and puts back one NDJSON line per query:
+
+			{"line": 3, "query": "class SIMPLE_JSON", "kind": "class", "found": true, "text": "..."}
+			{"line": 4, "query": "search json parse", "kind": "search", "found": true,
+			 "results": [{"type": "class", "id": "...", "title": "...", "snippet": "..."}]}
+
+		A query is "<kind> <text>" with kind class, feature (CLASS.name),
+		error, pattern, example, library (or lib) or search; any other line
+		is searched as a whole.
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_BATCH_WORKER
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_db_path: separate READABLE_STRING_32; a_jobs: separate KB_BATCH_JOBS)
+			-- Worker for the database at `a_db_path' taking queries from `a_jobs'
+		do
+			create db_path.make_from_separate (a_db_path)
+			jobs := a_jobs
+		end
+
+feature -- Access
+
+	db_path: STRING_32
+			-- Database answered from
+
+	answered: INTEGER
+			-- Queries answered by this worker
+
+feature -- Constants
+
+	Search_limit: INTEGER = 10
+			-- Results per "search" query
+
+feature -- Basic operations
+
+	run
+			-- Answer queries from `jobs' until none are left. If that fails
+			-- (database unreadable, lost connection), the query in hand and
+			-- all the ones left get a failure line: KB_BATCH waits for each.
+		local
+			l_db: KB_DATABASE
+			l_opened: detachable KB_DATABASE
+			l_index: INTEGER
+			l_failed: BOOLEAN
+		do
+			if l_failed then
+				if attached l_opened as al_db and then al_db.is_open then
+					al_db.close
+				end
+				from
+					if l_index = 0 then
+						l_index := next_job (jobs)
+					end
+				until
+					l_index = 0
+				loop
+					put_answer (jobs, failure_line (l_index), l_index)
+					l_index := next_job (jobs)
+				end
+			else
+				create l_db.make_reader (db_path)
+				l_opened := l_db
+				from
+					l_index := next_job (jobs)
+				until
+					l_index = 0
+				loop
+					put_answer (jobs, answer_line (l_db, job_line (jobs, l_index), job_query (jobs, l_index)), l_index)
+					-- Answered: nothing in hand until the next one is taken
+					l_index := 0
+					answered := answered + 1
+					l_index := next_job (jobs)
+				end
+				l_db.close
+			end
+		rescue
+			if not l_failed then
+				l_failed := True
+				retry
+			end
+		end
+
+	failure_line (a_index: INTEGER): STRING
+			-- NDJSON line (UTF-8) reporting that query `a_index' went unanswered
+		local
+			l_json: STRING_32
+		do
+			create l_json.make (128)
+			l_json.append ("{%"line%": " + job_line (jobs, a_index).out + ", %"query%": %"")
+			l_json.append (escape_json (job_query (jobs, a_index)))
+			l_json.append ("%", %"found%": false, %"error%": %"Batch worker failed reading ")
+			l_json.append (escape_json (db_path))
+			l_json.append ("%"}")
+			Result := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (l_json)
+		end
+
+	answer_line (a_db: KB_DATABASE; a_line: INTEGER; a_query: STRING_32): STRING
+			-- NDJSON line (UTF-8) answering `a_query' from input line `a_line'
+		local
+			l_json: STRING_32
+			l_kind, l_text: STRING_32
+			l_space, l_dot: INTEGER
+			l_failed: BOOLEAN
+		do
+			create l_json.make (256)
+			l_json.append ("{%"line%": " + a_line.out + ", %"query%": %"")
+			l_json.append (escape_json (a_query))
+			l_json.append ("%"")
+			if l_failed then
+				l_json.append (", %"found%": false, %"error%": %"")
+				if attached a_db.last_error as al_error then
+					l_json.append (escape_json (al_error))
+				end
+				l_json.append ("%"")
+			else
+				l_space := a_query.index_of (' ', 1)
+				if l_space > 0 then
+					l_kind := a_query.head (l_space - 1).as_lower
+					l_text := a_query.substring (l_space + 1, a_query.count)
+					l_text.left_adjust
+				else
+					create l_kind.make_empty
+					create l_text.make_empty
+				end
+				if l_text.is_empty or not Kinds.has (l_kind) then
+					l_kind := "search"
+					l_text := a_query
+				elseif l_kind.same_string ("lib") then
+					l_kind := "library"
+				end
+				l_json.append (", %"kind%": %"")
+				l_json.append (l_kind)
+				l_json.append ("%"")
+
+				if l_kind.same_string ("search") then
+					append_results (l_json, a_db.search (l_text, Search_limit))
+				elseif l_kind.same_string ("class") then
+					append_text (l_json, a_db.find_class (l_text.as_upper))
+				elseif l_kind.same_string ("feature") then
+					l_dot := l_text.index_of ('.', 1)
+					if l_dot > 1 and l_dot < l_text.count then
+						append_text (l_json, a_db.find_feature (l_text.head (l_dot - 1).as_upper, l_text.substring (l_dot + 1, l_text.count)))
+					else
+						append_text (l_json, Void)
+					end
+				elseif l_kind.same_string ("error") then
+					append_text (l_json, a_db.get_error (l_text.as_upper))
+				elseif l_kind.same_string ("pattern") then
+					append_text (l_json, a_db.get_pattern (l_text))
+				elseif l_kind.same_string ("example") then
+					append_text (l_json, a_db.find_example_like (l_text))
+				elseif l_kind.same_string ("library") then
+					append_text (l_json, a_db.get_library (l_text))
+				end
+			end
+			l_json.append_character ('}')
+			Result := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (l_json)
+		rescue
+			if not l_failed then
+				l_failed := True
+				retry
+			end
+		end
+
+	Kinds: ARRAY [STRING_32]
+			-- Query kinds understood besides plain search text
+		once
+			Result := <<"search", "class", "feature", "error", "pattern", "example", "library", "lib">>
+			Result.compare_objects
+		end
+
+feature {NONE} -- Implementation
+
+	jobs: separate KB_BATCH_JOBS
+			-- Shared queries and answers
+
+	next_job (a_jobs: separate KB_BATCH_JOBS): INTEGER
+			-- Index of the next query to answer (0 when done)
+		do
+			a_jobs.take
+			Result := a_jobs.last_taken
+		end
+
+	job_query (a_jobs: separate KB_BATCH_JOBS; a_index: INTEGER): STRING_32
+			-- Copy of query `a_index'
+		do
+			create Result.make_from_separate (a_jobs.query (a_index))
+		end
+
+	job_line (a_jobs: separate KB_BATCH_JOBS; a_index: INTEGER): INTEGER
+			-- Input line of query `a_index'
+		do
+			Result := a_jobs.line_number (a_index)
+		end
+
+	put_answer (a_jobs: separate KB_BATCH_JOBS; a_answer: STRING; a_index: INTEGER)
+			-- Hand `a_answer' for query `a_index' back to `a_jobs'
+		do
+			a_jobs.put_answer (a_answer, a_index)
+		end
+
+	append_text (a_json: STRING_32; a_item: detachable ANY)
+			-- Append found/text fields for the looked-up `a_item'
+		do
+			if attached {KB_CLASS_INFO} a_item as al_class then
+				append_formatted (a_json, al_class.formatted)
+			elseif attached {KB_FEATURE_INFO} a_item as al_feature then
+				append_formatted (a_json, al_feature.formatted)
+			elseif attached {KB_ERROR_INFO} a_item as al_error then
+				append_formatted (a_json, al_error.formatted)
+			elseif attached {KB_PATTERN} a_item as al_pattern then
+				append_formatted (a_json, al_pattern.formatted)
+			elseif attached {KB_EXAMPLE} a_item as al_example then
+				append_formatted (a_json, al_example.formatted)
+			elseif attached {KB_LIBRARY_INFO} a_item as al_library then
+				append_formatted (a_json, al_library.formatted)
+			else
+				a_json.append (", %"found%": false")
+			end
+		end
+
+	append_formatted (a_json: STRING_32; a_text: STRING_32)
+			-- Append a found entry shown as `a_text'
+		do
+			a_json.append (", %"found%": true, %"text%": %"")
+			a_json.append (escape_json (a_text))
+			a_json.append ("%"")
+		end
+
+	append_results (a_json: STRING_32; a_results: ARRAYED_LIST [KB_RESULT])
+			-- Append found/results fields for search `a_results'
+		do
+			a_json.append (", %"found%": " + (not a_results.is_empty).out.as_lower + ", %"results%": [")
+			across a_results as r loop
+				if a_json.item (a_json.count) /= '[' then
+					a_json.append (", ")
+				end
+				a_json.append ("{%"type%": %"")
+				a_json.append (escape_json (r.content_type))
+				a_json.append ("%", %"id%": %"")
+				a_json.append (escape_json (r.content_id))
+				a_json.append ("%", %"title%": %"")
+				a_json.append (escape_json (r.title))
+				a_json.append ("%", %"snippet%": %"")
+				a_json.append (escape_json (r.snippet))
+				a_json.append ("%"}")
+			end
+			a_json.append_character (']')
+		end
+
+	escape_json (a_str: STRING_32): STRING_32
+			-- Escape string for JSON
+		do
+			create Result.make (a_str.count + 10)
+			across a_str as ic loop
+				inspect ic
+				when '"' then
+					Result.append ("\%"")
+				when '\' then
+					Result.append ("\\")
+				when '%N' then
+					Result.append ("\n")
+				when '%R' then
+					Result.append ("\r")
+				when '%T' then
+					Result.append ("\t")
+				else
+					if ic.natural_32_code < 0x20 then
+						Result.append ("\u00")
+						Result.append (ic.natural_32_code.to_hex_string.tail (2))
+					else
+						Result.append_character (ic)
+					end
+				end
+			end
+		end
+
+end
@@ -0,0 +1,254 @@
+note
+	description: "[
+		KB_DAEMON - Long-Running kb Server on a Loopback Socket
+
+		Keeps one KB_DATABASE (schema checked, caches and FAQ vectors warm)
+		for many short kb invocations. Listens on 127.0.0.1 only and speaks
+		newline-delimited JSON (see KB_DAEMON_MESSAGE); each request names
+		a kb command line, which the handler runs with its output routed to
+		a KB_DAEMON_SESSION.
+
+		Clients are served one at a time, in the order they connect: the
+		database connection is not shared between threads. A client that
+		sends nothing for `Read_timeout' seconds, at a prompt too, is
+		disconnected so it cannot hold up the others. Besides the
+		handler's commands, "ping" reports the daemon and "shutdown" stops it.
+
+		While running, the port and a random `token' are written to a
+		marker file next to kb.db (kb.daemon), readable by its owner only,
+		so the CLI only tries to connect when a daemon is up. Requests
+		without that token are refused: other local users cannot use the
+		loopback port.
+
+		Usage:
+			create daemon.make (7433, "kb.daemon")
+			daemon.run (agent serve_request)
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_DAEMON
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_port: INTEGER; a_marker_path: READABLE_STRING_GENERAL)
+			-- Daemon for port `a_port', announced in the file `a_marker_path'
+		require
+			valid_port: a_port > 0 and a_port < 65536
+			marker_not_empty: not a_marker_path.is_empty
+		do
+			port := a_port
+			marker_path := a_marker_path.to_string_32
+			token := new_token
+			create last_error.make_empty
+		ensure
+			port_set: port = a_port
+		end
+
+feature -- Constants
+
+	Default_port: INTEGER = 7433
+			-- Port used when `kb serve' is not given one
+
+	Read_timeout: INTEGER = 30
+			-- Seconds a client may stay silent before it is disconnected
+
+feature -- Access
+
+	port: INTEGER
+			-- Loopback port listened on
+
+	marker_path: STRING_32
+			-- File holding `port' and `token' while the daemon runs
+
+	token: STRING
+			-- Secret every request must carry (see KB_DAEMON_CLIENT)
+
+	requests_served: INTEGER
+			-- Requests answered since `run' started
+
+	last_error: STRING_32
+			-- Why `run' could not listen (empty if it could)
+
+feature -- Status
+
+	is_stopped: BOOLEAN
+			-- Has "shutdown" been requested?
+
+feature -- Basic operations
+
+	run (a_handler: PROCEDURE [KB_DAEMON_SESSION])
+			-- Serve clients with `a_handler' until "shutdown"
+		local
+			l_server: detachable NETWORK_STREAM_SOCKET
+			l_failed: BOOLEAN
+		do
+			if not l_failed then
+				create l_server.make_server_by_address_and_port ((create {INET_ADDRESS_FACTORY}).create_loopback, port)
+				l_server.listen (8)
+				write_marker
+				from is_stopped := False until is_stopped loop
+					l_server.accept
+					if attached l_server.accepted as al_client then
+						serve_client (al_client, a_handler)
+					end
+				end
+			end
+			remove_marker
+			if attached l_server as al_server and then not al_server.is_closed then
+				al_server.close
+			end
+		rescue
+			if not l_failed then
+				l_failed := True
+				last_error := {STRING_32} "Cannot listen on 127.0.0.1:" + port.out
+				retry
+			end
+		end
+
+	stop
+			-- Stop after the current request
+		do
+			is_stopped := True
+		ensure
+			stopped: is_stopped
+		end
+
+feature {NONE} -- Implementation
+
+	serve_client (a_client: NETWORK_STREAM_SOCKET; a_handler: PROCEDURE [KB_DAEMON_SESSION])
+			-- Answer the requests of `a_client' until it disconnects
+			-- (an empty line or a broken connection ends it)
+		local
+			l_done, l_failed: BOOLEAN
+		do
+			if not l_failed then
+				a_client.set_recv_timeout (Read_timeout)
+				from until l_done or is_stopped or a_client.is_closed loop
+					-- A timeout ends the connection, as a disconnect does
+					a_client.read_line
+					if attached a_client.last_string as al_line and then not al_line.is_empty then
+						serve_line (a_client, al_line.twin, a_handler)
+					else
+						l_done := True
+					end
+				end
+			end
+			if not a_client.is_closed then
+				a_client.close
+			end
+		rescue
+			if not l_failed then
+				l_failed := True
+				retry
+			end
+		end
+
+	serve_line (a_client: NETWORK_STREAM_SOCKET; a_line: STRING; a_handler: PROCEDURE [KB_DAEMON_SESSION])
+			-- Answer the request in `a_line'
+		local
+			l_request: KB_DAEMON_MESSAGE
+			l_session: detachable KB_DAEMON_SESSION
+			l_retried: BOOLEAN
+		do
+			if l_retried then
+				if attached l_session as al_session and then not al_session.is_finished then
+					al_session.fail ("Request failed")
+				end
+				a_client.close
+			else
+				create l_request.make_from_json (a_line)
+				create l_session.make (a_client, l_request)
+				if not l_request.is_valid or l_session.command.is_empty then
+					l_session.fail ("Expected a JSON object with a %"command%"")
+				elseif not l_request.item ("token").same_string_general (token) then
+					l_session.fail ("Not authorized: token does not match the marker file")
+				elseif l_session.command.same_string ("ping") then
+					l_session.put ("kb daemon on 127.0.0.1:" + port.out + ", " + requests_served.out + " requests served%N")
+					l_session.finish
+				elseif l_session.command.same_string ("shutdown") then
+					stop
+					l_session.put ("kb daemon stopped%N")
+					l_session.finish
+				else
+					a_handler.call ([l_session])
+					if not l_session.is_finished then
+						l_session.finish
+					end
+				end
+				requests_served := requests_served + 1
+				if l_session.is_client_gone then
+					a_client.close
+				end
+			end
+		rescue
+			if not l_retried then
+				l_retried := True
+				retry
+			end
+		end
+
+	write_marker
+			-- Record `port' and `token' in `marker_path', for its owner only
+		local
+			l_file: PLAIN_TEXT_FILE
+		do
+			create l_file.make_with_name (marker_path)
+			l_file.open_write
+			l_file.change_mode (0c600)
+			l_file.put_string (port.out + "%N" + token + "%N")
+			l_file.close
+		end
+
+	new_token: STRING
+			-- 16 random bytes in hex, from /dev/urandom where there is one,
+			-- else a random UUID
+		local
+			l_file: RAW_FILE
+			l_failed: BOOLEAN
+		do
+			create Result.make (32)
+			if not l_failed then
+				create l_file.make_with_name ("/dev/urandom")
+				if l_file.exists and then l_file.is_readable then
+					l_file.open_read
+					l_file.read_stream (16)
+					across l_file.last_string as c loop
+						Result.append (c.code.to_hex_string.tail (2))
+					end
+					l_file.close
+				end
+			end
+			if Result.count < 32 then
+				Result := (create {UUID_GENERATOR}).generate.out
+			end
+		rescue
+			l_failed := True
+			retry
+		end
+
+	remove_marker
+			-- Delete `marker_path' if present
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_failed: BOOLEAN
+		do
+			if not l_failed then
+				create l_file.make_with_name (marker_path)
+				if l_file.exists then
+					l_file.delete
+				end
+			end
+		rescue
+			l_failed := True
+			retry
+		end
+
+invariant
+	valid_port: port > 0 and port < 65536
+	token_not_empty: not token.is_empty
+
+end
@@ -0,0 +1,194 @@
+note
+	description: "[
+		KB_DAEMON_CLIENT - CLI Side of the kb Daemon
+
+		Sends one kb command line to a running KB_DAEMON and plays its
+		replies back on the terminal: output is printed as the CLI would
+		print it, paged and streamed output goes through KB_PAGER, and
+		prompts are asked here and answered over the socket. The result
+		is what running the command locally would show, without opening
+		kb.db.
+
+		The daemon is found through the marker file it writes next to
+		kb.db; without one no connection is tried. Each request carries
+		the token from that file and the command's arguments as given, so
+		the daemon parses them as the local CLI would.
+
+		Usage:
+			create client.make_from_marker ("kb.daemon")
+			if client.is_connected and then client.run (create {KB_COMMAND_LINE}.make (<<"search", "json">>), pager) then
+				-- served by the daemon
+			end
+			client.close
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_DAEMON_CLIENT
+
+create
+	make,
+	make_from_marker
+
+feature {NONE} -- Initialization
+
+	make (a_port: INTEGER; a_token: READABLE_STRING_GENERAL)
+			-- Connect to a daemon on 127.0.0.1:`a_port' started with `a_token'
+		require
+			valid_port: a_port > 0 and a_port < 65536
+		do
+			port := a_port
+			token := a_token.to_string_8
+			connect
+		end
+
+	make_from_marker (a_marker_path: READABLE_STRING_GENERAL)
+			-- Connect to the daemon announced in `a_marker_path', if any
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_line: STRING
+		do
+			create token.make_empty
+			create l_file.make_with_name (a_marker_path)
+			if l_file.exists and then l_file.is_readable then
+				l_file.open_read
+				l_file.read_line
+				l_line := l_file.last_string.twin
+				if not l_file.end_of_file then
+					l_file.read_line
+					token := l_file.last_string.twin
+					token.left_adjust
+					token.right_adjust
+				end
+				l_file.close
+				l_line.left_adjust
+				l_line.right_adjust
+				if l_line.is_integer and then l_line.to_integer > 0 and then l_line.to_integer < 65536 then
+					port := l_line.to_integer
+					connect
+				end
+			end
+		end
+
+feature -- Access
+
+	port: INTEGER
+			-- Port of the daemon (0 if no marker was found)
+
+	token: STRING
+			-- Secret the daemon wrote to its marker file, sent with each request
+
+feature -- Status
+
+	is_connected: BOOLEAN
+			-- Is a daemon connection open?
+
+feature -- Basic operations
+
+	run (a_command: KB_COMMAND_LINE; a_pager: KB_PAGER): BOOLEAN
+			-- Have the daemon run `a_command' and show its replies.
+			-- False if the daemon went away before answering (run it locally).
+		require
+			connected: is_connected
+			command_not_empty: a_command.argument_count > 0
+		local
+			l_request, l_reply: KB_DAEMON_MESSAGE
+			l_answer: KB_DAEMON_MESSAGE
+			l_done, l_failed: BOOLEAN
+		do
+			if not l_failed and attached socket as al_socket then
+				request_count := request_count + 1
+				create l_request.make (request_count.out)
+				l_request.put (a_command.command, "command")
+				l_request.put (a_command.lines, "args")
+				l_request.put ("true", "interactive")
+				l_request.put (token, "token")
+				al_socket.put_string (l_request.to_json + "%N")
+				from until l_done loop
+					al_socket.read_line
+					if attached al_socket.last_string as al_line and then not al_line.is_empty then
+						create l_reply.make_from_json (al_line)
+						if l_reply.id.same_string (l_request.id) then
+							Result := True
+							if a_pager.is_streaming and not l_reply.kind.same_string ("stream") then
+								a_pager.end_stream
+							end
+							if l_reply.kind.same_string ("stream") then
+								if not a_pager.is_streaming then
+									a_pager.start_stream
+								end
+								a_pager.put_stream (utf_8 (l_reply.text))
+							elseif l_reply.kind.same_string ("output") then
+								io.put_string (utf_8 (l_reply.text))
+							elseif l_reply.kind.same_string ("page") then
+								a_pager.show (utf_8 (l_reply.text))
+							elseif l_reply.kind.same_string ("prompt") then
+								io.put_string (utf_8 (l_reply.text))
+								io.read_line
+								create l_answer.make (l_request.id)
+								l_answer.put ({UTF_CONVERTER}.utf_8_string_8_to_string_32 (io.last_string), "input")
+								al_socket.put_string (l_answer.to_json + "%N")
+							elseif l_reply.kind.same_string ("error") then
+								io.put_string ("kb daemon: " + utf_8 (l_reply.text) + "%N")
+							end
+							l_done := l_reply.is_final
+						end
+					else
+						l_done := True
+					end
+				end
+			end
+		rescue
+			if not l_failed then
+				l_failed := True
+				close
+				retry
+			end
+		end
+
+	close
+			-- Close the connection
+		do
+			if attached socket as al_socket and then not al_socket.is_closed then
+				al_socket.close
+			end
+			is_connected := False
+		ensure
+			disconnected: not is_connected
+		end
+
+feature {NONE} -- Implementation
+
+	socket: detachable NETWORK_STREAM_SOCKET
+			-- Connection to the daemon
+
+	request_count: INTEGER
+			-- Requests sent, numbering their ids
+
+	connect
+			-- Open `socket' to 127.0.0.1:`port' (a stale marker just leaves it closed)
+		local
+			l_failed: BOOLEAN
+		do
+			if not l_failed then
+				create socket.make_client_by_address_and_port ((create {INET_ADDRESS_FACTORY}).create_loopback, port)
+				if attached socket as al_socket then
+					al_socket.connect
+					is_connected := al_socket.is_connected
+				end
+			end
+		rescue
+			if not l_failed then
+				l_failed := True
+				is_connected := False
+				retry
+			end
+		end
+
+	utf_8 (a_text: READABLE_STRING_32): STRING_8
+			-- `a_text' as the UTF-8 bytes the CLI prints
+		do
+			Result := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (a_text)
+		end
+
+end
@@ -0,0 +1,217 @@
+note
+	description: "[
+		KB_DAEMON_MESSAGE - One Line of the kb Daemon Protocol
+
+		A flat JSON object of string fields, sent as one UTF-8 line
+		(newline-delimited JSON). Requests from a client:
+
+			{"id": "7", "command": "search foo bar", "args": "search\nfoo bar",
+			 "interactive": "true", "token": "..."}
+			{"id": "7", "input": "3"}               -- answer to a prompt
+
+		"args" are the command's arguments, one per line (KB_COMMAND_LINE),
+		so the daemon parses them as the local CLI would; "command" is the
+		same line for messages. "token" must be the one in the daemon's
+		marker file.
+
+		Replies from the daemon, in order, for each request:
+
+			{"id": "7", "kind": "output", "text": "Search Results ..."}
+			{"id": "7", "kind": "page", "text": "..."}     -- show through the pager
+			{"id": "7", "kind": "stream", "text": "Use "}  -- next piece of an answer being generated
+			{"id": "7", "kind": "prompt", "text": "Select (1-20) or Enter to skip: "}
+			{"id": "7", "kind": "done"}
+			{"id": "7", "kind": "error", "text": "Not served by the daemon: ingest"}
+
+		A "prompt" waits for an "input" line (interactive requests only;
+		otherwise the daemon answers it with an empty line itself). "done"
+		and "error" end the request.
+
+		Usage:
+			create msg.make ("7")
+			msg.put ("search json", "command")
+			socket.put_string (msg.to_json + "%N")
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_DAEMON_MESSAGE
+
+create
+	make,
+	make_from_json
+
+feature {NONE} -- Initialization
+
+	make (a_id: READABLE_STRING_GENERAL)
+			-- Message of request `a_id'
+		do
+			create fields.make (4)
+			put (a_id, "id")
+		ensure
+			id_set: id.same_string_general (a_id)
+		end
+
+	make_from_json (a_line: READABLE_STRING_8)
+			-- Message read from the UTF-8 JSON line `a_line'
+			-- (`is_valid' is False if it is not a JSON object)
+		local
+			l_json: SIMPLE_JSON
+		do
+			create fields.make (4)
+			create l_json
+			if attached l_json.parse ({UTF_CONVERTER}.utf_8_string_8_to_string_32 (a_line)) as al_value and then al_value.is_object then
+				is_valid := True
+				across Keys as k loop
+					if attached al_value.object_value.string_item (k) as al_text then
+						fields.force (al_text, k)
+					end
+				end
+			end
+		end
+
+feature -- Access
+
+	item (a_key: STRING): STRING_32
+			-- Value of field `a_key' (empty if absent)
+		do
+			if attached fields.item (a_key) as al_value then
+				Result := al_value
+			else
+				create Result.make_empty
+			end
+		end
+
+	id: STRING_32
+			-- Request this message belongs to
+		do
+			Result := item ("id")
+		end
+
+	arguments: KB_COMMAND_LINE
+			-- Arguments of a request: its "args", else the words of its "command"
+		do
+			if has ("args") then
+				create Result.make_from_lines (item ("args"))
+			else
+				create Result.make (command.split (' '))
+			end
+		end
+
+	command: STRING_32
+			-- Command line of a request, e.g. "search json"
+		do
+			Result := item ("command")
+		end
+
+	kind: STRING_32
+			-- Reply kind: output, page, stream, prompt, done or error
+		do
+			Result := item ("kind")
+		end
+
+	text: STRING_32
+			-- Output, prompt or error text of a reply
+		do
+			Result := item ("text")
+		end
+
+	Keys: ARRAY [STRING]
+			-- Fields of the protocol
+		once
+			Result := <<"id", "command", "args", "interactive", "token", "input", "kind", "text">>
+			Result.compare_objects
+		end
+
+feature -- Status
+
+	is_valid: BOOLEAN
+			-- Was the message read from a JSON object (or built locally)?
+
+	has (a_key: STRING): BOOLEAN
+			-- Is field `a_key' set?
+		do
+			Result := fields.has (a_key)
+		end
+
+	is_final: BOOLEAN
+			-- Does this reply end its request?
+		do
+			Result := kind.same_string ("done") or kind.same_string ("error")
+		end
+
+feature -- Element change
+
+	put (a_value: READABLE_STRING_GENERAL; a_key: STRING)
+			-- Set field `a_key' to `a_value'
+		require
+			known_key: Keys.has (a_key)
+		do
+			fields.force (a_value.to_string_32, a_key)
+			is_valid := True
+		ensure
+			set: item (a_key).same_string_general (a_value)
+		end
+
+feature -- Conversion
+
+	to_json: STRING_8
+			-- UTF-8 JSON object, without the line break
+		local
+			l_json: STRING_32
+		do
+			create l_json.make (64)
+			l_json.append_character ('{')
+			across Keys as k loop
+				if attached fields.item (k) as al_value then
+					if l_json.count > 1 then
+						l_json.append (", ")
+					end
+					l_json.append_character ('"')
+					l_json.append_string_general (k)
+					l_json.append ("%": %"")
+					append_escaped (l_json, al_value)
+					l_json.append_character ('"')
+				end
+			end
+			l_json.append_character ('}')
+			Result := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (l_json)
+		ensure
+			single_line: not Result.has ('%N')
+		end
+
+feature {NONE} -- Implementation
+
+	fields: HASH_TABLE [STRING_32, STRING]
+			-- Field values by key
+
+	append_escaped (a_json: STRING_32; a_value: STRING_32)
+			-- Append `a_value' to `a_json' as the body of a JSON string
+		do
+			across a_value as c loop
+				inspect c
+				when '"' then
+					a_json.append ("\%"")
+				when '\' then
+					a_json.append ("\\")
+				when '%N' then
+					a_json.append ("\n")
+				when '%R' then
+					a_json.append ("\r")
+				when '%T' then
+					a_json.append ("\t")
+				else
+					if c.natural_32_code < 0x20 then
+						a_json.append ("\u00")
+						a_json.append (c.natural_32_code.to_hex_string.tail (2))
+					else
+						a_json.append_character (c)
+					end
+				end
+			end
+		end
+
+invariant
+	fields_not_void: fields /= Void
+
+end
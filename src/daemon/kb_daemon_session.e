@@ -0,0 +1,190 @@
+note
+	description: "[
+		KB_DAEMON_SESSION - One Request Being Served by the kb Daemon
+
+		Collects the output of a command run for a client and sends it as
+		KB_DAEMON_MESSAGE replies. Output is buffered and flushed as one
+		"output" reply before each prompt and at the end, so a listing
+		goes out in one line rather than one line per put. A streamed
+		answer (`stream') goes out piece by piece as it is generated.
+
+		For an interactive request `prompt' asks the client and waits for
+		its "input" line; otherwise it answers with an empty line (the
+		"Enter to skip" choice) without asking. A client that does not
+		answer within the daemon's read timeout is taken as gone.
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_DAEMON_SESSION
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_socket: NETWORK_STREAM_SOCKET; a_request: KB_DAEMON_MESSAGE)
+			-- Session answering `a_request' on `a_socket'
+		require
+			socket_not_void: a_socket /= Void
+			request_not_void: a_request /= Void
+		do
+			socket := a_socket
+			request := a_request
+			is_interactive := a_request.item ("interactive").as_lower.same_string ("true")
+			create output.make (1024)
+		ensure
+			not_finished: not is_finished
+		end
+
+feature -- Access
+
+	request: KB_DAEMON_MESSAGE
+			-- Request being served
+
+	command: STRING_32
+			-- Command line requested, e.g. "search json"
+		do
+			Result := request.command
+		end
+
+	arguments: KB_COMMAND_LINE
+			-- Arguments of the command requested
+		do
+			Result := request.arguments
+		end
+
+feature -- Status
+
+	is_interactive: BOOLEAN
+			-- Does the client answer prompts?
+
+	is_finished: BOOLEAN
+			-- Has the final reply been sent?
+
+	is_client_gone: BOOLEAN
+			-- Did the client stop answering (no "input" line for a prompt)?
+
+feature -- Output
+
+	put (a_text: READABLE_STRING_8)
+			-- Add `a_text' (as the CLI would print it) to the pending output
+		require
+			not_finished: not is_finished
+		do
+			output.append (a_text)
+		end
+
+	page (a_text: READABLE_STRING_8)
+			-- Have the client show `a_text' through its pager
+		require
+			not_finished: not is_finished
+		do
+			flush
+			send ("page", a_text)
+		end
+
+	stream (a_text: READABLE_STRING_8)
+			-- Have the client show `a_text' now, as the next piece of a streamed text
+		require
+			not_finished: not is_finished
+		do
+			flush
+			send ("stream", a_text)
+		end
+
+	prompt (a_prompt: READABLE_STRING_8): STRING
+			-- Line the client answers `a_prompt' with (empty if not interactive)
+		require
+			not_finished: not is_finished
+		do
+			create Result.make_empty
+			if is_interactive then
+				flush
+				send ("prompt", a_prompt)
+				if attached client_line as al_line then
+					Result := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (
+						(create {KB_DAEMON_MESSAGE}.make_from_json (al_line)).item ("input"))
+				else
+					-- Timed out or disconnected: skip, and end the connection after this request
+					is_client_gone := True
+				end
+			end
+		end
+
+	finish
+			-- Send the pending output and end the request
+		require
+			not_finished: not is_finished
+		do
+			flush
+			send ("done", "")
+			is_finished := True
+		ensure
+			finished: is_finished
+		end
+
+	fail (a_message: READABLE_STRING_8)
+			-- Send the pending output and end the request with `a_message'
+		require
+			not_finished: not is_finished
+		do
+			flush
+			send ("error", a_message)
+			is_finished := True
+		ensure
+			finished: is_finished
+		end
+
+feature {NONE} -- Implementation
+
+	socket: NETWORK_STREAM_SOCKET
+			-- Connection to the client
+
+	output: STRING_8
+			-- Output not sent yet
+
+	client_line: detachable STRING
+			-- Next line from the client; Void if it sent none before the
+			-- read timeout or closed the connection
+		local
+			l_failed: BOOLEAN
+		do
+			if not l_failed then
+				socket.read_line
+				if attached socket.last_string as al_line and then not al_line.is_empty then
+					Result := al_line.twin
+				end
+			end
+		rescue
+			l_failed := True
+			retry
+		end
+
+	flush
+			-- Send the pending output as one "output" reply
+		do
+			if not output.is_empty then
+				send ("output", output)
+				output.wipe_out
+			end
+		end
+
+	send (a_kind: STRING; a_text: READABLE_STRING_8)
+			-- Send a reply of `a_kind' with the UTF-8 `a_text'
+		local
+			l_reply: KB_DAEMON_MESSAGE
+		do
+			create l_reply.make (request.id)
+			l_reply.put (a_kind, "kind")
+			if not a_text.is_empty then
+				l_reply.put ({UTF_CONVERTER}.utf_8_string_8_to_string_32 (a_text), "text")
+			end
+			socket.put_string (l_reply.to_json + "%N")
+		end
+
+invariant
+	socket_not_void: socket /= Void
+	output_not_void: output /= Void
+
+end
@@ -0,0 +1,248 @@
+note
+	description: "[
+		KB_FAQ_MINHASH - Near-Duplicate Signatures for FAQs
+
+		MinHash over the word 3-shingles of question + answer, banded into
+		faq_lsh buckets. FAQs sharing a bucket are near-duplicate candidates;
+		`jaccard' on their shingles decides. No pairwise scan is needed.
+
+			- shingle hash: CRC-32 of the UTF-8 shingle times 0x9E3779B1
+			- one-permutation MinHash: the top 7 bits pick one of 128 slots,
+			  the low 25 bits are the value kept; empty slots borrow from the
+			  next filled slot to the right
+			- 16 bands of 8 slots, one 63-bit bucket per band
+
+		Pairs share a bucket with probability ~0.95 at Jaccard 0.8 and
+		~0.001 at 0.3. scripts/faq_minhash.py computes the same buckets
+		bit for bit; keep them in step.
+
+		Usage:
+			minhash: KB_FAQ_MINHASH
+			create minhash
+			keys := minhash.band_keys (faq.question, faq.answer)
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_FAQ_MINHASH
+
+feature -- Constants
+
+	Slot_count: INTEGER = 128
+			-- MinHash values per signature
+
+	Band_count: INTEGER = 16
+			-- faq_lsh buckets per FAQ
+
+	Rows_per_band: INTEGER = 8
+			-- Signature values hashed into one bucket
+
+	Shingle_words: INTEGER = 3
+			-- Words per shingle
+
+	Default_threshold: REAL_64 = 0.8
+			-- Shingle similarity at which two FAQs are duplicates
+
+feature -- Access
+
+	band_keys (a_question, a_answer: READABLE_STRING_GENERAL): ARRAYED_LIST [INTEGER_64]
+			-- faq_lsh buckets of a FAQ (empty if it has no words)
+		local
+			l_hashes: HASH_TABLE [NATURAL_32, NATURAL_32]
+		do
+			l_hashes := shingle_hashes (a_question, a_answer)
+			if l_hashes.is_empty then
+				create Result.make (0)
+			else
+				Result := band_keys_for (signature (l_hashes))
+			end
+		end
+
+	band_keys_for (a_signature: SPECIAL [NATURAL_32]): ARRAYED_LIST [INTEGER_64]
+			-- One bucket per band of `a_signature'
+		require
+			full_signature: a_signature.count = Slot_count
+		local
+			l_key: NATURAL_64
+			b, r: INTEGER
+		do
+			create Result.make (Band_count)
+			from b := 0 until b >= Band_count loop
+				l_key := (b + 1).to_natural_64
+				from r := 0 until r >= Rows_per_band loop
+					l_key := (l_key * Fnv_prime).bit_xor (a_signature [b * Rows_per_band + r].to_natural_64)
+					r := r + 1
+				end
+				-- Drop the top bit so the bucket fits an SQLite INTEGER
+				Result.extend ((l_key |>> 1).to_integer_64)
+				b := b + 1
+			end
+		ensure
+			one_per_band: Result.count = Band_count
+		end
+
+	signature (a_hashes: HASH_TABLE [NATURAL_32, NATURAL_32]): SPECIAL [NATURAL_32]
+			-- Densified one-permutation MinHash of `a_hashes'
+		require
+			has_hashes: not a_hashes.is_empty
+		local
+			l_slots: SPECIAL [NATURAL_32]
+			l_value: NATURAL_32
+			l_slot, l_distance, j: INTEGER
+		do
+			create l_slots.make_filled (Empty_slot, Slot_count)
+			across a_hashes as h loop
+				l_slot := (h |>> Value_bits).to_integer_32
+				l_value := h & Value_mask
+				if l_value < l_slots [l_slot] then
+					l_slots [l_slot] := l_value
+				end
+			end
+			Result := l_slots.twin
+			from j := 0 until j >= Slot_count loop
+				if l_slots [j] = Empty_slot then
+					from l_distance := 1 until l_slots [(j + l_distance) \\ Slot_count] /= Empty_slot loop
+						l_distance := l_distance + 1
+					end
+					Result [j] := l_slots [(j + l_distance) \\ Slot_count] + (l_distance.to_natural_32 |<< Value_bits)
+				end
+				j := j + 1
+			end
+		ensure
+			full_signature: Result.count = Slot_count
+		end
+
+	shingle_hashes (a_question, a_answer: READABLE_STRING_GENERAL): HASH_TABLE [NATURAL_32, NATURAL_32]
+			-- Hashes of the word 3-shingles of `a_question' followed by `a_answer'
+			-- (one shingle of all words when there are fewer than three)
+		local
+			l_tokens: ARRAYED_LIST [STRING_32]
+			l_shingle: STRING_32
+			l_hash: NATURAL_32
+			i, j, l_last: INTEGER
+		do
+			l_tokens := words (a_question)
+			l_tokens.append (words (a_answer))
+			create Result.make (l_tokens.count.max (1))
+			if not l_tokens.is_empty then
+				l_last := (l_tokens.count - Shingle_words + 1).max (1)
+				from i := 1 until i > l_last loop
+					create l_shingle.make (32)
+					from j := i until j >= i + Shingle_words or j > l_tokens.count loop
+						if j > i then
+							l_shingle.append_character (' ')
+						end
+						l_shingle.append (l_tokens [j])
+						j := j + 1
+					end
+					l_hash := shingle_hash (l_shingle)
+					Result.force (l_hash, l_hash)
+					i := i + 1
+				end
+			end
+		end
+
+	words (a_text: READABLE_STRING_GENERAL): ARRAYED_LIST [STRING_32]
+			-- Lowercase alphanumeric words of `a_text'
+		local
+			l_text, l_word: STRING_32
+			i: INTEGER
+		do
+			l_text := a_text.to_string_32.as_lower
+			create Result.make (l_text.count // 6 + 1)
+			create l_word.make (16)
+			from i := 1 until i > l_text.count loop
+				if l_text [i].is_alpha_numeric then
+					l_word.append_character (l_text [i])
+				elseif not l_word.is_empty then
+					Result.extend (l_word)
+					create l_word.make (16)
+				end
+				i := i + 1
+			end
+			if not l_word.is_empty then
+				Result.extend (l_word)
+			end
+		end
+
+feature -- Measurement
+
+	jaccard (a_hashes, a_other: HASH_TABLE [NATURAL_32, NATURAL_32]): REAL_64
+			-- Jaccard similarity of two `shingle_hashes' sets
+		local
+			l_shared: INTEGER
+		do
+			if not a_hashes.is_empty and not a_other.is_empty then
+				across a_hashes as h loop
+					if a_other.has (h) then
+						l_shared := l_shared + 1
+					end
+				end
+				Result := l_shared / (a_hashes.count + a_other.count - l_shared)
+			end
+		ensure
+			in_range: Result >= 0.0 and Result <= 1.0
+		end
+
+feature -- Hashing
+
+	crc32 (a_bytes: READABLE_STRING_8): NATURAL_32
+			-- CRC-32 (IEEE 802.3, as zlib) of `a_bytes'
+		local
+			l_crc: NATURAL_32
+			i: INTEGER
+		do
+			l_crc := 0xFFFFFFFF
+			from i := 1 until i > a_bytes.count loop
+				l_crc := Crc_table [(l_crc.bit_xor (a_bytes.code (i)) & 0xFF).to_integer_32].bit_xor (l_crc |>> 8)
+				i := i + 1
+			end
+			Result := l_crc.bit_xor (0xFFFFFFFF)
+		end
+
+feature {NONE} -- Implementation
+
+	shingle_hash (a_shingle: READABLE_STRING_GENERAL): NATURAL_32
+			-- CRC-32 of the UTF-8 bytes of `a_shingle', mixed over all 32 bits
+		do
+			Result := crc32 ({UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (a_shingle)) * Mix
+		end
+
+	Crc_table: SPECIAL [NATURAL_32]
+			-- CRC-32 remainders of every byte value
+		local
+			l_crc: NATURAL_32
+			n, k: INTEGER
+		once
+			create Result.make_filled (0, 256)
+			from n := 0 until n > 255 loop
+				l_crc := n.to_natural_32
+				from k := 1 until k > 8 loop
+					if (l_crc & 1) = {NATURAL_32} 1 then
+						l_crc := (l_crc |>> 1).bit_xor (0xEDB88320)
+					else
+						l_crc := l_crc |>> 1
+					end
+					k := k + 1
+				end
+				Result [n] := l_crc
+				n := n + 1
+			end
+		end
+
+	Mix: NATURAL_32 = 0x9E3779B1
+			-- Golden-ratio multiplier spreading CRC bits into the slot bits
+
+	Fnv_prime: NATURAL_64 = 0x100000001B3
+			-- Multiplier folding a band into its bucket
+
+	Value_bits: INTEGER = 25
+			-- Low bits of a hash kept as the slot value
+
+	Value_mask: NATURAL_32 = 0x1FFFFFF
+			-- Mask of `Value_bits'
+
+	Empty_slot: NATURAL_32 = 0xFFFFFFFF
+			-- Marker of a slot no shingle hashed to
+
+end
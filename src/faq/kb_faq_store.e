@@ -16,6 +16,11 @@ feature {NONE} -- Initialization
 		do
 			db := a_db
 			current_kb_version := 1
+			create minhash
+			duplicate_threshold := minhash.Default_threshold
+			create vectors.make (a_db)
+			similarity_threshold := vectors.Default_threshold
+			create search_cache.make (a_db, Search_cache_capacity)
 		end
 
 feature -- Access
@@ -23,29 +28,58 @@ feature -- Access
 	db: SIMPLE_SQL_DATABASE
 	current_kb_version: INTEGER
 
+	minhash: KB_FAQ_MINHASH
+			-- Near-duplicate signatures (faq_lsh buckets)
+
+	duplicate_threshold: REAL_64
+			-- Shingle similarity at which `store_faq' merges instead of inserting
+
+	last_duplicate_of: INTEGER
+			-- Id of the FAQ the last `store_faq' merged into (0 if it inserted)
+
+	vectors: KB_FAQ_VECTORS
+			-- Term vectors for paraphrase lookups (faq_vectors)
+
+	similarity_threshold: REAL_64
+			-- Cosine at which `similar_faqs' counts a FAQ as the same question
+
+	search_cache: KB_RESULT_CACHE [ARRAYED_LIST [KB_FAQ]]
+			-- Recent `search_faqs' results, dropped on any write
+
+	Search_cache_capacity: INTEGER = 128
+			-- Distinct searches kept in `search_cache'
+
 feature -- Queries
 
 	search_faqs (a_keywords: STRING_32; a_limit: INTEGER): ARRAYED_LIST [KB_FAQ]
+			-- FAQs matching any of `a_keywords', best first.
+			-- Repeated searches are answered from `search_cache' until the next write.
 		require
 			keywords_not_empty: not a_keywords.is_empty
 			positive_limit: a_limit > 0
 		local
 			l_result: SIMPLE_SQL_RESULT
 			l_faq: KB_FAQ
-			l_fts_query: STRING_32
+			l_fts_query, l_key: STRING_32
 		do
-			create Result.make (a_limit)
 			l_fts_query := format_fts5_query (a_keywords)
-			l_result := db.query_with_args (
-				"SELECT f.* FROM faqs f " +
-				"JOIN faq_search fs ON f.id = CAST(fs.faq_id AS INTEGER) " +
-				"WHERE faq_search MATCH ? " +
-				"ORDER BY bm25(faq_search), f.hit_count DESC " +
-				"LIMIT " + a_limit.out,
-				<<l_fts_query>>)
-			across l_result.rows as row loop
-				create l_faq.make_from_row (row)
-				Result.extend (l_faq)
+			l_key := l_fts_query + {STRING_32} "%T" + a_limit.out
+			if attached search_cache.item (l_key) as al_cached then
+				Result := al_cached.twin
+			else
+				create Result.make (a_limit)
+				l_result := db.query_with_args (
+					"SELECT f.* FROM faqs f " +
+					"JOIN faq_search fs ON f.id = fs.rowid " +
+					"WHERE faq_search MATCH ? " +
+					"ORDER BY bm25(faq_search), f.hit_count DESC " +
+					"LIMIT " + a_limit.out,
+					<<l_fts_query>>)
+				across l_result.rows as row loop
+					create l_faq.make_from_row (row)
+					Result.extend (l_faq)
+				end
+				search_cache.put (Result.twin, l_key)
 			end
 		end
 
@@ -84,6 +118,46 @@ feature -- Queries
 			end
 		end
 
+	similar_faqs (a_question: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_FAQ]
+			-- FAQs asking what `a_question' asks, possibly in other words, most similar first
+		require
+			positive_limit: a_limit > 0
+		local
+			l_matches: ARRAYED_LIST [TUPLE [faq_id: INTEGER; score: REAL_64]]
+			l_found: HASH_TABLE [KB_FAQ, INTEGER]
+			l_result: SIMPLE_SQL_RESULT
+			l_faq: KB_FAQ
+			l_placeholders: STRING
+			l_args: ARRAY [ANY]
+			i: INTEGER
+		do
+			create Result.make (a_limit)
+			l_matches := vectors.similar (a_question, a_limit, similarity_threshold)
+			if not l_matches.is_empty then
+				create l_placeholders.make (l_matches.count * 2)
+				create l_args.make_filled (0, 1, l_matches.count)
+				from i := 1 until i > l_matches.count loop
+					if i > 1 then l_placeholders.append (",") end
+					l_placeholders.append ("?")
+					l_args [i] := l_matches [i].faq_id
+					i := i + 1
+				end
+				l_result := db.query_with_args (
+					"SELECT * FROM faqs WHERE id IN (" + l_placeholders + ")", l_args)
+				create l_found.make (l_result.rows.count)
+				across l_result.rows as row loop
+					create l_faq.make_from_row (row)
+					l_found.force (l_faq, l_faq.id)
+				end
+				-- Deleted FAQs whose rows are still indexed drop out here
+				across l_matches as m loop
+					if attached l_found.item (m.faq_id) as al_faq then
+						Result.extend (al_faq)
+					end
+				end
+			end
+		end
+
 	faq_count: INTEGER
 		local
 			l_result: SIMPLE_SQL_RESULT
@@ -94,6 +168,53 @@ feature -- Queries
 			end
 		end
 
+	answered_faq (a_question: READABLE_STRING_GENERAL; a_threshold: REAL_64): detachable KB_FAQ
+			-- Stored FAQ already answering `a_question': one asking it verbatim,
+			-- else one asked with the same `question_key' (case, punctuation,
+			-- articles, pronouns and simple inflections aside), else, if
+			-- `a_threshold' > 0, the FAQ at least that similar (`similar_faqs')
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_key: STRING_32
+			l_matches: ARRAYED_LIST [TUPLE [faq_id: INTEGER; score: REAL_64]]
+		do
+			l_result := db.query_with_args (
+				"SELECT * FROM faqs WHERE question = ? ORDER BY hit_count DESC, id DESC LIMIT 1",
+				<<a_question.to_string_32>>)
+			if l_result.rows.is_empty then
+				index_pending_questions
+				l_key := vectors.question_key (a_question)
+				if not l_key.is_empty then
+					l_result := db.query_with_args (
+						"SELECT f.* FROM faq_questions q JOIN faqs f ON f.id = q.faq_id " +
+						"WHERE q.question_key = ? ORDER BY f.hit_count DESC, f.id DESC LIMIT 1",
+						<<l_key>>)
+				end
+			end
+			if not l_result.rows.is_empty then
+				create Result.make_from_row (l_result.rows.first)
+			elseif a_threshold > 0.0 then
+				l_matches := vectors.similar (a_question, 1, a_threshold)
+				if not l_matches.is_empty then
+					l_result := db.query_with_args ("SELECT * FROM faqs WHERE id = ?", <<l_matches.first.faq_id>>)
+					if not l_result.rows.is_empty then
+						create Result.make_from_row (l_result.rows.first)
+					end
+				end
+			end
+		end
+
+	find_near_duplicate (a_question, a_answer: READABLE_STRING_GENERAL): detachable KB_FAQ
+			-- Stored FAQ at least `duplicate_threshold' similar to `a_question' and `a_answer'
+		local
+			l_hashes: HASH_TABLE [NATURAL_32, NATURAL_32]
+		do
+			l_hashes := minhash.shingle_hashes (a_question, a_answer)
+			if not l_hashes.is_empty then
+				Result := near_duplicate (l_hashes, minhash.band_keys_for (minhash.signature (l_hashes)))
+			end
+		end
+
 	recent_faqs (a_limit: INTEGER): ARRAYED_LIST [KB_FAQ]
 			-- Get most recent FAQs
 		require
@@ -116,42 +237,90 @@ feature -- Queries
 feature -- Commands
 
 	store_faq (a_faq: KB_FAQ)
+			-- Insert `a_faq' with its tags and set its id.
+			-- If a stored FAQ is a near-duplicate of it (`find_near_duplicate'),
+			-- `a_faq' is merged into that one instead: the tags are added to it
+			-- and `a_faq' takes its id, as recorded in `last_duplicate_of'.
 		require
 			faq_not_void: a_faq /= Void
 			not_persisted: not a_faq.is_persisted
 		local
 			l_result: SIMPLE_SQL_RESULT
+			l_hashes: HASH_TABLE [NATURAL_32, NATURAL_32]
+			l_keys: ARRAYED_LIST [INTEGER_64]
 			l_id: INTEGER
 		do
-			db.execute_with_args (
-				"INSERT INTO faqs (question, keywords, answer, sources, tags, kb_version) " +
-				"VALUES (?, ?, ?, ?, ?, ?)",
-				<<a_faq.question, a_faq.keywords, a_faq.answer,
-				  a_faq.sources_as_json, a_faq.tags_as_json, current_kb_version>>)
-			l_result := db.query ("SELECT last_insert_rowid() as id")
-			if not l_result.rows.is_empty then
-				l_id := l_result.rows.first.integer_value ("id")
-				a_faq.set_id (l_id)
-				across a_faq.tags as tag loop
-					db.execute_with_args (
-						"INSERT OR IGNORE INTO faq_tags (faq_id, tag) VALUES (?, ?)",
-						<<l_id, tag>>)
-				end
+			last_duplicate_of := 0
+			l_hashes := minhash.shingle_hashes (a_faq.question, a_faq.answer)
+			if l_hashes.is_empty then
+				create l_keys.make (0)
+			else
+				l_keys := minhash.band_keys_for (minhash.signature (l_hashes))
+			end
+			if attached near_duplicate (l_hashes, l_keys) as al_existing then
+				last_duplicate_of := al_existing.id
+				a_faq.set_id (al_existing.id)
+				store_tags (al_existing.id, a_faq.tags)
+				-- The new wording now finds the merged FAQ too
+				store_question_key (al_existing.id, a_faq.question)
+			else
 				db.execute_with_args (
-					"INSERT INTO faq_search (faq_id, question, answer, keywords, tags) " +
-					"VALUES (?, ?, ?, ?, ?)",
-					<<l_id.out, a_faq.question, a_faq.answer, a_faq.keywords, a_faq.tags_as_json>>)
+					"INSERT INTO faqs (question, keywords, answer, sources, tags, kb_version) " +
+					"VALUES (?, ?, ?, ?, ?, ?)",
+					<<a_faq.question, a_faq.keywords, a_faq.answer,
+					  a_faq.sources_as_json, a_faq.tags_as_json, current_kb_version>>)
+				l_result := db.query ("SELECT last_insert_rowid() as id")
+				if not l_result.rows.is_empty then
+					l_id := l_result.rows.first.integer_value ("id")
+					a_faq.set_id (l_id)
+					store_tags (l_id, a_faq.tags)
+					across l_keys as k loop
+						db.execute_with_args (
+							"INSERT OR IGNORE INTO faq_lsh (bucket, faq_id) VALUES (?, ?)",
+							<<k, l_id>>)
+					end
+					vectors.add_faq (l_id, a_faq.question, a_faq.keywords)
+					-- faq_search row is added by the faqs_search_ai trigger,
+					-- the faq_questions row on the next `answered_faq'
+				end
 			end
 		end
 
+	set_duplicate_threshold (a_threshold: REAL_64)
+			-- Merge FAQs at least `a_threshold' similar (1.0: exact shingle match only)
+		require
+			valid_threshold: a_threshold > 0.0 and a_threshold <= 1.0
+		do
+			duplicate_threshold := a_threshold
+		ensure
+			threshold_set: duplicate_threshold = a_threshold
+		end
+
+	set_similarity_threshold (a_threshold: REAL_64)
+			-- Count FAQs at least `a_threshold' similar as the same question
+		require
+			valid_threshold: a_threshold > 0.0 and a_threshold <= 1.0
+		do
+			similarity_threshold := a_threshold
+		ensure
+			threshold_set: similarity_threshold = a_threshold
+		end
+
 	record_hit (a_faq: KB_FAQ)
 		require
 			faq_persisted: a_faq.is_persisted
+		local
+			l_cache_current: BOOLEAN
 		do
+			l_cache_current := search_cache.is_current
 			a_faq.increment_hit_count
 			db.execute_with_args (
 				"UPDATE faqs SET hit_count = hit_count + 1 WHERE id = ?",
 				<<a_faq.id>>)
+			if l_cache_current then
+				-- Hit counts only break bm25 ties: keep cached searches
+				search_cache.adopt_version
+			end
 		end
 
 	bump_kb_version
@@ -174,8 +343,9 @@ feature -- Commands
 		require
 			faq_exists: has_faq (a_id)
 		do
-			-- Delete from FTS index first
-			db.execute_with_args ("DELETE FROM faq_search WHERE faq_id = ?", <<a_id.out>>)
+			-- FTS index, faq_lsh, faq_vectors and faq_questions rows are removed
+			-- by the faqs_search_ad, faqs_lsh_ad, faqs_vectors_ad and
+			-- faqs_questions_ad triggers
 			-- Delete from tags
 			db.execute_with_args ("DELETE FROM faq_tags WHERE faq_id = ?", <<a_id>>)
 			-- Delete the FAQ
@@ -185,13 +355,115 @@ feature -- Commands
 	delete_all
 			-- Delete all FAQs
 		do
-			db.execute ("DELETE FROM faq_search")
+			-- faq_search, faq_lsh, faq_vectors and faq_questions rows are removed by the faqs triggers
 			db.execute ("DELETE FROM faq_tags")
 			db.execute ("DELETE FROM faqs")
+			vectors.reload
 		end
 
 feature {NONE} -- Implementation
 
+	index_pending_questions
+			-- Add faq_questions rows for the FAQs the faqs triggers queued in
+			-- faq_questions_pending: stored or reworded by any writer since
+			-- the last call, including scripts/faq_loader.py
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_failed: BOOLEAN
+		do
+			l_result := db.query ("SELECT faq_id FROM faq_questions_pending LIMIT 1")
+			if not l_result.rows.is_empty then
+				-- Read and clear the queue under the write lock, so no row
+				-- queued meanwhile is dropped unkeyed. SIMPLE_SQL reports a
+				-- failed statement in `has_error': stop there and roll back,
+				-- keeping the queue for the next call.
+				db.execute ("BEGIN IMMEDIATE")
+				l_failed := db.has_error
+				if not l_failed then
+					l_result := db.query (
+						"SELECT f.id, f.question FROM faq_questions_pending p JOIN faqs f ON f.id = p.faq_id")
+					l_failed := db.has_error
+				end
+				if not l_failed then
+					across l_result.rows as row until l_failed loop
+						if attached row.string_value ("question") as al_question then
+							store_question_key (row.integer_value ("id"), al_question)
+							l_failed := db.has_error
+						end
+					end
+				end
+				if not l_failed then
+					db.execute ("DELETE FROM faq_questions_pending")
+					l_failed := db.has_error
+				end
+				if not l_failed then
+					db.execute ("COMMIT")
+					l_failed := db.has_error
+				end
+				if l_failed then
+					db.execute ("ROLLBACK")
+				end
+			end
+		end
+
+	store_question_key (a_id: INTEGER; a_question: READABLE_STRING_GENERAL)
+			-- Let `answered_faq' find FAQ `a_id' by the `question_key' of `a_question'
+		local
+			l_key: STRING_32
+		do
+			l_key := vectors.question_key (a_question)
+			if not l_key.is_empty then
+				db.execute_with_args (
+					"INSERT OR IGNORE INTO faq_questions (question_key, faq_id) VALUES (?, ?)",
+					<<l_key, a_id>>)
+			end
+		end
+
+	near_duplicate (a_hashes: HASH_TABLE [NATURAL_32, NATURAL_32]; a_keys: ARRAYED_LIST [INTEGER_64]): detachable KB_FAQ
+			-- Most similar FAQ sharing a faq_lsh bucket in `a_keys' whose shingles
+			-- are at least `duplicate_threshold' similar to `a_hashes'
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_faq: KB_FAQ
+			l_placeholders: STRING
+			l_args: ARRAY [ANY]
+			l_similarity, l_best: REAL_64
+			i: INTEGER
+		do
+			if not a_keys.is_empty then
+				create l_placeholders.make (a_keys.count * 2)
+				create l_args.make_filled (0, 1, a_keys.count)
+				from i := 1 until i > a_keys.count loop
+					if i > 1 then l_placeholders.append (",") end
+					l_placeholders.append ("?")
+					l_args [i] := a_keys [i]
+					i := i + 1
+				end
+				l_result := db.query_with_args (
+					"SELECT f.* FROM faqs f WHERE f.id IN " +
+					"(SELECT faq_id FROM faq_lsh WHERE bucket IN (" + l_placeholders + "))",
+					l_args)
+				across l_result.rows as row loop
+					create l_faq.make_from_row (row)
+					l_similarity := minhash.jaccard (a_hashes, minhash.shingle_hashes (l_faq.question, l_faq.answer))
+					if l_similarity >= duplicate_threshold and l_similarity > l_best then
+						Result := l_faq
+						l_best := l_similarity
+					end
+				end
+			end
+		end
+
+	store_tags (a_id: INTEGER; a_tags: ARRAYED_LIST [STRING_32])
+			-- Tag FAQ `a_id' with `a_tags'
+		do
+			across a_tags as tag loop
+				db.execute_with_args (
+					"INSERT OR IGNORE INTO faq_tags (faq_id, tag) VALUES (?, ?)",
+					<<a_id, tag>>)
+			end
+		end
+
 	format_fts5_query (a_query: STRING_32): STRING_32
 		local
 			l_words: LIST [STRING_32]
@@ -218,5 +490,7 @@ feature {NONE} -- Implementation
 
 invariant
 	db_not_void: db /= Void
+	valid_threshold: duplicate_threshold > 0.0 and duplicate_threshold <= 1.0
+	valid_similarity_threshold: similarity_threshold > 0.0 and similarity_threshold <= 1.0
 
 end
@@ -0,0 +1,430 @@
+note
+	description: "[
+		KB_FAQ_VECTORS - Term-Vector Similarity Index over FAQs
+
+		Finds stored FAQs that ask the same thing in other words, where an
+		FTS5 keyword match or a shared tag finds nothing. Runs locally on
+		the faq_vectors rows; no model or network is involved.
+
+			- the text of a FAQ is its question followed by its keywords
+			- text is split into lowercase alphanumeric words, stop words are
+			  dropped and the rest lightly stemmed ("ing", "ed", "es", "s")
+			- a term is the CRC-32 of the UTF-8 stem; faq_vectors.terms holds
+			  "term:count" pairs in ascending term order
+
+		Scoring is cosine similarity with SMART lnc.ltc weights: a FAQ term
+		weighs 1 + ln (count), a query term (1 + ln (count)) * ln (1 + N / df),
+		each vector scaled to unit length. FAQ weights do not depend on the
+		rest of the corpus, so rows are written once and never rewritten.
+
+		The rows are read into an inverted index (term -> FAQ rows and
+		weights) on first use and followed incrementally: `add_faq' indexes
+		new FAQs at once and later queries pick up rows other connections
+		appended. A query only touches the FAQs sharing one of its terms,
+		accumulating their scores in one dense array.
+
+		scripts/faq_vectors.py writes the same rows; keep them in step.
+
+		Usage:
+			vectors: KB_FAQ_VECTORS
+			create vectors.make (db)
+			across vectors.similar ("stop a loop early", 5, vectors.Default_threshold) as s loop
+				... s.faq_id, s.score ...
+			end
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_FAQ_VECTORS
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_db: SIMPLE_SQL_DATABASE)
+			-- Index over the faq_vectors rows of `a_db'
+		require
+			db_not_void: a_db /= Void
+		do
+			db := a_db
+			create minhash
+			create math
+			create postings.make (1024)
+			create row_ids.make (256)
+			create scores.make_filled (0.0, 256)
+			create touched.make (256)
+		ensure
+			not_loaded: not is_loaded
+		end
+
+feature -- Constants
+
+	Default_threshold: REAL_64 = 0.4
+			-- Cosine at which a FAQ counts as asking the same question
+
+feature -- Access
+
+	db: SIMPLE_SQL_DATABASE
+			-- Database holding faqs and faq_vectors
+
+	similar (a_text: READABLE_STRING_GENERAL; a_limit: INTEGER; a_threshold: REAL_64): ARRAYED_LIST [TUPLE [faq_id: INTEGER; score: REAL_64]]
+			-- At most `a_limit' FAQs scoring at least `a_threshold' against `a_text', best first
+		require
+			positive_limit: a_limit > 0
+		local
+			l_weights: HASH_TABLE [REAL_64, NATURAL_32]
+			l_norm, l_weight, l_score: REAL_64
+			l_df, l_row, i, j: INTEGER
+		do
+			ensure_loaded
+			create Result.make (a_limit)
+			l_weights := query_weights (terms (a_text))
+			across l_weights as w loop
+				l_norm := l_norm + w * w
+			end
+			if l_norm > 0.0 then
+				l_norm := math.sqrt (l_norm)
+				from l_weights.start until l_weights.after loop
+					if attached postings.item (l_weights.key_for_iteration) as al_posting then
+						l_weight := l_weights.item_for_iteration / l_norm
+						l_df := al_posting.rows.count
+						from i := 1 until i > l_df loop
+							l_row := al_posting.rows [i]
+							if scores [l_row] = 0.0 then
+								touched.extend (l_row)
+							end
+							scores [l_row] := scores [l_row] + l_weight * al_posting.weights [i].to_double
+							i := i + 1
+						end
+					end
+					l_weights.forth
+				end
+				across touched as r loop
+					l_score := scores [r]
+					scores [r] := 0.0
+					if l_score >= a_threshold then
+						-- Insert into the best-first list, keeping `a_limit'
+						from j := Result.count until j < 1 or else Result [j].score >= l_score loop
+							j := j - 1
+						end
+						if j < a_limit then
+							if Result.count = a_limit then
+								Result.finish
+								Result.remove
+							end
+							if j = Result.count then
+								Result.extend ([row_ids [r], l_score])
+							else
+								Result.go_i_th (j + 1)
+								Result.put_left ([row_ids [r], l_score])
+							end
+						end
+					end
+				end
+				touched.wipe_out
+			end
+		ensure
+			within_limit: Result.count <= a_limit
+		end
+
+	terms (a_text: READABLE_STRING_GENERAL): HASH_TABLE [INTEGER, NATURAL_32]
+			-- Count of each term among the non-stop words of `a_text'
+		local
+			l_term: NATURAL_32
+		do
+			create Result.make (16)
+			across minhash.words (a_text) as w loop
+				if not Stop_words.has (w) then
+					l_term := minhash.crc32 ({UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (stem (w)))
+					Result.force (Result.item (l_term) + 1, l_term)
+				end
+			end
+		end
+
+	faq_terms (a_question, a_keywords: READABLE_STRING_GENERAL): HASH_TABLE [INTEGER, NATURAL_32]
+			-- Terms of a FAQ: its question followed by its keywords
+		do
+			Result := terms (a_question.to_string_32 + {STRING_32} " " + a_keywords.to_string_32)
+		end
+
+	question_key (a_question: READABLE_STRING_GENERAL): STRING_32
+			-- Stems of the words of `a_question' in their order, without
+			-- `Filler_words', e.g. "how parse json" for "How do I parse JSON?"
+			-- and "how do I parse the JSON" (empty if it has no other words).
+			-- Question words, prepositions and word order are kept: "convert
+			-- json to xml" and "convert xml to json" differ.
+		do
+			create Result.make (a_question.count)
+			across minhash.words (a_question) as w loop
+				if not Filler_words.has (w) then
+					if not Result.is_empty then
+						Result.append_character (' ')
+					end
+					Result.append (stem (w))
+				end
+			end
+		end
+
+	encoded (a_terms: HASH_TABLE [INTEGER, NATURAL_32]): STRING
+			-- faq_vectors.terms text of `a_terms'
+		local
+			l_sorted: SORTED_TWO_WAY_LIST [NATURAL_32]
+		do
+			create l_sorted.make
+			from a_terms.start until a_terms.after loop
+				l_sorted.extend (a_terms.key_for_iteration)
+				a_terms.forth
+			end
+			create Result.make (a_terms.count * 14)
+			across l_sorted as t loop
+				if not Result.is_empty then
+					Result.append_character (' ')
+				end
+				Result.append (t.out + ":" + a_terms.item (t).out)
+			end
+		end
+
+feature -- Measurement
+
+	count: INTEGER
+			-- FAQs in the in-memory index
+		do
+			Result := row_ids.count
+		end
+
+feature -- Status
+
+	is_loaded: BOOLEAN
+			-- Have the faq_vectors rows been read?
+
+feature -- Element change
+
+	add_faq (a_id: INTEGER; a_question, a_keywords: READABLE_STRING_GENERAL)
+			-- Store the vector of new FAQ `a_id' and index it if loaded
+		require
+			positive_id: a_id > 0
+		local
+			l_terms: HASH_TABLE [INTEGER, NATURAL_32]
+		do
+			l_terms := faq_terms (a_question, a_keywords)
+			db.execute_with_args (
+				"INSERT OR REPLACE INTO faq_vectors (faq_id, terms) VALUES (?, ?)",
+				<<a_id, encoded (l_terms)>>)
+			if is_loaded and a_id > last_loaded_id then
+				index_row (a_id, l_terms)
+				last_loaded_id := a_id
+			elseif is_loaded then
+				-- The id of a deleted FAQ was reused: its old row is still indexed
+				reload
+			end
+		end
+
+	reload
+			-- Read every row again on next use (after FAQs were rewritten)
+		do
+			postings.wipe_out
+			row_ids.wipe_out
+			last_loaded_id := 0
+			is_loaded := False
+		ensure
+			not_loaded: not is_loaded
+			empty: count = 0
+		end
+
+feature {NONE} -- Implementation
+
+	minhash: KB_FAQ_MINHASH
+			-- Word splitting and CRC-32, shared with the near-duplicate signatures
+
+	math: DOUBLE_MATH
+			-- Logarithm and square root
+
+	postings: HASH_TABLE [TUPLE [rows: ARRAYED_LIST [INTEGER]; weights: ARRAYED_LIST [REAL_32]], NATURAL_32]
+			-- Rows containing each term, with the term's unit-vector weight in each
+
+	row_ids: ARRAYED_LIST [INTEGER]
+			-- FAQ id of each row (rows are numbered from 1)
+
+	scores: SPECIAL [REAL_64]
+			-- Per-row score accumulator, all zero between queries
+
+	touched: ARRAYED_LIST [INTEGER]
+			-- Rows scored by the current query
+
+	last_loaded_id: INTEGER
+			-- Highest FAQ id indexed
+
+	ensure_loaded
+			-- Read the faq_vectors rows not yet indexed, writing missing
+			-- rows for older FAQs first
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			if not is_loaded then
+				backfill
+				is_loaded := True
+			end
+			l_result := db.query_with_args (
+				"SELECT faq_id, terms FROM faq_vectors WHERE faq_id > ? ORDER BY faq_id",
+				<<last_loaded_id>>)
+			across l_result.rows as row loop
+				if attached row.string_value ("terms") as al_terms then
+					index_row (row.integer_value ("faq_id"), decoded (al_terms))
+				end
+				last_loaded_id := row.integer_value ("faq_id")
+			end
+		ensure
+			loaded: is_loaded
+		end
+
+	backfill
+			-- Write faq_vectors rows for FAQs stored without one
+			-- in one transaction, rolled back at the first failed write
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_keywords: STRING_32
+			l_failed: BOOLEAN
+		do
+			l_result := db.query (
+				"SELECT id, question, keywords FROM faqs " +
+				"WHERE NOT EXISTS (SELECT 1 FROM faq_vectors WHERE faq_id = faqs.id)")
+			if not l_result.rows.is_empty then
+				db.execute ("BEGIN IMMEDIATE")
+				l_failed := db.has_error
+				across l_result.rows as row until l_failed loop
+					create l_keywords.make_empty
+					if attached row.string_value ("keywords") as al_keywords then
+						l_keywords := al_keywords
+					end
+					if attached row.string_value ("question") as al_question then
+						db.execute_with_args (
+							"INSERT OR REPLACE INTO faq_vectors (faq_id, terms) VALUES (?, ?)",
+							<<row.integer_value ("id"), encoded (faq_terms (al_question, l_keywords))>>)
+						l_failed := db.has_error
+					end
+				end
+				if not l_failed then
+					db.execute ("COMMIT")
+					l_failed := db.has_error
+				end
+				if l_failed then
+					db.execute ("ROLLBACK")
+				end
+			end
+		end
+
+	index_row (a_id: INTEGER; a_terms: HASH_TABLE [INTEGER, NATURAL_32])
+			-- Add FAQ `a_id' with `a_terms' as the next row
+		local
+			l_norm: REAL_64
+			l_row: INTEGER
+			l_posting: TUPLE [rows: ARRAYED_LIST [INTEGER]; weights: ARRAYED_LIST [REAL_32]]
+		do
+			across a_terms as c loop
+				l_norm := l_norm + (1.0 + math.log (c)) ^ 2
+			end
+			if l_norm > 0.0 then
+				l_norm := math.sqrt (l_norm)
+				row_ids.extend (a_id)
+				l_row := row_ids.count
+				if l_row >= scores.count then
+					scores := scores.aliased_resized_area_with_default (0.0, (l_row * 2).max (256))
+				end
+				from a_terms.start until a_terms.after loop
+					if attached postings.item (a_terms.key_for_iteration) as al_posting then
+						l_posting := al_posting
+					else
+						l_posting := [create {ARRAYED_LIST [INTEGER]}.make (4), create {ARRAYED_LIST [REAL_32]}.make (4)]
+						postings.force (l_posting, a_terms.key_for_iteration)
+					end
+					l_posting.rows.extend (l_row)
+					l_posting.weights.extend (((1.0 + math.log (a_terms.item_for_iteration)) / l_norm).truncated_to_real)
+					a_terms.forth
+				end
+			end
+		end
+
+	query_weights (a_terms: HASH_TABLE [INTEGER, NATURAL_32]): HASH_TABLE [REAL_64, NATURAL_32]
+			-- ltc weight of each of `a_terms' against the indexed rows
+		local
+			l_df: INTEGER
+		do
+			create Result.make (a_terms.count)
+			from a_terms.start until a_terms.after loop
+				l_df := 1
+				if attached postings.item (a_terms.key_for_iteration) as al_posting then
+					l_df := al_posting.rows.count.max (1)
+				end
+				Result.force ((1.0 + math.log (a_terms.item_for_iteration)) * math.log (1.0 + count / l_df),
+					a_terms.key_for_iteration)
+				a_terms.forth
+			end
+		end
+
+	decoded (a_text: STRING_32): HASH_TABLE [INTEGER, NATURAL_32]
+			-- Terms of a faq_vectors.terms value
+		local
+			l_colon: INTEGER
+			l_term, l_count: STRING_32
+		do
+			create Result.make (16)
+			across a_text.split (' ') as p loop
+				l_colon := p.index_of (':', 1)
+				if l_colon > 1 then
+					l_term := p.head (l_colon - 1)
+					l_count := p.substring (l_colon + 1, p.count)
+					if l_term.is_natural_32 and l_count.is_integer and then l_count.to_integer > 0 then
+						Result.force (l_count.to_integer, l_term.to_natural_32)
+					end
+				end
+			end
+		end
+
+	stem (a_word: STRING_32): STRING_32
+			-- `a_word' without one common inflection ("ing", "ed", "es", "s")
+		do
+			if a_word.count > 4 and a_word.ends_with ("ing") then
+				Result := a_word.head (a_word.count - 3)
+			elseif a_word.count > 3 and (a_word.ends_with ("ed") or a_word.ends_with ("es")) then
+				Result := a_word.head (a_word.count - 2)
+			elseif a_word.count > 3 and a_word.ends_with ("s") and not a_word.ends_with ("ss") then
+				Result := a_word.head (a_word.count - 1)
+			else
+				Result := a_word
+			end
+		end
+
+	Stop_words: ARRAYED_SET [STRING_32]
+			-- Words too common in questions to tell them apart
+		once
+			create Result.make (48)
+			Result.compare_objects
+			across {ARRAY [STRING_32]} <<
+				"a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+				"from", "how", "i", "if", "in", "is", "it", "its", "me", "my", "of", "on",
+				"or", "should", "that", "the", "this", "to", "use", "using", "what", "when",
+				"where", "which", "why", "will", "with", "you", "your"
+			>> as w loop
+				Result.extend (w)
+			end
+		end
+
+	Filler_words: ARRAYED_SET [STRING_32]
+			-- Words `question_key' leaves out: articles, pronouns and the
+			-- auxiliary "do", which never change what is asked
+		once
+			create Result.make (16)
+			Result.compare_objects
+			across {ARRAY [STRING_32]} <<
+				"a", "an", "the", "i", "me", "my", "we", "our", "you", "your", "do", "does", "please"
+			>> as w loop
+				Result.extend (w)
+			end
+		end
+
+invariant
+	db_not_void: db /= Void
+	scores_cover_rows: scores.count > row_ids.count
+
+end
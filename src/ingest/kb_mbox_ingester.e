@@ -214,10 +214,16 @@ feature {NONE} -- Storage
 				l_faq.set_keywords (extract_keywords (l_q_text + " " + l_a_text))
 
 				faq_store.store_faq (l_faq)
-				imported_count := imported_count + 1
-
-				if a_verbose then
-					io.put_string ("  Imported: " + l_q_text.head (60).out + "%N")
+				if faq_store.last_duplicate_of > 0 then
+					skipped_count := skipped_count + 1
+					if a_verbose then
+						io.put_string ("  Skipped (near-duplicate of FAQ #" + faq_store.last_duplicate_of.out + "): " + l_q_text.head (50).out + "%N")
+					end
+				else
+					imported_count := imported_count + 1
+					if a_verbose then
+						io.put_string ("  Imported: " + l_q_text.head (60).out + "%N")
+					end
 				end
 			end
 		end
@@ -186,8 +186,20 @@ feature -- Setters
 			added: features.has (a_feature)
 		end
 
+	set_features_loaded
+			-- Record that `features' holds every stored feature
+		do
+			features_loaded := True
+		ensure
+			loaded: features_loaded
+		end
+
 feature -- Status
 
+	features_loaded: BOOLEAN
+			-- Have the stored features been read into `features'?
+			-- (class searches leave them unread until needed)
+
 	is_valid: BOOLEAN
 			-- Is this a valid class entry?
 		do
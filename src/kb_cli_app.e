@@ -12,6 +12,8 @@ note
 			kb ingest <l_path>    - Index source files from l_path
 			kb seed             - Populate database with known l_error codes
 			kb l_stats            - Show database statistics
+			kb stats --perf     - Latency per search/ask phase (p50/p95/p99)
+			kb serve [port]     - Keep kb.db open; later commands use the daemon
 			kb help             - Show help
 
 		Usage:
@@ -30,8 +32,11 @@ class
 inherit
 	SHARED_EXECUTION_ENVIRONMENT
 
+	KB_SHARED_PERF
+
 create
-	make
+	make,
+	make_with_database
 
 feature -- Constants
 
@@ -43,23 +48,44 @@ feature {NONE} -- Initialization
 	make
 			-- Run CLI
 		local
-			l_args: ARGUMENTS_32
+			l_args: KB_COMMAND_LINE
 		do
-			create l_args
-			create db.make (default_db_path)
-
+			create l_args.make_from_arguments (create {ARGUMENTS_32})
 			if l_args.argument_count = 0 then
 				run_interactive_mode
-			else
+			elseif not run_on_daemon (l_args) then
 				process_command (l_args)
 			end
 
-			db.close
+			if is_db_open then
+				db.close
+			end
+			perf.save (perf_path)
+		end
+
+	make_with_database (a_db: KB_DATABASE)
+			-- CLI on `a_db' that runs nothing until asked (see `output_of')
+		do
+			db := a_db
 		end
 
 feature -- Commands
 
-	process_command (a_args: ARGUMENTS_32)
+	output_of (a_args: KB_COMMAND_LINE): STRING_8
+			-- What `process_command' prints for `a_args', prompts answered
+			-- with Enter and paged text included
+		require
+			has_command: a_args.argument_count > 0
+		do
+			create Result.make (1024)
+			captured := Result
+			process_command (a_args)
+			captured := Void
+		rescue
+			captured := Void
+		end
+
+	process_command (a_args: KB_COMMAND_LINE)
 			-- Process command from arguments
 		local
 			l_cmd: STRING_32
@@ -91,50 +117,56 @@ feature -- Commands
 			elseif l_cmd.same_string ("seed") then
 				cmd_seed
 			elseif l_cmd.same_string ("stats") then
-				cmd_stats
+				process_stats_command (a_args)
+			elseif l_cmd.same_string ("reindex") then
+				process_reindex_command (a_args)
 			elseif l_cmd.same_string ("clear") then
 				process_clear_command (a_args)
 			elseif l_cmd.same_string ("ai") then
 				process_ai_command (a_args)
 			elseif l_cmd.same_string ("ask") then
 				process_ask_command (a_args)
+			elseif l_cmd.same_string ("serve") then
+				process_serve_command (a_args)
+			elseif l_cmd.same_string ("batch") then
+				process_batch_command (a_args)
 			elseif l_cmd.same_string ("help") or l_cmd.same_string ("--help") or l_cmd.same_string ("-h") then
 				show_help
 			else
-				io.put_string ("Unknown command: " + l_cmd.out + "%N")
-				io.put_string ("Use 'kb help' for usage information.%N")
+				put ("Unknown command: " + l_cmd.out + "%N")
+				put ("Use 'kb help' for usage information.%N")
 			end
 		end
 
-	process_search_command (a_args: ARGUMENTS_32)
+	process_search_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'search' subcommand
 		local
 			l_query: STRING_32
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb search <query>%N")
-				io.put_string ("Example: kb search json%N")
+				put ("Usage: kb search <query>%N")
+				put ("Example: kb search json%N")
 			else
 				l_query := a_args.argument (2)
 				cmd_search (l_query)
 			end
 		end
 
-	process_class_command (a_args: ARGUMENTS_32)
+	process_class_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'class' subcommand
 		local
 			l_name: STRING_32
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb class <name>%N")
-				io.put_string ("Example: kb class SIMPLE_JSON%N")
+				put ("Usage: kb class <name>%N")
+				put ("Example: kb class SIMPLE_JSON%N")
 			else
 				l_name := a_args.argument (2).as_upper
 				cmd_class (l_name)
 			end
 		end
 
-	process_error_command (a_args: ARGUMENTS_32)
+	process_error_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'error' subcommand
 		local
 			l_code: STRING_32
@@ -151,43 +183,81 @@ feature -- Commands
 			end
 		end
 
-	process_ingest_command (a_args: ARGUMENTS_32)
+	process_ingest_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'ingest' subcommand
 		local
 			l_path: STRING_32
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb ingest <path>%N")
-				io.put_string ("Example: kb ingest /d/prod/simple_json%N")
-				io.put_string ("         kb ingest /d/prod  (all simple_* libraries)%N")
+				put ("Usage: kb ingest <path>%N")
+				put ("Example: kb ingest /d/prod/simple_json%N")
+				put ("         kb ingest /d/prod  (all simple_* libraries)%N")
 			else
 				l_path := a_args.argument (2)
 				cmd_ingest (l_path)
 			end
 		end
 
-	process_rosetta_command (a_args: ARGUMENTS_32)
+	process_reindex_command (a_args: KB_COMMAND_LINE)
+			-- Handle 'reindex' subcommand
+		local
+			l_mode: STRING_32
+		do
+			if a_args.argument_count < 2 then
+				put ("Usage: kb reindex <external|standalone>%N")
+				put ("  external    Index only; text is read from the base tables (smaller kb.db)%N")
+				put ("  standalone  Index keeps its own copy of the text%N")
+			else
+				l_mode := a_args.argument (2).as_lower
+				if l_mode.same_string ("external") then
+					cmd_reindex (True)
+				elseif l_mode.same_string ("standalone") then
+					cmd_reindex (False)
+				else
+					put ("Unknown index mode: " + l_mode.out + "%N")
+					put ("Usage: kb reindex <external|standalone>%N")
+				end
+			end
+		end
+
+	process_stats_command (a_args: KB_COMMAND_LINE)
+			-- Handle 'stats' subcommand
+		do
+			if a_args.argument_count < 2 then
+				cmd_stats
+			elseif a_args.argument (2).as_lower.same_string ("--perf") then
+				if a_args.argument_count >= 3 then
+					cmd_stats_perf (a_args.argument (3).as_lower)
+				else
+					cmd_stats_perf ("")
+				end
+			else
+				put ("Usage: kb stats [--perf [--json|reset]]%N")
+			end
+		end
+
+	process_rosetta_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'rosetta' subcommand
 		local
 			l_path: STRING_32
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb rosetta <path>%N")
-				io.put_string ("Example: kb rosetta /d/prod/simple_rosetta%N")
+				put ("Usage: kb rosetta <path>%N")
+				put ("Example: kb rosetta /d/prod/simple_rosetta%N")
 			else
 				l_path := a_args.argument (2)
 				cmd_rosetta (l_path)
 			end
 		end
 
-	process_mbox_command (a_args: ARGUMENTS_32)
+	process_mbox_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'mbox' subcommand (import mailing list archive)
 		local
 			l_path: STRING_32
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb mbox <file.mbox>%N")
-				io.put_string ("Import Q&A from mbox archive (e.g., Google Takeout export)%N")
+				put ("Usage: kb mbox <file.mbox>%N")
+				put ("Import Q&A from mbox archive (e.g., Google Takeout export)%N")
 			else
 				l_path := a_args.argument (2)
 				cmd_mbox (l_path)
@@ -203,11 +273,11 @@ feature -- Commands
 			if attached db as al_l_db then
 				create l_faq_store.make (al_l_db.db)
 				create l_ingester.make (l_faq_store)
-				io.put_string ("Importing mbox: " + a_path.out + "%N")
+				put ("Importing mbox: " + a_path.out + "%N")
 				l_ingester.import_file (a_path, True)
-				io.put_string ("%NImport complete. New FAQs: " + l_ingester.imported_count.out + "%N")
+				put ("%NImport complete. New FAQs: " + l_ingester.imported_count.out + "%N")
 			else
-				io.put_string ("Error: Database not initialized%N")
+				put ("Error: Database not initialized%N")
 			end
 		end
 
@@ -220,24 +290,24 @@ feature -- Commands
 		do
 			create l_dir.make (a_path.out)
 			if not l_dir.exists then
-				io.put_string ("Path not found: " + a_path.out + "%N")
+				put ("Path not found: " + a_path.out + "%N")
 			else
-				io.put_string ("Importing Rosetta Code solutions from: " + a_path.out + "%N")
+				put ("Importing Rosetta Code solutions from: " + a_path.out + "%N")
 				create l_importer.make (db)
 				l_importer.import_all (a_path)
 
 				l_stats := l_importer.stats
-				io.put_string ("%NDone. Imported:%N")
-				io.put_string ("  - " + l_stats.imported.out + " examples%N")
+				put ("%NDone. Imported:%N")
+				put ("  - " + l_stats.imported.out + " examples%N")
 				if l_stats.errors > 0 then
-					io.put_string ("  - " + l_stats.errors.out + " errors%N")
+					put ("  - " + l_stats.errors.out + " errors%N")
 				end
 			end
 		end
 
 feature -- AI Commands
 
-	process_ai_command (a_args: ARGUMENTS_32)
+	process_ai_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'ai' subcommand
 		local
 			l_subcmd: STRING_32
@@ -258,20 +328,22 @@ feature -- AI Commands
 					if a_args.argument_count >= 3 then
 						cmd_ai_provider (a_args.argument (3))
 					else
-						io.put_string ("Usage: kb ai provider <name>%N")
-						io.put_string ("Available: claude, openai, gemini, grok, ollama%N")
+						put ("Usage: kb ai provider <name>%N")
+						put ("Available: claude, openai, gemini, grok, ollama%N")
 					end
 				elseif l_subcmd.same_string ("prompt") then
 					if a_args.argument_count >= 3 then
 						cmd_ai_prompt (a_args.argument (3))
 					else
-						io.put_string ("Usage: kb ai prompt <query>%N")
+						put ("Usage: kb ai prompt <query>%N")
 					end
 				elseif l_subcmd.same_string ("debug") then
 					cmd_ai_debug
+				elseif l_subcmd.same_string ("cache") then
+					cmd_ai_cache (a_args.argument_count >= 3 and then a_args.argument (3).as_lower.same_string ("clear"))
 				else
-					io.put_string ("Unknown AI command: " + l_subcmd.out + "%N")
-					io.put_string ("Available: status, setup, on, off, provider, prompt, debug%N")
+					put ("Unknown AI command: " + l_subcmd.out + "%N")
+					put ("Available: status, setup, on, off, provider, prompt, debug, cache%N")
 				end
 			end
 		end
@@ -281,47 +353,47 @@ feature -- AI Commands
 		do
 			ensure_ai_config
 			if attached ai_config as al_cfg then
-				io.put_string (al_cfg.status_report)
+				put (al_cfg.status_report)
 			end
 		end
 
 	cmd_ai_setup
 			-- Show setup instructions for AI providers
 		do
-			io.put_string ("SETTING UP AI ACCESS FOR SIMPLE_KB%N")
-			io.put_string ("==================================%N%N")
-			io.put_string ("simple_kb works great without AI (FTS5 search).%N")
-			io.put_string ("Adding AI enables natural language queries and%N")
-			io.put_string ("intelligent answer synthesis.%N%N")
-			io.put_string ("OPTION 1: Local AI (Free, Private)%N")
-			io.put_string ("---------------------------------%N")
-			io.put_string ("Install Ollama: https://ollama.com/download%N%N")
-			io.put_string ("Then run:%N")
-			io.put_string ("  ollama pull llama3%N")
-			io.put_string ("  ollama serve%N%N")
-			io.put_string ("simple_kb will auto-detect Ollama at localhost:11434.%N%N")
-			io.put_string ("OPTION 2: Claude API (Best Quality)%N")
-			io.put_string ("-----------------------------------%N")
-			io.put_string ("1. Get API key: https://console.anthropic.com/%N")
-			io.put_string ("2. Set environment variable:%N")
-			io.put_string ("   Windows: setx ANTHROPIC_API_KEY %"sk-ant-...%"%N")
-			io.put_string ("   Linux:   export ANTHROPIC_API_KEY=%"sk-ant-...%"%N")
-			io.put_string ("3. Restart terminal%N%N")
-			io.put_string ("OPTION 3: OpenAI API%N")
-			io.put_string ("--------------------%N")
-			io.put_string ("1. Get API key: https://platform.openai.com/%N")
-			io.put_string ("2. Set OPENAI_API_KEY environment variable%N%N")
-			io.put_string ("OPTION 4: Google Gemini API%N")
-			io.put_string ("---------------------------%N")
-			io.put_string ("1. Get API key: https://aistudio.google.com/%N")
-			io.put_string ("2. Set GOOGLE_AI_KEY environment variable%N%N")
-			io.put_string ("OPTION 5: xAI Grok API%N")
-			io.put_string ("----------------------%N")
-			io.put_string ("1. Get API key: https://console.x.ai/%N")
-			io.put_string ("2. Set XAI_API_KEY (or GROK_API_KEY) environment variable%N%N")
-			io.put_string ("VERIFY SETUP%N")
-			io.put_string ("------------%N")
-			io.put_string ("Run: kb ai status%N")
+			put ("SETTING UP AI ACCESS FOR SIMPLE_KB%N")
+			put ("==================================%N%N")
+			put ("simple_kb works great without AI (FTS5 search).%N")
+			put ("Adding AI enables natural language queries and%N")
+			put ("intelligent answer synthesis.%N%N")
+			put ("OPTION 1: Local AI (Free, Private)%N")
+			put ("---------------------------------%N")
+			put ("Install Ollama: https://ollama.com/download%N%N")
+			put ("Then run:%N")
+			put ("  ollama pull llama3%N")
+			put ("  ollama serve%N%N")
+			put ("simple_kb will auto-detect Ollama at localhost:11434.%N%N")
+			put ("OPTION 2: Claude API (Best Quality)%N")
+			put ("-----------------------------------%N")
+			put ("1. Get API key: https://console.anthropic.com/%N")
+			put ("2. Set environment variable:%N")
+			put ("   Windows: setx ANTHROPIC_API_KEY %"sk-ant-...%"%N")
+			put ("   Linux:   export ANTHROPIC_API_KEY=%"sk-ant-...%"%N")
+			put ("3. Restart terminal%N%N")
+			put ("OPTION 3: OpenAI API%N")
+			put ("--------------------%N")
+			put ("1. Get API key: https://platform.openai.com/%N")
+			put ("2. Set OPENAI_API_KEY environment variable%N%N")
+			put ("OPTION 4: Google Gemini API%N")
+			put ("---------------------------%N")
+			put ("1. Get API key: https://aistudio.google.com/%N")
+			put ("2. Set GOOGLE_AI_KEY environment variable%N%N")
+			put ("OPTION 5: xAI Grok API%N")
+			put ("----------------------%N")
+			put ("1. Get API key: https://console.x.ai/%N")
+			put ("2. Set XAI_API_KEY (or GROK_API_KEY) environment variable%N%N")
+			put ("VERIFY SETUP%N")
+			put ("------------%N")
+			put ("Run: kb ai status%N")
 		end
 
 	cmd_ai_on
@@ -331,13 +403,13 @@ feature -- AI Commands
 			if attached ai_config as al_cfg then
 				if al_cfg.has_ai_configured then
 					al_cfg.enable_ai
-					io.put_string ("AI mode ENABLED%N")
+					put ("AI mode ENABLED%N")
 					if attached al_cfg.active_provider as al_prov then
-						io.put_string ("Using provider: " + prov.out + "%N")
+						put ("Using provider: " + prov.out + "%N")
 					end
 				else
-					io.put_string ("No AI providers configured.%N")
-					io.put_string ("Run 'kb ai setup' for instructions.%N")
+					put ("No AI providers configured.%N")
+					put ("Run 'kb ai setup' for instructions.%N")
 				end
 			end
 		end
@@ -349,7 +421,7 @@ feature -- AI Commands
 			if attached ai_config as al_cfg then
 				al_cfg.disable_ai
 			end
-			io.put_string ("AI mode DISABLED (using FTS5 only)%N")
+			put ("AI mode DISABLED (using FTS5 only)%N")
 		end
 
 	cmd_ai_provider (a_name: STRING_32)
@@ -359,14 +431,14 @@ feature -- AI Commands
 			if attached ai_config as al_cfg then
 				if al_cfg.has_provider (a_name) then
 					al_cfg.set_provider (a_name)
-					io.put_string ("Switched to provider: " + a_name.out + "%N")
+					put ("Switched to provider: " + a_name.out + "%N")
 				else
-					io.put_string ("Provider not available: " + a_name.out + "%N")
-					io.put_string ("Configured providers: ")
+					put ("Provider not available: " + a_name.out + "%N")
+					put ("Configured providers: ")
 					across al_cfg.available_providers as prov loop
-						io.put_string (prov.out + " ")
+						put (prov.out + " ")
 					end
-					io.put_string ("%N")
+					put ("%N")
 				end
 			end
 		end
@@ -374,21 +446,21 @@ feature -- AI Commands
 	cmd_ai_prompt (a_query: STRING_32)
 			-- Generate a prompt for manual AI use
 		do
-			io.put_string ("=== EIFFEL KNOWLEDGE BASE QUERY ===%N%N")
-			io.put_string ("Copy this prompt to your AI:%N%N")
-			io.put_string ("---%N")
-			io.put_string ("I am working with Eiffel programming language.%N")
-			io.put_string ("I need help with: " + a_query + "%N%N")
-			io.put_string ("Context about Eiffel:%N")
-			io.put_string ("- Uses Design by Contract (require/ensure/invariant)%N")
-			io.put_string ("- Void-safe (detachable/attached types)%N")
-			io.put_string ("- SCOOP for concurrency%N")
-			io.put_string ("- Libraries use simple_* naming convention%N%N")
-			io.put_string ("Please provide:%N")
-			io.put_string ("1. Direct answer with Eiffel code examples%N")
-			io.put_string ("2. Relevant class/feature names to look up%N")
-			io.put_string ("3. Any library dependencies needed%N")
-			io.put_string ("---%N")
+			put ("=== EIFFEL KNOWLEDGE BASE QUERY ===%N%N")
+			put ("Copy this prompt to your AI:%N%N")
+			put ("---%N")
+			put ("I am working with Eiffel programming language.%N")
+			put ("I need help with: " + a_query + "%N%N")
+			put ("Context about Eiffel:%N")
+			put ("- Uses Design by Contract (require/ensure/invariant)%N")
+			put ("- Void-safe (detachable/attached types)%N")
+			put ("- SCOOP for concurrency%N")
+			put ("- Libraries use simple_* naming convention%N%N")
+			put ("Please provide:%N")
+			put ("1. Direct answer with Eiffel code examples%N")
+			put ("2. Relevant class/feature names to look up%N")
+			put ("3. Any library dependencies needed%N")
+			put ("---%N")
 		end
 
 	cmd_ai_debug
@@ -396,12 +468,26 @@ feature -- AI Commands
 		do
 			ai_debug_mode := not ai_debug_mode
 			if ai_debug_mode then
-				io.put_string ("AI debug mode ENABLED - verbose logging on%N")
+				put ("AI debug mode ENABLED - verbose logging on%N")
 			else
-				io.put_string ("AI debug mode DISABLED%N")
+				put ("AI debug mode DISABLED%N")
 			end
 		end
 
+	cmd_ai_cache (a_clear: BOOLEAN)
+			-- Show the provider response cache, emptying it first if `a_clear'
+		local
+			l_cache: KB_AI_CACHE
+		do
+			create l_cache.make_beside (default_db_path)
+			if a_clear then
+				l_cache.wipe_out
+				put ("AI response cache cleared.%N")
+			end
+			put ("AI cache: " + l_cache.description + "%N")
+			l_cache.close
+		end
+
 	ensure_ai_config
 			-- Ensure AI config is initialized
 		do
@@ -410,15 +496,15 @@ feature -- AI Commands
 			end
 		end
 
-	process_ask_command (a_args: ARGUMENTS_32)
+	process_ask_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'ask' subcommand for AI-powered queries
 		local
 			l_query: STRING_32
 			i: INTEGER
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb ask <natural language question>%N")
-				io.put_string ("Example: kb ask What is the best library for JSON?%N")
+				put ("Usage: kb ask <natural language question>%N")
+				put ("Example: kb ask What is the best library for JSON?%N")
 			else
 				-- Build query from all remaining args
 				create l_query.make (100)
@@ -441,23 +527,34 @@ feature -- AI Commands
 		do
 			ensure_ai_config
 			if attached ai_config as al_cfg then
-				create l_router.make (db, cfg)
+				create l_router.make_with_faq_store (db, cfg, faq_store)
 				l_router.set_debug (ai_debug_mode)
 				
 				if l_router.is_ai_available then
-					io.put_string ("Querying with AI (")
+					put ("Querying with AI (")
 					if attached al_cfg.active_provider as al_prov then
-						io.put_string (prov.out)
+						put (prov.out)
 					end
-					io.put_string (")...%N%N")
+					put (")...%N%N")
 				else
-					io.put_string ("AI not available, using keyword search...%N%N")
+					put ("AI not available, using keyword search...%N%N")
 				end
 				
+				-- Show the answer while it is generated
+				l_router.set_answer_sink (agent show_streamed)
+				if session = Void and captured = Void then
+					pager.start_stream
+				end
 				l_result := l_router.process_query (a_query)
-				io.put_string (l_result.formatted)
+				if pager.is_streaming then
+					pager.end_stream
+				end
+				if l_result.is_answer_streamed then
+					put ("%N")
+				end
+				put (l_result.formatted)
 			else
-				io.put_string ("Could not initialize AI configuration.%N")
+				put ("Could not initialize AI configuration.%N")
 			end
 		end
 
@@ -470,12 +567,12 @@ feature -- Error Commands
 		do
 			l_error := db.get_error (a_code)
 			if attached l_error as al_err then
-				io.put_string (al_err.formatted.out)
-				io.put_string ("%N")
+				put (al_err.formatted.out)
+				put ("%N")
 			else
-				io.put_string ("Error code not found: " + a_code.out + "%N%N")
-				io.put_string ("Use 'kb error list' to see all known error codes.%N")
-				io.put_string ("Or use 'kb seed' to populate the database first.%N")
+				put ("Error code not found: " + a_code.out + "%N%N")
+				put ("Use 'kb error list' to see all known error codes.%N")
+				put ("Or use 'kb seed' to populate the database first.%N")
 			end
 		end
 
@@ -489,28 +586,26 @@ feature -- Error Commands
 		do
 			l_errors := db.all_errors
 			if l_errors.is_empty then
-				io.put_string ("No error codes in database.%N")
-				io.put_string ("Run 'kb seed' to populate with known error codes.%N")
+				put ("No error codes in database.%N")
+				put ("Run 'kb seed' to populate with known error codes.%N")
 			else
-				io.put_string ("Known Error Codes (" + l_errors.count.out + "):%N")
-				io.put_string ("================================%N%N")
+				put ("Known Error Codes (" + l_errors.count.out + "):%N")
+				put ("================================%N%N")
 				from i := 1 until i > l_errors.count loop
-					io.put_string ("#" + i.out + " " + l_errors[i].code.out + ": " + l_errors[i].meaning.out + "%N")
+					put ("#" + i.out + " " + l_errors[i].code.out + ": " + l_errors[i].meaning.out + "%N")
 					i := i + 1
 				end
 				
-				io.put_string ("%NSelect (1-" + l_errors.count.out + ") or Enter to skip: ")
-				io.read_line
-				l_input := io.last_string.twin
+				l_input := read_input ("%NSelect (1-" + l_errors.count.out + ") or Enter to skip: ")
 				l_input.left_adjust
 				l_input.right_adjust
 				
 				if not l_input.is_empty and then l_input.is_integer then
 					l_choice := l_input.to_integer
 					if l_choice >= 1 and l_choice <= l_errors.count then
-						io.put_string ("%N")
-						io.put_string (l_errors[l_choice].formatted.out)
-						io.put_string ("%N")
+						put ("%N")
+						put (l_errors[l_choice].formatted.out)
+						put ("%N")
 					end
 				end
 			end
@@ -518,7 +613,7 @@ feature -- Error Commands
 
 feature -- Pattern Commands
 
-	process_pattern_command (a_args: ARGUMENTS_32)
+	process_pattern_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'pattern' subcommand
 		local
 			l_name: STRING_32
@@ -542,12 +637,12 @@ feature -- Pattern Commands
 		do
 			l_pattern := db.get_pattern (a_name)
 			if attached l_pattern as al_pat then
-				io.put_string (al_pat.formatted.out)
-				io.put_string ("%N")
+				put (al_pat.formatted.out)
+				put ("%N")
 			else
-				io.put_string ("Pattern not found: " + a_name.out + "%N%N")
-				io.put_string ("Use 'kb pattern list' to see all patterns.%N")
-				io.put_string ("Or run 'kb seed' to populate patterns first.%N")
+				put ("Pattern not found: " + a_name.out + "%N%N")
+				put ("Use 'kb pattern list' to see all patterns.%N")
+				put ("Or run 'kb seed' to populate patterns first.%N")
 			end
 		end
 
@@ -561,28 +656,26 @@ feature -- Pattern Commands
 		do
 			l_patterns := db.all_patterns
 			if l_patterns.is_empty then
-				io.put_string ("No patterns in database.%N")
-				io.put_string ("Run 'kb seed' to populate with Eiffel patterns.%N")
+				put ("No patterns in database.%N")
+				put ("Run 'kb seed' to populate with Eiffel patterns.%N")
 			else
-				io.put_string ("Eiffel Patterns (" + l_patterns.count.out + "):%N")
-				io.put_string ("========================%N%N")
+				put ("Eiffel Patterns (" + l_patterns.count.out + "):%N")
+				put ("========================%N%N")
 				from i := 1 until i > l_patterns.count loop
-					io.put_string ("#" + i.out + " " + l_patterns[i].brief.out + "%N")
+					put ("#" + i.out + " " + l_patterns[i].brief.out + "%N")
 					i := i + 1
 				end
 				
-				io.put_string ("%NSelect (1-" + l_patterns.count.out + ") or Enter to skip: ")
-				io.read_line
-				l_input := io.last_string.twin
+				l_input := read_input ("%NSelect (1-" + l_patterns.count.out + ") or Enter to skip: ")
 				l_input.left_adjust
 				l_input.right_adjust
 				
 				if not l_input.is_empty and then l_input.is_integer then
 					l_choice := l_input.to_integer
 					if l_choice >= 1 and l_choice <= l_patterns.count then
-						io.put_string ("%N")
-						io.put_string (l_patterns[l_choice].formatted.out)
-						io.put_string ("%N")
+						put ("%N")
+						put (l_patterns[l_choice].formatted.out)
+						put ("%N")
 					end
 				end
 			end
@@ -590,15 +683,15 @@ feature -- Pattern Commands
 
 feature -- Example Commands
 
-	process_example_command (a_args: ARGUMENTS_32)
+	process_example_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'example' subcommand
 		local
 			l_title: STRING_32
 			i: INTEGER
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb example <title>%N")
-				io.put_string ("Example: kb example %"Sieve of Eratosthenes%"%N")
+				put ("Usage: kb example <title>%N")
+				put ("Example: kb example %"Sieve of Eratosthenes%"%N")
 			else
 				-- Combine all args after 'example' as the title
 				create l_title.make_empty
@@ -618,24 +711,24 @@ feature -- Example Commands
 		do
 			l_example := db.get_example (a_title)
 			if attached l_example as al_ex then
-				io.put_string (al_ex.formatted.out)
-				io.put_string ("%N")
+				put (al_ex.formatted.out)
+				put ("%N")
 			else
 				-- Try partial match
 				l_example := db.find_example_like (a_title)
 				if attached l_example as al_ex then
-					io.put_string (al_ex.formatted.out)
-					io.put_string ("%N")
+					put (al_ex.formatted.out)
+					put ("%N")
 				else
-					io.put_string ("Example not found: " + a_title.out + "%N%N")
-					io.put_string ("Use 'kb search <keyword>' to find examples.%N")
+					put ("Example not found: " + a_title.out + "%N%N")
+					put ("Use 'kb search <keyword>' to find examples.%N")
 				end
 			end
 		end
 
 feature -- Feature Commands
 
-	process_feature_command (a_args: ARGUMENTS_32)
+	process_feature_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'feature' subcommand
 			-- Syntax: kb feature CLASS.name or kb feature CLASS name
 		local
@@ -643,9 +736,9 @@ feature -- Feature Commands
 			l_dot_pos: INTEGER
 		do
 			if a_args.argument_count < 2 then
-				io.put_string ("Usage: kb feature CLASS.feature_name%N")
-				io.put_string ("       kb feature CLASS feature_name%N")
-				io.put_string ("Example: kb feature SIMPLE_HTTP.get%N")
+				put ("Usage: kb feature CLASS.feature_name%N")
+				put ("       kb feature CLASS feature_name%N")
+				put ("Example: kb feature SIMPLE_HTTP.get%N")
 			else
 				l_arg := a_args.argument (2)
 				l_dot_pos := l_arg.index_of ('.', 1)
@@ -672,6 +765,7 @@ feature -- Feature Commands
 		local
 			l_feature: detachable KB_FEATURE_INFO
 			l_matches: ARRAYED_LIST [KB_FEATURE_INFO]
+			l_heading: STRING
 			i: INTEGER
 			l_input: STRING
 			l_choice: INTEGER
@@ -680,29 +774,32 @@ feature -- Feature Commands
 			if attached l_feature as al_feat then
 				show_feature_details (a_class_name, feat)
 			else
-				-- Try partial match
+				-- Try partial match, then names a few typos away
 				l_matches := db.search_features (a_class_name, a_feature_name, 20)
+				l_heading := "Features matching '"
+				if l_matches.is_empty then
+					l_matches := db.similar_features (a_class_name, a_feature_name, 10)
+					l_heading := "Features similar to '"
+				end
 				if l_matches.is_empty then
-					io.put_string ("Feature not found: " + a_class_name.out + "." + a_feature_name.out + "%N%N")
-					io.put_string ("Try 'kb class " + a_class_name.out + "' to see all features.%N")
+					put ("Feature not found: " + a_class_name.out + "." + a_feature_name.out + "%N%N")
+					put ("Try 'kb class " + a_class_name.out + "' to see all features.%N")
 				else
-					io.put_string ("Features matching '" + a_feature_name.out + "' in " + a_class_name.out + ":%N")
-					io.put_string ("========================================%N%N")
+					put (l_heading + a_feature_name.out + "' in " + a_class_name.out + ":%N")
+					put ("========================================%N%N")
 					from i := 1 until i > l_matches.count loop
-						io.put_string ("#" + i.out + " " + l_matches[i].name.out + " " + l_matches[i].signature.out + "%N")
+						put ("#" + i.out + " " + l_matches[i].name.out + " " + l_matches[i].signature.out + "%N")
 						i := i + 1
 					end
 					
-					io.put_string ("%NSelect (1-" + l_matches.count.out + ") or Enter to skip: ")
-					io.read_line
-					l_input := io.last_string.twin
+					l_input := read_input ("%NSelect (1-" + l_matches.count.out + ") or Enter to skip: ")
 					l_input.left_adjust
 					l_input.right_adjust
 					
 					if not l_input.is_empty and then l_input.is_integer then
 						l_choice := l_input.to_integer
 						if l_choice >= 1 and l_choice <= l_matches.count then
-							io.put_string ("%N")
+							put ("%N")
 							show_feature_details (a_class_name, l_matches[l_choice])
 						end
 					end
@@ -721,35 +818,33 @@ feature -- Feature Commands
 			l_class := db.find_class (a_class_name)
 			if attached l_class as al_cls then
 				if al_cls.features.is_empty then
-					io.put_string ("No features found for class: " + a_class_name.out + "%N")
+					put ("No features found for class: " + a_class_name.out + "%N")
 				else
-					io.put_string ("Features in " + al_cls.name.out + " (" + al_cls.features.count.out + "):%N")
-					io.put_string ("========================================%N%N")
+					put ("Features in " + al_cls.name.out + " (" + al_cls.features.count.out + "):%N")
+					put ("========================================%N%N")
 					from i := 1 until i > al_cls.features.count loop
-						io.put_string ("#" + i.out + " " + al_cls.features[i].kind.out + " " + al_cls.features[i].name.out)
+						put ("#" + i.out + " " + al_cls.features[i].kind.out + " " + al_cls.features[i].name.out)
 						if not al_cls.features[i].signature.is_empty then
-							io.put_string (" " + al_cls.features[i].signature.out)
+							put (" " + al_cls.features[i].signature.out)
 						end
-						io.put_string ("%N")
+						put ("%N")
 						i := i + 1
 					end
 					
-					io.put_string ("%NSelect (1-" + cls.features.count.out + ") or Enter to skip: ")
-					io.read_line
-					l_input := io.last_string.twin
+					l_input := read_input ("%NSelect (1-" + cls.features.count.out + ") or Enter to skip: ")
 					l_input.left_adjust
 					l_input.right_adjust
 					
 					if not l_input.is_empty and then l_input.is_integer then
 						l_choice := l_input.to_integer
 						if l_choice >= 1 and l_choice <= cls.features.count then
-							io.put_string ("%N")
+							put ("%N")
 							show_feature_details (cls.name, cls.features[l_choice])
 						end
 					end
 				end
 			else
-				io.put_string ("Class not found: " + a_class_name.out + "%N")
+				put ("Class not found: " + a_class_name.out + "%N")
 			end
 		end
 
@@ -764,35 +859,35 @@ feature -- Feature Commands
 			if a_feature.is_deferred then l_modifiers.append ("deferred ") end
 			if a_feature.is_once then l_modifiers.append ("once ") end
 
-			io.put_string ("FEATURE: " + a_class_name.out + "." + a_feature.name.out + "%N")
-			io.put_string ("========================================%N%N")
-			io.put_string ("Kind: " + l_modifiers + a_feature.kind.out + "%N")
-			io.put_string ("Signature: " + a_feature.name.out)
+			put ("FEATURE: " + a_class_name.out + "." + a_feature.name.out + "%N")
+			put ("========================================%N%N")
+			put ("Kind: " + l_modifiers + a_feature.kind.out + "%N")
+			put ("Signature: " + a_feature.name.out)
 			if not a_feature.signature.is_empty then
-				io.put_string (" " + a_feature.signature.out)
+				put (" " + a_feature.signature.out)
 			end
-			io.put_string ("%N")
+			put ("%N")
 			if not a_feature.description.is_empty then
-				io.put_string ("%NDescription:%N  " + a_feature.description.out + "%N")
+				put ("%NDescription:%N  " + a_feature.description.out + "%N")
 			end
 			if not a_feature.preconditions.is_empty then
-				io.put_string ("%NREQUIRE (Preconditions):%N")
+				put ("%NREQUIRE (Preconditions):%N")
 				across a_feature.preconditions as pre loop
-					io.put_string ("  " + pre.tag.out + ": " + pre.expression.out + "%N")
+					put ("  " + pre.tag.out + ": " + pre.expression.out + "%N")
 				end
 			end
 			if not a_feature.postconditions.is_empty then
-				io.put_string ("%NENSURE (Postconditions):%N")
+				put ("%NENSURE (Postconditions):%N")
 				across a_feature.postconditions as post loop
-					io.put_string ("  " + post.tag.out + ": " + post.expression.out + "%N")
+					put ("  " + post.tag.out + ": " + post.expression.out + "%N")
 				end
 			end
-			io.put_string ("%N")
+			put ("%N")
 		end
 
 feature -- Library Commands
 
-	process_library_command (a_args: ARGUMENTS_32)
+	process_library_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'library' subcommand
 		local
 			l_name: STRING_32
@@ -820,39 +915,37 @@ feature -- Library Commands
 		do
 			l_lib := db.get_library (a_name)
 			if attached l_lib as al_lib then
-				io.put_string (al_lib.formatted.out)
-				io.put_string ("%N")
+				put (al_lib.formatted.out)
+				put ("%N")
 			else
 				-- Try partial match
 				l_matches := db.search_libraries (a_name, 20)
 				if l_matches.is_empty then
-					io.put_string ("Library not found: " + a_name.out + "%N%N")
-					io.put_string ("Run 'kb ingest <path>' to index libraries first.%N")
-					io.put_string ("Or use 'kb library list' to see all libraries.%N")
+					put ("Library not found: " + a_name.out + "%N%N")
+					put ("Run 'kb ingest <path>' to index libraries first.%N")
+					put ("Or use 'kb library list' to see all libraries.%N")
 				else
-					io.put_string ("Libraries matching '" + a_name.out + "' (" + l_matches.count.out + "):%N")
-					io.put_string ("========================================%N%N")
+					put ("Libraries matching '" + a_name.out + "' (" + l_matches.count.out + "):%N")
+					put ("========================================%N%N")
 					from i := 1 until i > l_matches.count loop
-						io.put_string ("#" + i.out + " " + l_matches[i].name.out)
+						put ("#" + i.out + " " + l_matches[i].name.out)
 						if not l_matches[i].description.is_empty then
-							io.put_string (" - " + truncate (l_matches[i].description, 50).out)
+							put (" - " + truncate (l_matches[i].description, 50).out)
 						end
-						io.put_string ("%N")
+						put ("%N")
 						i := i + 1
 					end
 					
-					io.put_string ("%NSelect (1-" + l_matches.count.out + ") or Enter to skip: ")
-					io.read_line
-					l_input := io.last_string.twin
+					l_input := read_input ("%NSelect (1-" + l_matches.count.out + ") or Enter to skip: ")
 					l_input.left_adjust
 					l_input.right_adjust
 					
 					if not l_input.is_empty and then l_input.is_integer then
 						l_choice := l_input.to_integer
 						if l_choice >= 1 and l_choice <= l_matches.count then
-							io.put_string ("%N")
-							io.put_string (l_matches[l_choice].formatted.out)
-							io.put_string ("%N")
+							put ("%N")
+							put (l_matches[l_choice].formatted.out)
+							put ("%N")
 						end
 					end
 				end
@@ -869,32 +962,30 @@ feature -- Library Commands
 		do
 			l_libs := db.all_libraries
 			if l_libs.is_empty then
-				io.put_string ("No libraries in database.%N")
-				io.put_string ("Run 'kb ingest <path>' to index libraries.%N")
+				put ("No libraries in database.%N")
+				put ("Run 'kb ingest <path>' to index libraries.%N")
 			else
-				io.put_string ("Libraries (" + l_libs.count.out + "):%N")
-				io.put_string ("========================%N%N")
+				put ("Libraries (" + l_libs.count.out + "):%N")
+				put ("========================%N%N")
 				from i := 1 until i > l_libs.count loop
-					io.put_string ("#" + i.out + " " + l_libs[i].name.out)
+					put ("#" + i.out + " " + l_libs[i].name.out)
 					if not l_libs[i].description.is_empty then
-						io.put_string (" - " + truncate (l_libs[i].description, 50).out)
+						put (" - " + truncate (l_libs[i].description, 50).out)
 					end
-					io.put_string ("%N")
+					put ("%N")
 					i := i + 1
 				end
 				
-				io.put_string ("%NSelect (1-" + l_libs.count.out + ") or Enter to skip: ")
-				io.read_line
-				l_input := io.last_string.twin
+				l_input := read_input ("%NSelect (1-" + l_libs.count.out + ") or Enter to skip: ")
 				l_input.left_adjust
 				l_input.right_adjust
 				
 				if not l_input.is_empty and then l_input.is_integer then
 					l_choice := l_input.to_integer
 					if l_choice >= 1 and l_choice <= l_libs.count then
-						io.put_string ("%N")
-						io.put_string (l_libs[l_choice].formatted.out)
-						io.put_string ("%N")
+						put ("%N")
+						put (l_libs[l_choice].formatted.out)
+						put ("%N")
 					end
 				end
 			end
@@ -913,25 +1004,23 @@ feature -- Search Commands
 		do
 			l_results := db.search (a_query, 20)
 			if l_results.is_empty then
-				io.put_string ("No results found for: " + a_query.out + "%N%N")
-				io.put_string ("Try different keywords or run 'kb seed' and 'kb ingest' first.%N")
+				put ("No results found for: " + a_query.out + "%N%N")
+				put ("Try different keywords or run 'kb seed' and 'kb ingest' first.%N")
 			else
-				io.put_string ("Search Results for '" + a_query.out + "' (" + l_results.count.out + "):%N")
-				io.put_string ("============================================%N%N")
+				put ("Search Results for '" + a_query.out + "' (" + l_results.count.out + "):%N")
+				put ("============================================%N%N")
 				from i := 1 until i > l_results.count loop
 					l_result := l_results [i]
-					io.put_string ("#" + i.out + " " + l_result.type_label.out + " " + l_result.title.out + "%N")
+					put ("#" + i.out + " " + l_result.type_label.out + " " + l_result.title.out + "%N")
 					if not l_result.snippet.is_empty then
-						io.put_string ("   " + truncate (l_result.snippet, 75).out + "%N")
+						put ("   " + truncate (l_result.snippet, 75).out + "%N")
 					end
-					io.put_string ("%N")
+					put ("%N")
 					i := i + 1
 				end
 				
 				-- Prompt for selection
-				io.put_string ("Select (1-" + l_results.count.out + ") or Enter to skip: ")
-				io.read_line
-				l_input := io.last_string.twin
+				l_input := read_input ("Select (1-" + l_results.count.out + ") or Enter to skip: ")
 				l_input.left_adjust
 				l_input.right_adjust
 				
@@ -939,7 +1028,7 @@ feature -- Search Commands
 					l_choice := l_input.to_integer
 					if l_choice >= 1 and l_choice <= l_results.count then
 						l_result := l_results [l_choice]
-						io.put_string ("%N")
+						put ("%N")
 						show_full_result (l_result)
 					end
 				end
@@ -957,8 +1046,13 @@ feature -- Search Commands
 				cmd_pattern_lookup (a_result.title)
 			elseif a_result.content_type.same_string ("error") then
 				cmd_error_lookup (a_result.title)
+			elseif a_result.content_type.same_string ("feature") then
+				db.load_result_body (a_result)
+				put (a_result.type_label.out + " " + a_result.title.out + "%N")
+				put ("========================================%N%N")
+				put (a_result.body.out + "%N")
 			else
-				io.put_string ("Content type '" + a_result.content_type.out + "' not viewable.%N")
+				put ("Content type '" + a_result.content_type.out + "' not viewable.%N")
 			end
 		end
 
@@ -967,6 +1061,7 @@ feature -- Search Commands
 		local
 			l_class: detachable KB_CLASS_INFO
 			l_matches: ARRAYED_LIST [KB_CLASS_INFO]
+			l_heading: STRING
 			i: INTEGER
 			l_input: STRING
 			l_choice: INTEGER
@@ -975,29 +1070,33 @@ feature -- Search Commands
 			if attached l_class as al_cls then
 				show_class_details (cls)
 			else
-				-- Try partial match
+				-- Try partial match, then names a few typos away
 				l_matches := db.search_classes (a_name, 20)
+				l_heading := "Classes matching '"
 				if l_matches.is_empty then
-					io.put_string ("Class not found: " + a_name.out + "%N%N")
-					io.put_string ("Run 'kb ingest <path>' to index source files first.%N")
+					l_matches := db.similar_classes (a_name, 10)
+					l_heading := "Classes similar to '"
+				end
+				if l_matches.is_empty then
+					put ("Class not found: " + a_name.out + "%N%N")
+					put ("Run 'kb ingest <path>' to index source files first.%N")
 				else
-					io.put_string ("Classes matching '" + a_name.out + "' (" + l_matches.count.out + "):%N")
-					io.put_string ("========================================%N%N")
+					put (l_heading + a_name.out + "' (" + l_matches.count.out + "):%N")
+					put ("========================================%N%N")
 					from i := 1 until i > l_matches.count loop
-						io.put_string ("#" + i.out + " " + l_matches[i].name.out + " (" + l_matches[i].library.out + ")%N")
+						put ("#" + i.out + " " + l_matches[i].name.out + " (" + l_matches[i].library.out + ")%N")
 						i := i + 1
 					end
 					
-					io.put_string ("%NSelect (1-" + l_matches.count.out + ") or Enter to skip: ")
-					io.read_line
-					l_input := io.last_string.twin
+					l_input := read_input ("%NSelect (1-" + l_matches.count.out + ") or Enter to skip: ")
 					l_input.left_adjust
 					l_input.right_adjust
 					
 					if not l_input.is_empty and then l_input.is_integer then
 						l_choice := l_input.to_integer
 						if l_choice >= 1 and l_choice <= l_matches.count then
-							io.put_string ("%N")
+							put ("%N")
+							db.load_class_features (l_matches[l_choice])
 							show_class_details (l_matches[l_choice])
 						end
 					end
@@ -1020,74 +1119,72 @@ feature -- Search Commands
 			if a_class.is_expanded then l_modifiers.append ("expanded ") end
 			if a_class.is_frozen then l_modifiers.append ("frozen ") end
 
-			io.put_string ("CLASS: " + l_modifiers + a_class.name.out + "%N")
-			io.put_string ("========================================%N%N")
-			io.put_string ("Library:  " + a_class.library.out + "%N")
+			put ("CLASS: " + l_modifiers + a_class.name.out + "%N")
+			put ("========================================%N%N")
+			put ("Library:  " + a_class.library.out + "%N")
 			if not a_class.description.is_empty then
-				io.put_string ("Description:%N  " + a_class.description.out + "%N")
+				put ("Description:%N  " + a_class.description.out + "%N")
 			end
 			if not a_class.file_path.is_empty then
-				io.put_string ("File: " + a_class.file_path.out + "%N")
+				put ("File: " + a_class.file_path.out + "%N")
 			end
 
 			-- Show parents
 			if not a_class.parents.is_empty then
-				io.put_string ("%NPARENTS: ")
+				put ("%NPARENTS: ")
 				from i := 1 until i > a_class.parents.count loop
-					if i > 1 then io.put_string (", ") end
-					io.put_string (a_class.parents[i].out)
+					if i > 1 then put (", ") end
+					put (a_class.parents[i].out)
 					i := i + 1
 				end
-				io.put_string ("%N")
+				put ("%N")
 			end
 
 			-- Show ancestors (full inheritance chain)
 			l_ancestors := db.get_ancestors (a_class.name)
 			if not l_ancestors.is_empty then
-				io.put_string ("ANCESTORS: ")
+				put ("ANCESTORS: ")
 				from i := 1 until i > l_ancestors.count loop
-					if i > 1 then io.put_string (", ") end
-					io.put_string (l_ancestors[i].out)
+					if i > 1 then put (", ") end
+					put (l_ancestors[i].out)
 					i := i + 1
 				end
-				io.put_string ("%N")
+				put ("%N")
 			end
 
 			-- Show descendants
 			l_descendants := db.get_descendants (a_class.name)
 			if not l_descendants.is_empty then
-				io.put_string ("DESCENDANTS: ")
+				put ("DESCENDANTS: ")
 				from i := 1 until i > l_descendants.count.min (10) loop
-					if i > 1 then io.put_string (", ") end
-					io.put_string (l_descendants[i].out)
+					if i > 1 then put (", ") end
+					put (l_descendants[i].out)
 					i := i + 1
 				end
 				if l_descendants.count > 10 then
-					io.put_string (" ... (+" + (l_descendants.count - 10).out + " more)")
+					put (" ... (+" + (l_descendants.count - 10).out + " more)")
 				end
-				io.put_string ("%N")
+				put ("%N")
 			end
 			if not a_class.features.is_empty then
-				io.put_string ("%NFEATURES (" + a_class.features.count.out + "):%N")
+				put ("%NFEATURES (" + a_class.features.count.out + "):%N")
 				from i := 1 until i > a_class.features.count loop
-					io.put_string ("  #" + i.out + " " + a_class.features[i].kind.out + " " + a_class.features[i].name.out)
+					put ("  #" + i.out + " " + a_class.features[i].kind.out + " " + a_class.features[i].name.out)
 					if not a_class.features[i].signature.is_empty then
-						io.put_string (" " + a_class.features[i].signature.out)
+						put (" " + a_class.features[i].signature.out)
 					end
-					io.put_string ("%N")
+					put ("%N")
 					i := i + 1
 				end
 				
-				io.put_string ("%NSelect feature (1-" + a_class.features.count.out + ") or Enter to skip: ")
-				io.read_line
-				l_input := io.last_string.twin
+				l_input := read_input ("%NSelect feature (1-" + a_class.features.count.out + ") or Enter to skip: ")
 				l_input.left_adjust
 				l_input.right_adjust
 				
 				if not l_input.is_empty and then l_input.is_integer then
 					l_choice := l_input.to_integer
 					if l_choice >= 1 and l_choice <= a_class.features.count then
-						io.put_string ("%N")
+						put ("%N")
 						show_feature_details (a_class.name, a_class.features[l_choice])
 					end
 				end
@@ -1107,9 +1204,11 @@ feature -- Other Commands
 		do
 			create l_dir.make (a_path.out)
 			if not l_dir.exists then
-				io.put_string ("Path not found: " + a_path.out + "%N")
+				put ("Path not found: " + a_path.out + "%N")
 			else
-				io.put_string ("Ingesting source files from: " + a_path.out + "%N")
+				put ("Ingesting source files from: " + a_path.out + "%N")
+				-- Bulk profile while writing; readers keep working under WAL
+				db.use_tuning ({KB_DB_TUNING}.Bulk_profile)
 				create l_ingester.make (db)
 
 				-- Check if it's the base path with simple_* libraries
@@ -1137,14 +1236,15 @@ feature -- Other Commands
 					end
 				end
 
+				db.use_configured_tuning
 				l_stats := l_ingester.stats
-				io.put_string ("%NDone. Indexed:%N")
-				io.put_string ("  - " + l_stats.libraries.out + " libraries%N")
-				io.put_string ("  - " + l_stats.files.out + " files%N")
-				io.put_string ("  - " + l_stats.classes.out + " classes%N")
-				io.put_string ("  - " + l_stats.features.out + " features%N")
+				put ("%NDone. Indexed:%N")
+				put ("  - " + l_stats.libraries.out + " libraries%N")
+				put ("  - " + l_stats.files.out + " files%N")
+				put ("  - " + l_stats.classes.out + " classes%N")
+				put ("  - " + l_stats.features.out + " features%N")
 				if l_stats.errors > 0 then
-					io.put_string ("  - " + l_stats.errors.out + " parse errors%N")
+					put ("  - " + l_stats.errors.out + " parse errors%N")
 				end
 			end
 		end
@@ -1156,18 +1256,18 @@ feature -- Other Commands
 			l_pattern_seeder: KB_PATTERN_SEEDER
 			l_stats: TUPLE [classes, features, examples, errors, patterns: INTEGER]
 		do
-			io.put_string ("Seeding database...%N")
-			io.put_string ("  - Adding error codes...%N")
+			put ("Seeding database...%N")
+			put ("  - Adding error codes...%N")
 			create l_error_seeder.make (db)
-			io.put_string ("  - Adding Eiffel patterns...%N")
+			put ("  - Adding Eiffel patterns...%N")
 			create l_pattern_seeder.make (db)
 			l_stats := db.stats
-			io.put_string ("%NDone. Database now contains:%N")
-			io.put_string ("  - " + l_stats.errors.out + " error codes%N")
-			io.put_string ("  - " + l_stats.patterns.out + " patterns%N")
-			io.put_string ("  - " + l_stats.classes.out + " classes%N")
-			io.put_string ("  - " + l_stats.features.out + " features%N")
-			io.put_string ("  - " + l_stats.examples.out + " examples%N")
+			put ("%NDone. Database now contains:%N")
+			put ("  - " + l_stats.errors.out + " error codes%N")
+			put ("  - " + l_stats.patterns.out + " patterns%N")
+			put ("  - " + l_stats.classes.out + " classes%N")
+			put ("  - " + l_stats.features.out + " features%N")
+			put ("  - " + l_stats.examples.out + " examples%N")
 		end
 
 	cmd_stats
@@ -1175,23 +1275,66 @@ feature -- Other Commands
 		local
 			l_stats: TUPLE [classes, features, examples, errors, patterns, libraries: INTEGER]
 			l_faq_store: KB_FAQ_STORE
+			l_ai_cache: KB_AI_CACHE
 		do
 			l_stats := db.stats
-			create l_faq_store.make (db.db)
-			io.put_string ("Knowledge Base Statistics%N")
-			io.put_string ("=========================%N%N")
-			io.put_string ("Libraries:    " + l_stats.libraries.out + "%N")
-			io.put_string ("Classes:      " + l_stats.classes.out + "%N")
-			io.put_string ("Features:     " + l_stats.features.out + "%N")
-			io.put_string ("Examples:     " + l_stats.examples.out + "%N")
-			io.put_string ("Error codes:  " + l_stats.errors.out + "%N")
-			io.put_string ("Patterns:     " + l_stats.patterns.out + "%N")
-			io.put_string ("FAQs:         " + l_faq_store.faq_count.out + "%N")
+			l_faq_store := faq_store
+			put ("Knowledge Base Statistics%N")
+			put ("=========================%N%N")
+			put ("Libraries:    " + l_stats.libraries.out + "%N")
+			put ("Classes:      " + l_stats.classes.out + "%N")
+			put ("Features:     " + l_stats.features.out + "%N")
+			put ("Examples:     " + l_stats.examples.out + "%N")
+			put ("Error codes:  " + l_stats.errors.out + "%N")
+			put ("Patterns:     " + l_stats.patterns.out + "%N")
+			put ("FAQs:         " + l_faq_store.faq_count.out + "%N")
+			if db.is_external_content then
+				put ("Index:        external content%N")
+			else
+				put ("Index:        standalone%N")
+			end
+			put ("%NTuning:       " + db.tuning.description + "%N")
+			create l_ai_cache.make_beside (default_db_path)
+			put ("AI cache:     " + l_ai_cache.description + "%N")
+			l_ai_cache.close
+		end
+
+	cmd_stats_perf (a_option: STRING_32)
+			-- Show latency percentiles per phase (`a_option': empty, "--json" or "reset")
+		do
+			if a_option.is_empty then
+				put (perf.report (perf_path))
+			elseif a_option.same_string ("--json") then
+				put (perf.to_json (perf_path) + "%N")
+			elseif a_option.same_string ("reset") then
+				perf.reset (perf_path)
+				put ("Timings cleared.%N")
+			else
+				put ("Usage: kb stats --perf [--json|reset]%N")
+			end
+		end
+
+	cmd_reindex (a_external: BOOLEAN)
+			-- Rebuild kb_search and faq_search, then compact the file
+		do
+			if a_external then
+				put ("Rebuilding search indexes as external content...%N")
+			else
+				put ("Rebuilding search indexes as standalone tables...%N")
+			end
+			db.rebuild_search_indexes (a_external)
+			if db.has_error and then attached db.last_error as al_err then
+				put ("Error: " + al_err.out + "%N")
+			else
+				put ("Compacting database...%N")
+				db.db.execute ("VACUUM")
+				put ("Done.%N")
+			end
 		end
 
 feature -- FAQ Commands
 
-	process_faq_command (a_args: ARGUMENTS_32)
+	process_faq_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'faq' subcommand
 		local
 			l_subcmd: STRING_32
@@ -1208,7 +1351,7 @@ feature -- FAQ Commands
 					if a_args.argument_count >= 3 then
 						cmd_faq_delete (a_args.argument (3))
 					else
-						io.put_string ("Usage: faq delete <id> or faq delete all%N")
+						put ("Usage: faq delete <id> or faq delete all%N")
 					end
 				else
 					-- Join remaining args as search query
@@ -1230,22 +1373,22 @@ feature -- FAQ Commands
 			l_faqs: ARRAYED_LIST [KB_FAQ]
 			i: INTEGER
 		do
-			create l_faq_store.make (db.db)
+			l_faq_store := faq_store
 			l_faqs := l_faq_store.recent_faqs (20)
-			io.put_string ("Recent FAQs (" + l_faq_store.faq_count.out + " total)%N")
-			io.put_string ("============%N%N")
+			put ("Recent FAQs (" + l_faq_store.faq_count.out + " total)%N")
+			put ("============%N%N")
 			if l_faqs.is_empty then
-				io.put_string ("No FAQs yet. Use 'ask' command to create them.%N")
+				put ("No FAQs yet. Use 'ask' command to create them.%N")
 			else
 				from i := 1 until i > l_faqs.count loop
-					io.put_string (i.out + ". " + l_faqs [i].question.head (60))
+					put (i.out + ". " + l_faqs [i].question.head (60))
 					if l_faqs [i].question.count > 60 then
-						io.put_string ("...")
+						put ("...")
 					end
-					io.put_string ("%N")
+					put ("%N")
 					i := i + 1
 				end
-				io.put_string ("%NUse 'faq <query>' to search FAQs%N")
+				put ("%NUse 'faq <query>' to search FAQs%N")
 			end
 		end
 
@@ -1257,7 +1400,7 @@ feature -- FAQ Commands
 			l_output: STRING_32
 			i: INTEGER
 		do
-			create l_faq_store.make (db.db)
+			l_faq_store := faq_store
 			l_faqs := l_faq_store.search_faqs (a_query, 10)
 			
 			create l_output.make (5000)
@@ -1275,7 +1418,7 @@ feature -- FAQ Commands
 				end
 			end
 			
-			pager.show (l_output)
+			show_paged (l_output)
 		end
 
 	cmd_faq_delete (a_target: STRING_32)
@@ -1286,41 +1429,39 @@ feature -- FAQ Commands
 			l_count: INTEGER
 			l_confirm: STRING
 		do
-			create l_faq_store.make (db.db)
+			l_faq_store := faq_store
 			if a_target.same_string ("all") then
 				l_count := l_faq_store.faq_count
 				if l_count = 0 then
-					io.put_string ("No FAQs to delete.%N")
+					put ("No FAQs to delete.%N")
 				else
-					io.put_string ("WARNING: This will delete ALL " + l_count.out + " FAQs!%N")
-					io.put_string ("Type 'yes' to confirm: ")
-					io.read_line
-					l_confirm := io.last_string.twin
+					put ("WARNING: This will delete ALL " + l_count.out + " FAQs!%N")
+					l_confirm := read_input ("Type 'yes' to confirm: ")
 					l_confirm.left_adjust
 					l_confirm.right_adjust
 					if l_confirm.same_string ("yes") then
 						l_faq_store.delete_all
-						io.put_string ("Deleted all FAQs.%N")
+						put ("Deleted all FAQs.%N")
 					else
-						io.put_string ("Cancelled.%N")
+						put ("Cancelled.%N")
 					end
 				end
 			elseif a_target.is_integer then
 				l_id := a_target.to_integer
 				if l_faq_store.has_faq (l_id) then
 					l_faq_store.delete_faq (l_id)
-					io.put_string ("Deleted FAQ #" + l_id.out + "%N")
+					put ("Deleted FAQ #" + l_id.out + "%N")
 				else
-					io.put_string ("FAQ #" + l_id.out + " not found.%N")
+					put ("FAQ #" + l_id.out + " not found.%N")
 				end
 			else
-				io.put_string ("Usage: faq delete <id> or faq delete all%N")
+				put ("Usage: faq delete <id> or faq delete all%N")
 			end
 		end
 
 feature -- Clear Commands
 
-	process_clear_command (a_args: ARGUMENTS_32)
+	process_clear_command (a_args: KB_COMMAND_LINE)
 			-- Handle 'clear' subcommand
 		local
 			l_target: STRING_32
@@ -1343,15 +1484,15 @@ feature -- Clear Commands
 					if a_args.argument_count >= 3 then
 						cmd_clear_library (a_args.argument (3))
 					else
-						io.put_string ("Usage: kb clear library <name>%N")
-						io.put_string ("Example: kb clear library simple_json%N")
+						put ("Usage: kb clear library <name>%N")
+						put ("Example: kb clear library simple_json%N")
 					end
 				elseif l_target.same_string ("faqs") or l_target.same_string ("faq") then
 					cmd_clear_faqs
 				elseif l_target.same_string ("help") then
 					show_clear_help
 				else
-					io.put_string ("Unknown clear target: " + l_target.out + "%N")
+					put ("Unknown clear target: " + l_target.out + "%N")
 					show_clear_help
 				end
 			end
@@ -1360,7 +1501,7 @@ feature -- Clear Commands
 	show_clear_help
 			-- Show clear command help
 		do
-			io.put_string ("[
+			put ("[
 Clear Commands:
     kb clear all            Clear ALL data
     kb clear classes        Clear all indexed classes and features
@@ -1375,78 +1516,78 @@ Clear Commands:
 	cmd_clear_all
 			-- Clear all data with confirmation
 		do
-			io.put_string ("WARNING: This will delete ALL data from the knowledge base:%N")
-			io.put_string ("  - " + db.stats.classes.out + " classes%N")
-			io.put_string ("  - " + db.stats.features.out + " features%N")
-			io.put_string ("  - " + db.stats.examples.out + " examples%N")
-			io.put_string ("  - " + db.stats.errors.out + " errors%N")
-			io.put_string ("  - " + db.stats.patterns.out + " patterns%N%N")
+			put ("WARNING: This will delete ALL data from the knowledge base:%N")
+			put ("  - " + db.stats.classes.out + " classes%N")
+			put ("  - " + db.stats.features.out + " features%N")
+			put ("  - " + db.stats.examples.out + " examples%N")
+			put ("  - " + db.stats.errors.out + " errors%N")
+			put ("  - " + db.stats.patterns.out + " patterns%N%N")
 			if l_confirm ("Are you sure you want to delete ALL data?") then
 				db.clear_all
-				io.put_string ("All data cleared.%N")
+				put ("All data cleared.%N")
 			else
-				io.put_string ("Cancelled.%N")
+				put ("Cancelled.%N")
 			end
 		end
 
 	cmd_clear_classes
 			-- Clear classes and features
 		do
-			io.put_string ("This will delete:%N")
-			io.put_string ("  - " + db.stats.classes.out + " classes%N")
-			io.put_string ("  - " + db.stats.features.out + " features%N%N")
+			put ("This will delete:%N")
+			put ("  - " + db.stats.classes.out + " classes%N")
+			put ("  - " + db.stats.features.out + " features%N%N")
 			if l_confirm ("Are you sure?") then
 				db.clear_classes
-				io.put_string ("Classes and features cleared.%N")
+				put ("Classes and features cleared.%N")
 			else
-				io.put_string ("Cancelled.%N")
+				put ("Cancelled.%N")
 			end
 		end
 
 	cmd_clear_examples
 			-- Clear examples
 		do
-			io.put_string ("This will delete " + db.stats.examples.out + " examples.%N%N")
+			put ("This will delete " + db.stats.examples.out + " examples.%N%N")
 			if l_confirm ("Are you sure?") then
 				db.clear_examples
-				io.put_string ("Examples cleared.%N")
+				put ("Examples cleared.%N")
 			else
-				io.put_string ("Cancelled.%N")
+				put ("Cancelled.%N")
 			end
 		end
 
 	cmd_clear_errors
 			-- Clear error codes
 		do
-			io.put_string ("This will delete " + db.stats.errors.out + " error codes.%N%N")
+			put ("This will delete " + db.stats.errors.out + " error codes.%N%N")
 			if l_confirm ("Are you sure?") then
 				db.clear_errors
-				io.put_string ("Error codes cleared.%N")
+				put ("Error codes cleared.%N")
 			else
-				io.put_string ("Cancelled.%N")
+				put ("Cancelled.%N")
 			end
 		end
 
 	cmd_clear_patterns
 			-- Clear patterns
 		do
-			io.put_string ("This will delete " + db.stats.patterns.out + " patterns.%N%N")
+			put ("This will delete " + db.stats.patterns.out + " patterns.%N%N")
 			if l_confirm ("Are you sure?") then
 				db.clear_patterns
-				io.put_string ("Patterns cleared.%N")
+				put ("Patterns cleared.%N")
 			else
-				io.put_string ("Cancelled.%N")
+				put ("Cancelled.%N")
 			end
 		end
 
 	cmd_clear_faqs
 			-- Clear FAQ cache
 		do
-			io.put_string ("Clearing FAQ cache...%N")
-			db.db.execute ("DELETE FROM faq_search")
+			put ("Clearing FAQ cache...%N")
+			-- faq_search rows are removed by the faqs_search_ad trigger
 			db.db.execute ("DELETE FROM faq_tags")
 			db.db.execute ("DELETE FROM faqs")
-			io.put_string ("FAQ cache cleared. Fresh answers will be generated from KB.%N")
+			put ("FAQ cache cleared. Fresh answers will be generated from KB.%N")
 		end
 
 	cmd_clear_library (a_name: STRING_32)
@@ -1456,14 +1597,14 @@ Clear Commands:
 		do
 			l_count := db.library_class_count (a_name)
 			if l_count = 0 then
-				io.put_string ("No classes found for library: " + a_name.out + "%N")
+				put ("No classes found for library: " + a_name.out + "%N")
 			else
-				io.put_string ("This will delete " + l_count.out + " classes from library '" + a_name.out + "'.%N%N")
+				put ("This will delete " + l_count.out + " classes from library '" + a_name.out + "'.%N%N")
 				if l_confirm ("Are you sure?") then
 					db.clear_library (a_name)
-					io.put_string ("Library '" + a_name.out + "' cleared.%N")
+					put ("Library '" + a_name.out + "' cleared.%N")
 				else
-					io.put_string ("Cancelled.%N")
+					put ("Cancelled.%N")
 				end
 			end
 		end
@@ -1473,9 +1614,7 @@ Clear Commands:
 		local
 			l_input: STRING
 		do
-			io.put_string (a_prompt + " (y/n): ")
-			io.read_line
-			l_input := io.last_string.twin
+			l_input := read_input (a_prompt + " (y/n): ")
 			l_input.left_adjust
 			l_input.right_adjust
 			l_input.to_lower
@@ -1485,7 +1624,7 @@ Clear Commands:
 	show_help
 			-- Show help message
 		do
-			io.put_string ("[
+			put ("[
 Eiffel Knowledge Base CLI
 =========================
 
@@ -1509,6 +1648,7 @@ AI COMMANDS:
     ai on              Enable AI-assisted mode
     ai off             Disable AI (use direct search)
     ai provider <l_name> Switch AI provider
+    ai cache [clear]   Show (or empty) the cache of AI responses
 
 ADMIN COMMANDS:
     ingest <l_path>      Index source files from l_path
@@ -1516,7 +1656,13 @@ ADMIN COMMANDS:
     mbox <file>        Import Q&A from mbox archive
     seed               Populate l_error codes + l_patterns
     l_stats              Show database statistics
+    stats --perf       Latency per search/ask phase (p50/p95/p99 ms)
+    stats --perf --json  Same figures as JSON; 'stats --perf reset' clears them
+    reindex <mode>     Rebuild search indexes (external|standalone)
     clear <l_target>     Clear data (all|classes|examples|l_errors|l_patterns)
+    batch <file|->     Answer one query per line as NDJSON (parallel readers)
+    serve [port]       Keep kb.db open in a background daemon (default port 7433)
+    serve stop         Stop the daemon
     help               Show this help message
 
 EXAMPLES:
@@ -1530,16 +1676,204 @@ EXAMPLES:
     kb ingest /d/prod              # Index all simple_* libraries
     kb rosetta /d/prod/simple_rosetta  # Import Rosetta solutions
     kb seed                        # Initialize database
+    grep -o 'V[A-Z]*' build.log | sed 's/^/error /' | kb batch -
 
 NOTES:
     - Run 'kb seed' to populate l_error codes and l_patterns
     - Run 'kb ingest <l_path>' to index source files
     - Run 'kb rosetta <l_path>' to import Rosetta examples
     - Database is stored in kb.db
+    - While 'kb serve' runs, search/class/feature/error/pattern/example/
+      library/faq/ask/stats are answered by the daemon (set KB_NO_DAEMON
+      to always run them in-process)
 
 ]")
 		end
 
+feature -- Batch Commands
+
+	process_batch_command (a_args: KB_COMMAND_LINE)
+			-- Handle 'batch' subcommand
+		local
+			l_workers: INTEGER
+		do
+			if a_args.argument_count < 2 then
+				put ("Usage: kb batch <file|-> [workers]%N")
+				put ("One query per line: class SIMPLE_JSON, error VEVI, feature SIMPLE_JSON.parse,%N")
+				put ("pattern <name>, example <title>, library <name>, or search text.%N")
+				put ("Answers are written as NDJSON in input order.%N")
+			else
+				l_workers := execution_environment.available_cpu_count.to_integer_32.max (1)
+				if a_args.argument_count >= 3 and then a_args.argument (3).is_integer and then a_args.argument (3).to_integer > 0 then
+					l_workers := a_args.argument (3).to_integer
+				end
+				cmd_batch (a_args.argument (2), l_workers)
+			end
+		end
+
+	cmd_batch (a_source: STRING_32; a_workers: INTEGER)
+			-- Answer the queries in file `a_source' ("-" for stdin) as NDJSON
+		require
+			positive_workers: a_workers > 0
+		local
+			l_batch: KB_BATCH
+			l_file: PLAIN_TEXT_FILE
+			l_line: STRING
+			l_number: INTEGER
+		do
+			-- Opening kb.db here creates the schema the read connections expect
+			if not db.is_open then
+				put ("Error: Database not initialized%N")
+			else
+				create l_batch.make (db.db_path, a_workers)
+				if a_source.same_string ("-") then
+					from until io.input.end_of_file loop
+						io.read_line
+						l_number := l_number + 1
+						add_batch_query (l_batch, io.last_string, l_number)
+					end
+					l_batch.run (agent put)
+				else
+					create l_file.make_with_name (a_source)
+					if l_file.exists and then l_file.is_readable then
+						l_file.open_read
+						from l_file.read_line until l_file.exhausted loop
+							l_number := l_number + 1
+							add_batch_query (l_batch, l_file.last_string, l_number)
+							l_file.read_line
+						end
+						l_file.close
+						l_batch.run (agent put)
+					else
+						put ("File not found: " + a_source.out + "%N")
+					end
+				end
+			end
+		end
+
+	add_batch_query (a_batch: KB_BATCH; a_line: STRING; a_number: INTEGER)
+			-- Queue UTF-8 input line `a_line' unless blank or a # comment
+		local
+			l_query: STRING_32
+		do
+			l_query := {UTF_CONVERTER}.utf_8_string_8_to_string_32 (a_line)
+			l_query.left_adjust
+			l_query.right_adjust
+			if not l_query.is_empty and then l_query [1] /= '#' then
+				a_batch.add (l_query, a_number)
+			end
+		end
+
+feature -- Daemon Commands
+
+	process_serve_command (a_args: KB_COMMAND_LINE)
+			-- Handle 'serve' subcommand
+		do
+			if a_args.argument_count < 2 then
+				cmd_serve ({KB_DAEMON}.Default_port)
+			elseif a_args.argument (2).same_string ("stop") then
+				cmd_serve_stop
+			elseif a_args.argument (2).is_integer and then a_args.argument (2).to_integer > 0 and then a_args.argument (2).to_integer < 65536 then
+				cmd_serve (a_args.argument (2).to_integer)
+			else
+				put ("Usage: kb serve [port]   (default " + {KB_DAEMON}.Default_port.out + ")%N")
+				put ("       kb serve stop%N")
+			end
+		end
+
+	cmd_serve (a_port: INTEGER)
+			-- Keep the database open and answer kb commands on 127.0.0.1:`a_port'
+		require
+			valid_port: a_port > 0 and a_port < 65536
+		local
+			l_daemon: KB_DAEMON
+		do
+			put ("Starting kb daemon on 127.0.0.1:" + a_port.out + "...%N")
+			-- Open kb.db (schema checks, FTS5 probe) before the first request
+			put ("Database: " + default_db_path.out + " (" + faq_store.faq_count.out + " FAQs)%N")
+			create l_daemon.make (a_port, daemon_marker_path)
+			l_daemon.run (agent serve_request)
+			if l_daemon.last_error.is_empty then
+				put ("kb daemon stopped after " + l_daemon.requests_served.out + " requests.%N")
+			else
+				put ("Error: " + l_daemon.last_error.out + "%N")
+			end
+		end
+
+	cmd_serve_stop
+			-- Ask the running daemon to stop
+		local
+			l_client: KB_DAEMON_CLIENT
+		do
+			create l_client.make_from_marker (daemon_marker_path)
+			if l_client.is_connected then
+				if not l_client.run (create {KB_COMMAND_LINE}.make (<<"shutdown">>), pager) then
+					put ("kb daemon did not answer.%N")
+				end
+				l_client.close
+			else
+				put ("No kb daemon running.%N")
+			end
+		end
+
+	serve_request (a_session: KB_DAEMON_SESSION)
+			-- Run the command of `a_session' with its output sent to the client,
+			-- its arguments parsed as `process_command' parses the local ones
+		do
+			if is_served_by_daemon (a_session.command) then
+				session := a_session
+				-- Pick up 'kb ai on/off/provider' run since the last request
+				if attached ai_config as al_cfg then
+					al_cfg.load_config
+				end
+				process_command (a_session.arguments)
+				session := Void
+				perf.save (perf_path)
+			else
+				a_session.fail ("Not served by the daemon: " + {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (a_session.command))
+			end
+		rescue
+			session := Void
+		end
+
+	run_on_daemon (a_args: KB_COMMAND_LINE): BOOLEAN
+			-- Did a running daemon answer the command in `a_args'?
+		local
+			l_client: KB_DAEMON_CLIENT
+		do
+			if is_served_by_daemon (a_args.command) and then execution_environment.item ("KB_NO_DAEMON") = Void then
+				create l_client.make_from_marker (daemon_marker_path)
+				if l_client.is_connected then
+					Result := l_client.run (a_args, pager)
+					l_client.close
+				elseif l_client.port > 0 then
+					-- Marker left behind by a daemon that is gone
+					remove_daemon_marker
+				end
+			end
+		end
+
+	is_served_by_daemon (a_command: READABLE_STRING_GENERAL): BOOLEAN
+			-- Can the daemon run `a_command'? (lookups only, plus ask and stats)
+		local
+			l_words: LIST [STRING_32]
+		do
+			l_words := a_command.to_string_32.as_lower.split (' ')
+			if not l_words.is_empty then
+				Result := Daemon_commands.has (l_words.first)
+				if Result and l_words.first.same_string ("faq") and l_words.count >= 2 then
+					Result := not l_words [2].same_string ("delete")
+				end
+			end
+		end
+
+	Daemon_commands: ARRAY [STRING_32]
+			-- Commands the daemon runs
+		once
+			Result := <<"search", "class", "feature", "error", "pattern", "example", "library", "lib", "faq", "ask", "stats">>
+			Result.compare_objects
+		end
+
 feature -- Interactive Mode
 
 	run_interactive_mode
@@ -1561,7 +1895,7 @@ feature -- Interactive Mode
 					-- Skip empty input
 				elseif is_quit_command (l_input) then
 					l_done := True
-					io.put_string ("Goodbye!%N")
+					put ("Goodbye!%N")
 				else
 					dispatch_interactive_command (l_input)
 				end
@@ -1601,25 +1935,25 @@ feature -- Interactive Mode
 				-- Command dispatch - same commands as CLI mode
 				if l_cmd.same_string ("ask") then
 					if l_parts.count < 2 then
-						io.put_string ("Usage: ask <natural language question>%N")
+						put ("Usage: ask <natural language question>%N")
 					else
 						cmd_ask (join_parts (l_parts, 2))
 					end
 				elseif l_cmd.same_string ("search") then
 					if l_parts.count < 2 then
-						io.put_string ("Usage: search <query>%N")
+						put ("Usage: search <query>%N")
 					else
 						cmd_search (join_parts (l_parts, 2))
 					end
 				elseif l_cmd.same_string ("class") then
 					if l_arg.is_empty then
-						io.put_string ("Usage: class <name>%N")
+						put ("Usage: class <name>%N")
 					else
 						cmd_class (l_arg.as_upper)
 					end
 				elseif l_cmd.same_string ("feature") then
 					if l_arg.is_empty then
-						io.put_string ("Usage: feature <CLASS.name>%N")
+						put ("Usage: feature <CLASS.name>%N")
 					else
 						process_feature_arg (l_arg)
 					end
@@ -1637,7 +1971,7 @@ feature -- Interactive Mode
 					end
 				elseif l_cmd.same_string ("example") then
 					if l_parts.count < 2 then
-						io.put_string ("Usage: example <title>%N")
+						put ("Usage: example <title>%N")
 					else
 						cmd_example (join_parts (l_parts, 2))
 					end
@@ -1652,7 +1986,7 @@ feature -- Interactive Mode
 						cmd_faq_list
 					elseif l_arg.same_string ("delete") then
 						if l_arg2.is_empty then
-							io.put_string ("Usage: faq delete <id> or faq delete all%N")
+							put ("Usage: faq delete <id> or faq delete all%N")
 						else
 							cmd_faq_delete (l_arg2)
 						end
@@ -1671,36 +2005,42 @@ feature -- Interactive Mode
 						cmd_ai_off
 					elseif l_arg.same_string ("provider") then
 						if l_arg2.is_empty then
-							io.put_string ("Usage: ai provider <name>%N")
-							io.put_string ("Available: claude, openai, gemini, grok, ollama%N")
+							put ("Usage: ai provider <name>%N")
+							put ("Available: claude, openai, gemini, grok, ollama%N")
 						else
 							cmd_ai_provider (l_arg2)
 						end
 					elseif l_arg.same_string ("debug") then
 						cmd_ai_debug
+					elseif l_arg.same_string ("cache") then
+						cmd_ai_cache (l_arg2.as_lower.same_string ("clear"))
 					else
-						io.put_string ("Unknown AI command: " + l_arg.out + "%N")
-						io.put_string ("Available: status, setup, on, off, provider, debug%N")
+						put ("Unknown AI command: " + l_arg.out + "%N")
+						put ("Available: status, setup, on, off, provider, debug, cache%N")
 					end
 				elseif l_cmd.same_string ("stats") then
-					cmd_stats
+					if l_arg.as_lower.same_string ("--perf") then
+						cmd_stats_perf (l_arg2.as_lower)
+					else
+						cmd_stats
+					end
 				elseif l_cmd.same_string ("seed") then
 					cmd_seed
 				elseif l_cmd.same_string ("ingest") then
 					if l_arg.is_empty then
-						io.put_string ("Usage: ingest <path>%N")
+						put ("Usage: ingest <path>%N")
 					else
 						cmd_ingest (l_arg)
 					end
 				elseif l_cmd.same_string ("rosetta") then
 					if l_arg.is_empty then
-						io.put_string ("Usage: rosetta <path>%N")
+						put ("Usage: rosetta <path>%N")
 					else
 						cmd_rosetta (l_arg)
 					end
 				elseif l_cmd.same_string ("mbox") then
 					if l_arg.is_empty then
-						io.put_string ("Usage: mbox <file.mbox>%N")
+						put ("Usage: mbox <file.mbox>%N")
 					else
 						cmd_mbox (l_arg)
 					end
@@ -1725,7 +2065,7 @@ feature -- Interactive Mode
 				elseif l_cmd.same_string ("cls") or l_cmd.same_string ("clear-screen") then
 					cmd_clear_screen
 				else
-					io.put_string ("Unknown command: " + l_cmd.out + ". Type 'help' for commands.%N")
+					put ("Unknown command: " + l_cmd.out + ". Type 'help' for commands.%N")
 				end
 			end
 		end
@@ -1754,16 +2094,16 @@ feature -- Interactive Mode
 	print_header
 			-- Print the header banner with version
 		do
-			io.put_string ("Eiffel Knowledge Base v" + Version + "%N")
-			io.put_string ("===================================%N")
-			io.put_string ("Type 'help' for commands, 'quit' to exit%N%N")
+			put ("Eiffel Knowledge Base v" + Version + "%N")
+			put ("===================================%N")
+			put ("Type 'help' for commands, 'quit' to exit%N%N")
 		end
 
 	cmd_clear_screen
 			-- Clear screen and reprint header
 		do
 			-- ANSI escape sequence to clear screen and move cursor to top
-			io.put_string ("%/27/[2J%/27/[H")
+			put ("%/27/[2J%/27/[H")
 			print_header
 		end
 
@@ -1795,7 +2135,7 @@ feature -- Interactive Mode
 	show_interactive_help
 			-- Show interactive mode help (same commands as CLI)
 		do
-			io.put_string ("[
+			put ("[
 Interactive Mode Commands
 =========================
 
@@ -1816,6 +2156,7 @@ AI COMMANDS:
     ai on              Enable AI-assisted mode
     ai off             Disable AI (use direct search)
     ai provider <l_name> Switch AI provider
+    ai cache [clear]   Show (or empty) the cache of AI responses
 
 ADMIN COMMANDS:
     ingest <l_path>      Index source files from l_path
@@ -1823,7 +2164,12 @@ ADMIN COMMANDS:
     mbox <file>        Import Q&A from mbox archive
     seed               Populate l_error codes + l_patterns
     l_stats              Show database statistics
+    stats --perf       Latency per search/ask phase (p50/p95/p99 ms)
+    stats --perf --json  Same figures as JSON; 'stats --perf reset' clears them
     clear <l_target>     Clear data (all|classes|examples|l_errors|l_patterns)
+    batch <file|->     Answer one query per line as NDJSON (parallel readers)
+    serve [port]       Keep kb.db open in a background daemon (default port 7433)
+    serve stop         Stop the daemon
     help               Show this help message
     quit               Exit interactive mode
 
@@ -1842,7 +2188,26 @@ EXAMPLES:
 feature {NONE} -- Implementation
 
 	db: KB_DATABASE
-			-- Database connection
+			-- Database connection (opened on first use)
+		attribute
+			create Result.make (default_db_path)
+			is_db_open := True
+		end
+
+	is_db_open: BOOLEAN
+			-- Has `db' been opened?
+
+	faq_store: KB_FAQ_STORE
+			-- FAQ store on `db', kept for the life of the process
+		attribute
+			create Result.make (db.db)
+		end
+
+	session: detachable KB_DAEMON_SESSION
+			-- Client being served, while the daemon runs a command
+
+	captured: detachable STRING_8
+			-- Output collected instead of printed, while `output_of' runs
 
 	ai_config: detachable KB_AI_CONFIG
 			-- AI provider configuration (lazy initialized)
@@ -1876,6 +2241,105 @@ feature {NONE} -- Implementation
 			end
 		end
 
+	daemon_marker_path: STRING_32
+			-- File announcing a running daemon (next to the database)
+		local
+			l_path: PATH
+		once
+			create l_path.make_from_string (default_db_path)
+			if attached l_path.parent as al_dir then
+				Result := al_dir.extended ("kb.daemon").name.to_string_32
+			else
+				Result := "kb.daemon"
+			end
+		end
+
+	perf_path: STRING_32
+			-- File keeping the phase timings between runs (next to the database)
+		local
+			l_path: PATH
+		once
+			create l_path.make_from_string (default_db_path)
+			if attached l_path.parent as al_dir then
+				Result := al_dir.extended ("kb.perf").name.to_string_32
+			else
+				Result := "kb.perf"
+			end
+		end
+
+	remove_daemon_marker
+			-- Delete `daemon_marker_path' if present
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_failed: BOOLEAN
+		do
+			if not l_failed then
+				create l_file.make_with_name (daemon_marker_path)
+				if l_file.exists then
+					l_file.delete
+				end
+			end
+		rescue
+			l_failed := True
+			retry
+		end
+
+	put (a_text: READABLE_STRING_8)
+			-- Print `a_text' (to the daemon client while serving one)
+		do
+			if attached session as al_session then
+				al_session.put (a_text)
+			elseif attached captured as al_captured then
+				al_captured.append (a_text)
+			else
+				io.put_string (a_text)
+			end
+		end
+
+	read_input (a_prompt: READABLE_STRING_8): STRING
+			-- Line typed in answer to `a_prompt'
+		do
+			if attached session as al_session then
+				Result := al_session.prompt (a_prompt)
+			elseif attached captured as al_captured then
+				-- Nobody to ask: Enter
+				al_captured.append (a_prompt)
+				create Result.make_empty
+			else
+				io.put_string (a_prompt)
+				io.read_line
+				Result := io.last_string.twin
+			end
+		end
+
+	show_paged (a_text: READABLE_STRING_GENERAL)
+			-- Show `a_text' through the pager (the client's while serving one)
+		do
+			if attached session as al_session then
+				al_session.page ({UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (a_text.to_string_32))
+			elseif attached captured as al_captured then
+				al_captured.append ({UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 (a_text.to_string_32))
+			else
+				pager.show (a_text)
+			end
+		end
+
+	show_streamed (a_piece: STRING_32)
+			-- Show `a_piece' of an answer being generated (on the client while
+			-- serving one), sanitized as the whole answer would be
+		local
+			l_text: STRING_8
+		do
+			l_text := {UTF_CONVERTER}.utf_32_string_to_utf_8_string_8 ({KB_QUERY_RESULT}.sanitize_for_console (a_piece))
+			if attached session as al_session then
+				al_session.stream (l_text)
+			elseif attached captured as al_captured then
+				al_captured.append (l_text)
+			elseif pager.is_streaming then
+				pager.put_stream (l_text)
+			end
+		end
+
 	truncate (a_text: STRING_32; a_max: INTEGER): STRING_32
 			-- Truncate text to max length
 		do
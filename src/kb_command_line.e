@@ -0,0 +1,114 @@
+note
+	description: "[
+		KB_COMMAND_LINE - Arguments of One kb Command
+
+		The words `kb' was run with, whether they come from the process
+		(ARGUMENTS_32) or from a daemon request, so KB_CLI_APP parses both
+		the same way: `kb search foo bar' searches "foo" and `kb search
+		"foo bar"' searches "foo bar" either way.
+
+		A daemon request carries them as `lines', one argument per line.
+
+		Usage:
+			create line.make_from_arguments (create {ARGUMENTS_32})
+			create line.make (<<"search", "foo bar">>)
+			line.argument (2)    -- "foo bar"
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_COMMAND_LINE
+
+create
+	make,
+	make_from_arguments,
+	make_from_lines
+
+feature {NONE} -- Initialization
+
+	make (a_arguments: ITERABLE [READABLE_STRING_GENERAL])
+			-- Command line of `a_arguments', in order
+		do
+			create arguments.make (4)
+			across a_arguments as a loop
+				arguments.extend (a.to_string_32)
+			end
+		end
+
+	make_from_arguments (a_args: ARGUMENTS_32)
+			-- Command line the process was run with
+		local
+			i: INTEGER
+		do
+			create arguments.make (a_args.argument_count)
+			from i := 1 until i > a_args.argument_count loop
+				arguments.extend (a_args.argument (i).twin)
+				i := i + 1
+			end
+		ensure
+			same_count: argument_count = a_args.argument_count
+		end
+
+	make_from_lines (a_lines: READABLE_STRING_GENERAL)
+			-- Command line with one argument per line of `a_lines'
+		do
+			create arguments.make (4)
+			if not a_lines.is_empty then
+				across a_lines.to_string_32.split ('%N') as a loop
+					arguments.extend (a)
+				end
+			end
+		end
+
+feature -- Access
+
+	argument (i: INTEGER): STRING_32
+			-- `i'-th argument (the command is the first)
+		require
+			valid_index: i >= 1 and i <= argument_count
+		do
+			Result := arguments [i].twin
+		end
+
+	argument_count: INTEGER
+			-- Number of arguments
+		do
+			Result := arguments.count
+		end
+
+	lines: STRING_32
+			-- Arguments one per line, as a daemon request carries them
+		do
+			Result := joined ('%N')
+		end
+
+	command: STRING_32
+			-- Arguments separated by spaces, e.g. "search foo bar"
+		do
+			Result := joined (' ')
+		end
+
+feature {NONE} -- Implementation
+
+	arguments: ARRAYED_LIST [STRING_32]
+			-- Arguments, in order
+
+	joined (a_separator: CHARACTER_32): STRING_32
+			-- Arguments with `a_separator' between them
+		local
+			i: INTEGER
+		do
+			create Result.make (40)
+			from i := 1 until i > arguments.count loop
+				if i > 1 then
+					Result.append_character (a_separator)
+				end
+				Result.append (arguments [i])
+				i := i + 1
+			end
+		end
+
+invariant
+	arguments_not_void: arguments /= Void
+
+end
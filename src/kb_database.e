@@ -13,6 +13,7 @@ note
 			- patterns: Design patterns with Eiffel idioms
 			- translations: Language translation mappings
 			- kb_search: FTS5 virtual table for full-text search
+			- kb_search_vocab: fts5vocab terms of kb_search (keyword extraction)
 
 		Usage:
 			db: KB_DATABASE
@@ -33,8 +34,14 @@ inherit
 			default_create
 		end
 
+	KB_SHARED_PERF
+		undefine
+			default_create
+		end
+
 create
 	make,
+	make_reader,
 	make_in_memory,
 	default_create
 
@@ -52,19 +59,48 @@ feature {NONE} -- Initialization
 			path_not_empty: not a_path.is_empty
 		do
 			db_path := a_path.to_string_32
+			create tuning.make_from_config (config_path)
 			create db.make (db_path)
+			create search_cache.make (db, Search_cache_capacity)
+			snippet_tokens := Default_snippet_tokens
 			if db.is_open then
+				tuning.apply (db)
 				ensure_schema
 			end
 		ensure
 			path_set: db_path.same_string_general (a_path)
 		end
 
+	make_reader (a_path: READABLE_STRING_GENERAL)
+			-- Open the existing database at path for lookups only: no schema
+			-- checks, and PRAGMA query_only rejects writes. Under WAL several
+			-- readers run alongside each other and one writer.
+		require
+			path_not_empty: not a_path.is_empty
+		do
+			db_path := a_path.to_string_32
+			create tuning.make_from_config (config_path)
+			create db.make (db_path)
+			create search_cache.make (db, Search_cache_capacity)
+			snippet_tokens := Default_snippet_tokens
+			if db.is_open then
+				tuning.apply (db)
+				db.execute ("PRAGMA query_only = ON")
+				is_external_content := is_external_fts ("kb_search")
+				has_name_index := not fts_create_sql ("class_names").is_empty and not fts_create_sql ("feature_names").is_empty
+			end
+		ensure
+			path_set: db_path.same_string_general (a_path)
+		end
+
 	make_in_memory
 			-- Create in-memory database (for testing)
 		do
 			db_path := ":memory:"
+			create tuning.make_serving
 			create db.make_memory
+			create search_cache.make (db, Search_cache_capacity)
+			snippet_tokens := Default_snippet_tokens
 			if db.is_open then
 				ensure_schema
 			end
@@ -80,6 +116,40 @@ feature -- Access
 	db: SIMPLE_SQL_DATABASE
 			-- Underlying database connection
 
+	tuning: KB_DB_TUNING
+			-- PRAGMA profile applied to `db'
+
+	search_cache: KB_RESULT_CACHE [ARRAYED_LIST [KB_RESULT]]
+			-- Recent `search' results, dropped on any write
+
+	Search_cache_capacity: INTEGER = 256
+			-- Distinct searches kept in `search_cache'
+
+	snippet_tokens: INTEGER
+			-- Tokens of body text `search' returns per result (0: whole body)
+
+	Default_snippet_tokens: INTEGER = 24
+			-- `snippet_tokens' of a new connection
+
+	Max_snippet_tokens: INTEGER = 64
+			-- Largest window FTS5 snippet() returns
+
+	Feature_batch_size: INTEGER = 500
+			-- Class IDs per `load_features' query (under SQLite's 999 variables)
+
+	config_path: STRING_32
+			-- kb.toml next to the database file (see KB_DB_TUNING)
+		local
+			l_path: PATH
+		do
+			create l_path.make_from_string (db_path)
+			if attached l_path.parent as al_parent_dir then
+				Result := al_parent_dir.extended ("kb.toml").name
+			else
+				Result := {STRING_32} "kb.toml"
+			end
+		end
+
 	default_db_path: STRING_32
 			-- Default database location (colocated with executable)
 		local
@@ -104,6 +174,35 @@ feature -- Access
 
 feature -- Status
 
+	is_external_content: BOOLEAN
+			-- Are kb_search and faq_search external-content tables
+			-- (index only, text read from the base tables)?
+
+	has_name_index: BOOLEAN
+			-- Are class and feature names in the class_names and
+			-- feature_names trigram indexes (SQLite 3.34+)?
+
+	search_prefix (a_table: STRING): STRING
+			-- Prefix index lengths FTS5 table `a_table' was created with,
+			-- e.g. "2 3 4" (empty if none)
+		require
+			is_open: is_open
+		local
+			l_sql: STRING
+			l_start, l_end: INTEGER
+		do
+			create Result.make_empty
+			l_sql := fts_create_sql (a_table)
+			l_start := l_sql.substring_index ("prefix='", 1)
+			if l_start > 0 then
+				l_start := l_start + 8
+				l_end := l_sql.index_of ('%'', l_start)
+				if l_end > l_start then
+					Result := l_sql.substring (l_start, l_end - 1)
+				end
+			end
+		end
+
 	is_open: BOOLEAN
 			-- Is database connection open?
 		do
@@ -142,6 +241,37 @@ feature -- Status
 			end
 		end
 
+feature -- Settings
+
+	use_tuning (a_profile: READABLE_STRING_GENERAL)
+			-- Switch to tuning profile `a_profile' (e.g. "bulk" around a large ingest)
+		require
+			is_open: is_open
+		do
+			create tuning.make_named (a_profile, config_path)
+			tuning.apply (db)
+		end
+
+	use_configured_tuning
+			-- Switch back to the profile selected in kb.toml
+		require
+			is_open: is_open
+		do
+			create tuning.make_from_config (config_path)
+			tuning.apply (db)
+		end
+
+	set_snippet_tokens (a_tokens: INTEGER)
+			-- Return windows of `a_tokens' tokens of each body from `search'
+			-- (0: whole bodies)
+		require
+			valid_size: a_tokens >= 0 and a_tokens <= Max_snippet_tokens
+		do
+			snippet_tokens := a_tokens
+		ensure
+			set: snippet_tokens = a_tokens
+		end
+
 feature -- Schema
 
 	ensure_schema
@@ -151,6 +281,7 @@ feature -- Schema
 		do
 			create_classes_table
 			create_features_table
+			create_name_indexes
 			create_class_parents_table
 			create_libraries_table
 			create_examples_table
@@ -159,6 +290,7 @@ feature -- Schema
 			create_translations_table
 			create_fts5_index
 			create_faq_tables
+			migrate_search_prefix
 		end
 
 feature {NONE} -- Schema Creation
@@ -204,6 +336,62 @@ feature {NONE} -- Schema Creation
 			]")
 		end
 
+	create_name_indexes
+			-- Trigram indexes of class and feature names (rowid = row id), kept
+			-- by triggers, for substring, prefix and typo-tolerant lookups
+			-- that do not scan `classes' or `features'. Filled from the
+			-- tables when first created; skipped if SQLite lacks the trigram
+			-- tokenizer (lookups then fall back to LIKE scans).
+		local
+			l_fill_classes, l_fill_features: BOOLEAN
+		do
+			l_fill_classes := fts_create_sql ("class_names").is_empty
+			l_fill_features := fts_create_sql ("feature_names").is_empty
+			db.execute ("CREATE VIRTUAL TABLE IF NOT EXISTS class_names USING fts5(name, tokenize='trigram')")
+			db.execute ("CREATE VIRTUAL TABLE IF NOT EXISTS feature_names USING fts5(name, tokenize='trigram')")
+			has_name_index := not fts_create_sql ("class_names").is_empty and not fts_create_sql ("feature_names").is_empty
+			if has_name_index then
+				-- INSERT OR REPLACE does not fire the delete triggers:
+				-- add_class and add_feature drop the old entry themselves
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS classes_names_ai AFTER INSERT ON classes BEGIN
+						INSERT INTO class_names (rowid, name) VALUES (new.id, new.name);
+					END
+				]")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS classes_names_ad AFTER DELETE ON classes BEGIN
+						DELETE FROM class_names WHERE rowid = old.id;
+					END
+				]")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS classes_names_au AFTER UPDATE OF name ON classes BEGIN
+						UPDATE class_names SET name = new.name WHERE rowid = old.id;
+					END
+				]")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS features_names_ai AFTER INSERT ON features BEGIN
+						INSERT INTO feature_names (rowid, name) VALUES (new.id, new.name);
+					END
+				]")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS features_names_ad AFTER DELETE ON features BEGIN
+						DELETE FROM feature_names WHERE rowid = old.id;
+					END
+				]")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS features_names_au AFTER UPDATE OF name ON features BEGIN
+						UPDATE feature_names SET name = new.name WHERE rowid = old.id;
+					END
+				]")
+				if l_fill_classes then
+					db.execute ("INSERT INTO class_names (rowid, name) SELECT id, name FROM classes")
+				end
+				if l_fill_features then
+					db.execute ("INSERT INTO feature_names (rowid, name) SELECT id, name FROM features")
+				end
+			end
+		end
+
 	create_examples_table
 			-- Create examples table
 		do
@@ -300,16 +488,101 @@ feature {NONE} -- Schema Creation
 	create_fts5_index
 			-- Create FTS5 full-text search virtual table
 		do
-			db.execute ("[
+			step ("[
 				CREATE VIRTUAL TABLE IF NOT EXISTS kb_search USING fts5(
 					content_type,
 					content_id,
 					title,
 					body,
 					tags,
-					tokenize='porter unicode61'
+			]" + fts5_options + ")")
+			-- Term and document counts of kb_search, for KB_KEYWORD_EXTRACTOR
+			step ("CREATE VIRTUAL TABLE IF NOT EXISTS kb_search_vocab USING fts5vocab(kb_search, 'row')")
+			create_search_source_view
+			is_external_content := is_external_fts ("kb_search")
+			map_legacy_search_rows
+		end
+
+	create_search_source_view
+			-- Document map and view that rebuild each kb_search row from its base table.
+			-- kb_search_docs gives every indexed base row the kb_search rowid it
+			-- is stored under, so updates and deletes find it by rowid instead of
+			-- scanning content_type/content_id. The view is the content table
+			-- when kb_search is external-content (see `rebuild_search_indexes')
+			-- and the source of every index_document row.
+		do
+			step ("[
+				CREATE TABLE IF NOT EXISTS kb_search_docs (
+					id INTEGER PRIMARY KEY,
+					content_type TEXT NOT NULL,
+					content_id INTEGER NOT NULL,
+					UNIQUE(content_type, content_id)
 				)
 			]")
+			step ("[
+				CREATE VIEW IF NOT EXISTS kb_search_source AS
+				SELECT d.id AS doc_id, d.content_type,
+					CASE d.content_type WHEN 'error' THEN e.code ELSE CAST(d.content_id AS TEXT) END AS content_id,
+					CASE d.content_type
+						WHEN 'error' THEN e.code
+						WHEN 'class' THEN c.name
+						WHEN 'feature' THEN f.name
+						WHEN 'example' THEN x.title
+						WHEN 'pattern' THEN p.name
+					END AS title,
+					CASE d.content_type
+						WHEN 'error' THEN COALESCE(e.meaning, '') || ' ' || COALESCE(e.explanation, '')
+						WHEN 'class' THEN c.description
+						WHEN 'feature' THEN COALESCE(f.signature, '') || ' ' || COALESCE(f.description, '')
+						WHEN 'example' THEN x.code
+						WHEN 'pattern' THEN COALESCE(p.description, '') || ' ' || p.code
+					END AS body,
+					CASE d.content_type
+						WHEN 'error' THEN 'error compiler'
+						WHEN 'class' THEN c.library
+						WHEN 'feature' THEN f.kind
+						WHEN 'example' THEN x.tags
+						WHEN 'pattern' THEN 'pattern design'
+					END AS tags
+				FROM kb_search_docs d
+				LEFT JOIN errors e ON d.content_type = 'error' AND e.id = d.content_id
+				LEFT JOIN classes c ON d.content_type = 'class' AND c.id = d.content_id
+				LEFT JOIN features f ON d.content_type = 'feature' AND f.id = d.content_id
+				LEFT JOIN examples x ON d.content_type = 'example' AND x.id = d.content_id
+				LEFT JOIN patterns p ON d.content_type = 'pattern' AND p.id = d.content_id
+			]")
+		end
+
+	map_legacy_search_rows
+			-- Re-insert kb_search rows stored without a kb_search_docs entry
+			-- (regular indexes written before the map was kept for them), once
+		do
+			if not is_in_transaction and then not is_external_content and then
+				safe_count ("SELECT NOT EXISTS (SELECT 1 FROM kb_search_docs) AND EXISTS (SELECT 1 FROM kb_search)") = 1
+			then
+				begin_transaction
+				map_search_documents
+				step ("DELETE FROM kb_search")
+				step ("[
+					INSERT INTO kb_search (rowid, content_type, content_id, title, body, tags)
+					SELECT doc_id, content_type, content_id, title, body, tags FROM kb_search_source
+				]")
+				end_transaction
+			end
+		end
+
+	map_search_documents
+			-- Map every indexed base row to a fresh kb_search_docs id
+		do
+			step ("DELETE FROM kb_search_docs")
+			step ("[
+				INSERT INTO kb_search_docs (content_type, content_id)
+				SELECT 'error', id FROM errors
+				UNION ALL SELECT 'class', id FROM classes
+				UNION ALL SELECT 'feature', id FROM features
+				UNION ALL SELECT 'example', id FROM examples
+				UNION ALL SELECT 'pattern', id FROM patterns
+			]")
 		end
 
 	create_faq_tables
@@ -340,7 +613,53 @@ feature {NONE} -- Schema Creation
 				)
 			]")
 			db.execute ("CREATE INDEX IF NOT EXISTS idx_faq_tag ON faq_tags(tag)")
-			
+
+			-- MinHash band buckets for near-duplicate lookups (KB_FAQ_MINHASH)
+			db.execute ("[
+				CREATE TABLE IF NOT EXISTS faq_lsh (
+					bucket INTEGER NOT NULL,
+					faq_id INTEGER NOT NULL,
+					PRIMARY KEY (bucket, faq_id)
+				) WITHOUT ROWID
+			]")
+			db.execute ("CREATE INDEX IF NOT EXISTS idx_faq_lsh_faq ON faq_lsh(faq_id)")
+			db.execute ("[
+				CREATE TRIGGER IF NOT EXISTS faqs_lsh_ad AFTER DELETE ON faqs BEGIN
+					DELETE FROM faq_lsh WHERE faq_id = old.id;
+				END
+			]")
+
+			-- Questions already answered, verbatim and normalized, for
+			-- repeat lookups (KB_FAQ_STORE.answered_faq)
+			db.execute ("CREATE INDEX IF NOT EXISTS idx_faqs_question ON faqs(question)")
+			db.execute ("[
+				CREATE TABLE IF NOT EXISTS faq_questions (
+					question_key TEXT NOT NULL,
+					faq_id INTEGER NOT NULL,
+					PRIMARY KEY (question_key, faq_id)
+				) WITHOUT ROWID
+			]")
+			db.execute ("CREATE INDEX IF NOT EXISTS idx_faq_questions_faq ON faq_questions(faq_id)")
+			db.execute ("[
+				CREATE TRIGGER IF NOT EXISTS faqs_questions_ad AFTER DELETE ON faqs BEGIN
+					DELETE FROM faq_questions WHERE faq_id = old.id;
+				END
+			]")
+			create_faq_questions_queue
+
+			-- Term vectors for paraphrase lookups (KB_FAQ_VECTORS)
+			db.execute ("[
+				CREATE TABLE IF NOT EXISTS faq_vectors (
+					faq_id INTEGER PRIMARY KEY,
+					terms TEXT NOT NULL
+				)
+			]")
+			db.execute ("[
+				CREATE TRIGGER IF NOT EXISTS faqs_vectors_ad AFTER DELETE ON faqs BEGIN
+					DELETE FROM faq_vectors WHERE faq_id = old.id;
+				END
+			]")
+
 			-- FTS5 index for FAQ search
 			db.execute ("[
 				CREATE VIRTUAL TABLE IF NOT EXISTS faq_search USING fts5(
@@ -349,9 +668,141 @@ feature {NONE} -- Schema Creation
 					answer,
 					keywords,
 					tags,
-					tokenize='porter unicode61'
-				)
+			]" + fts5_options + ")")
+
+			-- Content view for external-content faq_search (column names must match)
+			db.execute ("[
+				CREATE VIEW IF NOT EXISTS faq_search_source AS
+				SELECT id, CAST(id AS TEXT) AS faq_id, question, answer, keywords, tags FROM faqs
 			]")
+
+			create_faq_search_sync
+		end
+
+	create_faq_questions_queue
+			-- Queue every FAQ whose question is added or reworded, by any
+			-- writer (kb, scripts/faq_loader.py), in faq_questions_pending
+			-- until KB_FAQ_STORE keys it into faq_questions.
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			db.execute ("CREATE TABLE IF NOT EXISTS faq_questions_pending (faq_id INTEGER PRIMARY KEY)")
+			l_result := db.query ("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = 'faqs_questions_ai'")
+			if l_result.is_empty then
+				-- One-time migration: re-key every FAQ stored so far
+				db.execute ("DELETE FROM faq_questions")
+				db.execute ("INSERT OR IGNORE INTO faq_questions_pending (faq_id) SELECT id FROM faqs")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS faqs_questions_ai AFTER INSERT ON faqs BEGIN
+						INSERT OR IGNORE INTO faq_questions_pending (faq_id) VALUES (new.id);
+					END
+				]")
+				db.execute ("[
+					CREATE TRIGGER IF NOT EXISTS faqs_questions_au AFTER UPDATE OF question ON faqs
+					WHEN new.question IS NOT old.question BEGIN
+						DELETE FROM faq_questions WHERE faq_id = old.id;
+						INSERT OR IGNORE INTO faq_questions_pending (faq_id) VALUES (new.id);
+					END
+				]")
+			end
+		end
+
+	create_faq_search_sync
+			-- Keep faq_search in step with faqs through triggers.
+			-- faq_search rowid equals faqs.id, so each change costs one
+			-- rowid lookup instead of a scan or a full rebuild.
+			-- Same triggers as scripts/faq_loader.py ensure_search_sync.
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			l_result := db.query ("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = 'faqs_search_ai'")
+			if l_result.is_empty then
+				-- One-time migration: re-key existing index rows by faq id
+				if is_external_fts ("faq_search") then
+					db.execute ("INSERT INTO faq_search (faq_search) VALUES ('rebuild')")
+				else
+					db.execute ("DELETE FROM faq_search")
+					db.execute ("[
+						INSERT INTO faq_search (rowid, faq_id, question, answer, keywords, tags)
+						SELECT id, CAST(id AS TEXT), question, answer, keywords, tags FROM faqs
+					]")
+				end
+				create_faq_search_triggers
+			end
+		end
+
+	create_faq_search_triggers
+			-- (Re)create the faqs triggers for the current faq_search storage.
+			-- An external-content index is told which tokens to drop with a
+			-- 'delete' command carrying the old values.
+		local
+			l_insert, l_remove: STRING
+		do
+			l_insert := "[
+				INSERT INTO faq_search (rowid, faq_id, question, answer, keywords, tags)
+				VALUES (new.id, CAST(new.id AS TEXT), new.question, new.answer, new.keywords, new.tags);
+			]"
+			if is_external_fts ("faq_search") then
+				l_remove := "[
+					INSERT INTO faq_search (faq_search, rowid, faq_id, question, answer, keywords, tags)
+					VALUES ('delete', old.id, CAST(old.id AS TEXT), old.question, old.answer, old.keywords, old.tags);
+				]"
+			else
+				l_remove := "DELETE FROM faq_search WHERE rowid = old.id;"
+			end
+			step ("DROP TRIGGER IF EXISTS faqs_search_ai")
+			step ("DROP TRIGGER IF EXISTS faqs_search_ad")
+			step ("DROP TRIGGER IF EXISTS faqs_search_au")
+			step ("CREATE TRIGGER faqs_search_ai AFTER INSERT ON faqs BEGIN " + l_insert + " END")
+			step ("CREATE TRIGGER faqs_search_ad AFTER DELETE ON faqs BEGIN " + l_remove + " END")
+			step ("CREATE TRIGGER faqs_search_au AFTER UPDATE OF question, answer, keywords, tags ON faqs BEGIN " +
+				l_remove + " " + l_insert + " END")
+		end
+
+	is_external_fts (a_table: STRING): BOOLEAN
+			-- Is FTS5 table `a_table' external-content (reads its text from a view)?
+		do
+			Result := fts_create_sql (a_table).has_substring ("content=")
+		end
+
+	fts_create_sql (a_table: STRING): STRING
+			-- CREATE statement of `a_table' (empty if it does not exist)
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			create Result.make_empty
+			l_result := db.query_with_args (
+				"SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+				<<a_table>>
+			)
+			if not l_result.is_empty and then attached l_result.rows.first.item (1) as al_sql then
+				Result := al_sql.out
+			end
+		end
+
+	fts5_options: STRING
+			-- Options closing every kb_search and faq_search CREATE statement:
+			-- prefix indexes from `tuning' (so `term*' queries of those lengths
+			-- read one index entry instead of every matching term) and tokenizer
+		do
+			create Result.make (48)
+			if not tuning.fts_prefix.is_empty then
+				Result.append ("prefix='" + tuning.fts_prefix + "', ")
+			end
+			Result.append ("tokenize='porter unicode61'")
+		end
+
+	migrate_search_prefix
+			-- Rebuild kb_search and faq_search, keeping their storage, when
+			-- their prefix indexes differ from kb.toml (once per change).
+			-- Runs in one write transaction: in WAL mode readers keep the
+			-- old index until it commits.
+		do
+			if not search_prefix ("kb_search").same_string (tuning.fts_prefix) or
+				not search_prefix ("faq_search").same_string (tuning.fts_prefix)
+			then
+				rebuild_search_indexes (is_external_content)
+			end
 		end
 
 feature -- Search
@@ -363,32 +814,162 @@ feature -- Search
 			is_open: is_open
 			query_not_empty: not a_query.is_empty
 			positive_limit: a_limit > 0
+		do
+			Result := search_type (a_query, "", a_limit)
+		ensure
+			result_not_void: Result /= Void
+			within_limit: Result.count <= a_limit
+		end
+
+	search_type (a_query, a_type: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_RESULT]
+			-- Search entries of content type `a_type' (class, feature, example,
+			-- error, pattern; empty for all) with FTS5.
+			-- Repeated searches are answered from `search_cache' until the next write.
+		require
+			is_open: is_open
+			query_not_empty: not a_query.is_empty
+			positive_limit: a_limit > 0
 		local
 			l_result: SIMPLE_SQL_RESULT
 			l_item: KB_RESULT
 			l_sql: STRING
-			l_fts_query: STRING_32
+			l_fts_query, l_key: STRING_32
+			l_started: DATE_TIME
 		do
-			create Result.make (a_limit)
-
+			l_started := perf.now
 			-- Format query for FTS5
 			-- Multi-word: join with AND for "all words must match"
 			l_fts_query := format_fts5_query (a_query)
+			l_key := l_fts_query + {STRING_32} "%T" + a_limit.out + {STRING_32} "%T" + a_type.to_string_32 +
+				{STRING_32} "%T" + snippet_tokens.out
 
-			-- FTS5 search with BM25 ranking
-			l_sql := "SELECT content_type, content_id, title, body, bm25(kb_search) as rank FROM kb_search WHERE kb_search MATCH ? ORDER BY rank LIMIT " + a_limit.out
+			if attached search_cache.item (l_key) as al_cached then
+				Result := al_cached.twin
+			else
+				create Result.make (a_limit)
 
-			l_result := db.query_with_args (l_sql, <<l_fts_query>>)
+				-- FTS5 search with BM25 ranking; only a window of each body
+				-- unless `snippet_tokens' is 0 (see `load_result_body')
+				if snippet_tokens > 0 then
+					l_sql := "SELECT content_type, content_id, title, snippet(kb_search, 3, '', '', '...', " +
+						snippet_tokens.out + ") AS body, bm25(kb_search) AS rank, rowid AS doc_id FROM kb_search WHERE kb_search MATCH ?"
+				else
+					l_sql := "SELECT content_type, content_id, title, body, bm25(kb_search) AS rank, rowid AS doc_id FROM kb_search WHERE kb_search MATCH ?"
+				end
+				if a_type.is_empty then
+					l_result := db.query_with_args (l_sql + " ORDER BY rank LIMIT " + a_limit.out, <<l_fts_query>>)
+				else
+					l_result := db.query_with_args (l_sql + " AND content_type = ? ORDER BY rank LIMIT " + a_limit.out,
+						<<l_fts_query, a_type.to_string_32>>)
+				end
 
-			across l_result.rows as row loop
-				create l_item.make_from_row (row)
-				Result.extend (l_item)
+				across l_result.rows as row loop
+					create l_item.make_from_row (row)
+					if snippet_tokens = 0 then
+						l_item.set_full_body (l_item.snippet)
+					end
+					Result.extend (l_item)
+				end
+				search_cache.put (Result.twin, l_key)
 			end
+			perf.record ("search", l_started)
 		ensure
 			result_not_void: Result /= Void
 			within_limit: Result.count <= a_limit
 		end
 
+	load_result_body (a_result: KB_RESULT)
+			-- Read the whole body of `a_result' into its `full_body', if not
+			-- there yet (one rowid lookup)
+		require
+			is_open: is_open
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			if not attached a_result.full_body and a_result.doc_id > 0 then
+				l_result := db.query_with_args ("SELECT body FROM kb_search WHERE rowid = ?", <<a_result.doc_id>>)
+				if not l_result.is_empty and then attached l_result.rows.first.item (1) as al_body then
+					a_result.set_full_body (al_body.out)
+				else
+					a_result.set_full_body ("")
+				end
+			end
+		ensure
+			loaded: a_result.doc_id > 0 implies attached a_result.full_body
+		end
+
+feature -- Index Storage
+
+	rebuild_search_indexes (a_external: BOOLEAN)
+			-- Recreate kb_search and faq_search from the base tables.
+			-- With `a_external' both become external-content tables that keep
+			-- only the index and read text through kb_search_source and
+			-- faq_search_source; otherwise each stores its own copy of the text.
+			-- Dropped pages go to the freelist: VACUUM to shrink the file.
+			-- All in one transaction, rolled back at the first failed
+			-- statement: the old indexes and `is_external_content' stay.
+		require
+			is_open: is_open
+		local
+			l_was_external: BOOLEAN
+		do
+			l_was_external := is_external_content
+			begin_transaction
+			map_search_documents
+			step ("DROP TABLE IF EXISTS kb_search")
+			step ("DROP TABLE IF EXISTS faq_search")
+			if a_external then
+				step ("[
+					CREATE VIRTUAL TABLE kb_search USING fts5(
+						content_type,
+						content_id,
+						title,
+						body,
+						tags,
+						content='kb_search_source',
+						content_rowid='doc_id',
+				]" + fts5_options + ")")
+				step ("INSERT INTO kb_search (kb_search) VALUES ('rebuild')")
+				step ("[
+					CREATE VIRTUAL TABLE faq_search USING fts5(
+						faq_id,
+						question,
+						answer,
+						keywords,
+						tags,
+						content='faq_search_source',
+						content_rowid='id',
+				]" + fts5_options + ")")
+				step ("INSERT INTO faq_search (faq_search) VALUES ('rebuild')")
+			else
+				create_fts5_index
+				step ("[
+					INSERT INTO kb_search (rowid, content_type, content_id, title, body, tags)
+					SELECT doc_id, content_type, content_id, title, body, tags FROM kb_search_source
+				]")
+				step ("[
+					CREATE VIRTUAL TABLE faq_search USING fts5(
+						faq_id,
+						question,
+						answer,
+						keywords,
+						tags,
+				]" + fts5_options + ")")
+				step ("[
+					INSERT INTO faq_search (rowid, faq_id, question, answer, keywords, tags)
+					SELECT id, faq_id, question, answer, keywords, tags FROM faq_search_source
+				]")
+			end
+			create_faq_search_triggers
+			end_transaction
+			if transaction_committed then
+				is_external_content := a_external
+			else
+				is_external_content := l_was_external
+			end
+			search_cache.wipe_out
+		end
+
 feature -- Error Operations
 
 	get_error (a_code: READABLE_STRING_GENERAL): detachable KB_ERROR_INFO
@@ -414,6 +995,8 @@ feature -- Error Operations
 			is_open: is_open
 			error_valid: a_error.is_valid
 		do
+			-- Drop the old index entry while its row is still readable
+			unindex_error (a_error.code)
 			db.execute_with_args ("[
 				INSERT OR REPLACE INTO errors
 				(code, meaning, explanation, common_causes, fixes, examples, ecma_section)
@@ -486,34 +1069,137 @@ feature -- Class Operations
 		end
 
 	search_classes (a_query: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_CLASS_INFO]
-			-- Search for classes by partial name match
+			-- Search for classes by partial name match ("JSON"), or by
+			-- prefix with a trailing '*' ("SIMPLE_J*")
+			-- (features are not read; see `load_features')
 		require
 			is_open: is_open
 			positive_limit: a_limit > 0
 		local
 			l_result: SIMPLE_SQL_RESULT
 			l_class: KB_CLASS_INFO
-			l_pattern: STRING
+			l_pattern: STRING_32
 		do
 			create Result.make (a_limit)
-			l_pattern := "%%" + a_query.out.as_upper + "%%"
-			l_result := db.query_with_args (
-				"SELECT * FROM classes WHERE UPPER(name) LIKE ? ORDER BY name LIMIT " + a_limit.out,
-				<<l_pattern>>
-			)
+			l_pattern := name_pattern (a_query)
+			if has_name_index then
+				l_result := db.query_with_args (
+					"SELECT * FROM classes WHERE id IN (SELECT rowid FROM class_names WHERE name LIKE ?) ORDER BY name LIMIT " + a_limit.out,
+					<<l_pattern>>
+				)
+			else
+				l_result := db.query_with_args (
+					"SELECT * FROM classes WHERE UPPER(name) LIKE ? ORDER BY name LIMIT " + a_limit.out,
+					<<l_pattern.as_upper>>
+				)
+			end
 			across l_result.rows as row loop
 				create l_class.make_from_row (row)
-				load_class_features (l_class)
 				Result.extend (l_class)
 			end
 		end
 
+	search_classes_with_features (a_query: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_CLASS_INFO]
+			-- `search_classes' with the features of every match loaded
+		require
+			is_open: is_open
+			positive_limit: a_limit > 0
+		do
+			Result := search_classes (a_query, a_limit)
+			load_features (Result)
+		end
+
+	similar_classes (a_name: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_CLASS_INFO]
+			-- Classes whose names are a few typos away from `a_name', nearest
+			-- first (empty without the trigram index or for names under
+			-- three characters; features are not read)
+		require
+			is_open: is_open
+			positive_limit: a_limit > 0
+		local
+			l_matcher: KB_NAME_MATCHER
+			l_query: STRING_32
+			l_ids: ARRAYED_LIST [INTEGER]
+			l_found: HASH_TABLE [KB_CLASS_INFO, INTEGER]
+			l_class: KB_CLASS_INFO
+		do
+			create Result.make (a_limit)
+			create l_matcher
+			l_query := l_matcher.trigram_query (a_name)
+			if has_name_index and not l_query.is_empty then
+				l_ids := l_matcher.ranked (a_name, name_candidates ("class_names", l_query), a_limit)
+				if not l_ids.is_empty then
+					create l_found.make (l_ids.count)
+					across rows_with_ids ("classes", l_ids).rows as row loop
+						create l_class.make_from_row (row)
+						l_found.put (l_class, l_class.id)
+					end
+					across l_ids as id loop
+						if attached l_found.item (id) as al_class then
+							Result.extend (al_class)
+						end
+					end
+				end
+			end
+		ensure
+			within_limit: Result.count <= a_limit
+		end
+
+	load_features (a_classes: LIST [KB_CLASS_INFO])
+			-- Read the features of every class in `a_classes' not yet loaded,
+			-- one query per `Feature_batch_size' classes
+		require
+			is_open: is_open
+			classes_not_void: a_classes /= Void
+		local
+			l_pending: HASH_TABLE [KB_CLASS_INFO, INTEGER]
+			l_ids: ARRAYED_LIST [INTEGER]
+		do
+			create l_pending.make (a_classes.count)
+			create l_ids.make (Feature_batch_size)
+			across a_classes as cls loop
+				if cls.id > 0 and not cls.features_loaded and not l_pending.has (cls.id) then
+					l_pending.put (cls, cls.id)
+					l_ids.extend (cls.id)
+					if l_ids.count = Feature_batch_size then
+						load_feature_batch (l_ids, l_pending)
+						l_ids.wipe_out
+					end
+				end
+			end
+			if not l_ids.is_empty then
+				load_feature_batch (l_ids, l_pending)
+			end
+			across a_classes as cls loop
+				cls.set_features_loaded
+			end
+		ensure
+			all_loaded: across a_classes as cls all cls.features_loaded end
+		end
+
+	load_class_features (a_class: KB_CLASS_INFO)
+			-- Load features for class, unless already loaded
+		require
+			is_open: is_open
+			class_has_id: a_class.id > 0
+		local
+			l_classes: ARRAYED_LIST [KB_CLASS_INFO]
+		do
+			create l_classes.make (1)
+			l_classes.extend (a_class)
+			load_features (l_classes)
+		ensure
+			loaded: a_class.features_loaded
+		end
+
 	add_class (a_class: KB_CLASS_INFO)
 			-- Add or update class entry
 		require
 			is_open: is_open
 			class_valid: a_class.is_valid
 		do
+			-- Drop the old index entry while its row is still readable
+			unindex_class (a_class.library, a_class.name)
 			db.execute_with_args ("[
 				INSERT OR REPLACE INTO classes
 				(library, name, description, file_path, is_deferred, is_expanded, is_frozen, generics)
@@ -541,22 +1227,85 @@ feature -- Class Operations
 
 feature {NONE} -- Class Helpers
 
-	load_class_features (a_class: KB_CLASS_INFO)
-			-- Load features for class
+	load_feature_batch (a_ids: ARRAYED_LIST [INTEGER]; a_classes: HASH_TABLE [KB_CLASS_INFO, INTEGER])
+			-- Read the features of the classes `a_ids' in one query and
+			-- add each to its class in `a_classes'
 		require
-			class_has_id: a_class.id > 0
+			has_ids: not a_ids.is_empty
 		local
 			l_result: SIMPLE_SQL_RESULT
 			l_feature: KB_FEATURE_INFO
-		do
+			l_placeholders: STRING
+			l_args: ARRAY [ANY]
+			i: INTEGER
+		do
+			create l_placeholders.make (a_ids.count * 2)
+			create l_args.make_filled (0, 1, a_ids.count)
+			from i := 1 until i > a_ids.count loop
+				if i > 1 then l_placeholders.append (",") end
+				l_placeholders.append ("?")
+				l_args [i] := a_ids [i]
+				i := i + 1
+			end
 			l_result := db.query_with_args (
-				"SELECT * FROM features WHERE class_id = ? ORDER BY kind, name",
-				<<a_class.id>>
+				"SELECT * FROM features WHERE class_id IN (" + l_placeholders + ") ORDER BY class_id, kind, name",
+				l_args
 			)
 			across l_result.rows as row loop
 				create l_feature.make_from_row (row)
-				a_class.add_feature (l_feature)
+				if attached a_classes.item (l_feature.class_id) as al_class then
+					al_class.add_feature (l_feature)
+				end
+			end
+		end
+
+	name_pattern (a_query: READABLE_STRING_GENERAL): STRING_32
+			-- LIKE pattern for a name lookup: prefix for "NAME*", else substring
+		do
+			if not a_query.is_empty and then a_query [a_query.count] = '*' then
+				Result := a_query.to_string_32.head (a_query.count - 1)
+				Result.append_character ('%%')
+			else
+				Result := {STRING_32} "%%" + a_query.to_string_32 + {STRING_32} "%%"
+			end
+		end
+
+	name_candidates (a_table: STRING; a_query: STRING_32): ARRAYED_LIST [TUPLE [id: INTEGER; name: STRING_32]]
+			-- Names in trigram index `a_table' sharing trigrams with `a_query'
+			-- (see KB_NAME_MATCHER), most shared first
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			l_result := db.query_with_args (
+				"SELECT rowid AS id, name FROM " + a_table + " WHERE " + a_table + " MATCH ? ORDER BY rank LIMIT " + {KB_NAME_MATCHER}.Candidate_limit.out,
+				<<a_query>>
+			)
+			create Result.make (l_result.rows.count)
+			across l_result.rows as row loop
+				if attached row.string_value ("name") as al_name then
+					Result.extend ([row.integer_value ("id"), al_name])
+				end
+			end
+		end
+
+	rows_with_ids (a_table: STRING; a_ids: ARRAYED_LIST [INTEGER]): SIMPLE_SQL_RESULT
+			-- Rows of `a_table' whose id is in `a_ids'
+		require
+			has_ids: not a_ids.is_empty
+		local
+			l_placeholders: STRING
+			l_args: ARRAY [ANY]
+			i: INTEGER
+		do
+			create l_placeholders.make (a_ids.count * 2)
+			create l_args.make_filled (0, 1, a_ids.count)
+			from i := 1 until i > a_ids.count loop
+				if i > 1 then l_placeholders.append (",") end
+				l_placeholders.append ("?")
+				l_args [i] := a_ids [i]
+				i := i + 1
 			end
+			Result := db.query_with_args ("SELECT * FROM " + a_table + " WHERE id IN (" + l_placeholders + ")", l_args)
 		end
 
 feature -- Feature Operations
@@ -590,7 +1339,8 @@ feature -- Feature Operations
 		end
 
 	search_features (a_class_name, a_query: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_FEATURE_INFO]
-			-- Search features in a class by partial name match
+			-- Search features in a class by partial name match, or by
+			-- prefix with a trailing '*'
 		require
 			is_open: is_open
 			positive_limit: a_limit > 0
@@ -598,7 +1348,7 @@ feature -- Feature Operations
 			l_result: SIMPLE_SQL_RESULT
 			l_feature: KB_FEATURE_INFO
 			l_class_id: INTEGER
-			l_pattern: STRING
+			l_pattern: STRING_32
 		do
 			create Result.make (a_limit)
 			-- First find the class ID
@@ -610,9 +1360,11 @@ feature -- Feature Operations
 				if attached l_result.rows.first.item (1) as al_val then
 					l_class_id := al_val.out.to_integer
 				end
-				l_pattern := "%%" + a_query.out.as_lower + "%%"
+				l_pattern := name_pattern (a_query)
+				-- The UNIQUE(class_id, name) index narrows this to the class's
+				-- own features; feature_names would be matched in full first
 				l_result := db.query_with_args (
-					"SELECT * FROM features WHERE class_id = ? AND LOWER(name) LIKE ? ORDER BY name LIMIT " + a_limit.out,
+					"SELECT * FROM features WHERE class_id = ? AND name LIKE ? ORDER BY name LIMIT " + a_limit.out,
 					<<l_class_id, l_pattern>>
 				)
 				across l_result.rows as row loop
@@ -622,12 +1374,56 @@ feature -- Feature Operations
 			end
 		end
 
+	similar_features (a_class_name, a_name: READABLE_STRING_GENERAL; a_limit: INTEGER): ARRAYED_LIST [KB_FEATURE_INFO]
+			-- Features of a class whose names are a few typos away from
+			-- `a_name', nearest first
+		require
+			is_open: is_open
+			positive_limit: a_limit > 0
+		local
+			l_result: SIMPLE_SQL_RESULT
+			l_candidates: ARRAYED_LIST [TUPLE [id: INTEGER; name: STRING_32]]
+			l_ids: ARRAYED_LIST [INTEGER]
+			l_found: HASH_TABLE [KB_FEATURE_INFO, INTEGER]
+			l_feature: KB_FEATURE_INFO
+		do
+			create Result.make (a_limit)
+			-- A class has few features: rerank all of them
+			l_result := db.query_with_args (
+				"SELECT f.id, f.name FROM features f JOIN classes c ON c.id = f.class_id WHERE c.name = ? COLLATE NOCASE",
+				<<a_class_name.to_string_32>>
+			)
+			create l_candidates.make (l_result.rows.count)
+			across l_result.rows as row loop
+				if attached row.string_value ("name") as al_name then
+					l_candidates.extend ([row.integer_value ("id"), al_name])
+				end
+			end
+			l_ids := (create {KB_NAME_MATCHER}).ranked (a_name, l_candidates, a_limit)
+			if not l_ids.is_empty then
+				create l_found.make (l_ids.count)
+				across rows_with_ids ("features", l_ids).rows as row loop
+					create l_feature.make_from_row (row)
+					l_found.put (l_feature, l_feature.id)
+				end
+				across l_ids as id loop
+					if attached l_found.item (id) as al_feature then
+						Result.extend (al_feature)
+					end
+				end
+			end
+		ensure
+			within_limit: Result.count <= a_limit
+		end
+
 	add_feature (a_feature: KB_FEATURE_INFO)
 			-- Add or update feature entry
 		require
 			is_open: is_open
 			feature_valid: a_feature.is_valid
 		do
+			-- Drop the old index entry while its row is still readable
+			unindex_feature (a_feature.class_id, a_feature.name)
 			db.execute_with_args ("[
 				INSERT OR REPLACE INTO features
 				(class_id, name, signature, description, kind, is_deferred, is_frozen, is_once, preconditions, postconditions)
@@ -645,6 +1441,8 @@ feature -- Feature Operations
 				a_feature.postconditions_json
 			>>)
 
+			a_feature.set_id (db.last_insert_rowid.to_integer_32)
+
 			-- Update FTS5 index
 			update_fts5_feature (a_feature)
 		end
@@ -1014,95 +1812,104 @@ feature {NONE} -- FTS5 Query Formatting
 feature {NONE} -- FTS5 Index Updates
 
 	update_fts5_error (a_error: KB_ERROR_INFO)
-			-- Add error to FTS5 index
+			-- Add error to FTS5 index (just stored by `add_error')
 		do
-			-- Delete existing entry
-			db.execute_with_args (
-				"DELETE FROM kb_search WHERE content_type = 'error' AND title = ?",
-				<<a_error.code>>
-			)
-			-- Insert new entry
-			db.execute_with_args ("[
-				INSERT INTO kb_search (content_type, content_id, title, body, tags)
-				VALUES ('error', ?, ?, ?, ?)
-			]", <<
-				a_error.code,
-				a_error.code,
-				a_error.meaning + " " + a_error.explanation,
-				"error compiler"
-			>>)
+			index_document ("error", db.last_insert_rowid.to_integer_32)
 		end
 
 	update_fts5_class (a_class: KB_CLASS_INFO)
 			-- Add class to FTS5 index
 		do
-			db.execute_with_args (
-				"DELETE FROM kb_search WHERE content_type = 'class' AND content_id = ?",
-				<<a_class.id.out>>
-			)
-			db.execute_with_args ("[
-				INSERT INTO kb_search (content_type, content_id, title, body, tags)
-				VALUES ('class', ?, ?, ?, ?)
-			]", <<
-				a_class.id.out,
-				a_class.name,
-				a_class.description,
-				a_class.library
-			>>)
+			index_document ("class", a_class.id)
 		end
 
 	update_fts5_feature (a_feature: KB_FEATURE_INFO)
 			-- Add feature to FTS5 index
 		do
-			db.execute_with_args (
-				"DELETE FROM kb_search WHERE content_type = 'feature' AND content_id = ?",
-				<<a_feature.id.out>>
-			)
-			db.execute_with_args ("[
-				INSERT INTO kb_search (content_type, content_id, title, body, tags)
-				VALUES ('feature', ?, ?, ?, ?)
-			]", <<
-				a_feature.id.out,
-				a_feature.name,
-				a_feature.signature + " " + a_feature.description,
-				a_feature.kind
-			>>)
+			index_document ("feature", a_feature.id)
 		end
 
 	update_fts5_example (a_example: KB_EXAMPLE)
 			-- Add example to FTS5 index
 		do
-			db.execute_with_args (
-				"DELETE FROM kb_search WHERE content_type = 'example' AND content_id = ?",
-				<<a_example.id.out>>
-			)
-			db.execute_with_args ("[
-				INSERT INTO kb_search (content_type, content_id, title, body, tags)
-				VALUES ('example', ?, ?, ?, ?)
-			]", <<
-				a_example.id.out,
-				a_example.title,
-				a_example.code,
-				a_example.tags_json
-			>>)
+			index_document ("example", a_example.id)
 		end
 
 	update_fts5_pattern (a_pattern: KB_PATTERN)
 			-- Add pattern to FTS5 index
+		do
+			index_document ("pattern", a_pattern.id)
+		end
+
+	unindex_error (a_code: READABLE_STRING_GENERAL)
+			-- Remove index entry of error `a_code' (before its row is replaced)
+		do
+			unindex_where ("content_type = 'error' AND content_id IN (SELECT id FROM errors WHERE code = ?)",
+				<<a_code.to_string_32>>)
+		end
+
+	unindex_class (a_library, a_name: READABLE_STRING_GENERAL)
+			-- Remove index entries of a stored class (before its row is replaced)
+		do
+			unindex_where ("content_type = 'class' AND content_id IN (SELECT id FROM classes WHERE library = ? AND name = ?)",
+				<<a_library.to_string_32, a_name.to_string_32>>)
+			if has_name_index then
+				db.execute_with_args ("DELETE FROM class_names WHERE rowid IN (SELECT id FROM classes WHERE library = ? AND name = ?)",
+					<<a_library.to_string_32, a_name.to_string_32>>)
+			end
+		end
+
+	unindex_feature (a_class_id: INTEGER; a_name: READABLE_STRING_GENERAL)
+			-- Remove index entries of a stored feature (before its row is replaced)
+		do
+			unindex_where ("content_type = 'feature' AND content_id IN (SELECT id FROM features WHERE class_id = ? AND name = ?)",
+				<<a_class_id, a_name.to_string_32>>)
+			if has_name_index then
+				db.execute_with_args ("DELETE FROM feature_names WHERE rowid IN (SELECT id FROM features WHERE class_id = ? AND name = ?)",
+					<<a_class_id, a_name.to_string_32>>)
+			end
+		end
+
+	index_document (a_type: STRING; a_id: INTEGER)
+			-- Index base row `a_id' of `a_type' in kb_search, under its
+			-- kb_search_docs id as rowid
 		do
 			db.execute_with_args (
-				"DELETE FROM kb_search WHERE content_type = 'pattern' AND content_id = ?",
-				<<a_pattern.id.out>>
+				"INSERT OR IGNORE INTO kb_search_docs (content_type, content_id) VALUES (?, ?)",
+				<<a_type, a_id>>
 			)
+			if not is_external_content then
+				-- Replace any text still stored for the document
+				db.execute_with_args (
+					"DELETE FROM kb_search WHERE rowid = (SELECT id FROM kb_search_docs WHERE content_type = ? AND content_id = ?)",
+					<<a_type, a_id>>
+				)
+			end
 			db.execute_with_args ("[
-				INSERT INTO kb_search (content_type, content_id, title, body, tags)
-				VALUES ('pattern', ?, ?, ?, ?)
-			]", <<
-				a_pattern.id.out,
-				a_pattern.name,
-				a_pattern.description + " " + a_pattern.code,
-				"pattern design"
-			>>)
+				INSERT INTO kb_search (rowid, content_type, content_id, title, body, tags)
+				SELECT doc_id, content_type, content_id, title, body, tags FROM kb_search_source
+				WHERE doc_id = (SELECT id FROM kb_search_docs WHERE content_type = ? AND content_id = ?)
+			]", <<a_type, a_id>>)
+		end
+
+	unindex_where (a_condition: STRING; a_args: ARRAY [ANY])
+			-- Remove kb_search_docs rows matching `a_condition' and their index
+			-- entries, by rowid. External content has to be told the exact values
+			-- it indexed, so this must run before the base rows change.
+		do
+			if is_external_content then
+				db.execute_with_args ("[
+					INSERT INTO kb_search (kb_search, rowid, content_type, content_id, title, body, tags)
+					SELECT 'delete', doc_id, content_type, content_id, title, body, tags FROM kb_search_source
+					WHERE doc_id IN (SELECT id FROM kb_search_docs WHERE
+				]" + " " + a_condition + ")", a_args)
+			else
+				db.execute_with_args (
+					"DELETE FROM kb_search WHERE rowid IN (SELECT id FROM kb_search_docs WHERE " + a_condition + ")",
+					a_args
+				)
+			end
+			db.execute_with_args ("DELETE FROM kb_search_docs WHERE " + a_condition, a_args)
 		end
 
 feature -- Clear Operations
@@ -1120,35 +1927,18 @@ feature -- Clear Operations
 		require
 			is_open: is_open
 		local
-			l_class_ids: STRING
-			l_result: SIMPLE_SQL_RESULT
+			l_library: STRING_32
 		do
-			-- Get class IDs for this library
-			l_result := db.query_with_args (
-				"SELECT id FROM classes WHERE library = ?",
-				<<a_library.to_string_32>>
-			)
-			
-			if not l_result.is_empty then
-				-- Build comma-separated list of IDs
-				create l_class_ids.make (100)
-				across l_result.rows as row loop
-					if not l_class_ids.is_empty then
-						l_class_ids.append (",")
-					end
-					if attached row.item (1) as al_id then
-						l_class_ids.append (al_id.out)
-					end
-				end
-				
-				-- Delete from FTS index
-				db.execute ("DELETE FROM kb_search WHERE content_type = 'class' AND content_id IN (" + l_class_ids + ")")
-				db.execute ("DELETE FROM kb_search WHERE content_type = 'feature' AND content_id IN (SELECT id FROM features WHERE class_id IN (" + l_class_ids + "))")
-				
-				-- Delete features then classes
-				db.execute ("DELETE FROM features WHERE class_id IN (" + l_class_ids + ")")
-				db.execute_with_args ("DELETE FROM classes WHERE library = ?", <<a_library.to_string_32>>)
-			end
+			l_library := a_library.to_string_32
+			-- Delete from FTS index
+			unindex_where ("content_type = 'class' AND content_id IN (SELECT id FROM classes WHERE library = ?)",
+				<<l_library>>)
+			unindex_where ("content_type = 'feature' AND content_id IN (SELECT f.id FROM features f JOIN classes c ON f.class_id = c.id WHERE c.library = ?)",
+				<<l_library>>)
+
+			-- Delete features then classes
+			db.execute_with_args ("DELETE FROM features WHERE class_id IN (SELECT id FROM classes WHERE library = ?)", <<l_library>>)
+			db.execute_with_args ("DELETE FROM classes WHERE library = ?", <<l_library>>)
 		end
 
 	clear_all
@@ -1156,8 +1946,13 @@ feature -- Clear Operations
 		require
 			is_open: is_open
 		do
-			db.execute ("DELETE FROM kb_search")
-			db.execute ("DELETE FROM faq_search")
+			if is_external_content then
+				db.execute ("INSERT INTO kb_search (kb_search) VALUES ('delete-all')")
+			else
+				db.execute ("DELETE FROM kb_search")
+			end
+			db.execute ("DELETE FROM kb_search_docs")
+			-- faq_search rows are removed by the faqs_search_ad trigger
 			db.execute ("DELETE FROM faq_tags")
 			db.execute ("DELETE FROM faqs")
 			db.execute ("DELETE FROM features")
@@ -1175,7 +1970,7 @@ feature -- Clear Operations
 		require
 			is_open: is_open
 		do
-			db.execute ("DELETE FROM kb_search WHERE content_type IN ('class', 'feature')")
+			unindex_where ("content_type IN ('class', 'feature')", <<>>)
 			db.execute ("DELETE FROM features")
 			db.execute ("DELETE FROM classes")
 		end
@@ -1185,7 +1980,7 @@ feature -- Clear Operations
 		require
 			is_open: is_open
 		do
-			db.execute ("DELETE FROM kb_search WHERE content_type = 'example'")
+			unindex_where ("content_type = 'example'", <<>>)
 			db.execute ("DELETE FROM examples")
 		end
 
@@ -1194,7 +1989,7 @@ feature -- Clear Operations
 		require
 			is_open: is_open
 		do
-			db.execute ("DELETE FROM kb_search WHERE content_type = 'error'")
+			unindex_where ("content_type = 'error'", <<>>)
 			db.execute ("DELETE FROM errors")
 		end
 
@@ -1203,7 +1998,7 @@ feature -- Clear Operations
 		require
 			is_open: is_open
 		do
-			db.execute ("DELETE FROM kb_search WHERE content_type = 'pattern'")
+			unindex_where ("content_type = 'pattern'", <<>>)
 			db.execute ("DELETE FROM patterns")
 		end
 
@@ -1363,6 +2158,61 @@ feature -- Ancestry Queries
 			end
 		end
 
+feature {NONE} -- Transactions
+
+	is_in_transaction: BOOLEAN
+			-- Is a `begin_transaction' block running?
+
+	transaction_failed: BOOLEAN
+			-- Has a statement of the running transaction failed?
+
+	transaction_committed: BOOLEAN
+			-- Did the last `end_transaction' commit?
+
+	begin_transaction
+			-- Start a write transaction whose statements go through `step'
+		require
+			not_nested: not is_in_transaction
+		do
+			db.execute ("BEGIN IMMEDIATE")
+			is_in_transaction := True
+			transaction_failed := db.has_error
+		ensure
+			in_transaction: is_in_transaction
+		end
+
+	step (a_sql: READABLE_STRING_8)
+			-- Execute `a_sql'. In a transaction, skip it once a statement has
+			-- failed (SIMPLE_SQL sets `has_error' instead of raising).
+		do
+			if not (is_in_transaction and transaction_failed) then
+				db.execute (a_sql)
+				if is_in_transaction and db.has_error then
+					transaction_failed := True
+				end
+			end
+		end
+
+	end_transaction
+			-- Commit the running transaction, or roll it back if a statement
+			-- (or the commit) failed
+		require
+			in_transaction: is_in_transaction
+		do
+			transaction_committed := False
+			if not transaction_failed then
+				db.execute ("COMMIT")
+				transaction_committed := not db.has_error
+			end
+			if not transaction_committed then
+				db.execute ("ROLLBACK")
+			end
+			is_in_transaction := False
+			transaction_failed := False
+		ensure
+			ended: not is_in_transaction
+		end
+
 feature {NONE} -- Helpers
 
 	bool_to_int (a_bool: BOOLEAN): INTEGER
@@ -0,0 +1,303 @@
+note
+	description: "[
+		KB_DB_TUNING - SQLite Tuning Profile
+
+		Named set of connection PRAGMAs applied when a KB database is opened.
+
+		Presets:
+			- serving: WAL, synchronous=NORMAL, mmap, 16 MB cache.
+			  Readers (kb search, kb ask) never wait on a writer.
+			- bulk: WAL, synchronous=OFF, larger cache, long busy
+			  timeout. For kb ingest and the FAQ load scripts.
+
+		Configured in kb.toml (same file as KB_AI_CONFIG):
+
+			[database]
+			profile = "serving"
+
+			[database.serving]
+			mmap_size = 268435456
+			busy_timeout = 5000
+
+		The [database.<profile>] keys override the preset of that name.
+		scripts/kb_tuning.py reads the same sections; keep them in step.
+
+		[database] fts_prefix lists the prefix lengths kb_search and
+		faq_search keep prefix indexes for (default "2 3 4"; "" for none).
+		It belongs to the schema, not the connection: KB_DATABASE rebuilds
+		both indexes when it changes.
+
+			[database]
+			fts_prefix = "2 3 4"
+
+		Usage:
+			tuning: KB_DB_TUNING
+			create tuning.make_from_config ("kb.toml")
+			tuning.apply (db)
+	]"
+	author: "Simple Eiffel"
+	date: "$Date$"
+	revision: "$Revision$"
+
+class
+	KB_DB_TUNING
+
+create
+	make_serving,
+	make_bulk,
+	make_named,
+	make_from_config
+
+feature {NONE} -- Initialization
+
+	make_serving
+			-- Preset for interactive use: concurrent readers, durable commits
+		do
+			name := Serving_profile
+			journal_mode := "WAL"
+			synchronous := "NORMAL"
+			mmap_size := 268_435_456
+			cache_size := -16_000
+			temp_store := "MEMORY"
+			busy_timeout := 5_000
+			page_size := 4_096
+			fts_prefix := Default_fts_prefix
+		ensure
+			serving: name.same_string (Serving_profile)
+		end
+
+	make_bulk
+			-- Preset for large loads: no fsync per commit, big cache
+		do
+			name := Bulk_profile
+			journal_mode := "WAL"
+			synchronous := "OFF"
+			mmap_size := 268_435_456
+			cache_size := -262_144
+			temp_store := "MEMORY"
+			busy_timeout := 30_000
+			page_size := 4_096
+			fts_prefix := Default_fts_prefix
+		ensure
+			bulk: name.same_string (Bulk_profile)
+		end
+
+	make_named (a_name: READABLE_STRING_GENERAL; a_config_path: READABLE_STRING_GENERAL)
+			-- Preset `a_name' with overrides from [database.<a_name>] in `a_config_path'
+		do
+			if a_name.same_string (Bulk_profile) then
+				make_bulk
+			else
+				make_serving
+			end
+			load_overrides (a_config_path)
+			fts_prefix := configured_fts_prefix (a_config_path)
+		end
+
+	make_from_config (a_config_path: READABLE_STRING_GENERAL)
+			-- Profile selected by [database] profile in `a_config_path' (serving if unset)
+		do
+			make_named (configured_profile (a_config_path), a_config_path)
+		end
+
+feature -- Constants
+
+	Serving_profile: STRING = "serving"
+	Bulk_profile: STRING = "bulk"
+
+	Default_fts_prefix: STRING = "2 3 4"
+			-- Prefix lengths indexed unless kb.toml says otherwise
+
+feature -- Access
+
+	name: STRING
+			-- Profile name
+
+	journal_mode: STRING
+			-- PRAGMA journal_mode
+
+	synchronous: STRING
+			-- PRAGMA synchronous
+
+	mmap_size: INTEGER_64
+			-- PRAGMA mmap_size in bytes (0 disables memory mapping)
+
+	cache_size: INTEGER
+			-- PRAGMA cache_size (negative: KiB, positive: pages)
+
+	temp_store: STRING
+			-- PRAGMA temp_store
+
+	busy_timeout: INTEGER
+			-- PRAGMA busy_timeout in milliseconds
+
+	page_size: INTEGER
+			-- PRAGMA page_size (only takes effect on a new database)
+
+	fts_prefix: STRING
+			-- FTS5 prefix='...' lengths, space separated (empty: no prefix indexes)
+
+feature -- Basic operations
+
+	apply (a_db: SIMPLE_SQL_DATABASE)
+			-- Set this profile's PRAGMAs on `a_db'
+		require
+			is_open: a_db.is_open
+		do
+			-- busy_timeout first so switching journal mode waits for other connections
+			a_db.execute ("PRAGMA busy_timeout = " + busy_timeout.out)
+			a_db.execute ("PRAGMA page_size = " + page_size.out)
+			a_db.execute ("PRAGMA journal_mode = " + journal_mode)
+			a_db.execute ("PRAGMA synchronous = " + synchronous)
+			a_db.execute ("PRAGMA mmap_size = " + mmap_size.out)
+			a_db.execute ("PRAGMA cache_size = " + cache_size.out)
+			a_db.execute ("PRAGMA temp_store = " + temp_store)
+		end
+
+feature -- Display
+
+	description: STRING
+			-- One-line summary, e.g. for kb stats
+		do
+			Result := name + " (journal_mode=" + journal_mode + ", synchronous=" + synchronous +
+				", mmap_size=" + mmap_size.out + ", cache_size=" + cache_size.out +
+				", temp_store=" + temp_store + ", busy_timeout=" + busy_timeout.out + ")"
+		end
+
+feature {NONE} -- Configuration
+
+	configured_profile (a_config_path: READABLE_STRING_GENERAL): STRING
+			-- Value of `profile' in the [database] section, or `Serving_profile'
+		do
+			Result := Serving_profile
+			across config_entries (a_config_path, "[database]") as e loop
+				if e.key.same_string ("profile") then
+					Result := e.value
+				end
+			end
+		end
+
+	configured_fts_prefix (a_config_path: READABLE_STRING_GENERAL): STRING
+			-- `fts_prefix' in the [database] section as "2 3 4", or `Default_fts_prefix'.
+			-- Accepts "2 3 4", "2,3,4" and [2, 3, 4]; lengths outside 1..99 are dropped.
+		local
+			l_length: STRING
+		do
+			Result := Default_fts_prefix
+			across config_entries (a_config_path, "[database]") as e loop
+				if e.key.same_string ("fts_prefix") then
+					create Result.make (8)
+					create l_length.make (2)
+					across e.value + " " as c loop
+						if c.is_digit then
+							l_length.append_character (c)
+						elseif not l_length.is_empty then
+							if l_length.count <= 2 and then l_length.to_integer > 0 then
+								if not Result.is_empty then
+									Result.append_character (' ')
+								end
+								Result.append (l_length.to_integer.out)
+							end
+							l_length.wipe_out
+						end
+					end
+				end
+			end
+		end
+
+	load_overrides (a_config_path: READABLE_STRING_GENERAL)
+			-- Apply keys of the [database.`name'] section; invalid values are ignored
+		local
+			l_value, l_number: STRING
+		do
+			across config_entries (a_config_path, "[database." + name + "]") as e loop
+				l_value := e.value.as_upper
+				-- TOML allows 268_435_456
+				l_number := e.value.twin
+				l_number.prune_all ('_')
+				if e.key.same_string ("journal_mode") and then Journal_modes.has (l_value) then
+					journal_mode := l_value
+				elseif e.key.same_string ("synchronous") and then Synchronous_levels.has (l_value) then
+					synchronous := l_value
+				elseif e.key.same_string ("temp_store") and then Temp_stores.has (l_value) then
+					temp_store := l_value
+				elseif e.key.same_string ("mmap_size") and then l_number.is_integer_64 then
+					mmap_size := l_number.to_integer_64.max (0)
+				elseif e.key.same_string ("cache_size") and then l_number.is_integer then
+					cache_size := l_number.to_integer
+				elseif e.key.same_string ("busy_timeout") and then l_number.is_integer then
+					busy_timeout := l_number.to_integer.max (0)
+				elseif e.key.same_string ("page_size") and then l_number.is_integer then
+					page_size := l_number.to_integer
+				end
+			end
+		end
+
+	config_entries (a_config_path: READABLE_STRING_GENERAL; a_section: STRING): ARRAYED_LIST [TUPLE [key, value: STRING]]
+			-- `key = value' lines of `a_section' in the TOML file at `a_config_path'
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_line, l_key, l_value: STRING
+			l_eq_pos: INTEGER
+			l_in_section: BOOLEAN
+		do
+			create Result.make (8)
+			create l_file.make_with_name (a_config_path)
+			if l_file.exists and then l_file.is_readable then
+				l_file.open_read
+				from l_file.read_line until l_file.exhausted loop
+					l_line := l_file.last_string.twin
+					l_line.left_adjust
+					l_line.right_adjust
+					if not l_line.is_empty and then l_line [1] = '[' then
+						l_in_section := l_line.same_string (a_section)
+					elseif l_in_section and then not l_line.is_empty and then l_line [1] /= '#' then
+						l_eq_pos := l_line.index_of ('=', 1)
+						if l_eq_pos > 1 then
+							l_key := l_line.substring (1, l_eq_pos - 1)
+							l_key.right_adjust
+							l_value := l_line.substring (l_eq_pos + 1, l_line.count)
+							l_value.left_adjust
+							-- Remove quotes if present
+							if l_value.count >= 2 and then l_value [1] = '"' and then l_value [l_value.count] = '"' then
+								l_value := l_value.substring (2, l_value.count - 1)
+							end
+							Result.extend ([l_key, l_value])
+						end
+					end
+					l_file.read_line
+				end
+				l_file.close
+			end
+		rescue
+			-- Ignore file errors, use presets
+		end
+
+	Journal_modes: ARRAY [STRING]
+			-- Accepted journal_mode values
+		once
+			Result := <<"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF">>
+			Result.compare_objects
+		end
+
+	Synchronous_levels: ARRAY [STRING]
+			-- Accepted synchronous values
+		once
+			Result := <<"OFF", "NORMAL", "FULL", "EXTRA">>
+			Result.compare_objects
+		end
+
+	Temp_stores: ARRAY [STRING]
+			-- Accepted temp_store values
+		once
+			Result := <<"DEFAULT", "FILE", "MEMORY">>
+			Result.compare_objects
+		end
+
+invariant
+	name_not_empty: not name.is_empty
+	busy_timeout_not_negative: busy_timeout >= 0
+	mmap_size_not_negative: mmap_size >= 0
+	fts_prefix_not_void: fts_prefix /= Void
+
+end
@@ -0,0 +1,173 @@
+note
+	description: "[
+		KB_NAME_MATCHER - Typo-Tolerant Matching of Class and Feature Names
+
+		Companion of the class_names and feature_names trigram indexes
+		(FTS5 tokenize='trigram'). `trigram_query' turns a name into an
+		OR of its trigrams, so the index returns every name sharing part
+		of its spelling, best overlap first; `ranked' keeps the candidates
+		within `max_distance' edits of the name and orders them by edit
+		distance (insert, delete, substitute, swap adjacent letters),
+		ignoring case.
+
+		Usage:
+			matcher: KB_NAME_MATCHER
+			create matcher
+			db.query_with_args ("... WHERE class_names MATCH ?", <<matcher.trigram_query ("SIMPEL_JSON")>>)
+			ids := matcher.ranked ("SIMPEL_JSON", candidates, 10)
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_NAME_MATCHER
+
+feature -- Constants
+
+	Candidate_limit: INTEGER = 200
+			-- Index candidates reranked per lookup
+
+feature -- Access
+
+	trigram_query (a_name: READABLE_STRING_GENERAL): STRING_32
+			-- FTS5 query matching any trigram of `a_name'
+			-- (empty if it is shorter than three characters)
+		local
+			l_name: STRING_32
+			l_seen: ARRAYED_LIST [STRING_32]
+			l_trigram: STRING_32
+			i: INTEGER
+		do
+			create Result.make (a_name.count * 8)
+			l_name := a_name.to_string_32.as_upper
+			create l_seen.make (l_name.count)
+			l_seen.compare_objects
+			from i := 1 until i > l_name.count - 2 loop
+				l_trigram := l_name.substring (i, i + 2)
+				if not l_seen.has (l_trigram) then
+					l_seen.extend (l_trigram)
+					if not Result.is_empty then
+						Result.append (" OR ")
+					end
+					Result.append_character ('"')
+					l_trigram.replace_substring_all ({STRING_32} "%"", {STRING_32} "%"%"")
+					Result.append (l_trigram)
+					Result.append_character ('"')
+				end
+				i := i + 1
+			end
+		end
+
+	max_distance (a_name: READABLE_STRING_GENERAL): INTEGER
+			-- Edits allowed between `a_name' and a match
+		do
+			if a_name.count <= 4 then
+				Result := 1
+			elseif a_name.count <= 10 then
+				Result := 2
+			else
+				Result := 3
+			end
+		end
+
+	distance (a_first, a_second: READABLE_STRING_GENERAL): INTEGER
+			-- Edits (insert, delete, substitute, swap adjacent) turning
+			-- `a_first' into `a_second', ignoring case
+		local
+			l_a, l_b: STRING_32
+			l_before, l_previous, l_current, l_swap: SPECIAL [INTEGER]
+			i, j, l_cost: INTEGER
+		do
+			l_a := a_first.to_string_32.as_upper
+			l_b := a_second.to_string_32.as_upper
+			create l_before.make_filled (0, l_b.count + 1)
+			create l_previous.make_filled (0, l_b.count + 1)
+			create l_current.make_filled (0, l_b.count + 1)
+			from j := 0 until j > l_b.count loop
+				l_previous [j] := j
+				j := j + 1
+			end
+			from i := 1 until i > l_a.count loop
+				l_current [0] := i
+				from j := 1 until j > l_b.count loop
+					if l_a [i] = l_b [j] then
+						l_cost := 0
+					else
+						l_cost := 1
+					end
+					l_current [j] := (l_previous [j] + 1).min (l_current [j - 1] + 1).min (l_previous [j - 1] + l_cost)
+					if i > 1 and j > 1 and then l_a [i] = l_b [j - 1] and then l_a [i - 1] = l_b [j] then
+						l_current [j] := l_current [j].min (l_before [j - 2] + 1)
+					end
+					j := j + 1
+				end
+				l_swap := l_before
+				l_before := l_previous
+				l_previous := l_current
+				l_current := l_swap
+				i := i + 1
+			end
+			Result := l_previous [l_b.count]
+		ensure
+			non_negative: Result >= 0
+		end
+
+	ranked (a_name: READABLE_STRING_GENERAL; a_candidates: LIST [TUPLE [id: INTEGER; name: STRING_32]]; a_limit: INTEGER): ARRAYED_LIST [INTEGER]
+			-- Ids of the `a_candidates' within `max_distance' of `a_name',
+			-- nearest first (shorter length difference, then name, on ties)
+		require
+			positive_limit: a_limit > 0
+		local
+			l_kept: ARRAYED_LIST [TUPLE [id, distance, length_gap: INTEGER; name: STRING_32]]
+			l_limit, l_distance: INTEGER
+			l_placed: BOOLEAN
+		do
+			l_limit := max_distance (a_name)
+			create l_kept.make (a_limit + 1)
+			across a_candidates as c loop
+				l_distance := distance (a_name, c.name)
+				if l_distance <= l_limit then
+					from
+						l_kept.start
+						l_placed := False
+					until
+						l_placed or l_kept.after
+					loop
+						if is_nearer (l_distance, (c.name.count - a_name.count).abs, c.name, l_kept.item) then
+							l_kept.put_left ([c.id, l_distance, (c.name.count - a_name.count).abs, c.name])
+							l_placed := True
+						else
+							l_kept.forth
+						end
+					end
+					if not l_placed then
+						l_kept.extend ([c.id, l_distance, (c.name.count - a_name.count).abs, c.name])
+					end
+					if l_kept.count > a_limit then
+						l_kept.finish
+						l_kept.remove
+					end
+				end
+			end
+			create Result.make (l_kept.count)
+			across l_kept as k loop
+				Result.extend (k.id)
+			end
+		ensure
+			within_limit: Result.count <= a_limit
+		end
+
+feature {NONE} -- Implementation
+
+	is_nearer (a_distance, a_length_gap: INTEGER; a_name: STRING_32; a_other: TUPLE [id, distance, length_gap: INTEGER; name: STRING_32]): BOOLEAN
+			-- Does a match at `a_distance' rank before `a_other'?
+		do
+			if a_distance /= a_other.distance then
+				Result := a_distance < a_other.distance
+			elseif a_length_gap /= a_other.length_gap then
+				Result := a_length_gap < a_other.length_gap
+			else
+				Result := a_name < a_other.name
+			end
+		end
+
+end
@@ -9,6 +9,10 @@ note
 			create pager.make (20)  -- 20 l_lines per page
 			pager.show (long_text)
 
+		Text that arrives in pieces (an AI answer being generated) is shown
+		as it comes with `start_stream', `put_stream' and `end_stream'; the
+		prompt for the next page waits until more text arrives.
+
 		User interaction:
 			c/C/Enter = l_continue to next page
 			q/Q/blank line = stop and return
@@ -42,6 +46,15 @@ feature -- Access
 	enabled: BOOLEAN
 			-- Is paging enabled?
 
+	is_streaming: BOOLEAN
+			-- Is a streamed text being shown?
+
+	is_stream_stopped: BOOLEAN
+			-- Has the reader stopped the current stream? (the rest is not shown)
+
+	stream_lines: INTEGER
+			-- Lines of the current stream shown
+
 feature -- Settings
 
 	set_page_size (a_size: INTEGER)
@@ -165,6 +178,103 @@ feature -- Output
 			end
 		end
 
+feature -- Streaming
+
+	start_stream
+			-- Begin showing a text that arrives in pieces
+		do
+			is_streaming := True
+			is_stream_stopped := False
+			stream_lines := 0
+			stream_page_lines := 0
+			stream_line_open := False
+		ensure
+			streaming: is_streaming
+			not_stopped: not is_stream_stopped
+		end
+
+	put_stream (a_text: READABLE_STRING_8)
+			-- Show the next piece of the stream (UTF-8) at once, asking before
+			-- the line after each full page; nothing once the reader stopped
+		require
+			streaming: is_streaming
+		local
+			l_start, i: INTEGER
+		do
+			from
+				l_start := 1
+				i := 1
+			until
+				i > a_text.count or is_stream_stopped
+			loop
+				if enabled and stream_page_lines >= page_size then
+					-- More text after a full page: ask before showing it
+					if continues ("-- [c]ontinue, [Enter] to stop (" + stream_lines.out + " lines so far) --") then
+						stream_page_lines := 0
+					else
+						is_stream_stopped := True
+					end
+				end
+				if not is_stream_stopped and a_text [i] = '%N' then
+					write (a_text.substring (l_start, i))
+					l_start := i + 1
+					stream_lines := stream_lines + 1
+					stream_page_lines := stream_page_lines + 1
+					stream_line_open := False
+				end
+				i := i + 1
+			end
+			if not is_stream_stopped and l_start <= a_text.count then
+				write (a_text.substring (l_start, a_text.count))
+				stream_line_open := True
+			end
+			io.output.flush
+		end
+
+	end_stream
+			-- Finish the streamed text (ending its last line)
+		require
+			streaming: is_streaming
+		do
+			if stream_line_open and not is_stream_stopped then
+				write ("%N")
+			end
+			is_streaming := False
+		ensure
+			not_streaming: not is_streaming
+		end
+
+feature {NONE} -- Implementation
+
+	stream_page_lines: INTEGER
+			-- Lines shown since the last prompt
+
+	stream_line_open: BOOLEAN
+			-- Does the last line shown lack its line break?
+
+	write (a_text: READABLE_STRING_8)
+			-- Show `a_text' of the stream
+		do
+			io.put_string (a_text)
+		end
+
+	continues (a_prompt: READABLE_STRING_8): BOOLEAN
+			-- Does the reader answer `a_prompt' with anything but Enter or q?
+		local
+			l_input: STRING
+		do
+			io.put_string (a_prompt)
+			io.read_line
+			l_input := io.last_string.twin
+			l_input.left_adjust
+			l_input.right_adjust
+			l_input.to_lower
+			Result := not l_input.is_empty and not l_input.same_string ("q")
+			if Result then
+				io.put_string ("%R                                                  %R")
+			end
+		end
+
 invariant
 	positive_page_size: page_size > 0
 
@@ -0,0 +1,337 @@
+note
+	description: "[
+		KB_PERF - Rolling Latency Histograms for kb Phases
+
+		Timing spans recorded around KB_DATABASE.search and every phase of
+		the KB_AI_ROUTER cascade ("ask.*"), with every provider round trip
+		also counted under "llm" so LLM and SQLite time can be compared.
+
+		Samples (microseconds; the clock resolves milliseconds) stay in
+		memory until `save' merges them into a small text file next to
+		kb.db (kb.perf: one line per span, name, tab, samples oldest
+		first), keeping the last `Window' per span. The CLI saves on exit
+		and the daemon after every request; `report' and `to_json' read
+		the file plus unsaved samples and give p50/p95/p99 per span.
+
+		Usage:
+			l_started := perf.now
+			... phase ...
+			perf.record ("ask.extract_keywords", l_started)
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_PERF
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make
+			-- Empty recorder
+		do
+			create pending.make (8)
+		ensure
+			nothing_pending: not has_pending
+		end
+
+feature -- Constants
+
+	Window: INTEGER = 512
+			-- Samples kept per span
+
+feature -- Access
+
+	now: DATE_TIME
+			-- Current time, to pass to `record' when the span ends
+		do
+			create Result.make_now_utc
+		end
+
+	spans (a_path: READABLE_STRING_GENERAL): HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING]
+			-- Samples of every span: those saved at `a_path', then unsaved ones
+			-- (last `Window' of each)
+		do
+			Result := saved_spans (a_path)
+			merge_pending (Result)
+		end
+
+feature -- Status
+
+	has_pending: BOOLEAN
+			-- Are there samples not yet saved?
+		do
+			Result := not pending.is_empty
+		end
+
+feature -- Element change
+
+	record (a_span: STRING; a_started: DATE_TIME)
+			-- Add the time elapsed since `a_started' as a sample of `a_span'
+		require
+			span_not_empty: not a_span.is_empty
+		do
+			add_sample (a_span, (now.relative_duration (a_started).fine_seconds_count * 1_000_000).truncated_to_integer_64.max (0))
+		ensure
+			pending: has_pending
+		end
+
+	add_sample (a_span: STRING; a_micros: INTEGER_64)
+			-- Add a sample of `a_micros' microseconds to `a_span'
+		require
+			span_not_empty: not a_span.is_empty
+			no_tab: not a_span.has ('%T')
+		local
+			l_samples: ARRAYED_LIST [INTEGER_64]
+		do
+			if attached pending.item (a_span) as al_samples then
+				l_samples := al_samples
+			else
+				create l_samples.make (16)
+				pending.force (l_samples, a_span)
+			end
+			l_samples.extend (a_micros)
+			if l_samples.count > Window then
+				l_samples.start
+				l_samples.remove
+			end
+		ensure
+			pending: has_pending
+		end
+
+feature -- Basic operations
+
+	save (a_path: READABLE_STRING_GENERAL)
+			-- Merge the unsaved samples into the file at `a_path'
+		local
+			l_spans: HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING]
+			l_file: PLAIN_TEXT_FILE
+			l_line: STRING
+			l_failed: BOOLEAN
+		do
+			if not l_failed and has_pending then
+				l_spans := spans (a_path)
+				create l_file.make_with_name (a_path)
+				l_file.open_write
+				from l_spans.start until l_spans.after loop
+					create l_line.make (l_spans.item_for_iteration.count * 7)
+					l_line.append (l_spans.key_for_iteration)
+					l_line.append_character ('%T')
+					across l_spans.item_for_iteration as s loop
+						if l_line [l_line.count] /= '%T' then
+							l_line.append_character (' ')
+						end
+						l_line.append (s.out)
+					end
+					l_file.put_string (l_line + "%N")
+					l_spans.forth
+				end
+				l_file.close
+				pending.wipe_out
+			end
+		rescue
+			-- Timings are best effort: never fail the command over them
+			l_failed := True
+			retry
+		end
+
+	reset (a_path: READABLE_STRING_GENERAL)
+			-- Forget all samples, saved and unsaved
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_failed: BOOLEAN
+		do
+			pending.wipe_out
+			if not l_failed then
+				create l_file.make_with_name (a_path)
+				if l_file.exists then
+					l_file.delete
+				end
+			end
+		rescue
+			l_failed := True
+			retry
+		end
+
+feature -- Display
+
+	report (a_path: READABLE_STRING_GENERAL): STRING
+			-- Table of count, p50, p95, p99 and max (ms) per span
+		local
+			l_spans: HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING]
+			l_sorted: SORTED_TWO_WAY_LIST [STRING]
+			l_samples: ARRAYED_LIST [INTEGER_64]
+		do
+			l_spans := spans (a_path)
+			create Result.make (1024)
+			Result.append ("Latency (ms, last " + Window.out + " samples per phase)%N")
+			Result.append ("=============================================%N%N")
+			if l_spans.is_empty then
+				Result.append ("No timings yet. Run 'kb search' or 'kb ask' first.%N")
+			else
+				Result.append (padded ("Phase", 30) + padded_left ("count", 7) + padded_left ("p50", 10) +
+					padded_left ("p95", 10) + padded_left ("p99", 10) + padded_left ("max", 10) + "%N")
+				create l_sorted.make
+				from l_spans.start until l_spans.after loop
+					l_sorted.extend (l_spans.key_for_iteration)
+					l_spans.forth
+				end
+				across l_sorted as name loop
+					if attached l_spans.item (name) as al_samples then
+						l_samples := sorted_copy (al_samples)
+						Result.append (padded (name, 30) + padded_left (l_samples.count.out, 7) +
+							padded_left (milliseconds (percentile (l_samples, 50)), 10) +
+							padded_left (milliseconds (percentile (l_samples, 95)), 10) +
+							padded_left (milliseconds (percentile (l_samples, 99)), 10) +
+							padded_left (milliseconds (l_samples.last), 10) + "%N")
+					end
+				end
+			end
+		end
+
+	to_json (a_path: READABLE_STRING_GENERAL): STRING
+			-- The `report' figures as one JSON object, e.g.
+			-- {"window": 512, "spans": {"search": {"count": 40, "p50_ms": 1.0, ...}}}
+		local
+			l_spans: HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING]
+			l_samples: ARRAYED_LIST [INTEGER_64]
+			l_total: INTEGER_64
+		do
+			l_spans := spans (a_path)
+			create Result.make (1024)
+			Result.append ("{%"window%": " + Window.out + ", %"spans%": {")
+			from l_spans.start until l_spans.after loop
+				l_samples := sorted_copy (l_spans.item_for_iteration)
+				l_total := 0
+				across l_samples as s loop
+					l_total := l_total + s
+				end
+				if Result [Result.count] /= '{' then
+					Result.append (", ")
+				end
+				Result.append ("%"" + l_spans.key_for_iteration + "%": {%"count%": " + l_samples.count.out)
+				Result.append (", %"mean_ms%": " + milliseconds (l_total // l_samples.count.max (1)))
+				Result.append (", %"p50_ms%": " + milliseconds (percentile (l_samples, 50)))
+				Result.append (", %"p95_ms%": " + milliseconds (percentile (l_samples, 95)))
+				Result.append (", %"p99_ms%": " + milliseconds (percentile (l_samples, 99)))
+				Result.append (", %"max_ms%": " + milliseconds (l_samples.last) + "}")
+				l_spans.forth
+			end
+			Result.append ("}}")
+		end
+
+feature {NONE} -- Implementation
+
+	pending: HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING]
+			-- Samples recorded since the last `save', by span
+
+	saved_spans (a_path: READABLE_STRING_GENERAL): HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING]
+			-- Samples in the file at `a_path' (empty if none)
+		local
+			l_file: PLAIN_TEXT_FILE
+			l_line: STRING
+			l_tab: INTEGER
+			l_samples: ARRAYED_LIST [INTEGER_64]
+			l_failed: BOOLEAN
+		do
+			create Result.make (16)
+			create l_file.make_with_name (a_path)
+			if not l_failed and then l_file.exists and then l_file.is_readable then
+				l_file.open_read
+				from l_file.read_line until l_file.exhausted loop
+					l_line := l_file.last_string.twin
+					l_tab := l_line.index_of ('%T', 1)
+					if l_tab > 1 then
+						create l_samples.make (Window)
+						across l_line.substring (l_tab + 1, l_line.count).split (' ') as v loop
+							if v.is_integer_64 then
+								l_samples.extend (v.to_integer_64)
+							end
+						end
+						Result.force (l_samples, l_line.head (l_tab - 1))
+					end
+					l_file.read_line
+				end
+				l_file.close
+			end
+		rescue
+			-- Unreadable file: start over
+			l_failed := True
+			retry
+		end
+
+	merge_pending (a_spans: HASH_TABLE [ARRAYED_LIST [INTEGER_64], STRING])
+			-- Append the unsaved samples to `a_spans', keeping the last `Window'
+		local
+			l_samples: ARRAYED_LIST [INTEGER_64]
+		do
+			from pending.start until pending.after loop
+				if attached a_spans.item (pending.key_for_iteration) as al_samples then
+					l_samples := al_samples
+				else
+					create l_samples.make (pending.item_for_iteration.count)
+					a_spans.force (l_samples, pending.key_for_iteration)
+				end
+				l_samples.append (pending.item_for_iteration)
+				from until l_samples.count <= Window loop
+					l_samples.start
+					l_samples.remove
+				end
+				pending.forth
+			end
+		end
+
+	sorted_copy (a_samples: ARRAYED_LIST [INTEGER_64]): ARRAYED_LIST [INTEGER_64]
+			-- `a_samples' in increasing order
+		local
+			l_sorted: SORTED_TWO_WAY_LIST [INTEGER_64]
+		do
+			create l_sorted.make
+			across a_samples as s loop
+				l_sorted.extend (s)
+			end
+			create Result.make (l_sorted.count)
+			across l_sorted as s loop
+				Result.extend (s)
+			end
+		end
+
+	percentile (a_sorted: ARRAYED_LIST [INTEGER_64]; a_percent: INTEGER): INTEGER_64
+			-- Nearest-rank `a_percent'th percentile of `a_sorted'
+		require
+			not_empty: not a_sorted.is_empty
+			valid_percent: a_percent > 0 and a_percent <= 100
+		do
+			Result := a_sorted [((a_sorted.count * a_percent + 99) // 100).max (1)]
+		end
+
+	milliseconds (a_micros: INTEGER_64): STRING
+			-- `a_micros' as milliseconds with one decimal, e.g. "12.5"
+		do
+			Result := (a_micros // 1000).out + "." + ((a_micros \\ 1000) // 100).out
+		end
+
+	padded (a_text: READABLE_STRING_8; a_width: INTEGER): STRING
+			-- `a_text' left-aligned in `a_width' columns
+		do
+			create Result.make_from_string (a_text)
+			from until Result.count >= a_width loop
+				Result.append_character (' ')
+			end
+		end
+
+	padded_left (a_text: READABLE_STRING_8; a_width: INTEGER): STRING
+			-- `a_text' right-aligned in `a_width' columns
+		do
+			create Result.make (a_width)
+			from until Result.count + a_text.count >= a_width loop
+				Result.append_character (' ')
+			end
+			Result.append (a_text)
+		end
+
+invariant
+	pending_not_void: pending /= Void
+
+end
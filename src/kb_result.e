@@ -4,6 +4,9 @@ note
 
 		Represents a single result from FTS5 full-text search.
 		Contains content type, ID reference, title, snippet, and rank.
+		The snippet is a window of the body (KB_DATABASE.snippet_tokens);
+		the whole body is read on demand into `full_body' by
+		KB_DATABASE.load_result_body.
 	]"
 	author: "Simple Eiffel"
 	date: "$Date$"
@@ -45,6 +48,9 @@ feature {NONE} -- Initialization
 			if attached a_row.item (5) as al_val then
 				rank := al_val.out.to_real_64
 			end
+			if a_row.has_column ("doc_id") then
+				doc_id := a_row.integer_value ("doc_id")
+			end
 		end
 
 feature -- Access
@@ -64,6 +70,32 @@ feature -- Access
 	rank: REAL_64
 			-- BM25 relevance rank (lower = more relevant)
 
+	doc_id: INTEGER_64
+			-- kb_search rowid (0 if unknown)
+
+	full_body: detachable STRING_32
+			-- Whole indexed body, once loaded
+
+	body: STRING_32
+			-- `full_body' if loaded, else `snippet'
+		do
+			if attached full_body as al_body then
+				Result := al_body
+			else
+				Result := snippet
+			end
+		end
+
+feature -- Element change
+
+	set_full_body (a_body: READABLE_STRING_GENERAL)
+			-- Set `full_body'
+		do
+			full_body := a_body.to_string_32
+		ensure
+			set: attached full_body as al_body and then al_body.same_string_general (a_body)
+		end
+
 feature -- Display
 
 	type_label: STRING_32
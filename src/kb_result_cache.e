@@ -0,0 +1,198 @@
+note
+	description: "[
+		KB_RESULT_CACHE - Bounded LRU Cache of Search Results
+
+		Maps a query key (formatted FTS5 query, limit, filters) to the
+		results last returned for it on one database connection, so a
+		repeated search skips the MATCH and bm25 ranking.
+
+		Entries belong to one data version of the connection: its
+		total_changes() and PRAGMA data_version. Every INSERT, UPDATE or
+		DELETE through the connection (trigger writes included) moves the
+		first; a commit by any other connection (kb ingest, the FAQ load
+		scripts) moves the second. When either moved, the cache is emptied
+		before the lookup, so a stale result is never returned. Schema
+		changes do not move them: callers `wipe_out' after DDL.
+
+		When full, the least recently used entry is evicted.
+
+		Usage:
+			cache: KB_RESULT_CACHE [ARRAYED_LIST [KB_RESULT]]
+			create cache.make (db, 256)
+			if attached cache.item (key) as al_hit then ... else
+				... run query ...
+				cache.put (results, key)
+			end
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_RESULT_CACHE [G]
+
+create
+	make
+
+feature {NONE} -- Initialization
+
+	make (a_db: SIMPLE_SQL_DATABASE; a_capacity: INTEGER)
+			-- Cache for queries on `a_db' holding at most `a_capacity' results
+		require
+			db_not_void: a_db /= Void
+			positive_capacity: a_capacity > 0
+		do
+			db := a_db
+			capacity := a_capacity
+			create entries.make (a_capacity)
+			changes_seen := -1
+			data_version_seen := -1
+		ensure
+			capacity_set: capacity = a_capacity
+			empty: count = 0
+		end
+
+feature -- Access
+
+	db: SIMPLE_SQL_DATABASE
+			-- Connection whose data version guards the entries
+
+	item (a_key: READABLE_STRING_GENERAL): detachable G
+			-- Results cached for `a_key' at the current data version, if any
+		do
+			revalidate
+			if attached entries.item (a_key.to_string_32) as al_entry then
+				clock := clock + 1
+				al_entry.last_used := clock
+				Result := al_entry.value
+				hits := hits + 1
+			else
+				misses := misses + 1
+			end
+		end
+
+feature -- Measurement
+
+	capacity: INTEGER
+			-- Maximum number of entries
+
+	count: INTEGER
+			-- Number of entries
+		do
+			Result := entries.count
+		end
+
+	hits: INTEGER
+			-- Lookups answered from the cache
+
+	misses: INTEGER
+			-- Lookups that had to run the query
+
+feature -- Status
+
+	is_current: BOOLEAN
+			-- Has the data stayed unchanged since the entries were stored?
+		local
+			l_version: like db_version
+		do
+			l_version := db_version
+			Result := l_version.changes = changes_seen and l_version.data_version = data_version_seen
+		end
+
+feature -- Element change
+
+	put (a_value: G; a_key: READABLE_STRING_GENERAL)
+			-- Cache `a_value' as the results for `a_key'
+		local
+			l_key: STRING_32
+		do
+			revalidate
+			l_key := a_key.to_string_32
+			if not entries.has (l_key) and entries.count >= capacity then
+				evict_least_recent
+			end
+			clock := clock + 1
+			entries.force ([a_value, clock], l_key)
+		ensure
+			within_capacity: count <= capacity
+		end
+
+	adopt_version
+			-- Keep the entries valid across writes just made through `db'
+			-- that cannot change any cached result (check `is_current' first)
+		local
+			l_version: like db_version
+		do
+			l_version := db_version
+			changes_seen := l_version.changes
+			data_version_seen := l_version.data_version
+		end
+
+feature -- Removal
+
+	wipe_out
+			-- Drop every entry (e.g. after a schema change)
+		do
+			entries.wipe_out
+		ensure
+			empty: count = 0
+		end
+
+feature {NONE} -- Implementation
+
+	entries: HASH_TABLE [TUPLE [value: G; last_used: INTEGER_64], STRING_32]
+			-- Cached results with their last use, by key
+
+	clock: INTEGER_64
+			-- Use counter stamped on entries
+
+	changes_seen: INTEGER_64
+			-- total_changes() the entries were stored at
+
+	data_version_seen: INTEGER_64
+			-- PRAGMA data_version the entries were stored at
+
+	revalidate
+			-- Empty the cache if the data changed since the entries were stored
+		do
+			if not is_current then
+				entries.wipe_out
+				adopt_version
+			end
+		end
+
+	db_version: TUPLE [changes, data_version: INTEGER_64]
+			-- Rows changed through `db' since it was opened, and the commit
+			-- counter of other connections to the database file
+		local
+			l_result: SIMPLE_SQL_RESULT
+		do
+			Result := [{INTEGER_64} 0, {INTEGER_64} 0]
+			l_result := db.query ("SELECT total_changes() AS changes, data_version FROM pragma_data_version")
+			if not l_result.rows.is_empty then
+				Result.changes := l_result.rows.first.integer_value ("changes")
+				Result.data_version := l_result.rows.first.integer_value ("data_version")
+			end
+		end
+
+	evict_least_recent
+			-- Remove the entry used longest ago
+		local
+			l_oldest: detachable STRING_32
+			l_stamp: INTEGER_64
+		do
+			from entries.start until entries.after loop
+				if l_oldest = Void or else entries.item_for_iteration.last_used < l_stamp then
+					l_oldest := entries.key_for_iteration
+					l_stamp := entries.item_for_iteration.last_used
+				end
+				entries.forth
+			end
+			if attached l_oldest as al_key then
+				entries.remove (al_key)
+			end
+		end
+
+invariant
+	entries_not_void: entries /= Void
+	within_capacity: entries.count <= capacity
+
+end
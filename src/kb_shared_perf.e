@@ -0,0 +1,23 @@
+note
+	description: "[
+		KB_SHARED_PERF - Access to the Process-Wide KB_PERF Recorder
+
+		Inherit to time a phase:
+			l_started := perf.now
+			...
+			perf.record ("search", l_started)
+	]"
+	author: "Simple Eiffel"
+
+class
+	KB_SHARED_PERF
+
+feature -- Access
+
+	perf: KB_PERF
+			-- Latency recorder shared by the whole process
+		once
+			create Result.make
+		end
+
+end
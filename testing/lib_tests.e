@@ -53,6 +53,42 @@ feature -- Database Tests
 			assert ("fts5_available", db.fts5_available)
 		end
 
+	test_search_prefix_indexes
+			-- Test kb_search and faq_search keep prefix indexes, also after a rebuild
+		local
+			l_error: KB_ERROR_INFO
+		do
+			assert ("kb_search_prefix", db.search_prefix ("kb_search").same_string (db.tuning.fts_prefix))
+			assert ("faq_search_prefix", db.search_prefix ("faq_search").same_string (db.tuning.fts_prefix))
+			assert ("default_lengths", db.tuning.fts_prefix.same_string ({KB_DB_TUNING}.Default_fts_prefix))
+			create l_error.make ("PFX1", "Echidna precondition violated")
+			db.add_error (l_error)
+			db.rebuild_search_indexes (False)
+			assert ("kept_after_rebuild", db.search_prefix ("kb_search").same_string (db.tuning.fts_prefix))
+			assert ("short_prefix_found", not db.search ("ec", 10).is_empty)
+		end
+
+	test_tuning_presets
+			-- Test serving and bulk tuning profiles
+		local
+			l_tuning: KB_DB_TUNING
+		do
+			create l_tuning.make_bulk
+			assert ("bulk_wal", l_tuning.journal_mode.same_string ("WAL"))
+			assert ("bulk_no_sync", l_tuning.synchronous.same_string ("OFF"))
+			create l_tuning.make_named ("no_such_profile", "no_such_kb.toml")
+			assert ("fallback_serving", l_tuning.name.same_string ({KB_DB_TUNING}.Serving_profile))
+			assert ("serving_sync", l_tuning.synchronous.same_string ("NORMAL"))
+		end
+
+	test_use_bulk_tuning
+			-- Test switching profiles on an open database
+		do
+			db.use_tuning ({KB_DB_TUNING}.Bulk_profile)
+			assert ("bulk_active", db.tuning.name.same_string ({KB_DB_TUNING}.Bulk_profile))
+			assert ("no_error", not db.has_error)
+		end
+
 feature -- Error Tests
 
 	test_add_error
@@ -144,6 +180,102 @@ feature -- Search Tests
 			assert ("found_results", l_results.count >= 2)
 		end
 
+	test_search_external_content
+			-- Test search and replacement after switching to external-content indexes
+		local
+			l_error: KB_ERROR_INFO
+			l_results: ARRAYED_LIST [KB_RESULT]
+		do
+			create l_error.make ("EXT1", "Wombat contract violation")
+			db.add_error (l_error)
+			db.rebuild_search_indexes (True)
+			assert ("external", db.is_external_content)
+			assert ("found_after_rebuild", not db.search ("wombat", 10).is_empty)
+
+			-- Replacing the row must drop the old tokens
+			create l_error.make ("EXT1", "Numbat contract violation")
+			db.add_error (l_error)
+			assert ("old_text_gone", db.search ("wombat", 10).is_empty)
+			l_results := db.search ("numbat", 10)
+			assert ("new_text_found", l_results.count = 1)
+
+			db.clear_errors
+			assert ("cleared", db.search ("numbat", 10).is_empty)
+		end
+
+	test_search_regular_replace
+			-- Test replacing and clearing rows in a regular (content-storing) index
+		local
+			l_class: KB_CLASS_INFO
+		do
+			db.rebuild_search_indexes (False)
+			assert ("regular", not db.is_external_content)
+			create l_class.make ("quokka_lib", "QUOKKA_PARSER")
+			l_class.set_description ("Quokka token stream")
+			db.add_class (l_class)
+
+			-- Re-adding the class replaces its index entry
+			create l_class.make ("quokka_lib", "QUOKKA_PARSER")
+			l_class.set_description ("Quokka syntax tree")
+			db.add_class (l_class)
+			assert ("one_entry", db.search ("quokka", 10).count = 1)
+			assert ("old_text_gone", db.search ("stream", 10).is_empty)
+
+			db.clear_library ("quokka_lib")
+			assert ("cleared", db.search ("quokka", 10).is_empty)
+		end
+
+	test_search_snippets
+			-- Test search returns body windows and reads whole bodies on demand
+		local
+			l_example: KB_EXAMPLE
+			l_code: STRING
+			l_results: ARRAYED_LIST [KB_RESULT]
+			i: INTEGER
+		do
+			create l_code.make (2000)
+			from i := 1 until i > 100 loop
+				l_code.append ("line_" + i.out + " ")
+				if i = 50 then
+					l_code.append ("kookaburra ")
+				end
+				i := i + 1
+			end
+			create l_example.make ("Long example", l_code)
+			db.add_example (l_example)
+
+			l_results := db.search ("kookaburra", 10)
+			assert ("found", l_results.count = 1)
+			assert ("window_only", l_results.first.snippet.count < l_code.count and l_results.first.snippet.has_substring ("kookaburra"))
+			assert ("body_not_loaded", l_results.first.full_body = Void)
+			db.load_result_body (l_results.first)
+			assert ("whole_body", l_results.first.body.same_string (l_code))
+
+			db.set_snippet_tokens (0)
+			assert ("full_bodies", db.search ("kookaburra", 10).first.snippet.same_string (l_code))
+			db.set_snippet_tokens ({KB_DATABASE}.Default_snippet_tokens)
+		end
+
+	test_search_cached
+			-- Test repeated search is cached until the next write
+		local
+			l_error: KB_ERROR_INFO
+			l_hits: INTEGER
+		do
+			create l_error.make ("CACHE1", "Platypus feature call on void target")
+			db.add_error (l_error)
+			assert ("first_search", db.search ("platypus", 10).count = 1)
+			l_hits := db.search_cache.hits
+			assert ("repeat_search", db.search ("platypus", 10).count = 1)
+			assert ("served_from_cache", db.search_cache.hits = l_hits + 1)
+			assert ("type_filtered", db.search_type ("platypus", "class", 10).is_empty)
+
+			-- A write invalidates the cached result
+			create l_error.make ("CACHE2", "Platypus creation procedure missing")
+			db.add_error (l_error)
+			assert ("sees_new_row", db.search ("platypus", 10).count = 2)
+		end
+
 feature -- Class Tests
 
 	test_add_class
@@ -177,6 +309,74 @@ feature -- Class Tests
 			end
 		end
 
+	test_class_name_lookups
+			-- Test substring, prefix and typo-tolerant class and feature lookups
+		local
+			l_class: KB_CLASS_INFO
+			l_feature: KB_FEATURE_INFO
+			l_matcher: KB_NAME_MATCHER
+		do
+			create l_class.make ("test_lib", "TRIGRAM_PROBE_WIDGET")
+			db.add_class (l_class)
+			create l_feature.make (l_class.id, "redraw_border")
+			l_feature.set_kind ("command")
+			db.add_feature (l_feature)
+			-- Re-adding replaces the row without leaving a stale name entry
+			db.add_class (l_class)
+
+			assert ("substring", db.search_classes ("probe_wid", 10).count = 1)
+			assert ("prefix", db.search_classes ("TRIGRAM_PR*", 10).count = 1)
+			assert ("prefix_anchored", db.search_classes ("PROBE_WIDGET*", 10).is_empty)
+			assert ("feature_substring", db.search_features ("TRIGRAM_PROBE_WIDGET", "draw", 10).count = 1)
+			if db.has_name_index then
+				assert ("typo_found", not db.similar_classes ("TRIGRAM_PORBE_WIDGTE", 5).is_empty and then
+					db.similar_classes ("TRIGRAM_PORBE_WIDGTE", 5).first.name.same_string ("TRIGRAM_PROBE_WIDGET"))
+				assert ("far_not_found", db.similar_classes ("COMPLETELY_OTHER", 5).is_empty)
+			end
+			assert ("feature_typo", not db.similar_features ("TRIGRAM_PROBE_WIDGET", "redraw_boarder", 5).is_empty)
+
+			create l_matcher
+			assert ("swap_is_one_edit", l_matcher.distance ("widget", "wdiget") = 1)
+			assert ("case_ignored", l_matcher.distance ("Widget", "WIDGET") = 0)
+			assert ("three_edits", l_matcher.distance ("kitten", "sitting") = 3)
+		end
+
+	test_search_classes_batched_features
+			-- Test class search leaves features unread until loaded in one batch
+		local
+			l_class: KB_CLASS_INFO
+			l_feature: KB_FEATURE_INFO
+			l_matches: ARRAYED_LIST [KB_CLASS_INFO]
+		do
+			create l_class.make ("simple_json", "BATCH_READER")
+			db.add_class (l_class)
+			create l_feature.make (l_class.id, "read")
+			l_feature.set_kind ("command")
+			db.add_feature (l_feature)
+			create l_class.make ("simple_json", "BATCH_WRITER")
+			db.add_class (l_class)
+			create l_feature.make (l_class.id, "write")
+			l_feature.set_kind ("command")
+			db.add_feature (l_feature)
+			create l_feature.make (l_class.id, "flush")
+			l_feature.set_kind ("command")
+			db.add_feature (l_feature)
+
+			l_matches := db.search_classes ("BATCH_", 10)
+			assert ("two_matches", l_matches.count = 2)
+			assert ("lazy", not l_matches.first.features_loaded and l_matches.first.features.is_empty)
+
+			db.load_features (l_matches)
+			assert ("reader_features", l_matches [1].features.count = 1)
+			assert ("writer_features", l_matches [2].features.count = 2)
+			assert ("ordered", l_matches [2].features.first.name.same_string ("flush"))
+
+			-- Loading again does not duplicate
+			db.load_features (l_matches)
+			assert ("no_duplicates", l_matches [2].features.count = 2)
+			assert ("eager_variant", db.search_classes_with_features ("BATCH_WRITER", 10).first.features.count = 2)
+		end
+
 feature -- Example Tests
 
 	test_add_example
@@ -681,6 +881,363 @@ end
 			assert ("completed", l_ingester.files_processed >= 1)
 		end
 
+feature -- FAQ Tests
+
+	test_faq_store_indexed
+			-- Test stored FAQ is searchable through the sync trigger
+		local
+			l_store: KB_FAQ_STORE
+			l_faq: KB_FAQ
+			l_found: ARRAYED_LIST [KB_FAQ]
+		do
+			create l_store.make (db.db)
+			create l_faq.make ("How do I declare a zanzibar agent?", "Use the agent keyword.")
+			l_store.store_faq (l_faq)
+			assert ("has_id", l_faq.is_persisted)
+			l_found := l_store.search_faqs ("zanzibar", 5)
+			assert ("found_by_fts", l_found.count = 1)
+			if not l_found.is_empty then
+				assert ("same_id", l_found.first.id = l_faq.id)
+			end
+		end
+
+	test_faq_delete_unindexed
+			-- Test deleted FAQ drops out of faq_search
+		local
+			l_store: KB_FAQ_STORE
+			l_faq: KB_FAQ
+		do
+			create l_store.make (db.db)
+			create l_faq.make ("What is a quokka precondition?", "A precondition named quokka.")
+			l_store.store_faq (l_faq)
+			l_store.delete_faq (l_faq.id)
+			assert ("faq_gone", not l_store.has_faq (l_faq.id))
+			assert ("index_gone", l_store.search_faqs ("quokka", 5).is_empty)
+		end
+
+	test_faq_near_duplicate_merged
+			-- Test a near-duplicate FAQ is merged into the stored one
+		local
+			l_store: KB_FAQ_STORE
+			l_first, l_again, l_other: KB_FAQ
+			l_answer: STRING_32
+		do
+			create l_store.make (db.db)
+			l_answer := "Wrap every call on a separate object in a routine that takes the object as a separate argument; the routine body then holds the lock."
+			create l_first.make ("How do I call a separate object in SCOOP?", l_answer)
+			l_store.store_faq (l_first)
+			assert ("first_inserted", l_store.last_duplicate_of = 0)
+
+			create l_again.make ("How do I call a separate object in SCOOP?", l_answer + " Thanks")
+			l_again.add_tag ("scoop")
+			l_store.store_faq (l_again)
+			assert ("merged", l_store.last_duplicate_of = l_first.id)
+			assert ("same_id", l_again.id = l_first.id)
+			assert ("one_faq", l_store.faq_count = 1)
+			assert ("tag_merged", l_store.search_by_tags (l_again.tags, 5).count = 1)
+
+			create l_other.make ("What does a once function return?", "The value computed by its first call, shared by every later call.")
+			l_store.store_faq (l_other)
+			assert ("other_inserted", l_store.last_duplicate_of = 0 and l_other.id /= l_first.id)
+		end
+
+	test_faq_minhash_buckets
+			-- Test buckets match scripts/faq_minhash.py for the same FAQ
+		local
+			l_minhash: KB_FAQ_MINHASH
+			l_keys: ARRAYED_LIST [INTEGER_64]
+		do
+			create l_minhash
+			l_keys := l_minhash.band_keys ("How do I use SCOOP separate objects?",
+				"Wrap calls on separate objects in a routine taking them as separate arguments.")
+			assert ("one_per_band", l_keys.count = l_minhash.Band_count)
+			assert ("first_bucket", l_keys.first = 852255723814733200)
+			assert ("second_bucket", l_keys [2] = 4182978648473595577)
+			assert ("no_words_no_buckets", l_minhash.band_keys ("?", "!").is_empty)
+		end
+
+	test_faq_similar_paraphrase
+			-- Test a reworded question finds the stored FAQ through faq_vectors
+		local
+			l_store: KB_FAQ_STORE
+			l_faq: KB_FAQ
+			l_found: ARRAYED_LIST [KB_FAQ]
+		do
+			create l_store.make (db.db)
+			create l_faq.make ("How do I stop a quetzal loop early?", "Make the until condition true; Eiffel loops have no break.")
+			l_faq.set_keywords ("quetzal loop exit")
+			l_store.store_faq (l_faq)
+			l_found := l_store.similar_faqs ("Ways of exiting quetzal loops", 5)
+			assert ("paraphrase_found", not l_found.is_empty and then l_found.first.id = l_faq.id)
+			assert ("unrelated_not_found", l_store.similar_faqs ("pelican database connection", 5).is_empty)
+			l_store.delete_faq (l_faq.id)
+			assert ("deleted_not_found", l_store.similar_faqs ("Ways of exiting quetzal loops", 5).is_empty)
+		end
+
+	test_faq_answered_question
+			-- Test a repeated or trivially reworded question finds its stored answer
+		local
+			l_store: KB_FAQ_STORE
+			l_faq: KB_FAQ
+		do
+			create l_store.make (db.db)
+			create l_faq.make ("How do I feed the answered zebras?", "With hay, twice a day.")
+			l_store.store_faq (l_faq)
+			assert ("verbatim", attached l_store.answered_faq ("How do I feed the answered zebras?", 0.0) as al_faq and then
+				al_faq.id = l_faq.id)
+			assert ("normalized", attached l_store.answered_faq ("how do I feed answered zebra", 0.0) as al_faq and then
+				al_faq.id = l_faq.id)
+			assert ("word_order_kept", l_store.answered_faq ("How do I feed the zebras answered?", 0.0) = Void)
+			assert ("question_word_kept", l_store.answered_faq ("Why do I feed the answered zebras?", 0.0) = Void)
+			assert ("other_question", l_store.answered_faq ("How do I feed the unanswered zebras?", 0.0) = Void)
+			-- Stored by another writer (scripts/faq_loader.py) after the first lookup
+			db.db.execute ("INSERT INTO faqs (question, answer) VALUES ('Where do the answered zebras sleep?', 'In the barn.')")
+			assert ("other_writer", attached l_store.answered_faq ("where do answered zebra sleep", 0.0) as al_faq and then
+				al_faq.answer.same_string ("In the barn."))
+			l_store.delete_faq (l_faq.id)
+			assert ("deleted", l_store.answered_faq ("how do I feed answered zebra", 0.0) = Void)
+		end
+
+feature -- Daemon Tests
+
+	test_daemon_message_round_trip
+			-- Test a protocol line survives to_json and make_from_json
+		local
+			l_message, l_read: KB_DAEMON_MESSAGE
+		do
+			create l_message.make ("7")
+			l_message.put ({STRING_32} "search %"json%" caf%/233/\n", "command")
+			l_message.put ("true", "interactive")
+			assert ("one_line", not l_message.to_json.has ('%N'))
+			create l_read.make_from_json (l_message.to_json)
+			assert ("valid", l_read.is_valid)
+			assert ("id_kept", l_read.id.same_string ("7"))
+			assert ("command_kept", l_read.item ("command").same_string (l_message.item ("command")))
+			assert ("no_kind", not l_read.has ("kind"))
+			create l_read.make_from_json ("not json")
+			assert ("invalid", not l_read.is_valid)
+		end
+
+	test_daemon_output_matches_local
+			-- Test a command sent to the daemon prints what it prints locally
+		local
+			l_app: KB_CLI_APP
+			l_request: KB_DAEMON_MESSAGE
+			l_local: STRING_8
+		do
+			create l_app.make_with_database (db)
+			across {ARRAY [KB_COMMAND_LINE]} <<
+					create {KB_COMMAND_LINE}.make (<<"search", "zqxw", "vbnm">>),
+					create {KB_COMMAND_LINE}.make (<<"search", "zqxw vbnm">>),
+					create {KB_COMMAND_LINE}.make (<<"stats", "badarg">>)
+				>> as line
+			loop
+				l_local := l_app.output_of (line)
+				-- As KB_DAEMON_CLIENT.run sends it and KB_DAEMON_SESSION reads it
+				create l_request.make ("1")
+				l_request.put (line.command, "command")
+				l_request.put (line.lines, "args")
+				l_request.put ("true", "interactive")
+				assert ("same_output", l_app.output_of ((create {KB_DAEMON_MESSAGE}.make_from_json (l_request.to_json)).arguments).same_string (l_local))
+			end
+			assert ("first_word_only", l_app.output_of (create {KB_COMMAND_LINE}.make (<<"search", "zqxw", "vbnm">>)).has_substring ("for: zqxw%N"))
+			assert ("usage", l_app.output_of (create {KB_COMMAND_LINE}.make (<<"stats", "badarg">>)).has_substring ("Usage: kb stats"))
+		end
+
+feature -- Batch Tests
+
+	test_batch_answer_line
+			-- Test batch queries are answered as one NDJSON line each
+		local
+			l_class: KB_CLASS_INFO
+			l_jobs: separate KB_BATCH_JOBS
+			l_worker: KB_BATCH_WORKER
+			l_line: STRING
+		do
+			create l_class.make ("test_lib", "NDJSON_PROBE_CLASS")
+			db.add_class (l_class)
+			create l_jobs.make (0)
+			create l_worker.make ({STRING_32} ":memory:", l_jobs)
+			l_line := l_worker.answer_line (db, 3, "class ndjson_probe_class")
+			assert ("line_number", l_line.starts_with ("{%"line%": 3,"))
+			assert ("class_found", l_line.has_substring ("%"kind%": %"class%", %"found%": true"))
+			assert ("single_line", not l_line.has ('%N'))
+			l_line := l_worker.answer_line (db, 4, "error NOT_A_CODE")
+			assert ("error_not_found", l_line.has_substring ("%"found%": false"))
+			l_line := l_worker.answer_line (db, 5, "ndjson probe")
+			assert ("plain_text_searched", l_line.has_substring ("%"kind%": %"search%""))
+		end
+
+feature -- AI Cache Tests
+
+	test_ai_cache_round_trip
+			-- Test provider responses are reused per prompt and evicted by size
+		local
+			l_cache: KB_AI_CACHE
+		do
+			create l_cache.make_in_memory
+			assert ("empty_miss", l_cache.item ("ollama", "llama3", "system", "json parsing") = Void)
+			l_cache.put ("ollama", "llama3", "system", "json parsing", "json parse")
+			assert ("hit", attached l_cache.item ("ollama", "llama3", "system", "json parsing") as al_text and then
+				al_text.same_string ("json parse"))
+			assert ("other_model_miss", l_cache.item ("ollama", "mistral", "system", "json parsing") = Void)
+			assert ("other_prompt_miss", l_cache.item ("ollama", "llama3", "other system", "json parsing") = Void)
+			assert ("counted", l_cache.hits = 1 and l_cache.misses = 3 and l_cache.total_hits = 1)
+
+			l_cache.set_max_chars (15)
+			l_cache.put ("ollama", "llama3", "system", "http request", "http client get")
+			assert ("oldest_evicted", l_cache.count = 1)
+			l_cache.wipe_out
+			assert ("wiped", l_cache.count = 0 and l_cache.total_misses = 0)
+		end
+
+	test_ai_request_without_client
+			-- Test a request for a provider without a client fails with a message
+		local
+			l_request: KB_AI_REQUEST
+		do
+			create l_request.make ({STRING_32} "no_such_provider", Void, {STRING_32} "system", {STRING_32} "json parsing")
+			assert ("not_done", not l_request.is_done)
+			l_request.run
+			assert ("done", l_request.is_done)
+			assert ("no_text", l_request.text = Void)
+			assert ("error_names_provider", attached l_request.error_message as al_e and then al_e.has_substring ("no_such_provider"))
+		end
+
+feature -- Streaming Tests
+
+	test_streamed_answer_not_repeated
+			-- Test an answer shown while generated is left out of the formatted result
+		local
+			l_result: KB_QUERY_RESULT
+		do
+			create l_result.make ("stream probe question")
+			l_result.set_mode ("raw-kb")
+			l_result.set_synthesized_answer ("Streamed probe answer")
+			l_result.add_citation ("STREAM_PROBE_CLASS")
+			assert ("shown_when_not_streamed", l_result.formatted.has_substring ("Streamed probe answer"))
+			l_result.set_answer_streamed
+			assert ("left_out_when_streamed", not l_result.formatted.has_substring ("Streamed probe answer"))
+			assert ("sources_kept", l_result.formatted.has_substring ("STREAM_PROBE_CLASS"))
+		end
+
+	test_streamed_pieces_sanitized
+			-- Test pieces are sanitized like the whole answer
+		do
+			assert ("arrow", {KB_QUERY_RESULT}.sanitize_for_console ({STRING_32} "a → b").same_string ("a -> b"))
+			assert ("split_text", ({KB_QUERY_RESULT}.sanitize_for_console ({STRING_32} "x ≥") +
+				{KB_QUERY_RESULT}.sanitize_for_console ({STRING_32} " 1 •")).same_string ("x >= 1 *"))
+		end
+
+	test_pager_stream
+			-- Test a streamed text is paged by line, asking only when more text follows a full page
+		local
+			l_pager: TEST_PAGER
+		do
+			create l_pager.make_scripted (2, <<True, False>>)
+			l_pager.start_stream
+			l_pager.put_stream ("one%Ntwo%N")
+			assert ("no_prompt_at_page_end", l_pager.prompts = 0)
+			l_pager.put_stream ("thr")
+			assert ("prompt_before_more", l_pager.prompts = 1)
+			l_pager.put_stream ("ee%Nfour%Nfive%N")
+			assert ("stopped", l_pager.is_stream_stopped and l_pager.prompts = 2)
+			l_pager.put_stream ("six%N")
+			l_pager.end_stream
+			assert ("shown", l_pager.shown.same_string ("one%Ntwo%Nthree%Nfour%N"))
+			assert ("lines", l_pager.stream_lines = 4)
+			assert ("not_streaming", not l_pager.is_streaming)
+
+			create l_pager.make_scripted (1, {ARRAY [BOOLEAN]} <<>>)
+			l_pager.disable
+			l_pager.start_stream
+			l_pager.put_stream ("a%Nb%Nc")
+			l_pager.end_stream
+			assert ("unpaged", l_pager.prompts = 0 and l_pager.shown.same_string ("a%Nb%Nc%N"))
+			assert ("unpaged_lines", l_pager.stream_lines = 2)
+		end
+
+	test_ollama_stream_read_piece
+			-- Test NDJSON lines from Ollama are read into pieces and the last one is found
+		local
+			l_stream: KB_OLLAMA_STREAM
+			l_text: STRING_32
+			l_pieces: ARRAYED_LIST [STRING_32]
+			l_started: DATE_TIME
+		do
+			create l_stream.make ("llama3")
+			create l_text.make_empty
+			create l_pieces.make (4)
+			create l_started.make_now_utc
+			assert ("piece", not l_stream.read_piece ("{%"model%":%"llama3%",%"response%":%"Use %",%"done%":false}", l_text, agent l_pieces.extend, l_started))
+			assert ("escaped", not l_stream.read_piece ("{%"response%":%"caf\u00e9 \%"done\%":true%",%"done%":false}", l_text, agent l_pieces.extend, l_started))
+			assert ("empty_piece_skipped", not l_stream.read_piece ("{%"response%":%"%",%"done%":false}", l_text, agent l_pieces.extend, l_started))
+			assert ("done", l_stream.read_piece ("{%"model%":%"llama3%",%"response%":%"%",%"done%":true,%"total_duration%":1}", l_text, agent l_pieces.extend, l_started))
+			assert ("done_spaced", l_stream.read_piece ("{%"response%": %"%", %"done%": true}", l_text, agent l_pieces.extend, l_started))
+			assert ("text", l_text.same_string ({STRING_32} "Use caf%/233/ %"done%":true"))
+			assert ("pieces", l_pieces.count = 2)
+			assert ("first_piece_timed", l_stream.first_piece_micros > 0)
+			assert ("no_error", l_stream.last_error = Void)
+			assert ("error_ends", l_stream.read_piece ("{%"error%":%"model 'x' not found%"}", l_text, agent l_pieces.extend, l_started))
+			assert ("error_kept", attached l_stream.last_error as al_e and then al_e.has_substring ("not found"))
+		end
+
+feature -- Keyword Tests
+
+	test_local_keywords
+			-- Test keywords come from class names and error codes the KB knows
+		local
+			l_class: KB_CLASS_INFO
+			l_error: KB_ERROR_INFO
+			l_extractor: KB_KEYWORD_EXTRACTOR
+			l_keywords, l_question: STRING_32
+			i: INTEGER
+		do
+			create l_class.make ("test_lib", "KEYWORD_PROBE_CLASS")
+			db.add_class (l_class)
+			create l_error.make ("KWP1", "Keyword probe violated")
+			db.add_error (l_error)
+			create l_extractor.make (db.db)
+			l_keywords := l_extractor.keywords ("What is KWP1 in KEYWORD_PROBE_CLASS?")
+			assert ("class_keyword", l_keywords.has_substring ("keyword_probe_class"))
+			assert ("error_keyword", l_keywords.has_substring ("kwp1"))
+			assert ("stopword_dropped", not l_keywords.has_substring ("what"))
+			assert ("confident", l_extractor.last_confidence >= l_extractor.Default_threshold)
+			l_keywords := l_extractor.keywords ("zzqx wobblefrob")
+			assert ("unknown_words", l_keywords.is_empty and l_extractor.last_confidence = 0.0)
+			-- More words than one query can bind (SQLite's 999 variables)
+			create l_question.make (6000)
+			from i := 1 until i > 700 loop
+				l_question.append ("word" + i.out + " ")
+				i := i + 1
+			end
+			l_question.append ("KEYWORD_PROBE_CLASS")
+			assert ("long_question", l_extractor.keywords (l_question).has_substring ("keyword_probe_class"))
+		end
+
+feature -- Perf Tests
+
+	test_perf_percentiles
+			-- Test phase timings are summarized as nearest-rank percentiles
+		local
+			l_perf: KB_PERF
+			l_json: STRING
+			i: INTEGER
+		do
+			create l_perf.make
+			from i := 100 until i < 1 loop
+				l_perf.add_sample ("probe.phase", i * 1000)
+				i := i - 1
+			end
+			assert ("pending", l_perf.has_pending)
+			l_json := l_perf.to_json ("no_such_dir/kb.perf")
+			assert ("count", l_json.has_substring ("%"probe.phase%": {%"count%": 100"))
+			assert ("p50", l_json.has_substring ("%"p50_ms%": 50.0"))
+			assert ("p95", l_json.has_substring ("%"p95_ms%": 95.0"))
+			assert ("max", l_json.has_substring ("%"max_ms%": 100.0"))
+			assert ("report_row", l_perf.report ("no_such_dir/kb.perf").has_substring ("probe.phase"))
+		end
+
 feature -- Edge Case Tests
 
 	test_class_no_parents
@@ -42,6 +42,9 @@ feature -- Tests
 			run_test (agent lib_tests.test_database_create, "test_database_create")
 			run_test (agent lib_tests.test_schema_creation, "test_schema_creation")
 			run_test (agent lib_tests.test_fts5_available, "test_fts5_available")
+			run_test (agent lib_tests.test_search_prefix_indexes, "test_search_prefix_indexes")
+			run_test (agent lib_tests.test_tuning_presets, "test_tuning_presets")
+			run_test (agent lib_tests.test_use_bulk_tuning, "test_use_bulk_tuning")
 
 			io.put_string ("%NError Tests:%N")
 			run_test (agent lib_tests.test_add_error, "test_add_error")
@@ -51,10 +54,16 @@ feature -- Tests
 			io.put_string ("%NSearch Tests:%N")
 			run_test (agent lib_tests.test_search_basic, "test_search_basic")
 			run_test (agent lib_tests.test_search_ranking, "test_search_ranking")
+			run_test (agent lib_tests.test_search_external_content, "test_search_external_content")
+			run_test (agent lib_tests.test_search_regular_replace, "test_search_regular_replace")
+			run_test (agent lib_tests.test_search_cached, "test_search_cached")
+			run_test (agent lib_tests.test_search_snippets, "test_search_snippets")
 
 			io.put_string ("%NClass Tests:%N")
 			run_test (agent lib_tests.test_add_class, "test_add_class")
 			run_test (agent lib_tests.test_find_class, "test_find_class")
+			run_test (agent lib_tests.test_search_classes_batched_features, "test_search_classes_batched_features")
+			run_test (agent lib_tests.test_class_name_lookups, "test_class_name_lookups")
 
 			io.put_string ("%NExample Tests:%N")
 			run_test (agent lib_tests.test_add_example, "test_add_example")
@@ -102,6 +111,37 @@ feature -- Tests
 			run_test (agent lib_tests.test_feature_deferred, "test_feature_deferred")
 			run_test (agent lib_tests.test_feature_once, "test_feature_once")
 
+			io.put_string ("%NFAQ Tests:%N")
+			run_test (agent lib_tests.test_faq_store_indexed, "test_faq_store_indexed")
+			run_test (agent lib_tests.test_faq_delete_unindexed, "test_faq_delete_unindexed")
+			run_test (agent lib_tests.test_faq_near_duplicate_merged, "test_faq_near_duplicate_merged")
+			run_test (agent lib_tests.test_faq_minhash_buckets, "test_faq_minhash_buckets")
+			run_test (agent lib_tests.test_faq_similar_paraphrase, "test_faq_similar_paraphrase")
+			run_test (agent lib_tests.test_faq_answered_question, "test_faq_answered_question")
+
+			io.put_string ("%NDaemon Tests:%N")
+			run_test (agent lib_tests.test_daemon_message_round_trip, "test_daemon_message_round_trip")
+			run_test (agent lib_tests.test_daemon_output_matches_local, "test_daemon_output_matches_local")
+
+			io.put_string ("%NBatch Tests:%N")
+			run_test (agent lib_tests.test_batch_answer_line, "test_batch_answer_line")
+
+			io.put_string ("%NAI Cache Tests:%N")
+			run_test (agent lib_tests.test_ai_cache_round_trip, "test_ai_cache_round_trip")
+			run_test (agent lib_tests.test_ai_request_without_client, "test_ai_request_without_client")
+
+			io.put_string ("%NStreaming Tests:%N")
+			run_test (agent lib_tests.test_streamed_answer_not_repeated, "test_streamed_answer_not_repeated")
+			run_test (agent lib_tests.test_streamed_pieces_sanitized, "test_streamed_pieces_sanitized")
+			run_test (agent lib_tests.test_pager_stream, "test_pager_stream")
+			run_test (agent lib_tests.test_ollama_stream_read_piece, "test_ollama_stream_read_piece")
+
+			io.put_string ("%NKeyword Tests:%N")
+			run_test (agent lib_tests.test_local_keywords, "test_local_keywords")
+
+			io.put_string ("%NPerf Tests:%N")
+			run_test (agent lib_tests.test_perf_percentiles, "test_perf_percentiles")
+
 			io.put_string ("%NEdge Case Tests:%N")
 			run_test (agent lib_tests.test_class_no_parents, "test_class_no_parents")
 			run_test (agent lib_tests.test_unknown_class_ancestry, "test_unknown_class_ancestry")
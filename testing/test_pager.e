@@ -0,0 +1,57 @@
+note
+	description: "KB_PAGER that records what it shows and answers its prompts from a script"
+
+class
+	TEST_PAGER
+
+inherit
+	KB_PAGER
+		redefine
+			write,
+			continues
+		end
+
+create
+	make_scripted
+
+feature {NONE} -- Initialization
+
+	make_scripted (a_page_size: INTEGER; a_answers: ARRAY [BOOLEAN])
+			-- Pager of `a_page_size' lines answering its prompts with `a_answers', then "stop"
+		require
+			positive_size: a_page_size > 0
+		do
+			make (a_page_size)
+			answers := a_answers
+			create shown.make_empty
+		end
+
+feature -- Access
+
+	shown: STRING
+			-- Text shown so far
+
+	prompts: INTEGER
+			-- Prompts asked so far
+
+feature {NONE} -- Implementation
+
+	answers: ARRAY [BOOLEAN]
+			-- Answer to each prompt in turn (continue?)
+
+	write (a_text: READABLE_STRING_8)
+			-- Record `a_text'
+		do
+			shown.append (a_text)
+		end
+
+	continues (a_prompt: READABLE_STRING_8): BOOLEAN
+			-- Next scripted answer (False once they run out)
+		do
+			prompts := prompts + 1
+			if answers.valid_index (answers.lower + prompts - 1) then
+				Result := answers [answers.lower + prompts - 1]
+			end
+		end
+
+end